@@ -0,0 +1,66 @@
+"""feat: add status to deal_outbox
+
+The event, that isn't delivered by the max count of the attempts (or
+whose payload is invalid), is failed instead of the retries forever. The
+failed events are kept for the inspection, the pending ones are claimed by
+the partial index.
+
+Revision ID: 3c8f1a6d2e94
+Revises: 5e8a1c7d3f29
+Create Date: 2026-10-20 11:24:08.371592
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c8f1a6d2e94"
+down_revision: str | Sequence[str] | None = "5e8a1c7d3f29"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    # the existing events are pending
+    op.add_column(
+        "deal_outbox",
+        sa.Column(
+            "status",
+            sa.String(length=20),
+            nullable=False,
+            server_default="pending",
+        ),
+    )
+    op.alter_column("deal_outbox", "status", server_default=None)
+    op.drop_index("deal_outbox_available_at_idx", table_name="deal_outbox")
+    op.create_index(
+        "deal_outbox_available_at_idx",
+        "deal_outbox",
+        ["available_at", "outbox_id"],
+        unique=False,
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    The failed events are deleted.
+    """
+    op.drop_index(
+        "deal_outbox_available_at_idx",
+        table_name="deal_outbox",
+        postgresql_where=sa.text("status = 'pending'"),
+    )
+    op.execute("delete from deal_outbox where status = 'failed'")
+    op.create_index(
+        "deal_outbox_available_at_idx",
+        "deal_outbox",
+        ["available_at", "outbox_id"],
+        unique=False,
+    )
+    op.drop_column("deal_outbox", "status")
@@ -0,0 +1,298 @@
+"""feat: range partition deal_message and deal_history by month
+
+The deal messages and the deal history are split into the monthly
+partitions by sent_at and changed_at, so the indexes of the old months
+aren't touched by the recent writes and reads, the time bounded queries
+are pruned to the partitions of their months, and the old months are
+archived by the detach of their partitions instead of the deletes.
+
+The partitions are named <table>_<YYYYMM>. The partitions of the months of
+the existing rows and of the next months are created by the
+create_month_partition function, the partitions of the later months are
+created by the deal partition archiver. The rows out of the partitions are
+saved in the default partition, the function moves them to the partition
+of their month, when it's created.
+
+The partition key is added to the primary keys, the identities keep their
+positions.
+
+Revision ID: 7b3f9d2e4c60
+Revises: 2d9b6e4c8a13
+Create Date: 2026-10-19 23:41:07.512846
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7b3f9d2e4c60"
+down_revision: str | Sequence[str] | None = "2d9b6e4c8a13"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# the count of the next months, whose partitions are created
+PREMAKE_MONTHS = 3
+
+# table name -> (partition key, identity column)
+PARTITIONED_TABLES = {
+    "deal_message": ("sent_at", "deal_message_id"),
+    "deal_history": ("changed_at", "deal_history_id"),
+}
+
+DEAL_MESSAGE_COLUMNS = (
+    "deal_message_id, deal_id, user_id, message, is_updated, viewed_at,"
+    " sent_at"
+)
+DEAL_HISTORY_COLUMNS = (
+    "deal_history_id, deal_id, sale_stage_id, probability, lost_reason_id,"
+    " lost_reason_additional_text, manager_id, changed_at"
+)
+
+
+def execute(statements: Sequence[str]) -> None:
+    # asyncpg doesn't allow several commands in one statement
+    for statement in statements:
+        op.execute(statement)
+
+
+def rename_to_old_tables() -> None:
+    """Free the names of the tables, sequences, constraints and indexes."""
+    for table_name, (_, identity_column) in PARTITIONED_TABLES.items():
+        execute(
+            [
+                f"alter table {table_name} rename to {table_name}_old",
+                f"alter table {table_name}_old"
+                f" rename constraint {table_name}_pkey"
+                f" to {table_name}_old_pkey",
+                f"alter sequence {table_name}_{identity_column}_seq"
+                f" rename to {table_name}_old_{identity_column}_seq",
+            ]
+        )
+    execute(
+        [
+            "alter index deal_message_deal_id_sent_at_idx"
+            " rename to deal_message_old_deal_id_sent_at_idx",
+            "alter index deal_message_unread_idx"
+            " rename to deal_message_old_unread_idx",
+            "alter index deal_history_deal_id_changed_at_idx"
+            " rename to deal_history_old_deal_id_changed_at_idx",
+        ]
+    )
+
+
+def create_tables(partitioned: bool = False) -> None:
+    message_key = (
+        "deal_message_id, sent_at" if partitioned else "deal_message_id"
+    )
+    history_key = (
+        "deal_history_id, changed_at" if partitioned else "deal_history_id"
+    )
+    op.execute(f"""
+        create table deal_message (
+            deal_message_id bigint generated always as identity,
+            deal_id uuid not null
+                references deal (deal_id) on delete cascade,
+            user_id uuid
+                references "user" (user_id) on delete set null,
+            message varchar(4096) not null,
+            is_updated boolean not null,
+            viewed_at timestamp with time zone,
+            sent_at timestamp with time zone not null,
+            constraint deal_message_pkey primary key ({message_key}),
+            constraint deal_message_check check (length(message) > 0)
+        ) {"partition by range (sent_at)" if partitioned else ""};
+    """)
+    op.execute(f"""
+        create table deal_history (
+            deal_history_id bigint generated always as identity,
+            deal_id uuid not null
+                references deal (deal_id) on delete cascade,
+            sale_stage_id integer not null
+                references sale_stage (sale_stage_id) on delete cascade,
+            probability numeric(3, 2) not null,
+            lost_reason_id integer
+                references lost_reason (lost_reason_id) on delete set null,
+            lost_reason_additional_text text,
+            manager_id uuid
+                references "user" (user_id) on delete set null,
+            changed_at timestamp with time zone not null,
+            constraint deal_history_pkey primary key ({history_key}),
+            constraint deal_history_probability_range
+                check (probability between 0 and 1)
+        ) {"partition by range (changed_at)" if partitioned else ""};
+    """)
+
+
+def create_partitions() -> None:
+    """Create the default partitions and the partitions of the months of
+    the old rows and of the next months.
+    """
+    op.execute("""
+        create or replace function create_month_partition(
+            table_name text, key_column text, month date
+        )
+        returns boolean as $$
+        declare
+            partition_name text :=
+                table_name || '_' || to_char(month, 'YYYYMM');
+            default_name text := table_name || '_default';
+            lower_bound timestamptz := date_trunc(
+                'month', cast(month as timestamp)
+            ) at time zone 'UTC';
+            upper_bound timestamptz := (
+                date_trunc('month', cast(month as timestamp))
+                + interval '1 month'
+            ) at time zone 'UTC';
+            has_default_rows boolean := false;
+        begin
+            if to_regclass(partition_name) is not null then
+                return false;
+            end if;
+
+            if to_regclass(default_name) is not null then
+                execute format(
+                    'select exists ('
+                    'select from %I where %I >= $1 and %I < $2)',
+                    default_name, key_column, key_column
+                ) into has_default_rows using lower_bound, upper_bound;
+            end if;
+
+            if has_default_rows then
+                -- the partition isn't created, while the default partition
+                -- contains the rows of the month, so the rows are moved
+                execute format(
+                    'alter table %I detach partition %I',
+                    table_name, default_name
+                );
+                execute format(
+                    'create table %I partition of %I'
+                    ' for values from (%L) to (%L)',
+                    partition_name, table_name, lower_bound, upper_bound
+                );
+                execute format(
+                    'insert into %I overriding system value select * from %I'
+                    ' where %I >= $1 and %I < $2',
+                    table_name, default_name, key_column, key_column
+                ) using lower_bound, upper_bound;
+                execute format(
+                    'delete from %I where %I >= $1 and %I < $2',
+                    default_name, key_column, key_column
+                ) using lower_bound, upper_bound;
+                execute format(
+                    'alter table %I attach partition %I default',
+                    table_name, default_name
+                );
+            else
+                execute format(
+                    'create table %I partition of %I'
+                    ' for values from (%L) to (%L)',
+                    partition_name, table_name, lower_bound, upper_bound
+                );
+            end if;
+
+            return true;
+        end;
+        $$ language plpgsql;
+        """)
+    for table_name, (key_column, _) in PARTITIONED_TABLES.items():
+        op.execute(f"""
+            create table {table_name}_default
+            partition of {table_name} default;
+        """)
+        op.execute(f"""
+            select create_month_partition(
+                '{table_name}', '{key_column}', cast(month as date)
+            )
+            from generate_series(
+                date_trunc(
+                    'month',
+                    coalesce(
+                        (select min({key_column}) from {table_name}_old),
+                        current_timestamp
+                    ) at time zone 'UTC'
+                ),
+                date_trunc('month', current_timestamp at time zone 'UTC')
+                    + interval '{PREMAKE_MONTHS} months',
+                interval '1 month'
+            ) as month;
+        """)
+
+
+def move_data_from_old_tables() -> None:
+    """Copy the data, restart the identities, create the indexes, drop the
+    old tables.
+    """
+    execute(
+        [
+            f"""
+            insert into deal_message ({DEAL_MESSAGE_COLUMNS})
+            overriding system value
+            select {DEAL_MESSAGE_COLUMNS}
+            from deal_message_old
+            """,
+            f"""
+            insert into deal_history ({DEAL_HISTORY_COLUMNS})
+            overriding system value
+            select {DEAL_HISTORY_COLUMNS}
+            from deal_history_old
+            """,
+        ]
+    )
+    for table_name, (_, identity_column) in PARTITIONED_TABLES.items():
+        op.execute(f"""
+            select setval(
+                pg_get_serial_sequence('{table_name}', '{identity_column}'),
+                greatest(
+                    (
+                        select last_value
+                        from {table_name}_old_{identity_column}_seq
+                    ),
+                    (
+                        select coalesce(max({identity_column}), 1)
+                        from {table_name}
+                    )
+                )
+            );
+        """)
+    execute(
+        [
+            """
+            create index deal_message_deal_id_sent_at_idx
+                on deal_message (deal_id, sent_at, deal_message_id)
+            """,
+            """
+            create index deal_message_unread_idx
+                on deal_message (deal_id, user_id)
+                where viewed_at is null
+            """,
+            """
+            create index deal_history_deal_id_changed_at_idx
+                on deal_history (deal_id, changed_at)
+            """,
+            "drop table deal_message_old",
+            "drop table deal_history_old",
+            "analyze deal_message",
+            "analyze deal_history",
+        ]
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rename_to_old_tables()
+    create_tables(partitioned=True)
+    create_partitions()
+    move_data_from_old_tables()
+
+
+def downgrade() -> None:
+    """Downgrade schema.
+
+    The rows of the archived partitions aren't restored.
+    """
+    rename_to_old_tables()
+    create_tables()
+    move_data_from_old_tables()
+    op.execute("drop function create_month_partition(text, text, date)")
@@ -0,0 +1,39 @@
+"""feat: add expected_close_at to deal
+
+The revenue forecast of the open deals is bucketed by the month of the
+expected close. close_at is the actual close, so the non-null close_at
+always means a closed deal.
+
+Revision ID: 9d4e2b7a1c58
+Revises: 3c8f1a6d2e94
+Create Date: 2026-10-20 14:06:52.918340
+
+"""
+
+from collections.abc import Sequence
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9d4e2b7a1c58"
+down_revision: str | Sequence[str] | None = "3c8f1a6d2e94"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    op.add_column(
+        "deal",
+        sa.Column(
+            "expected_close_at",
+            sa.TIMESTAMP(timezone=True),
+            nullable=True,
+        ),
+    )
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    op.drop_column("deal", "expected_close_at")
@@ -0,0 +1,180 @@
+"""feat: list partition article_translate by language
+
+Every list and search query of the articles filters the translates by
+language_id, so the translates (and the deleted translates) are split into
+the partitions by language. The GIN index of tsv_content is created on the
+partitioned table, so every partition has its own GIN index, and the
+queries with the language filter touch only the index of one language.
+
+The translates of the languages without own partition are saved in the
+default partition. The tsvector_update and the
+trigger_move_to_article_translate_deleted triggers are recreated on the
+partitioned table.
+
+Note: the change of the translate language moves the row to other
+partition (delete + insert), so the old language version of the translate
+is saved to the article_translate_deleted table.
+
+Revision ID: b7e1f4c2a9d3
+Revises: 3af85b38f593
+Create Date: 2026-10-19 12:04:41.318552
+
+"""
+
+from collections.abc import Sequence
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b7e1f4c2a9d3"
+down_revision: str | Sequence[str] | None = "3af85b38f593"
+branch_labels: str | Sequence[str] | None = None
+depends_on: str | Sequence[str] | None = None
+
+# partition suffix -> language_id
+LANGUAGE_PARTITIONS = {"ru": "ru-RU", "kz": "kz-KZ", "en": "en-US"}
+
+ARTICLE_TRANSLATE_COLUMNS = (
+    "article_id, language_id, title, content, image_src, tsv_content"
+)
+ARTICLE_TRANSLATE_DELETED_COLUMNS = (
+    "article_id, language_id, image_src, title, content, tsv_content,"
+    " deleted_at"
+)
+
+
+def execute(statements: Sequence[str]) -> None:
+    # asyncpg doesn't allow several commands in one statement
+    for statement in statements:
+        op.execute(statement)
+
+
+def rename_to_old_tables() -> None:
+    """Free the names of the tables, constraints and indexes."""
+    execute(
+        [
+            "alter table article_translate_deleted"
+            " rename to article_translate_deleted_old",
+            "alter table article_translate_deleted_old"
+            " rename constraint article_translate_deleted_pkey"
+            " to article_translate_deleted_old_pkey",
+            "drop trigger tsvector_update on article_translate",
+            "drop trigger trigger_move_to_article_translate_deleted"
+            " on article_translate",
+            "alter index article_translate_idx"
+            " rename to article_translate_old_idx",
+            "alter table article_translate rename to article_translate_old",
+            "alter table article_translate_old"
+            " rename constraint article_translate_pkey"
+            " to article_translate_old_pkey",
+            "alter table article_translate_old"
+            " rename constraint article_title_language_unique"
+            " to article_old_title_language_unique",
+        ]
+    )
+
+
+def create_tables(partition_by: str = "") -> None:
+    op.execute(f"""
+        create table article_translate_deleted (
+            article_id uuid not null,
+            language_id varchar(10) not null,
+            image_src varchar(255),
+            title varchar(255) not null,
+            content text,
+            tsv_content tsvector,
+            deleted_at timestamp with time zone not null,
+            constraint article_translate_deleted_pkey
+                primary key (article_id, language_id),
+            constraint article_title_check check (length(title) > 0)
+        ) {partition_by};
+    """)
+    op.execute(f"""
+        create table article_translate (
+            article_id uuid not null
+                references article (article_id) on delete cascade,
+            language_id varchar(10) not null
+                references language (language_id) on delete cascade,
+            title varchar(255) not null,
+            content text,
+            image_src varchar(255),
+            tsv_content tsvector,
+            constraint article_translate_pkey
+                primary key (article_id, language_id),
+            constraint article_title_language_unique
+                unique (title, language_id),
+            constraint article_title_check check (length(title) > 0),
+            constraint article_content_check check (length(content) >= 0)
+        ) {partition_by};
+    """)
+
+
+def create_partitions() -> None:
+    for table_name in ("article_translate", "article_translate_deleted"):
+        for suffix, language_id in LANGUAGE_PARTITIONS.items():
+            op.execute(f"""
+                create table {table_name}_{suffix}
+                partition of {table_name} for values in ('{language_id}');
+            """)
+        op.execute(f"""
+            create table {table_name}_default
+            partition of {table_name} default;
+        """)
+
+
+def move_data_from_old_tables() -> None:
+    """Copy the data, create the index and the triggers, drop old tables.
+
+    The triggers are created after the copy, so the tsv_content isn't
+    recalculated for the copied rows.
+    """
+    execute(
+        [
+            f"""
+            insert into article_translate_deleted
+                ({ARTICLE_TRANSLATE_DELETED_COLUMNS})
+            select {ARTICLE_TRANSLATE_DELETED_COLUMNS}
+            from article_translate_deleted_old
+            """,
+            f"""
+            insert into article_translate ({ARTICLE_TRANSLATE_COLUMNS})
+            select {ARTICLE_TRANSLATE_COLUMNS}
+            from article_translate_old
+            """,
+            """
+            create index article_translate_idx
+                on article_translate using gin (tsv_content)
+            """,
+            """
+            create trigger tsvector_update
+            before insert or update
+            on article_translate
+            for each row
+            execute function update_tsvector()
+            """,
+            """
+            create trigger trigger_move_to_article_translate_deleted
+            before delete on article_translate
+            for each row execute function move_to_article_translate_deleted()
+            """,
+            "drop table article_translate_old",
+            "drop table article_translate_deleted_old",
+            "analyze article_translate",
+            "analyze article_translate_deleted",
+        ]
+    )
+
+
+def upgrade() -> None:
+    """Upgrade schema."""
+    rename_to_old_tables()
+    create_tables(partition_by="partition by list (language_id)")
+    create_partitions()
+    move_data_from_old_tables()
+
+
+def downgrade() -> None:
+    """Downgrade schema."""
+    rename_to_old_tables()
+    create_tables()
+    move_data_from_old_tables()
@@ -2,6 +2,7 @@
 The file of the dependencies, that are using by these endpoints
 """
 
+from collections.abc import Callable
 from http import HTTPStatus
 from pathlib import Path
 
@@ -9,7 +10,7 @@ from fastapi import Depends, HTTPException, Request, WebSocket
 from starlette.status import HTTP_401_UNAUTHORIZED, HTTP_405_METHOD_NOT_ALLOWED
 
 # project configuration file
-from core.config import auth_settings
+from core.config import auth_settings, language_settings
 from core.logger.logger import get_configure_logger
 from domain.enums import LanguageEnum
 from domain.exceptions import (
@@ -25,7 +26,7 @@ from repository.user_repository import (
     UserRepository,
     user_repository_dependency,
 )
-from services.auth_service import AuthService
+from services.auth_service import AuthService, validate_access_token
 from services.classes.token import Token, TokenPayload
 from services.email_verification_service import (
     EmailVerificationService,
@@ -92,6 +93,39 @@ def auth_dependency(
             detail="Allowed only HTTP and WS requests",
         )
 
+    return _get_token_payload(
+        source=source, validate=auth_master.validate_access_token
+    )
+
+
+def websocket_auth_dependency(websocket: WebSocket) -> TokenPayload:
+    """FastAPI dependency that provides auth checking of the websocket.
+
+    The access token is validated without the database, so the long-lived
+    connection doesn't hold the database session.
+
+    Returns:
+        The payload of the access token.
+    """
+    return _get_token_payload(source=websocket, validate=validate_access_token)
+
+
+def stream_auth_dependency(request: Request) -> TokenPayload:
+    """FastAPI dependency that provides auth checking of the event stream.
+
+    The access token is validated without the database, like the token of
+    the websocket.
+
+    Returns:
+        The payload of the access token.
+    """
+    return _get_token_payload(source=request, validate=validate_access_token)
+
+
+def _get_token_payload(
+    source: Request | WebSocket,
+    validate: Callable[[Token], TokenPayload],
+) -> TokenPayload:
     try:
         access_token = source.cookies.get(auth_settings.access_cookie_name)
         if not access_token:
@@ -99,9 +133,7 @@ def auth_dependency(
                 status_code=HTTP_401_UNAUTHORIZED,
                 detail="Access token not found in cookies.",
             )
-        return auth_master.validate_access_token(
-            token=Token(token=access_token)
-        )
+        return validate(Token(token=access_token))
     except (
         AccessTokenAbsenceError,
         InvalidTokenDataError,
@@ -113,19 +145,95 @@ def auth_dependency(
         ) from error
 
 
+def parse_accept_language(header: str) -> list[LanguageEnum]:
+    """Parse the Accept-Language header into the supported languages.
+
+    Languages are ordered by their q-value (the order of the header is kept
+    for the equal q-values). Unsupported and not acceptable (q=0) languages
+    are skipped. The tag without region (e.g. "en") is matched by the
+    primary subtag of the supported languages.
+
+    Examples:
+        "kz-KZ,ru-RU;q=0.9,en;q=0.8" -> [kz-KZ, ru-RU, en-US]
+
+    Args:
+        header: The raw value of the Accept-Language header.
+
+    Returns:
+        The list of supported languages without duplicates.
+    """
+    weighted_languages: list[tuple[float, str]] = []
+
+    for part in header.split(","):
+        tag, *params = part.strip().split(";")
+        quality = 1.0
+        for param in params:
+            name, _, value = param.strip().partition("=")
+            if name == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        if tag and quality > 0:
+            weighted_languages.append((quality, tag.strip()))
+
+    # sorted is stable, so the header order is kept for the equal q-values
+    weighted_languages.sort(key=lambda language: language[0], reverse=True)
+
+    languages: list[LanguageEnum] = []
+    for _, tag in weighted_languages:
+        language = next(
+            (
+                supported
+                for supported in LanguageEnum
+                if tag.lower() == supported.lower()
+                or tag.lower() == supported.split("-")[0].lower()
+            ),
+            None,
+        )
+        if language and language not in languages:
+            languages.append(language)
+
+    return languages
+
+
+def languages_dependency(
+    request: Request, preferred_language: LanguageEnum | None = None
+) -> tuple[LanguageEnum, ...]:
+    """FastAPI dependency that provides the fallback chain of languages.
+
+    The chain is: the explicitly preferred language, the languages of the
+    Accept-Language header (by q-value) and the configured fallback
+    languages.
+
+    Returns:
+        The ordered tuple of the unique languages. It's never empty.
+    """
+    languages: list[LanguageEnum] = (
+        [preferred_language] if preferred_language else []
+    )
+    languages += parse_accept_language(
+        request.headers.get("Accept-Language", "")
+    )
+    languages += language_settings.fallback_languages
+
+    languages_chain = tuple(dict.fromkeys(languages)) or (
+        LanguageEnum.DEFAULT_LANGUAGE,
+    )
+    logger.debug("Languages chain of the request: %s.", languages_chain)
+
+    return languages_chain
+
+
 # TODO: change return types
 def language_dependency(
     request: Request, preferred_language: str | None = None
 ) -> LanguageEnum | str | None:
     if not preferred_language:
-        request_language = request.headers.get("Accept-Language", "")
-
-        # parse Accept-Language header
-        preferred_language = request_language.split(";")[0].split(",")[0]
-
-        # TODO: create a cycle of getting preferred languages and checking
-        #  that language is in the LanguageEnum (supports in our application).
-        #  Else set language to the default language
+        languages = parse_accept_language(
+            request.headers.get("Accept-Language", "")
+        )
+        preferred_language = languages[0] if languages else None
 
     logger.debug("Preferred accept-language header: %s.", preferred_language)
 
@@ -1,7 +1,14 @@
 from pathlib import Path
 from uuid import UUID
 
-from fastapi import APIRouter, Body, Depends, HTTPException, Query
+from fastapi import (
+    APIRouter,
+    Body,
+    Depends,
+    HTTPException,
+    Query,
+    Response,
+)
 from starlette.status import (
     HTTP_200_OK,
     HTTP_201_CREATED,
@@ -13,7 +20,8 @@ from starlette.status import (
     HTTP_500_INTERNAL_SERVER_ERROR,
 )
 
-from api.v1.depends import language_dependency
+from api.v1.depends import language_dependency, languages_dependency
+from core.config import search_settings
 from core.general_constants import BASE_MAX_STR_LENGTH, BASE_MIN_STR_LENGTH
 from core.logger.logger import get_configure_logger
 from domain.enums import (
@@ -208,6 +216,9 @@ async def set_tags_to_article(
     description="""
     This endpoint allows fetching a paginated and sortable list of articles,
     with options to filter by categories, statuses, and tags.
+
+    The search by text ranks only the capped set of the newest matching
+    articles. If the search matched more articles, `truncated` is true.
     """,
     responses={
         200: {
@@ -284,6 +295,7 @@ async def get_all_articles(
             statuses=tuple(statuses) if statuses else None,
             tags=tuple(tags) if tags else None,
             searched_text=str(searched_text) if searched_text else None,
+            candidates_limit=search_settings.article_list_candidates_limit,
             limit=limits.limit,
             offset=offsets.offset,
             order_by=order_by,
@@ -305,13 +317,110 @@ async def get_all_articles(
         ) from error
 
 
+@router.get(
+    "/by-slug/{slug}",
+    response_model=ArticleResponseSchema,
+    summary="Retrieve a single article by its slug",
+    description="""
+    This endpoint retrieves detailed information for a specific article
+    using its SEO slug. The slug is resolved by the in-memory slug index,
+    so the lookup costs only the article fetch. The languages are resolved
+    like in the `GET /article/{article_id}` endpoint.
+    """,
+    responses={
+        400: {
+            "description": (
+                "Bad Request - Invalid input (e.g., missing slug or "
+                "integrity issue)."
+            )
+        },
+        404: {
+            "description": (
+                "Not Found - Article or related author does not exist."
+            )
+        },
+        500: {
+            "description": (
+                "Internal Server Error - Database or service-level error."
+            )
+        },
+    },
+)
+async def get_article_by_slug(
+    slug: str,
+    response: Response,
+    languages: tuple[LanguageEnum, ...] = Depends(languages_dependency),
+    article_service: ArticleService = Depends(article_service_dependency),
+):
+    """
+    Retrieve a single article by its slug.
+
+    Args:
+        slug (str): The SEO slug of the article to retrieve.
+        response (Response): The response to set the Content-Language
+            header.
+        languages (tuple[LanguageEnum, ...]): The fallback chain of the
+            languages of the article to retrieve.
+        article_service (ArticleService): Dependency for article-related
+            operations.
+
+    Returns:
+        ArticleResponseSchema: The detailed information of the requested
+            article.
+
+    Raises:
+        HTTPException:
+            - 400 Bad Request: If `SlugIsMissingError` or
+              `ArticleIntegrityError` occurs.
+            - 404 Not Found: If `AuthorDoesNotExistsError` or
+              `ArticleDoesNotExistsError` occurs.
+            - 500 Internal Server Error: If a database error occurs during
+              article retrieval.
+    """
+    try:
+        article = await article_service.get_article_by_slug(
+            slug=slug, languages=languages
+        )
+        if article:
+            response.headers["Content-Language"] = article.language
+        return article
+    except ContentTitleValidationError as error:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+    except SlugIsMissingError as error:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+    except ArticleIntegrityError as error:
+        raise HTTPException(
+            status_code=HTTP_400_BAD_REQUEST, detail=str(error)
+        ) from error
+    except AuthorDoesNotExistsError as error:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail=str(error)
+        ) from error
+    except ArticleDoesNotExistsError as error:
+        raise HTTPException(
+            status_code=HTTP_404_NOT_FOUND, detail=str(error)
+        ) from error
+    except ArticleDatabaseError as error:
+        raise HTTPException(
+            status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)
+        ) from error
+
+
 @router.get(
     "/{article_id}",
     response_model=ArticleResponseSchema,
     summary="Retrieve a single article by its ID",
     description="""
     This endpoint retrieves detailed information for a specific article
-    using its unique identifier (UUID).
+    using its unique identifier (UUID). If the article hasn't the translation
+    in the preferred language, the next language of the Accept-Language
+    header (by q-value) or of the configured fallback chain is served.
+    The served language is returned in the `language` field and in the
+    `Content-Language` header.
     """,
     responses={
         400: {
@@ -321,7 +430,7 @@ async def get_all_articles(
             )
         },
         404: {
-            "description": "Not Found - Article or related author does not exist."
+            "description": "Not Found - Article or its author does not exist."
         },
         500: {
             "description": (
@@ -332,7 +441,8 @@ async def get_all_articles(
 )
 async def get_article(
     article_id: UUID,
-    language: LanguageEnum = Depends(language_dependency),
+    response: Response,
+    languages: tuple[LanguageEnum, ...] = Depends(languages_dependency),
     article_service: ArticleService = Depends(article_service_dependency),
 ):
     """
@@ -340,8 +450,10 @@ async def get_article(
 
     Args:
         article_id (UUID): The UUID of the article to retrieve.
-        language (LanguageEnum): The language version of the article to
-            retrieve.
+        response (Response): The response to set the Content-Language
+            header.
+        languages (tuple[LanguageEnum, ...]): The fallback chain of the
+            languages of the article to retrieve.
         article_service (ArticleService): Dependency for article-related
             operations.
 
@@ -360,7 +472,14 @@ async def get_article(
     """
     try:
         # Call the article service to fetch a single article by its ID.
-        return await article_service.get_article(article_id, language)
+        article = await article_service.get_article(
+            article_id=article_id,
+            language=languages[0],
+            fallback_languages=languages[1:],
+        )
+        if article:
+            response.headers["Content-Language"] = article.language
+        return article
     except ContentTitleValidationError as error:
         raise HTTPException(
             status_code=HTTP_400_BAD_REQUEST, detail=str(error)
@@ -5,49 +5,89 @@ from fastapi import (
     APIRouter,
     Body,
     Depends,
+    Header,
     HTTPException,
+    Query,
+    Response,
     WebSocket,
     WebSocketDisconnect,
     WebSocketException,
 )
+from fastapi.responses import StreamingResponse
 from starlette.status import (
+    HTTP_202_ACCEPTED,
+    HTTP_403_FORBIDDEN,
     HTTP_404_NOT_FOUND,
     HTTP_409_CONFLICT,
     HTTP_500_INTERNAL_SERVER_ERROR,
     WS_1000_NORMAL_CLOSURE,
     WS_1002_PROTOCOL_ERROR,
+    WS_1008_POLICY_VIOLATION,
 )
 
-from api.v1.depends import auth_dependency
+from api.v1.depends import (
+    auth_dependency,
+    language_dependency,
+    stream_auth_dependency,
+    websocket_auth_dependency,
+)
 from core.general_constants import MAX_DB_INT
 from domain.entities.deal import Deal
+from domain.enums import DealCreateMode, LanguageEnum
 from domain.exceptions import (
     ChatNotActiveError,
+    DealAccessDeniedError,
     DealAlreadyExistsError,
     DealDBError,
     DealError,
+    DealIntakeNotFoundError,
     DealLeadNotFoundError,
     DealLostReasonNotFoundError,
     DealManagerNotFoundError,
     DealNotFoundError,
     DealSaleStageNotFoundError,
+    ManagersDoesNotExistsError,
     MessageAlreadyExistsError,
     UserNotFoundError,
 )
-from dto.deal_dto import DealShortDTO
+from dto.deal_dto import DealCursorDTO, DealShortDTO, DealStreamEventDTO
+from dto.message_dto import MessageCursorDTO
 from schemas.deal_schema import (
+    DEAL_EVENT_ID_PATTERN,
+    DEAL_SEARCH_QUERY_MAX_LENGTH,
+    DEAL_SEARCH_QUERY_MIN_LENGTH,
+    DealBoardStageSchema,
     DealCreateSchema,
+    DealFiltersSchema,
+    DealIntakeResponseSchema,
+    DealIntakeStatsSchema,
     DealResponseSchema,
     DealShortResponseSchema,
     DealUpdateSchema,
     LostCreateSchema,
     LostResponseSchema,
+    MessagePreviewSchema,
+)
+from schemas.message_schema import (
+    MESSAGE_CURSOR_PATTERN,
+    MESSAGE_SEARCH_QUERY_MAX_LENGTH,
+    DealMessageResponseSchema,
+    MessageAckSchema,
+    MessageCreateSchema,
+    MessageCursorsSchema,
+    MessageSearchResponseSchema,
 )
-from schemas.message_schema import MessageCreateSchema
 from schemas.support_schemas import LimitSchema, OffsetSchema
 from services.abc.deal_service_abc import AbstractDealService
 from services.classes.token import TokenPayload
-from services.deal_service import deal_service_dependency
+from services.deal_event_stream import (
+    DealEventStream,
+    deal_event_stream_dependency,
+)
+from services.deal_service import (
+    deal_chat_service_dependency,
+    deal_service_dependency,
+)
 
 router = APIRouter(prefix="/deal", tags=["deal"])
 
@@ -64,6 +104,7 @@ def get_deal_response(deal: Deal | None) -> DealResponseSchema:
             priority=deal.priority,
             created_at=deal.created_at,
             close_at=deal.close_at,
+            expected_close_at=deal.expected_close_at,
             lost=LostResponseSchema(
                 lost_reason=deal.lost_reason,
                 description=deal.lost_reason_description,
@@ -77,6 +118,47 @@ def get_deal_response(deal: Deal | None) -> DealResponseSchema:
     )
 
 
+def get_deal_card_response(deal: DealShortDTO) -> DealShortResponseSchema:
+    return DealShortResponseSchema(
+        **deal.model_dump(
+            exclude={
+                "last_message_id",
+                "last_message",
+                "last_message_user_id",
+                "last_message_sent_at",
+            }
+        ),
+        last_message=MessagePreviewSchema(
+            message_id=deal.last_message_id,
+            message=deal.last_message,
+            user_id=deal.last_message_user_id,
+            sent_at=deal.last_message_sent_at,
+        )
+        if deal.last_message_id is not None
+        else None,
+        cursor=DealCursorDTO(
+            updated_at=deal.updated_at, deal_id=deal.deal_id
+        ).encode(),
+    )
+
+
+def format_deal_event(event: DealStreamEventDTO | None) -> str:
+    """Format the event of the stream as the server-sent event.
+
+    The heartbeat (None) is the comment, it only keeps the connection open.
+    """
+    if event is None:
+        return ": heartbeat\n\n"
+
+    lines = [f"event: {event.event_type}"]
+    if event.event_id:
+        lines.append(f"id: {event.event_id}")
+    lines.append(
+        f"data: {event.event.model_dump_json() if event.event else '{}'}"
+    )
+    return "\n".join(lines) + "\n\n"
+
+
 def handle_deal_errors(func):
     @wraps(func)
     async def wrapper(*args, **kwargs):
@@ -88,11 +170,17 @@ def handle_deal_errors(func):
             DealSaleStageNotFoundError,
             DealLostReasonNotFoundError,
             DealNotFoundError,
+            DealIntakeNotFoundError,
             UserNotFoundError,
+            ManagersDoesNotExistsError,
         ) as error:
             raise HTTPException(
                 status_code=HTTP_404_NOT_FOUND, detail=str(error)
             ) from error
+        except DealAccessDeniedError as error:
+            raise HTTPException(
+                status_code=HTTP_403_FORBIDDEN, detail=str(error)
+            ) from error
         except (DealAlreadyExistsError, MessageAlreadyExistsError) as error:
             raise HTTPException(
                 status_code=HTTP_409_CONFLICT, detail=str(error)
@@ -108,9 +196,26 @@ def handle_deal_errors(func):
 @router.post("/")
 @handle_deal_errors
 async def create_deal(
+    response: Response,
     deal_create_data: DealCreateSchema = Body(),
+    mode: DealCreateMode = Query(
+        default=DealCreateMode.SYNC,
+        description=(
+            "In the async mode the deal is queued and created by the intake"
+            + " worker, the request is tracked by the returned intake_id."
+        ),
+    ),
     deal_service: AbstractDealService = Depends(deal_service_dependency),
 ):
+    if mode == DealCreateMode.ASYNC:
+        intake_id = await deal_service.enqueue(deal_create_data)
+        response.status_code = HTTP_202_ACCEPTED
+        return {
+            "status": "accepted",
+            "detail": "The deal is queued for the creation.",
+            "intake_id": intake_id,
+        }
+
     deal_id = await deal_service.create(deal_create_data)
     return {
         "status": "success",
@@ -119,45 +224,249 @@ async def create_deal(
     }
 
 
+@router.get("/intake/stats")
+@handle_deal_errors
+async def get_deal_intake_stats(
+    deal_service: AbstractDealService = Depends(deal_service_dependency),
+) -> DealIntakeStatsSchema:
+    """Get the depth and the lag of the deal intake queue.
+
+    The metrics are polled by the autoscaler of the intake workers.
+    """
+    stats = await deal_service.get_intake_stats()
+    return DealIntakeStatsSchema(**stats.model_dump())
+
+
+@router.get("/intake/{intake_id}")
+@handle_deal_errors
+async def get_deal_intake(
+    intake_id: UUID,
+    deal_service: AbstractDealService = Depends(deal_service_dependency),
+) -> DealIntakeResponseSchema:
+    """Get the state of the queued deal creation."""
+    intake = await deal_service.get_intake(intake_id)
+    return DealIntakeResponseSchema(**intake.model_dump())
+
+
 @router.get("/all", response_model=list[DealShortResponseSchema])
 async def get_deals(
     limit: LimitSchema = Depends(),
     offset: OffsetSchema = Depends(),
+    filters: DealFiltersSchema = Depends(),
+    jwt: TokenPayload = Depends(auth_dependency),
     deal_service: AbstractDealService = Depends(deal_service_dependency),
 ):
+    """Get the deal cards, the latest updated first.
+
+    Every card contains the preview of the last message of the deal chat
+    and the count of the messages, that the user hasn't viewed. The leads
+    get only their own deals. The next page is fetched by the `after`
+    cursor of the last card.
+    """
     deals: list[DealShortDTO] = await deal_service.get_deals(
+        user_id=UUID(jwt.user_id),
+        role_id=jwt.role_id,
         limit=int(limit),
         offset=int(offset),
+        filters=filters,
     )
 
-    deals_response = [
-        DealShortResponseSchema(**deal.model_dump()) for deal in deals
-    ]
+    deals_response = [get_deal_card_response(deal) for deal in deals]
 
     return deals_response
 
 
+@router.get("/board")
+@handle_deal_errors
+async def get_deal_board(
+    limit: LimitSchema = Depends(),
+    manager_id: UUID | None = Query(default=None),
+    jwt: TokenPayload = Depends(auth_dependency),
+    deal_service: AbstractDealService = Depends(deal_service_dependency),
+) -> list[DealBoardStageSchema]:
+    """Get the kanban board of the open deals for the managers.
+
+    Every sale stage (except the completed one) contains the count and the
+    total cost of its open deals and the first `limit` cards, the latest
+    updated first.
+    """
+    board = await deal_service.get_board(
+        user_id=UUID(jwt.user_id),
+        role_id=jwt.role_id,
+        limit=int(limit),
+        manager_id=manager_id,
+    )
+
+    return [
+        DealBoardStageSchema(
+            **stage.model_dump(exclude={"deals"}),
+            deals=[get_deal_card_response(deal) for deal in stage.deals],
+        )
+        for stage in board
+    ]
+
+
+@router.get("/search", response_model=list[DealShortResponseSchema])
+@handle_deal_errors
+async def search_deals(
+    query: str = Query(
+        min_length=DEAL_SEARCH_QUERY_MIN_LENGTH,
+        max_length=DEAL_SEARCH_QUERY_MAX_LENGTH,
+        description=(
+            "The email, the phone or the part of the name of the lead."
+            + " The email and the phone are matched after the normalization."
+        ),
+    ),
+    limit: LimitSchema = Depends(),
+    jwt: TokenPayload = Depends(auth_dependency),
+    deal_service: AbstractDealService = Depends(deal_service_dependency),
+):
+    """Search the deal cards for the managers.
+
+    The exact matches of the contacts go first, then the deals of the most
+    similar names of the contacts and of the leads.
+    """
+    deals = await deal_service.search_deals(
+        user_id=UUID(jwt.user_id),
+        role_id=jwt.role_id,
+        query=query,
+        limit=int(limit),
+    )
+
+    return [get_deal_card_response(deal) for deal in deals]
+
+
+@router.get("/messages/search")
+@handle_deal_errors
+async def search_deal_messages(
+    query: str = Query(
+        min_length=1,
+        max_length=MESSAGE_SEARCH_QUERY_MAX_LENGTH,
+        description="The searched words, all of them are matched.",
+    ),
+    limit: LimitSchema = Depends(),
+    language: LanguageEnum = Depends(language_dependency),
+    jwt: TokenPayload = Depends(auth_dependency),
+    deal_service: AbstractDealService = Depends(deal_service_dependency),
+) -> list[MessageSearchResponseSchema]:
+    """Search the chat messages of the deals of the manager.
+
+    The words are matched in all their forms of the language (of the
+    `preferred_language` or of the Accept-Language header). Every found
+    deal is returned once with the snippet of its best matched message,
+    the chat around the message is fetched by its cursor.
+    """
+    messages = await deal_service.search_messages(
+        user_id=UUID(jwt.user_id),
+        role_id=jwt.role_id,
+        language=language,
+        query=query,
+        limit=int(limit),
+    )
+
+    return [
+        MessageSearchResponseSchema(
+            **message.model_dump(),
+            cursor=MessageCursorDTO(
+                sent_at=message.sent_at, message_id=message.message_id
+            ).encode(),
+        )
+        for message in messages
+    ]
+
+
+@router.get("/events")
+async def stream_deal_events(
+    last_event_id: str | None = Header(
+        default=None, pattern=DEAL_EVENT_ID_PATTERN
+    ),
+    jwt: TokenPayload = Depends(stream_auth_dependency),
+    event_stream: DealEventStream = Depends(deal_event_stream_dependency),
+) -> StreamingResponse:
+    """Stream the changes of the deals of the user as the server-sent events.
+
+    The stream contains the events of the deals, where the user is the lead
+    or the manager. The client resumes the stream by the `Last-Event-ID`
+    header. On the `reset` event the missed events aren't available and the
+    client reloads the deals.
+    """
+
+    async def get_events():
+        async for event in event_stream.subscribe(
+            user_id=UUID(jwt.user_id), last_event_id=last_event_id
+        ):
+            yield format_deal_event(event)
+
+    return StreamingResponse(
+        get_events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+
 @router.get("/{deal_id}/messages")
 @handle_deal_errors
 async def get_deal_messages(
     deal_id: UUID,
     limit: LimitSchema = Depends(),
     offset: OffsetSchema = Depends(),
+    cursors: MessageCursorsSchema = Depends(),
     deal_service: AbstractDealService = Depends(deal_service_dependency),
-):
+) -> list[DealMessageResponseSchema]:
+    """Get the messages of the deal in the chronological order.
+
+    Without the cursors the history is paginated from the first message.
+    The `before` cursor returns the latest messages before the message,
+    the `after` cursor returns the messages after the message (e.g. the
+    reconnected client fetches the missed messages after its last message
+    until the page is shorter than the limit).
+    """
     messages = await deal_service.get_messages(
         deal_id=deal_id,
         limit=int(limit),
         offset=int(offset),
+        cursors=cursors,
     )
 
-    if not messages:
+    # the empty page of the cursor isn't an error (e.g. no new messages)
+    if not messages and not (cursors.before or cursors.after):
         raise HTTPException(
             status_code=HTTP_404_NOT_FOUND, detail="Messages not found."
         )
 
-    # TODO: change to schema
-    return messages
+    return [
+        DealMessageResponseSchema(
+            **message.model_dump(),
+            cursor=MessageCursorDTO(
+                sent_at=message.sent_at, message_id=message.message_id
+            ).encode(),
+        )
+        for message in messages
+    ]
+
+
+@router.post("/{deal_id}/messages/viewed")
+@handle_deal_errors
+async def mark_deal_messages_viewed(
+    deal_id: UUID,
+    until: str = Body(pattern=MESSAGE_CURSOR_PATTERN, embed=True),
+    jwt: TokenPayload = Depends(auth_dependency),
+    deal_service: AbstractDealService = Depends(deal_service_dependency),
+):
+    """Mark the messages of other chat members as viewed by the user.
+
+    The messages up to the `until` cursor (inclusive) are viewed, so they
+    aren't counted as unread on the deal card.
+    """
+    viewed_messages = await deal_service.mark_messages_viewed(
+        deal_id=deal_id, user_id=UUID(jwt.user_id), until=until
+    )
+
+    return {
+        "status": "success",
+        "detail": "The messages marked as viewed successfully!",
+        "viewed_quantity": viewed_messages,
+    }
 
 
 @router.websocket("/chat/{deal_id}")
@@ -165,28 +474,54 @@ async def get_deal_messages(
 async def connect_to_deal_chat(
     websocket: WebSocket,
     deal_id: UUID,
-    jwt: TokenPayload = Depends(auth_dependency),
-    deal_service: AbstractDealService = Depends(deal_service_dependency),
+    last_seen: str | None = Query(
+        default=None,
+        pattern=MESSAGE_CURSOR_PATTERN,
+        description=(
+            "Cursor of the last message seen by the client, the latest"
+            + " messages after it are replayed on the connection."
+        ),
+    ),
+    jwt: TokenPayload = Depends(websocket_auth_dependency),
+    deal_service: AbstractDealService = Depends(deal_chat_service_dependency),
 ):
+    """Chat of the deal.
+
+    The latest messages (after the `last_seen` cursor, if it's set) are
+    replayed on the connection, the older ones are fetched by the messages
+    endpoint with the `before` cursor of the first replayed message (and
+    the `after` cursor of the last seen message).
+    """
     user_id = UUID(jwt.user_id)
     try:
         await deal_service.connect_to_chat(
             websocket=websocket,
             deal_id=deal_id,
             user_id=user_id,
+            last_seen=last_seen,
         )
 
         while True:
             data = await websocket.receive_text()
-            await deal_service.write_message(
+            message = await deal_service.write_message(
                 user_id=user_id,
                 message=MessageCreateSchema(
                     message=data,
                     deal_id=deal_id,
                 ),
             )
+            # the message is committed
+            await websocket.send_json(
+                MessageAckSchema(
+                    deal_id=message.deal_id,
+                    message_id=message.message_id,
+                    sent_at=message.sent_at,
+                    cursor=MessageCursorDTO(
+                        sent_at=message.sent_at, message_id=message.message_id
+                    ).encode(),
+                ).model_dump(mode="json")
+            )
     except WebSocketDisconnect as error:
-        deal_service.disconnect(deal_id, user_id)
         raise WebSocketException(
             code=WS_1000_NORMAL_CLOSURE, reason=str(error)
         ) from error
@@ -194,6 +529,14 @@ async def connect_to_deal_chat(
         raise WebSocketException(
             code=WS_1002_PROTOCOL_ERROR, reason=str(error)
         ) from error
+    except (DealAccessDeniedError, DealNotFoundError) as error:
+        raise WebSocketException(
+            code=WS_1008_POLICY_VIOLATION, reason=str(error)
+        ) from error
+    finally:
+        # the connection (its writer task and the subscription of the room)
+        # is released on any error
+        await deal_service.disconnect(deal_id, user_id)
 
 
 @router.patch("/change_sale_stage/{deal_id}")
@@ -0,0 +1,124 @@
+from functools import wraps
+
+from fastapi import APIRouter, Depends, HTTPException, Query
+from starlette.status import HTTP_500_INTERNAL_SERVER_ERROR
+
+from domain.enums import ForecastDimension
+from domain.exceptions import DealAnalyticsDBError
+from schemas.deal_analytics_schema import (
+    DEFAULT_PERCENTILES,
+    AnalyticsPeriodSchema,
+    FunnelStageSchema,
+    ManagerThroughputSchema,
+    Percentile,
+    RevenueForecastSchema,
+    StageDurationSchema,
+)
+from services.deal_analytics_service import (
+    DealAnalyticsService,
+    deal_analytics_service_dependency,
+)
+
+router = APIRouter(prefix="/analytics/deal", tags=["deal analytics"])
+
+
+def handle_analytics_errors(func):
+    @wraps(func)
+    async def wrapper(*args, **kwargs):
+        try:
+            return await func(*args, **kwargs)
+        except DealAnalyticsDBError as error:
+            raise HTTPException(
+                status_code=HTTP_500_INTERNAL_SERVER_ERROR, detail=str(error)
+            ) from error
+
+    return wrapper
+
+
+@router.get("/funnel")
+@handle_analytics_errors
+async def get_funnel(
+    period: AnalyticsPeriodSchema = Depends(),
+    analytics_service: DealAnalyticsService = Depends(
+        deal_analytics_service_dependency
+    ),
+) -> list[FunnelStageSchema]:
+    """Get the conversion of the sale stages in the order of the funnel.
+
+    The stats are folded from the deal history with the delay of the
+    rollup job.
+    """
+    funnel = await analytics_service.get_funnel(
+        date_from=period.date_from, date_to=period.date_to
+    )
+
+    return [FunnelStageSchema(**stage.model_dump()) for stage in funnel]
+
+
+@router.get("/time_in_stage")
+@handle_analytics_errors
+async def get_time_in_stage(
+    period: AnalyticsPeriodSchema = Depends(),
+    percentiles: list[Percentile] = Query(default=DEFAULT_PERCENTILES),
+    analytics_service: DealAnalyticsService = Depends(
+        deal_analytics_service_dependency
+    ),
+) -> list[StageDurationSchema]:
+    """Get the percentiles of the time in the sale stages.
+
+    The percentiles are estimated by the histogram of the log-spaced
+    buckets (the error is less than the width of the bucket).
+    """
+    durations = await analytics_service.get_time_in_stage(
+        date_from=period.date_from,
+        date_to=period.date_to,
+        percentiles=percentiles,
+    )
+
+    return [
+        StageDurationSchema(**duration.model_dump()) for duration in durations
+    ]
+
+
+@router.get("/managers")
+@handle_analytics_errors
+async def get_manager_throughput(
+    period: AnalyticsPeriodSchema = Depends(),
+    analytics_service: DealAnalyticsService = Depends(
+        deal_analytics_service_dependency
+    ),
+) -> list[ManagerThroughputSchema]:
+    """Get the moves of the deals between the sale stages by the managers."""
+    throughput = await analytics_service.get_manager_throughput(
+        date_from=period.date_from, date_to=period.date_to
+    )
+
+    return [
+        ManagerThroughputSchema(**manager.model_dump())
+        for manager in throughput
+    ]
+
+
+@router.get("/forecast")
+@handle_analytics_errors
+async def get_revenue_forecast(
+    group_by: list[ForecastDimension] = Query(
+        default=[
+            ForecastDimension.MANAGER,
+            ForecastDimension.SALE_STAGE,
+            ForecastDimension.MONTH,
+        ]
+    ),
+    analytics_service: DealAnalyticsService = Depends(
+        deal_analytics_service_dependency
+    ),
+) -> RevenueForecastSchema:
+    """Get the probability-weighted revenue of the open deals.
+
+    The expected revenue and its variance are summed by the groups of the
+    managers, the sale stages and the months of the expected close. The
+    open deals are cached and reloaded after the deal writes.
+    """
+    forecast = await analytics_service.get_revenue_forecast(group_by=group_by)
+
+    return RevenueForecastSchema(**forecast.model_dump())
@@ -5,6 +5,7 @@ from api.v1.endpoints.auth import router as auth_router
 from api.v1.endpoints.content import router as content_router
 from api.v1.endpoints.country import router as country_router
 from api.v1.endpoints.deal import router as deal_router
+from api.v1.endpoints.deal_analytics import router as deal_analytics_router
 from api.v1.endpoints.grape import router as grape_router
 from api.v1.endpoints.partners import router as partners_router
 from api.v1.endpoints.region import router as region_router
@@ -20,6 +21,7 @@ routers = [
     grape_router,
     content_router,
     deal_router,
+    deal_analytics_router,
     partners_router,
 ]
 
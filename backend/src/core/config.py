@@ -10,6 +10,8 @@ from pydantic import EmailStr, Field, SecretStr
 from pydantic_settings import BaseSettings
 from pydantic_settings.main import SettingsConfigDict
 
+from domain.enums import LanguageEnum
+
 THIRTY_DAYS_IN_MINUTES = 42000
 
 
@@ -19,6 +21,13 @@ class ModeEnum(StrEnum):
     PROD = auto()
 
 
+class ChatBrokerEnum(StrEnum):
+    # the messages are delivered inside the process (single worker)
+    LOCAL = auto()
+    # the messages are delivered by the Redis pub/sub (several workers)
+    REDIS = auto()
+
+
 # Base config class
 class ModelConfig(BaseSettings):
     model_config = SettingsConfigDict(
@@ -175,16 +184,445 @@ class RedisSettings(ModelConfig):
 
 class CRMSettings(ModelConfig):
     max_deal_saves: int = Field(default=5, validation_alias="MAX_DEAL_SAVES")
+    deal_history_prune_interval: int = Field(
+        default=300,
+        ge=1,
+        validation_alias="DEAL_HISTORY_PRUNE_INTERVAL",
+        description="Interval between the deal history prunes in seconds.",
+    )
+    deal_history_prune_batch_size: int = Field(
+        default=1000,
+        ge=1,
+        validation_alias="DEAL_HISTORY_PRUNE_BATCH_SIZE",
+        description="Max count of the deals pruned by one statement.",
+    )
+    manager_load_reconcile_interval: int = Field(
+        default=600,
+        ge=1,
+        validation_alias="MANAGER_LOAD_RECONCILE_INTERVAL",
+        description=(
+            "Interval between the reconciliations of the open deals counts"
+            + " of the managers in seconds."
+        ),
+    )
+    deal_stage_board_reconcile_interval: int = Field(
+        default=600,
+        ge=1,
+        validation_alias="DEAL_STAGE_BOARD_RECONCILE_INTERVAL",
+        description=(
+            "Interval between the reconciliations of the counts and the"
+            + " total costs of the open deals of the sale stages in"
+            + " seconds."
+        ),
+    )
+    deal_events_stream_length: int = Field(
+        default=10000,
+        ge=1,
+        validation_alias="DEAL_EVENTS_STREAM_LENGTH",
+        description=(
+            "Approximate count of the recent deal events, that are kept in"
+            + " Redis for the resumption of the event streams."
+        ),
+    )
+    deal_events_replay_limit: int = Field(
+        default=1000,
+        ge=1,
+        validation_alias="DEAL_EVENTS_REPLAY_LIMIT",
+        description=(
+            "Max count of the events replayed on the resumption, the"
+            + " client further behind reloads the deals."
+        ),
+    )
+    deal_events_queue_size: int = Field(
+        default=100,
+        ge=1,
+        validation_alias="DEAL_EVENTS_QUEUE_SIZE",
+        description=(
+            "Max count of the undelivered events of the stream, the slow"
+            + " client with the full queue reloads the deals."
+        ),
+    )
+    deal_events_heartbeat_interval: float = Field(
+        default=15,
+        gt=0,
+        validation_alias="DEAL_EVENTS_HEARTBEAT_INTERVAL",
+        description=(
+            "Max idle time of the event stream in seconds, the heartbeat"
+            + " comment keeps the idle connection open."
+        ),
+    )
+    message_flush_interval: float = Field(
+        default=0.005,
+        gt=0,
+        validation_alias="DEAL_MESSAGE_FLUSH_INTERVAL",
+        description=(
+            "Max time of the accumulation of the chat messages before the"
+            + " group commit in seconds."
+        ),
+    )
+    message_batch_size: int = Field(
+        default=500,
+        ge=1,
+        validation_alias="DEAL_MESSAGE_BATCH_SIZE",
+        description="Max count of the chat messages in one group commit.",
+    )
+    message_queue_size: int = Field(
+        default=10000,
+        ge=1,
+        validation_alias="DEAL_MESSAGE_QUEUE_SIZE",
+        description=(
+            "Max count of the queued chat messages, the writers wait for"
+            + " the free place in the full queue."
+        ),
+    )
+    deal_history_rollup_interval: int = Field(
+        default=60,
+        ge=1,
+        validation_alias="DEAL_HISTORY_ROLLUP_INTERVAL",
+        description=(
+            "Interval between the folds of the new deal history to the"
+            + " stage rollups in seconds. The unfolded history isn't"
+            + " pruned, so it should be less than the prune interval."
+        ),
+    )
+    deal_history_rollup_batch_size: int = Field(
+        default=5000,
+        ge=1,
+        validation_alias="DEAL_HISTORY_ROLLUP_BATCH_SIZE",
+        description="Max count of the history rows folded by one transaction.",
+    )
+    deal_history_rollup_settle_delay: float = Field(
+        default=60,
+        ge=0,
+        validation_alias="DEAL_HISTORY_ROLLUP_SETTLE_DELAY",
+        description=(
+            "Age of the history rows, that are folded, in seconds. The"
+            + " rows of the running transactions can be committed after"
+            + " the newer rows, so the fresh rows are folded by the next"
+            + " runs."
+        ),
+    )
+
+
+class LanguageSettings(ModelConfig):
+    fallback_languages: tuple[LanguageEnum, ...] = Field(
+        default=(LanguageEnum.DEFAULT_LANGUAGE,),
+        validation_alias="FALLBACK_LANGUAGES",
+        description=(
+            "Languages, that are tried after the languages from the"
+            + " Accept-Language header, when the translation is missing."
+        ),
+    )
+
+
+class SearchSettings(ModelConfig):
+    article_list_candidates_limit: int = Field(
+        default=1000,
+        ge=0,
+        validation_alias="ARTICLE_LIST_SEARCH_CANDIDATES_LIMIT",
+        description=(
+            "Max count of the newest matching articles, that are ranked by"
+            + " the search of the article list endpoint. 0 means that all"
+            + " matching articles are ranked."
+        ),
+    )
+
+
+class OutboxSettings(ModelConfig):
+    deal_outbox_interval: float = Field(
+        default=1,
+        gt=0,
+        validation_alias="DEAL_OUTBOX_INTERVAL",
+        description=(
+            "Interval between the polls of the empty deal outbox in"
+            + " seconds. The new deals wake the dispatcher immediately."
+        ),
+    )
+    deal_outbox_batch_size: int = Field(
+        default=50,
+        ge=1,
+        validation_alias="DEAL_OUTBOX_BATCH_SIZE",
+        description="Max count of the events claimed by one statement.",
+    )
+    deal_outbox_max_attempts: int = Field(
+        default=10,
+        ge=1,
+        validation_alias="DEAL_OUTBOX_MAX_ATTEMPTS",
+        description=(
+            "Max count of the delivery attempts of the event, after that"
+            + " the event is failed."
+        ),
+    )
+    deal_outbox_lease: float = Field(
+        default=60,
+        gt=0,
+        validation_alias="DEAL_OUTBOX_LEASE",
+        description=(
+            "Time of the delivery of the claimed batch in seconds, after"
+            + " that the undelivered events are claimed again."
+        ),
+    )
+    deal_outbox_digest_window: float = Field(
+        default=3,
+        ge=0,
+        validation_alias="DEAL_OUTBOX_DIGEST_WINDOW",
+        description=(
+            "Time of the accumulation of the new deals before the dispatch"
+            + " in seconds. The dispatch starts earlier, if the batch is"
+            + " full. 0 means that the deals are dispatched immediately."
+        ),
+    )
+    deal_outbox_digest_min_size: int = Field(
+        default=3,
+        ge=1,
+        validation_alias="DEAL_OUTBOX_DIGEST_MIN_SIZE",
+        description=(
+            "Min count of the dispatched deals, that are sent by one digest"
+            + " message. The smaller batches are sent by the message per"
+            + " deal."
+        ),
+    )
+    deal_outbox_base_backoff: float = Field(
+        default=1,
+        gt=0,
+        validation_alias="DEAL_OUTBOX_BASE_BACKOFF",
+        description="Delay of the first retry of the event in seconds.",
+    )
+    deal_outbox_max_backoff: float = Field(
+        default=600,
+        gt=0,
+        validation_alias="DEAL_OUTBOX_MAX_BACKOFF",
+        description="Max delay of the retry of the event in seconds.",
+    )
+
+
+class IntakeSettings(ModelConfig):
+    deal_intake_interval: float = Field(
+        default=1,
+        gt=0,
+        validation_alias="DEAL_INTAKE_INTERVAL",
+        description=(
+            "Interval between the polls of the empty deal intake queue in"
+            + " seconds. The queued deals wake the worker immediately."
+        ),
+    )
+    deal_intake_batch_size: int = Field(
+        default=100,
+        ge=1,
+        validation_alias="DEAL_INTAKE_BATCH_SIZE",
+        description="Max count of the deals created by one upsert.",
+    )
+    deal_intake_lease: float = Field(
+        default=60,
+        gt=0,
+        validation_alias="DEAL_INTAKE_LEASE",
+        description=(
+            "Time of the processing of the claimed batch in seconds, after"
+            + " that the unprocessed requests are claimed again."
+        ),
+    )
+    deal_intake_max_attempts: int = Field(
+        default=5,
+        ge=1,
+        validation_alias="DEAL_INTAKE_MAX_ATTEMPTS",
+        description=(
+            "Max count of the attempts of the request, after that the"
+            + " request is failed."
+        ),
+    )
+    deal_intake_base_backoff: float = Field(
+        default=1,
+        gt=0,
+        validation_alias="DEAL_INTAKE_BASE_BACKOFF",
+        description="Delay of the first retry of the request in seconds.",
+    )
+    deal_intake_max_backoff: float = Field(
+        default=300,
+        gt=0,
+        validation_alias="DEAL_INTAKE_MAX_BACKOFF",
+        description="Max delay of the retry of the request in seconds.",
+    )
+    deal_intake_retention: int = Field(
+        default=86400,
+        gt=0,
+        validation_alias="DEAL_INTAKE_RETENTION",
+        description=(
+            "Time of the tracking of the processed and failed requests in"
+            + " seconds, after that they are deleted."
+        ),
+    )
+
+
+class ArchiveSettings(ModelConfig):
+    deal_archive_interval: int = Field(
+        default=3600,
+        ge=1,
+        validation_alias="DEAL_ARCHIVE_INTERVAL",
+        description=(
+            "Interval between the maintenances of the monthly partitions of"
+            + " the deal messages and the deal history in seconds."
+        ),
+    )
+    deal_archive_directory: str = Field(
+        default="archive",
+        validation_alias="DEAL_ARCHIVE_DIRECTORY",
+        description="Directory of the exported partitions.",
+    )
+    deal_archive_batch_size: int = Field(
+        default=10000,
+        ge=1,
+        validation_alias="DEAL_ARCHIVE_BATCH_SIZE",
+        description="Count of the rows fetched by one read of the export.",
+    )
+    deal_partition_premake_months: int = Field(
+        default=3,
+        ge=1,
+        validation_alias="DEAL_PARTITION_PREMAKE_MONTHS",
+        description=(
+            "Count of the next months, whose partitions are created in"
+            + " advance."
+        ),
+    )
+    deal_message_retention_months: int = Field(
+        default=24,
+        ge=1,
+        validation_alias="DEAL_MESSAGE_RETENTION_MONTHS",
+        description=(
+            "Count of the months of the deal messages kept in the database"
+            + " (besides the current month), the partitions of the older"
+            + " months are exported and dropped."
+        ),
+    )
+    deal_history_retention_months: int = Field(
+        default=24,
+        ge=1,
+        validation_alias="DEAL_HISTORY_RETENTION_MONTHS",
+        description=(
+            "Count of the months of the deal history kept in the database"
+            + " (besides the current month), the partitions of the older"
+            + " months are exported and dropped."
+        ),
+    )
+
+
+class CacheSettings(ModelConfig):
+    article_list_ttl: int = Field(
+        default=30,
+        ge=1,
+        validation_alias="ARTICLE_LIST_CACHE_TTL",
+        description=(
+            "Time-to-live of the cached article lists in seconds. The lists"
+            + " are invalidated on the writes, the ttl is a safety net."
+        ),
+    )
+    deal_forecast_ttl: int = Field(
+        default=300,
+        ge=1,
+        validation_alias="DEAL_FORECAST_CACHE_TTL",
+        description=(
+            "Time-to-live of the cached open deals of the revenue forecast"
+            + " in seconds. The forecast is invalidated on the deal writes,"
+            + " the ttl is a safety net."
+        ),
+    )
+
+
+class ChatSettings(ModelConfig):
+    chat_broker: ChatBrokerEnum = Field(
+        default=ChatBrokerEnum.REDIS,
+        validation_alias="CHAT_BROKER",
+        description=(
+            "Transport of the deal chat messages between the workers. The"
+            + " local broker works only with the single worker."
+        ),
+    )
+    send_queue_size: int = Field(
+        default=100,
+        ge=1,
+        validation_alias="CHAT_SEND_QUEUE_SIZE",
+        description=(
+            "Max count of the unsent messages of the chat member, the"
+            + " member with the full queue is disconnected."
+        ),
+    )
+    send_timeout: float = Field(
+        default=10,
+        gt=0,
+        validation_alias="CHAT_SEND_TIMEOUT",
+        description=(
+            "Max time of the sending of one message to the chat member in"
+            + " seconds, the member is disconnected after the timeout."
+        ),
+    )
+    history_length: int = Field(
+        default=100,
+        ge=1,
+        validation_alias="CHAT_HISTORY_LENGTH",
+        description=(
+            "Approximate count of the recent messages of the deal chat,"
+            + " that are kept in Redis for the replay on the connection."
+        ),
+    )
+    history_ttl: int = Field(
+        default=86400,
+        ge=1,
+        validation_alias="CHAT_HISTORY_TTL",
+        description=(
+            "Time-to-live of the recent messages of the deal chat without"
+            + " new messages in seconds."
+        ),
+    )
+    history_replay_limit: int = Field(
+        default=50,
+        ge=1,
+        validation_alias="CHAT_HISTORY_REPLAY_LIMIT",
+        description=(
+            "Max count of the messages replayed on the connection to the"
+            + " chat, the older missed messages are fetched by the history"
+            + " endpoint. Should be less than the send queue size."
+        ),
+    )
+    membership_ttl: float = Field(
+        default=60,
+        gt=0,
+        validation_alias="CHAT_MEMBERSHIP_TTL",
+        description=(
+            "Time-to-live of the cached members of the deal (the lead and"
+            + " the manager) in seconds. The cache is invalidated by the"
+            + " deal changes of the worker, the TTL limits the staleness"
+            + " after the changes on other workers."
+        ),
+    )
+    membership_cache_size: int = Field(
+        default=10000,
+        ge=1,
+        validation_alias="CHAT_MEMBERSHIP_CACHE_SIZE",
+        description="Max count of the deals with the cached members.",
+    )
 
 
 class TelegramSettings(ModelConfig):
     telegram_bot_token: str = Field(
-        default="MY_COOL_TELEGRAM_TOKEN",
+        default="123456789:MY_COOL_TELEGRAM_TOKEN",
         validation_alias="TELEGRAM_BOT_API_TOKEN",
     )
     deals_chat_id: int = Field(
         default=123456789, validation_alias="DEALS_TELEGRAM_CHAT_ID"
     )
+    chat_messages_per_minute: int = Field(
+        default=20,
+        ge=1,
+        validation_alias="TELEGRAM_CHAT_MESSAGES_PER_MINUTE",
+        description="Max count of the messages of the bot to one chat.",
+    )
+    telegram_api_server: str | None = Field(
+        default=None,
+        validation_alias="TELEGRAM_API_SERVER",
+        description=(
+            "Base URL of the Bot API server (e.g. the local server or the"
+            + " fake server of the tests). None means the official server."
+        ),
+    )
 
 
 # create config instances
@@ -196,4 +634,11 @@ app_settings = AppSettings()
 mail_settings = MailSettings()
 redis_settings = RedisSettings()
 crm_settings = CRMSettings()
+language_settings = LanguageSettings()
+search_settings = SearchSettings()
+cache_settings = CacheSettings()
+outbox_settings = OutboxSettings()
+intake_settings = IntakeSettings()
+archive_settings = ArchiveSettings()
+chat_settings = ChatSettings()
 telegram_settings = TelegramSettings()
@@ -38,3 +38,11 @@ RUSSIAN_LOWERCASE_LETTERS = set("абвгдеёжзийклмнопрстуфх
 
 # Roles
 USER_ROLE = 1
+
+# CRM
+# the last sale stage of the won deal
+COMPLETED_SALE_STAGE_ID = 7
+# the watermark of the deal history folded to the stage rollups
+DEAL_HISTORY_ROLLUP_WATERMARK = "deal_history_rollup"
+# the max length of the last message on the deal card
+DEAL_MESSAGE_PREVIEW_LENGTH = 200
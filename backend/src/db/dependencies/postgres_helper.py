@@ -61,6 +61,8 @@ class DatabaseHelper:
 
     async def create_tables(self) -> None:
         async with self.engine.begin() as conn:
+            # the trigram indexes of the lead search
+            await conn.execute(text("create extension if not exists pg_trgm"))
             await conn.run_sync(Base.metadata.create_all)
             await conn.commit()
 
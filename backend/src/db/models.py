@@ -12,13 +12,17 @@ from sqlalchemy import (
     CheckConstraint,
     ForeignKey,
     Identity,
+    Index,
     Integer,
     Numeric,
     String,
     Text,
     func,
+    text,
 )
 from sqlalchemy.dialects.postgresql import (
+    ARRAY,
+    DOUBLE_PRECISION,
     JSONB,
     MONEY,
     NUMERIC,
@@ -359,6 +363,16 @@ class MdUser(Base):
             "length(profile_picture_link) > 0",
             name="md_user_profile_picture_link_check",
         ),
+        # the trigram search of the leads by the full names, the search
+        # query uses the same expression
+        Index(
+            "md_user_full_name_trgm_idx",
+            text(
+                "(coalesce(first_name, '') || ' ' || coalesce(last_name, ''))"
+                " gin_trgm_ops"
+            ),
+            postgresql_using="gin",
+        ),
     )
 
     user = relationship("User", back_populates="md_user")
@@ -640,6 +654,8 @@ class ArticleTranslate(Base):
         UniqueConstraint(
             "title", "language_id", name="article_title_language_unique"
         ),
+        # the partitions are created in the triggers module
+        {"postgresql_partition_by": "LIST (language_id)"},
     )
 
     article = relationship("Article", back_populates="article_translates")
@@ -1712,6 +1728,8 @@ class ArticleTranslateDeleted(Base):
 
     __table_args__ = (
         CheckConstraint("length(title) > 0", name="article_title_check"),
+        # the partitions are created in the triggers module
+        {"postgresql_partition_by": "LIST (language_id)"},
     )
 
 
@@ -1931,6 +1949,29 @@ class Deal(Base, TimeStampMixin):
         CheckConstraint(
             "priority between -1 and 10", name="deal_priority_range"
         ),
+        # the keyset pages of the deal board with the filters
+        Index("deal_updated_at_idx", "updated_at", "deal_id"),
+        Index(
+            "deal_manager_id_updated_at_idx",
+            "manager_id",
+            "updated_at",
+            "deal_id",
+        ),
+        Index(
+            "deal_sale_stage_id_updated_at_idx",
+            "sale_stage_id",
+            "updated_at",
+            "deal_id",
+        ),
+        # the lookup and the deduplication of the leads by the contacts
+        Index("deal_contact_email_idx", "contact_email"),
+        Index("deal_contact_phone_idx", "contact_phone"),
+        Index(
+            "deal_contact_name_trgm_idx",
+            "contact_name",
+            postgresql_using="gin",
+            postgresql_ops={"contact_name": "gin_trgm_ops"},
+        ),
     )
 
     deal_id: Mapped[uuid.UUID] = mapped_column(
@@ -1983,6 +2024,25 @@ class Deal(Base, TimeStampMixin):
         TIMESTAMP(timezone=True),
         nullable=True,
     )
+    # the expected close of the open deal, the revenue forecast is bucketed
+    # by its month
+    expected_close_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
+    # the normalized contacts of the fields, they are set by the trigger
+    contact_email: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    contact_phone: Mapped[str | None] = mapped_column(
+        String(32),
+        nullable=True,
+    )
+    contact_name: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
 
     sale_stage = relationship("SaleStage", back_populates="deals")
     lost_reason = relationship("LostReason", back_populates="deals")
@@ -2003,6 +2063,14 @@ class DealHistory(Base):
             "probability between 0 and 1",
             name="deal_history_probability_range",
         ),
+        Index(
+            "deal_history_deal_id_changed_at_idx",
+            "deal_id",
+            "changed_at",
+        ),
+        # the monthly partitions are created in the triggers module and by
+        # the deal partition archiver
+        {"postgresql_partition_by": "RANGE (changed_at)"},
     )
 
     deal_history_id: Mapped[int] = mapped_column(
@@ -2039,9 +2107,10 @@ class DealHistory(Base):
         ForeignKey("user.user_id", ondelete="SET NULL"),
         nullable=True,
     )
+    # the partition key is the part of the primary key
     changed_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
-        nullable=False,
+        primary_key=True,
         default=func.current_timestamp(),
     )
 
@@ -2051,10 +2120,350 @@ class DealHistory(Base):
     manager = relationship("User", back_populates="deal_histories")
 
 
+class ManagerLoad(Base):
+    """Count of the open deals of the manager.
+
+    The count is maintained by the update_manager_load trigger of the deal
+    table and reconciled with the real count periodically.
+    """
+
+    __tablename__ = "manager_load"
+    __table_args__ = (
+        CheckConstraint(
+            "open_deals_count >= 0", name="manager_load_open_deals_count_check"
+        ),
+        Index(
+            "manager_load_open_deals_count_idx",
+            "open_deals_count",
+            "manager_id",
+        ),
+    )
+
+    manager_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("user.user_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    open_deals_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+
+
+class DealStageBoard(Base):
+    """Count and total cost of the open deals of the sale stage and the
+    manager.
+
+    The board is maintained by the update_deal_stage_board trigger of the
+    deal table and reconciled with the real deals periodically.
+    """
+
+    __tablename__ = "deal_stage_board"
+    __table_args__ = (
+        UniqueConstraint(
+            "sale_stage_id",
+            "manager_id",
+            name="deal_stage_board_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+        CheckConstraint(
+            "deals_count >= 0", name="deal_stage_board_deals_count_check"
+        ),
+    )
+
+    deal_stage_board_id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        server_default=Identity(always=True),
+    )
+    sale_stage_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sale_stage.sale_stage_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    manager_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("user.user_id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    deals_count: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    cost_total: Mapped[Numeric] = mapped_column(
+        NUMERIC,
+        nullable=False,
+        default=0,
+    )
+
+
+class DealStageRollup(Base):
+    """Daily rollup of the moves of the deals between the sale stages.
+
+    The rollup is folded from the new rows of the deal history by the
+    rollup job. The time spent by the deals in the from stage is kept as
+    the histogram of the log-spaced buckets, so the rollups of the several
+    days are merged without the raw durations.
+    """
+
+    __tablename__ = "deal_stage_rollup"
+    __table_args__ = (
+        UniqueConstraint(
+            "day",
+            "from_sale_stage_id",
+            "to_sale_stage_id",
+            "manager_id",
+            name="deal_stage_rollup_key",
+            postgresql_nulls_not_distinct=True,
+        ),
+        CheckConstraint(
+            "transitions > 0", name="deal_stage_rollup_transitions_check"
+        ),
+    )
+
+    deal_stage_rollup_id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        server_default=Identity(always=True),
+    )
+    day: Mapped[date] = mapped_column(
+        DATE,
+        nullable=False,
+    )
+    from_sale_stage_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sale_stage.sale_stage_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    to_sale_stage_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sale_stage.sale_stage_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    manager_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("user.user_id", ondelete="CASCADE"),
+        nullable=True,
+    )
+    transitions: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+    )
+    # the total time in the from stage in seconds
+    duration_total: Mapped[float] = mapped_column(
+        DOUBLE_PRECISION,
+        nullable=False,
+        default=0,
+    )
+    duration_histogram: Mapped[list[int]] = mapped_column(
+        ARRAY(Integer),
+        nullable=False,
+    )
+
+
+class DealStageEntry(Base):
+    """Time of the entry of the deal to its current sale stage.
+
+    The entry is maintained by the rollup job, so the time in the stage is
+    known after the prune of the old deal history.
+    """
+
+    __tablename__ = "deal_stage_entry"
+
+    deal_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("deal.deal_id", ondelete="CASCADE"),
+        primary_key=True,
+    )
+    sale_stage_id: Mapped[int] = mapped_column(
+        Integer,
+        ForeignKey("sale_stage.sale_stage_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    entered_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+    )
+
+
+class AnalyticsWatermark(Base):
+    """Position of the analytics job in the source table (the last folded
+    row ID).
+    """
+
+    __tablename__ = "analytics_watermark"
+
+    name: Mapped[str] = mapped_column(
+        String(255),
+        primary_key=True,
+    )
+    position: Mapped[int] = mapped_column(
+        BigInteger,
+        nullable=False,
+        default=0,
+    )
+    updated_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=func.current_timestamp(),
+    )
+
+
+class DealOutbox(Base):
+    """Side effect of the deal write, that is delivered by the dispatcher.
+
+    The event is saved in the transaction of the deal write and deleted
+    after the delivery. The available_at is the time of the next delivery
+    attempt, it's moved forward by the claim (lease) and by the backoff.
+    The failed events aren't retried, they are kept for the inspection.
+    """
+
+    __tablename__ = "deal_outbox"
+    __table_args__ = (
+        Index(
+            "deal_outbox_available_at_idx",
+            "available_at",
+            "outbox_id",
+            postgresql_where=text("status = 'pending'"),
+        ),
+    )
+
+    outbox_id: Mapped[int] = mapped_column(
+        BigInteger,
+        primary_key=True,
+        server_default=Identity(always=True),
+    )
+    deal_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        ForeignKey("deal.deal_id", ondelete="CASCADE"),
+        nullable=False,
+    )
+    event_type: Mapped[str] = mapped_column(
+        String(50),
+        nullable=False,
+    )
+    payload: Mapped[dict] = mapped_column(
+        JSONB,
+        nullable=False,
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="pending",
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    last_error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=func.current_timestamp(),
+    )
+    available_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=func.current_timestamp(),
+    )
+
+
+class DealIntake(Base):
+    """Deal creation request, that is queued by the asynchronous intake.
+
+    The request is saved by the endpoint and the deal is created by the
+    intake worker. The available_at is the time of the next attempt, it's
+    moved forward by the claim (lease) and by the backoff. The processed
+    and failed requests are kept for the tracking until the retention.
+    """
+
+    __tablename__ = "deal_intake"
+    __table_args__ = (
+        Index(
+            "deal_intake_available_at_idx",
+            "available_at",
+            "created_at",
+            postgresql_where=text("status = 'pending'"),
+        ),
+        Index("deal_intake_processed_at_idx", "processed_at"),
+    )
+
+    intake_id: Mapped[uuid.UUID] = mapped_column(
+        UUID(as_uuid=True),
+        primary_key=True,
+        default=uuid7,
+    )
+    payload: Mapped[dict] = mapped_column(
+        JSONB,
+        nullable=False,
+    )
+    status: Mapped[str] = mapped_column(
+        String(20),
+        nullable=False,
+        default="pending",
+    )
+    # the created (or merged) deal of the processed request
+    deal_id: Mapped[uuid.UUID | None] = mapped_column(
+        UUID(as_uuid=True),
+        nullable=True,
+    )
+    attempts: Mapped[int] = mapped_column(
+        Integer,
+        nullable=False,
+        default=0,
+    )
+    last_error: Mapped[str | None] = mapped_column(
+        Text,
+        nullable=True,
+    )
+    created_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=func.current_timestamp(),
+    )
+    available_at: Mapped[datetime] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=False,
+        default=func.current_timestamp(),
+    )
+    processed_at: Mapped[datetime | None] = mapped_column(
+        TIMESTAMP(timezone=True),
+        nullable=True,
+    )
+
+
 class DealMessage(Base):
     __tablename__ = "deal_message"
     __table_args__ = (
         CheckConstraint("length(message) > 0", name="deal_message_check"),
+        Index(
+            "deal_message_deal_id_sent_at_idx",
+            "deal_id",
+            "sent_at",
+            "deal_message_id",
+        ),
+        # the unread counts of the deal cards
+        Index(
+            "deal_message_unread_idx",
+            "deal_id",
+            "user_id",
+            postgresql_where=text("viewed_at is null"),
+        ),
+        # the full-text search of the messages
+        Index(
+            "deal_message_tsv_message_idx",
+            "tsv_message",
+            postgresql_using="gin",
+        ),
+        # the monthly partitions are created in the triggers module and by
+        # the deal partition archiver
+        {"postgresql_partition_by": "RANGE (sent_at)"},
     )
 
     deal_message_id: Mapped[int] = mapped_column(
@@ -2085,11 +2494,18 @@ class DealMessage(Base):
         TIMESTAMP(timezone=True),
         nullable=True,
     )
+    # the partition key is the part of the primary key
     sent_at: Mapped[datetime] = mapped_column(
         TIMESTAMP(timezone=True),
-        nullable=False,
+        primary_key=True,
         default=func.current_timestamp(),
     )
+    # the message parsed by the configs of all languages, it's set by the
+    # trigger
+    tsv_message: Mapped[str | None] = mapped_column(
+        TSVECTOR,
+        nullable=True,
+    )
 
     deal = relationship("Deal", back_populates="deal_messages")
     user = relationship("User", back_populates="deal_messages")
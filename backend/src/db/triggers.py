@@ -358,6 +358,21 @@ TRIGGERS = [
     BEFORE DELETE ON article
     FOR EACH ROW EXECUTE FUNCTION move_to_article_deleted();
     """),
+    # Article-translate partitions by language (the default partition
+    # contains the languages without own partition)
+    *(
+        text(f"""
+        CREATE TABLE IF NOT EXISTS {table_name}_{suffix}
+        PARTITION OF {table_name} {bound};
+        """)
+        for table_name in ("article_translate", "article_translate_deleted")
+        for suffix, bound in (
+            ("ru", "FOR VALUES IN ('ru-RU')"),
+            ("kz", "FOR VALUES IN ('kz-KZ')"),
+            ("en", "FOR VALUES IN ('en-US')"),
+            ("default", "DEFAULT"),
+        )
+    ),
     # Article-translate
     text("""
     CREATE OR REPLACE FUNCTION move_to_article_translate_deleted()
@@ -397,6 +412,141 @@ TRIGGERS = [
     before delete on content
     for each row execute function move_to_content_deleted();
     """),
+    # Deal message and deal history partitions by month (the default
+    # partition contains the rows of the months without own partition, the
+    # partitions of the next months are created by the archiver)
+    *(
+        text(f"""
+        create table if not exists {table_name}_default
+        partition of {table_name} default;
+        """)
+        for table_name in ("deal_message", "deal_history")
+    ),
+    text(
+        """
+        create or replace function create_month_partition(
+            table_name text, key_column text, month date
+        )
+        returns boolean as $$
+        declare
+            partition_name text :=
+                table_name || '_' || to_char(month, 'YYYYMM');
+            default_name text := table_name || '_default';
+            lower_bound timestamptz := date_trunc(
+                'month', cast(month as timestamp)
+            ) at time zone 'UTC';
+            upper_bound timestamptz := (
+                date_trunc('month', cast(month as timestamp))
+                + interval '1 month'
+            ) at time zone 'UTC';
+            has_default_rows boolean := false;
+        begin
+            if to_regclass(partition_name) is not null then
+                return false;
+            end if;
+
+            if to_regclass(default_name) is not null then
+                execute format(
+                    'select exists ('
+                    'select from %I where %I >= $1 and %I < $2)',
+                    default_name, key_column, key_column
+                ) into has_default_rows using lower_bound, upper_bound;
+            end if;
+
+            if has_default_rows then
+                -- the partition isn't created, while the default partition
+                -- contains the rows of the month, so the rows are moved
+                execute format(
+                    'alter table %I detach partition %I',
+                    table_name, default_name
+                );
+                execute format(
+                    'create table %I partition of %I'
+                    ' for values from (%L) to (%L)',
+                    partition_name, table_name, lower_bound, upper_bound
+                );
+                execute format(
+                    'insert into %I overriding system value select * from %I'
+                    ' where %I >= $1 and %I < $2',
+                    table_name, default_name, key_column, key_column
+                ) using lower_bound, upper_bound;
+                execute format(
+                    'delete from %I where %I >= $1 and %I < $2',
+                    default_name, key_column, key_column
+                ) using lower_bound, upper_bound;
+                execute format(
+                    'alter table %I attach partition %I default',
+                    table_name, default_name
+                );
+            else
+                execute format(
+                    'create table %I partition of %I'
+                    ' for values from (%L) to (%L)',
+                    partition_name, table_name, lower_bound, upper_bound
+                );
+            end if;
+
+            return true;
+        end;
+        $$ language plpgsql;
+        """
+    ),
+    *(
+        text(f"""
+        select create_month_partition(
+            '{table_name}', '{key_column}', current_date
+        );
+        """)
+        for table_name, key_column in (
+            ("deal_message", "sent_at"),
+            ("deal_history", "changed_at"),
+        )
+    ),
+    # Deal message full-text search (the language of the message isn't
+    # known, so it's parsed by the configs of all languages and found by
+    # the query in the language of the manager)
+    text(
+        """
+        create or replace function get_deal_message_tsvector(message text)
+        returns tsvector as $$
+        declare
+            config regconfig;
+            tsv tsvector := to_tsvector('simple', message);
+        begin
+            for config in
+                select cast(c.oid as regconfig)
+                from pg_ts_config c
+                where c.cfgname <> 'simple'
+                    and c.cfgname in (
+                        select cast(cfgname as text) from language
+                    )
+            loop
+                tsv := tsv || to_tsvector(config, message);
+            end loop;
+
+            return tsv;
+        end;
+        $$ language plpgsql stable;
+        """
+    ),
+    text(
+        """
+        create or replace function update_deal_message_tsvector()
+        returns trigger as $$
+        begin
+            new.tsv_message = get_deal_message_tsvector(new.message);
+            return new;
+        end;
+        $$ language plpgsql;
+        """
+    ),
+    text(
+        """
+        create trigger trigger_update_deal_message_tsvector
+        before insert or update of message on deal_message
+        for each row execute function update_deal_message_tsvector();
+        """
+    ),
     # Deal history
     text(
         """
@@ -456,4 +606,181 @@ TRIGGERS = [
         for each row execute function save_deal_state();
         """
     ),
+    # Manager load (the deal is open until it is closed or completed,
+    # 7 - the completed sale stage)
+    text(
+        """
+        create or replace function update_manager_load()
+        returns trigger as $$
+        declare
+            old_open boolean = tg_op <> 'INSERT'
+                and old.manager_id is not null
+                and old.close_at is null
+                and old.sale_stage_id <> 7;
+            new_open boolean = tg_op <> 'DELETE'
+                and new.manager_id is not null
+                and new.close_at is null
+                and new.sale_stage_id <> 7;
+        begin
+            if old_open and (
+                not new_open or old.manager_id <> new.manager_id
+            ) then
+                update manager_load
+                set open_deals_count = greatest(open_deals_count - 1, 0)
+                where manager_id = old.manager_id;
+            end if;
+
+            if new_open and (
+                not old_open or old.manager_id <> new.manager_id
+            ) then
+                update manager_load
+                set open_deals_count = open_deals_count + 1
+                where manager_id = new.manager_id;
+            end if;
+
+            return null;
+        end;
+        $$ language plpgsql;
+        """
+    ),
+    text(
+        """
+        create trigger trigger_update_manager_load
+        after insert or update or delete on deal
+        for each row execute function update_manager_load();
+        """
+    ),
+    # Deal stage board (the counters of the open deals of the kanban board)
+    text(
+        """
+        create or replace function update_deal_stage_board()
+        returns trigger as $$
+        declare
+            old_open boolean = tg_op <> 'INSERT'
+                and old.close_at is null
+                and old.sale_stage_id <> 7;
+            new_open boolean = tg_op <> 'DELETE'
+                and new.close_at is null
+                and new.sale_stage_id <> 7;
+        begin
+            if old_open and new_open
+                and old.sale_stage_id = new.sale_stage_id
+                and old.manager_id is not distinct from new.manager_id
+                and old.cost = new.cost
+            then
+                return null;
+            end if;
+
+            if old_open then
+                update deal_stage_board
+                set deals_count = greatest(deals_count - 1, 0),
+                    cost_total = cost_total - old.cost
+                where sale_stage_id = old.sale_stage_id
+                    and manager_id is not distinct from old.manager_id;
+            end if;
+
+            if new_open then
+                insert into deal_stage_board (
+                    sale_stage_id, manager_id, deals_count, cost_total
+                )
+                values (new.sale_stage_id, new.manager_id, 1, new.cost)
+                on conflict on constraint deal_stage_board_key do update
+                set deals_count = deal_stage_board.deals_count + 1,
+                    cost_total = deal_stage_board.cost_total + new.cost;
+            end if;
+
+            return null;
+        end;
+        $$ language plpgsql;
+        """
+    ),
+    text(
+        """
+        create trigger trigger_update_deal_stage_board
+        after insert or delete
+            or update of sale_stage_id, manager_id, cost, close_at
+        on deal
+        for each row execute function update_deal_stage_board();
+        """
+    ),
+    # Deal contacts (the normalized keys of the lead lookup and the
+    # deduplication, the phone is kept by the digits with the country code)
+    text(
+        """
+        create or replace function normalize_contact_email(email text)
+        returns text as $$
+            select nullif(lower(btrim(email)), '');
+        $$ language sql immutable parallel safe returns null on null input;
+        """
+    ),
+    text(
+        """
+        create or replace function normalize_contact_phone(phone text)
+        returns text as $$
+            select case
+                when length(digits) < 5 then null
+                when length(digits) = 11 and left(digits, 1) = '8'
+                    then '7' || right(digits, 10)
+                when length(digits) = 10 and left(digits, 1) = '9'
+                    then '7' || digits
+                else left(digits, 32)
+            end
+            from regexp_replace(phone, '\\D', '', 'g') as digits;
+        $$ language sql immutable parallel safe returns null on null input;
+        """
+    ),
+    text(
+        """
+        create or replace function update_deal_contacts()
+        returns trigger as $$
+        begin
+            new.contact_email = normalize_contact_email(
+                new.fields ->> 'email'
+            );
+            new.contact_phone = normalize_contact_phone(
+                new.fields ->> 'phone'
+            );
+            new.contact_name = nullif(btrim(new.fields ->> 'name'), '');
+            return new;
+        end;
+        $$ language plpgsql;
+        """
+    ),
+    text(
+        """
+        create trigger trigger_update_deal_contacts
+        before insert or update of fields on deal
+        for each row execute function update_deal_contacts();
+        """
+    ),
+    # the managers are the users with the role 2
+    text(
+        """
+        create or replace function register_manager_load()
+        returns trigger as $$
+        begin
+            if new.role_id = 2 then
+                insert into manager_load (manager_id, open_deals_count)
+                select new.user_id, count(*)
+                from deal
+                where manager_id = new.user_id
+                    and close_at is null
+                    and sale_stage_id <> 7
+                on conflict (manager_id) do nothing;
+            else
+                delete from manager_load where manager_id = new.user_id;
+            end if;
+
+            return null;
+        end;
+        $$ language plpgsql;
+        """
+    ),
+    text(
+        """
+        create trigger trigger_register_manager_load
+        after insert or update of role_id on "user"
+        for each row execute function register_manager_load();
+        """
+    ),
 ]
@@ -23,6 +23,7 @@ class Deal(BaseModel):
     lost_reason_description: str | None = None
     created_at: datetime
     close_at: None | datetime = None
+    expected_close_at: None | datetime = None
 
     @model_validator(mode="after")
     def validate_close_time(self) -> Self:
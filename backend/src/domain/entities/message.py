@@ -1,4 +1,4 @@
-from datetime import UTC, datetime, timedelta
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, Field
@@ -14,4 +14,4 @@ class Message(BaseModel):
         max_length=MAX_MESSAGE_LENGTH,
     )
     user_id: UUID
-    sent_at: datetime = Field(le=datetime.now(tz=UTC) + timedelta(seconds=5))
+    sent_at: datetime
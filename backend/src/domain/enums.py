@@ -44,3 +44,46 @@ class Priority(IntEnum):
 class Roles(IntEnum):
     LEAD = 1
     ADMIN = 2
+
+
+class DealOutboxEvent(StrEnum):
+    DEAL_CREATED = "deal_created"
+
+
+class DealOutboxStatus(StrEnum):
+    PENDING = "pending"
+    FAILED = "failed"
+
+
+class DealIntakeStatus(StrEnum):
+    PENDING = "pending"
+    PROCESSED = "processed"
+    FAILED = "failed"
+
+
+class DealCreateMode(StrEnum):
+    # the deal is created by the request
+    SYNC = "sync"
+    # the deal is queued and created by the intake worker
+    ASYNC = "async"
+
+
+class ForecastDimension(StrEnum):
+    MANAGER = "manager"
+    SALE_STAGE = "sale_stage"
+    MONTH = "month"
+
+
+class DealState(StrEnum):
+    OPEN = "open"
+    CLOSED = "closed"
+
+
+class DealEventType(StrEnum):
+    DEAL_CREATED = "deal_created"
+    DEAL_UPDATED = "deal_updated"
+    STAGE_CHANGED = "stage_changed"
+    FIELDS_CHANGED = "fields_changed"
+    DEAL_CLOSED = "deal_closed"
+    # the missed events aren't available, the client reloads the deals
+    RESET = "reset"
@@ -578,11 +578,26 @@ class ChatNotActiveError(Exception):
         super().__init__(message)
 
 
+class DealIntakeNotFoundError(Exception):
+    def __init__(self, message="The deal intake request hasn't been found."):
+        super().__init__(message)
+
+
+class DealAccessDeniedError(Exception):
+    def __init__(self, message="The user isn't the member of the deal."):
+        super().__init__(message)
+
+
 class ManagersDoesNotExistsError(Exception):
     def __init__(self, message="Managers does not exists"):
         super().__init__(message)
 
 
+class DealAnalyticsDBError(Exception):
+    def __init__(self, message="Deal analytics database error"):
+        super().__init__(message)
+
+
 # ===================================== #
 #           Partner errors              #
 # ===================================== #
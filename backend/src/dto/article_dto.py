@@ -0,0 +1,50 @@
+from uuid import UUID
+
+from pydantic import BaseModel, Field, field_validator
+
+from core.general_constants import (
+    BASE_MAX_STR_LENGTH,
+    BASE_MIN_STR_LENGTH,
+    DEFAULT_LIMIT,
+)
+from domain.enums import (
+    ArticleCategoriesID,
+    ArticleSortBy,
+    ArticleStatus,
+    LanguageEnum,
+    SortOrder,
+)
+
+
+class ArticleSlugDTO(BaseModel):
+    article_id: UUID
+    slug: str = Field(
+        min_length=BASE_MIN_STR_LENGTH,
+        max_length=BASE_MAX_STR_LENGTH,
+    )
+    languages: set[LanguageEnum] = set()
+
+
+class ArticleListFiltersDTO(BaseModel):
+    """The normalized filters of the article list.
+
+    Equal filter sets give equal dumps, so the dump is used as the key of
+    the article list cache.
+    """
+
+    language: LanguageEnum
+    category_id: tuple[ArticleCategoriesID, ...] | None = None
+    statuses: tuple[ArticleStatus, ...] | None = None
+    tags: tuple[int, ...] | None = None
+    searched_text: str | None = None
+    candidates_limit: int | None = None
+    limit: int = DEFAULT_LIMIT
+    offset: int = 0
+    order_by: ArticleSortBy = ArticleSortBy.PUBLISHED_AT
+    order_direction: SortOrder = SortOrder.DESC
+
+    @field_validator("category_id", "statuses", "tags", mode="after")
+    @classmethod
+    def normalize_values(cls, values: tuple | None) -> tuple | None:
+        # the order and the duplicates of the values don't change the result
+        return tuple(sorted(set(values))) if values else None
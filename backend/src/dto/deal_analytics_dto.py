@@ -0,0 +1,98 @@
+from datetime import date, datetime
+from uuid import UUID
+
+from pydantic import BaseModel, Field
+
+
+class DealHistoryRowDTO(BaseModel):
+    """The version of the deal with the sale stage of the next version."""
+
+    deal_history_id: int
+    deal_id: UUID
+    sale_stage_id: int
+    manager_id: UUID | None
+    # the time of the change of the version
+    changed_at: datetime
+    # None, if the deal is deleted
+    next_sale_stage_id: int | None
+    deal_created_at: datetime | None
+
+
+class DealStageEntryDTO(BaseModel):
+    deal_id: UUID
+    sale_stage_id: int
+    entered_at: datetime
+
+
+class DealStageRollupDTO(BaseModel):
+    day: date
+    from_sale_stage_id: int
+    to_sale_stage_id: int
+    manager_id: UUID | None
+    transitions: int = Field(ge=0)
+    # the total time in the from stage in seconds
+    duration_total: float = Field(ge=0)
+    duration_histogram: list[int]
+
+
+class DealHistoryFoldDTO(BaseModel):
+    rollups: list[DealStageRollupDTO] = Field(default_factory=list)
+    # the new entries of the deals to the sale stages
+    entries: list[DealStageEntryDTO] = Field(default_factory=list)
+
+
+class SaleStageDTO(BaseModel):
+    sale_stage_id: int
+    name: str
+    next_sale_stage_id: int | None
+
+
+class FunnelStageDTO(BaseModel):
+    sale_stage_id: int
+    name: str
+    entered: int = Field(ge=0)
+    exited: int = Field(ge=0)
+    advanced: int = Field(ge=0)
+    # the share of the exits to the next sale stage
+    conversion: float | None = Field(default=None, ge=0, le=1)
+
+
+class StagePercentileDTO(BaseModel):
+    percentile: float = Field(ge=0, le=100)
+    seconds: float = Field(ge=0)
+
+
+class StageDurationDTO(BaseModel):
+    sale_stage_id: int
+    name: str
+    # the count of the exits with the known time in the stage
+    count: int = Field(ge=0)
+    mean_seconds: float | None = Field(default=None, ge=0)
+    percentiles: list[StagePercentileDTO] = Field(default_factory=list)
+
+
+class ManagerThroughputDTO(BaseModel):
+    manager_id: UUID
+    transitions: int = Field(ge=0)
+    advanced: int = Field(ge=0)
+    won: int = Field(ge=0)
+    transitions_per_day: float = Field(ge=0)
+
+
+class ForecastBucketDTO(BaseModel):
+    # the dimensions, that aren't grouped, are None
+    manager_id: UUID | None = None
+    sale_stage_id: int | None = None
+    # the month of the expected close (None for the deals without it)
+    month: date | None = None
+    deals: int = Field(ge=0)
+    pipeline: float = Field(ge=0)
+    expected_revenue: float = Field(ge=0)
+    variance: float = Field(ge=0)
+    stddev: float = Field(ge=0)
+
+
+class RevenueForecastDTO(BaseModel):
+    total: ForecastBucketDTO
+    buckets: list[ForecastBucketDTO] = Field(default_factory=list)
+    loaded_at: datetime
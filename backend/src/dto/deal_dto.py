@@ -1,11 +1,18 @@
-from datetime import datetime
+from datetime import UTC, datetime, timedelta
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 from uuid_extensions import uuid7
 
 from core.general_constants import MAX_DB_INT
-from domain.enums import Priority
+from domain.enums import (
+    DealEventType,
+    DealIntakeStatus,
+    DealOutboxEvent,
+    DealState,
+    Priority,
+)
+from dto.message_dto import CURSOR_EPOCH
 
 
 class DealBaseDTO(BaseModel):
@@ -29,6 +36,8 @@ class DealDTO(DealBaseDTO):
 
 class DealCreateDTO(DealBaseDTO):
     deal_id: UUID = Field(default_factory=uuid7)
+    # the least loaded manager is picked, if the manager isn't specified
+    manager_id: UUID | None = None
 
 
 class LostReasonDTO(BaseModel):
@@ -48,6 +57,7 @@ class DealUpdateDTO(BaseModel):
     )
     lost: LostReasonDTO | None = None
     close_at: datetime | None = None
+    expected_close_at: datetime | None = None
 
 
 class DealShortDTO(BaseModel):
@@ -57,8 +67,134 @@ class DealShortDTO(BaseModel):
     lead_name: str | None = None
     lead_last_name: str | None = None
     profile_picture_link: str | None = None
+    manager_id: UUID | None = None
+    updated_at: datetime
+    # the preview of the last message of the deal chat
+    last_message_id: int | None = None
+    last_message: str | None = None
+    last_message_user_id: UUID | None = None
+    last_message_sent_at: datetime | None = None
+    # the count of the not viewed messages of other chat members
+    unread_count: int = Field(default=0, ge=0)
+
+
+class DealBoardStageDTO(BaseModel):
+    sale_stage_id: int
+    name: str
+    # the count and the total cost of the open deals of the stage
+    deals_count: int = Field(ge=0)
+    cost_total: float
+    # the first cards of the stage
+    deals: list[DealShortDTO] = Field(default_factory=list)
+
+
+class DealCursorDTO(BaseModel):
+    """Position of the deal in the board ordered by the last update.
+
+    The deals are ordered by (updated_at, deal_id) descending, the cursor
+    is encoded as "<updated_at in microseconds>_<deal_id in hex>".
+    """
+
+    updated_at: datetime
+    deal_id: UUID
+
+    @classmethod
+    def decode(cls, cursor: str) -> "DealCursorDTO":
+        updated_at, deal_id = cursor.split("_")
+        return cls(
+            updated_at=CURSOR_EPOCH + timedelta(microseconds=int(updated_at)),
+            deal_id=UUID(hex=deal_id),
+        )
+
+    def encode(self) -> str:
+        updated_at = (self.updated_at - CURSOR_EPOCH) // timedelta(
+            microseconds=1
+        )
+        return f"{updated_at}_{self.deal_id.hex}"
+
+
+class DealFiltersDTO(BaseModel):
+    manager_id: UUID | None = None
+    sale_stage_id: int | None = None
+    state: DealState | None = None
+    lost: bool | None = None
+    # the leads get only their own deals
+    lead_id: UUID | None = None
+    # the deals after the cursor are returned
+    after: DealCursorDTO | None = None
 
 
 class ManagerOpenDealsDTO(BaseModel):
     manager_id: UUID
     open_deals_count: int
+
+
+class DealMembersDTO(BaseModel):
+    lead_id: UUID
+    manager_id: UUID | None
+
+
+class DealHistoryPruneDTO(BaseModel):
+    pruned_rows: int = Field(default=0, ge=0)
+    pruned_deals: int = Field(default=0, ge=0)
+
+
+class DealPartitionDTO(BaseModel):
+    partition_name: str
+    # false, if the partition is detached, but isn't exported yet
+    attached: bool
+
+
+class DealOutboxEventDTO(BaseModel):
+    outbox_id: int
+    deal_id: UUID
+    event_type: DealOutboxEvent
+    payload: dict
+    attempts: int = Field(ge=0)
+    created_at: datetime
+
+
+class DealOutboxStatsDTO(BaseModel):
+    depth: int = Field(default=0, ge=0)
+    # age of the oldest pending event in seconds
+    lag: float = Field(default=0, ge=0)
+
+
+class DealIntakeDTO(BaseModel):
+    intake_id: UUID
+    status: DealIntakeStatus
+    # the created (or merged) deal of the processed request
+    deal_id: UUID | None = None
+    attempts: int = Field(ge=0)
+    last_error: str | None = None
+    created_at: datetime
+    processed_at: datetime | None = None
+
+
+class DealIntakeRequestDTO(BaseModel):
+    intake_id: UUID
+    deal: DealCreateDTO
+    attempts: int = Field(ge=0)
+
+
+class DealIntakeStatsDTO(BaseModel):
+    # count of the pending requests
+    depth: int = Field(default=0, ge=0)
+    # age of the oldest pending request in seconds
+    lag: float = Field(default=0, ge=0)
+
+
+class DealEventDTO(BaseModel):
+    event_type: DealEventType
+    deal_id: UUID
+    lead_id: UUID
+    manager_id: UUID | None = None
+    sale_stage_id: int | None = None
+    occurred_at: datetime = Field(default_factory=lambda: datetime.now(tz=UTC))
+
+
+class DealStreamEventDTO(BaseModel):
+    # the ID of the event in the stream, the reset events haven't it
+    event_id: str | None = None
+    event_type: DealEventType
+    event: DealEventDTO | None = None
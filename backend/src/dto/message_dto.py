@@ -13,4 +13,42 @@ class MessageCreateDTO(BaseModel):
         max_length=MAX_MESSAGE_LENGTH,
     )
     user_id: UUID
-    sent_at: datetime = Field(default=datetime.now(tz=UTC))
+    sent_at: datetime = Field(default_factory=lambda: datetime.now(tz=UTC))
+
+
+# the start of the sent_at part of the message cursor
+CURSOR_EPOCH = datetime(1970, 1, 1, tzinfo=UTC)
+
+
+class MessageCursorDTO(BaseModel):
+    """Position of the message in the ordered history of the deal chat.
+
+    The messages are ordered by (sent_at, message_id), the cursor is
+    encoded as "<sent_at in microseconds>_<message_id>".
+    """
+
+    sent_at: datetime
+    message_id: int
+
+    @classmethod
+    def decode(cls, cursor: str) -> "MessageCursorDTO":
+        sent_at, message_id = cursor.split("_")
+        return cls(
+            sent_at=CURSOR_EPOCH + timedelta(microseconds=int(sent_at)),
+            message_id=int(message_id),
+        )
+
+    def encode(self) -> str:
+        sent_at = (self.sent_at - CURSOR_EPOCH) // timedelta(microseconds=1)
+        return f"{sent_at}_{self.message_id}"
+
+
+class MessageSearchDTO(BaseModel):
+    """The best matched message of the deal."""
+
+    deal_id: UUID
+    message_id: int
+    sent_at: datetime
+    # the fragments of the message with the highlighted words
+    snippet: str
+    matched_messages: int
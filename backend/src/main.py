@@ -1,4 +1,5 @@
-from contextlib import asynccontextmanager
+import asyncio
+from contextlib import asynccontextmanager, suppress
 from pathlib import Path
 
 from fastapi import FastAPI
@@ -9,12 +10,44 @@ from core.config import host_settings
 from core.logger.logger import get_configure_logger
 from db.dependencies.base_statements import BASE_STATEMENTS
 from db.dependencies.postgres_helper import postgres_helper
+from repository.article_repository import ArticleRepository
+from services.article_slug_index import article_slug_index
+from services.connection_manager import websocket_manager
+from services.deal_counter_reconciler import (
+    deal_stage_board_reconciler,
+    manager_load_reconciler,
+)
+from services.deal_event_stream import deal_event_stream
+from services.deal_history_compactor import deal_history_compactor
+from services.deal_history_rollup import deal_history_rollup
+from services.deal_intake_worker import deal_intake_worker
+from services.deal_message_writer import deal_message_writer
+from services.deal_outbox_dispatcher import deal_outbox_dispatcher
+from services.deal_partition_archiver import deal_partition_archiver
 
 
 @asynccontextmanager
 async def lifespan(app: FastAPI):
     await postgres_helper.insert_data(BASE_STATEMENTS)
+    async with postgres_helper.session_factory() as session:
+        await article_slug_index.load(ArticleRepository(session))
+    background_tasks = [
+        asyncio.create_task(deal_history_compactor.run()),
+        asyncio.create_task(deal_history_rollup.run()),
+        asyncio.create_task(deal_partition_archiver.run()),
+        asyncio.create_task(manager_load_reconciler.run()),
+        asyncio.create_task(deal_stage_board_reconciler.run()),
+        asyncio.create_task(deal_outbox_dispatcher.run()),
+        asyncio.create_task(deal_intake_worker.run()),
+        asyncio.create_task(deal_message_writer.run()),
+        asyncio.create_task(websocket_manager.run()),
+        asyncio.create_task(deal_event_stream.run()),
+    ]
     yield
+    for task in background_tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
     await postgres_helper.close_connection()
 
 
@@ -3,15 +3,28 @@ from uuid import UUID
 
 from domain.entities.deal import Deal
 from domain.entities.message import Message
+from domain.enums import LanguageEnum
 from dto.deal_dto import (
+    DealBoardStageDTO,
     DealCreateDTO,
     DealDTO,
+    DealFiltersDTO,
+    DealHistoryPruneDTO,
+    DealIntakeDTO,
+    DealIntakeRequestDTO,
+    DealIntakeStatsDTO,
+    DealOutboxEventDTO,
+    DealOutboxStatsDTO,
     DealShortDTO,
     DealUpdateDTO,
     LostReasonDTO,
     ManagerOpenDealsDTO,
 )
-from dto.message_dto import MessageCreateDTO
+from dto.message_dto import (
+    MessageCreateDTO,
+    MessageCursorDTO,
+    MessageSearchDTO,
+)
 
 
 class AbstractDealRepository(ABC):
@@ -69,15 +82,78 @@ class AbstractDealRepository(ABC):
     @abstractmethod
     async def get_deals(
         self,
+        user_id: UUID,
         limit: int,
         offset: int,
+        filters: DealFiltersDTO | None = None,
     ) -> list[DealShortDTO]:
+        """Get the page of the deal cards ordered by the last update.
+
+        Args:
+            user_id: The ID of the user, whose unread messages are counted.
+            limit: The max count of the deals.
+            offset: The count of the skipped deals.
+            filters: The filters and the keyset cursor of the page.
+
+        Returns:
+            The deals with the last messages, the latest updated first.
+        """
         raise NotImplementedError
 
     @abstractmethod
     async def get_messages(
-        self, deal_id: UUID, limit: int, offset: int
+        self,
+        deal_id: UUID,
+        limit: int,
+        offset: int,
+        before: MessageCursorDTO | None = None,
+        after: MessageCursorDTO | None = None,
+        latest: bool = False,
     ) -> list[Message]:
+        """Get the page of the messages of the deal ordered by sending.
+
+        Args:
+            deal_id: The ID of the deal.
+            limit: The max count of the messages.
+            offset: The count of the skipped messages.
+            before: If set, the latest messages before the cursor are
+                returned.
+            after: If set, the first messages after the cursor are
+                returned.
+            latest: If set without the cursors, the latest messages are
+                returned instead of the first ones.
+
+        Returns:
+            The messages in the chronological order.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def mark_messages_viewed(
+        self, deal_id: UUID, user_id: UUID, until: MessageCursorDTO
+    ) -> int:
+        """Mark the messages of other members up to the cursor as viewed.
+
+        Args:
+            deal_id: The ID of the deal.
+            user_id: The ID of the viewer.
+            until: The cursor of the last viewed message (inclusive).
+
+        Returns:
+            The count of the newly viewed messages.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_messages(
+        self, user_id: UUID, language: LanguageEnum, query: str, limit: int
+    ) -> list[MessageSearchDTO]:
+        """Search the messages of the deals of the manager by the words.
+
+        Returns:
+            The best matched message of every found deal with the snippet,
+            the best ranked first.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -87,8 +163,178 @@ class AbstractDealRepository(ABC):
     ):
         raise NotImplementedError
 
+    @abstractmethod
+    async def write_messages(
+        self, messages_data: list[MessageCreateDTO]
+    ) -> list[int]:
+        """Write the batch of the messages by one transaction.
+
+        Returns:
+            The IDs of the messages in the order of the messages.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def get_managers_with_quantity_of_open_deals(
         self,
     ) -> list[ManagerOpenDealsDTO]:
         raise NotImplementedError
+
+    @abstractmethod
+    async def prune_deal_history(
+        self, max_deal_saves: int, batch_size: int
+    ) -> DealHistoryPruneDTO:
+        """Delete the versions of the deals over the max count of versions.
+
+        Args:
+            max_deal_saves: The count of the kept versions of the deal.
+            batch_size: The max count of the pruned deals.
+
+        Returns:
+            The count of the deleted versions and the pruned deals.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_board(
+        self,
+        user_id: UUID,
+        limit: int,
+        manager_id: UUID | None = None,
+    ) -> list[DealBoardStageDTO]:
+        """Get the sale stages with the counts, the total costs and the
+        first cards of the open deals.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_deals(
+        self, user_id: UUID, query: str, limit: int
+    ) -> list[DealShortDTO]:
+        """Search the deal cards by the contacts and the lead names.
+
+        The exact matches of the normalized email or phone go first, then
+        the deals by the trigram similarity of the names.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reconcile_deal_stage_board(self) -> int:
+        """Correct the counts and the total costs of the deal board.
+
+        Returns:
+            The count of the corrected board rows.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def reconcile_manager_load(self) -> int:
+        """Correct the counts of the open deals of the managers.
+
+        Returns:
+            The count of the corrected manager loads.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def claim_outbox_events(
+        self, batch_size: int, lease: float
+    ) -> list[DealOutboxEventDTO]:
+        """Claim the batch of the available outbox events for the delivery.
+
+        Args:
+            batch_size: The max count of the claimed events.
+            lease: The time of the delivery of the batch in seconds.
+
+        Returns:
+            The claimed events in the order of creation.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_outbox_events(self, outbox_ids: list[int]) -> int:
+        """Delete the delivered outbox events.
+
+        Returns:
+            The count of the deleted events.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def postpone_outbox_event(
+        self,
+        outbox_id: int,
+        delay: float,
+        error_text: str,
+        failed: bool = False,
+    ) -> None:
+        """Postpone the next delivery attempt of the failed outbox event."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_outbox_stats(self) -> DealOutboxStatsDTO:
+        """Get the count and the age of the oldest pending event."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def enqueue_deal_intake(
+        self, intake_id: UUID, deal_create: DealCreateDTO
+    ) -> None:
+        """Queue the deal creation request for the intake worker."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_deal_intake(self, intake_id: UUID) -> DealIntakeDTO | None:
+        """Get the state of the deal creation request."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def claim_deal_intakes(
+        self, batch_size: int, lease: float
+    ) -> list[DealIntakeRequestDTO]:
+        """Claim the batch of the pending deal creation requests.
+
+        Args:
+            batch_size: The max count of the claimed requests.
+            lease: The time of the processing of the batch in seconds.
+
+        Returns:
+            The claimed requests in the order of creation.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def create_intake_deals(
+        self, requests: list[DealIntakeRequestDTO]
+    ) -> list[DealDTO]:
+        """Create the deals of the requests by one upsert.
+
+        Returns:
+            The created (or merged) deals.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def postpone_deal_intake(
+        self,
+        intake_id: UUID,
+        delay: float,
+        error_text: str,
+        failed: bool = False,
+    ) -> None:
+        """Postpone the next attempt of the failed deal creation request."""
+        raise NotImplementedError
+
+    @abstractmethod
+    async def delete_deal_intakes(self, retention: float) -> int:
+        """Delete the processed and failed requests after the retention.
+
+        Returns:
+            The count of the deleted requests.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_deal_intake_stats(self) -> DealIntakeStatsDTO:
+        """Get the count and the age of the oldest pending request."""
+        raise NotImplementedError
@@ -0,0 +1,156 @@
+from pathlib import Path
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.logger.logger import get_configure_logger
+from db.dependencies.redis_helper import redis_helper
+
+logger = get_configure_logger(Path(__file__).stem)
+
+ARTICLE_LIST_KEY_PREFIX = "article_list"
+
+
+class ArticleCacheRepository:
+    def __init__(self, redis: Redis):
+        """Initialize the ArticleCacheRepository with a Redis client.
+
+        The cached article lists are stored as strings. Every list is
+        registered in the sets of its tags, so the lists can be found by the
+        tags on the invalidation.
+
+        Args:
+            redis (Redis): An asynchronous Redis client instance.
+        """
+        self.__redis = redis
+
+    def __get_tag_key(self, tag: str) -> str:
+        return f"{ARTICLE_LIST_KEY_PREFIX}:tag:{tag}"
+
+    async def get_list(self, key: str) -> str | None:
+        """Get the cached article list.
+
+        Args:
+            key (str): The key of the article list.
+
+        Returns:
+            str | None: The serialized article list or None if it isn't
+                cached.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            return await self.__redis.get(f"{ARTICLE_LIST_KEY_PREFIX}:{key}")
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get article list %s",
+                key,
+                exc_info=error,
+            )
+            raise error
+
+    async def set_list(
+        self,
+        key: str,
+        value: str,
+        tags: list[str],
+        ttl: int,
+    ) -> None:
+        """Cache the article list and register it in the sets of the tags.
+
+        The sets of the tags live as long as the last list registered in
+        them.
+
+        Args:
+            key (str): The key of the article list.
+            value (str): The serialized article list.
+            tags (list[str]): The tags of the article list.
+            ttl (int): The time-to-live of the article list in seconds.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            async with self.__redis.pipeline(transaction=True) as pipe:
+                pipe.setex(
+                    name=f"{ARTICLE_LIST_KEY_PREFIX}:{key}",
+                    value=value,
+                    time=ttl,
+                )
+                for tag in tags:
+                    pipe.sadd(self.__get_tag_key(tag), key)
+                    pipe.expire(self.__get_tag_key(tag), ttl)
+                await pipe.execute()
+
+        except RedisError as error:
+            logger.error(
+                "Error with redis when set article list %s",
+                key,
+                exc_info=error,
+            )
+            raise error
+
+    async def get_tagged_lists(self, tags: list[str]) -> dict[str, set[str]]:
+        """Get the keys of the article lists registered in the tags.
+
+        Args:
+            tags (list[str]): The tags.
+
+        Returns:
+            dict[str, set[str]]: The keys of the article lists by tag.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            async with self.__redis.pipeline(transaction=False) as pipe:
+                for tag in tags:
+                    pipe.smembers(self.__get_tag_key(tag))
+                result = await pipe.execute()
+
+            return {
+                tag: set(keys) for tag, keys in zip(tags, result, strict=True)
+            }
+
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get article lists of tags %s",
+                tags,
+                exc_info=error,
+            )
+            raise error
+
+    async def delete_lists(self, keys: set[str], tags: list[str]) -> None:
+        """Delete the article lists and unregister them from the tags.
+
+        Args:
+            keys (set[str]): The keys of the article lists.
+            tags (list[str]): The tags to unregister the article lists from.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        if not keys:
+            return
+
+        try:
+            async with self.__redis.pipeline(transaction=True) as pipe:
+                pipe.delete(
+                    *(f"{ARTICLE_LIST_KEY_PREFIX}:{key}" for key in keys)
+                )
+                for tag in tags:
+                    pipe.srem(self.__get_tag_key(tag), *keys)
+                await pipe.execute()
+
+        except RedisError as error:
+            logger.error(
+                "Error with redis when delete %s article lists",
+                len(keys),
+                exc_info=error,
+            )
+            raise error
+
+
+def article_cache_repository_dependency() -> ArticleCacheRepository:
+    return ArticleCacheRepository(redis=redis_helper.redis)
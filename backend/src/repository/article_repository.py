@@ -7,6 +7,7 @@ from sqlalchemy import (
     and_,
     cast,
     delete,
+    exists,
     func,
     select,
     text,
@@ -52,6 +53,7 @@ from domain.exceptions import (
     TagIntegrityError,
     TitleAlreadyExistsError,
 )
+from dto.article_dto import ArticleSlugDTO
 from schemas.article_schema import (
     ArticleCreateSchema,
     ArticleTranslateCreateSchema,
@@ -105,11 +107,29 @@ class ArticleRepository:
             )
             raise ArticleDatabaseError from error
 
-    async def get_article(
-        self, article_id: UUID, language: LanguageEnum
+    async def __fetch_article(
+        self,
+        article_filter: str,
+        params: dict,
+        languages: tuple[LanguageEnum, ...],
     ) -> Article | None:
+        """Fetch the article in the first available language of the chain.
+
+        All candidate translations are fetched by one query and ordered by
+        their position in the `languages`, so the missing translation
+        doesn't cost an extra round trip.
+
+        Args:
+            article_filter: The sql condition, that selects the article.
+            params: The params of the `article_filter`.
+            languages: The languages chain of the article.
+
+        Returns:
+            The article in the served language (see `Article.language`)
+            or None, if the article hasn't translation in any language.
+        """
         stmt = text(
-            """
+            f"""
             select
                 a.article_id,
                 a.author_id,
@@ -133,7 +153,7 @@ class ArticleRepository:
                             'tag_id', tt.tag_id,
                             'tag_name', tt.name
                         )
-                    ), '[{"tag_id": null, "tag_name": null}]'::jsonb
+                    ), '[{{"tag_id": null, "tag_name": null}}]'::jsonb
                 ) as tags
             from article a
             join article_translate at using(article_id)
@@ -148,72 +168,102 @@ class ArticleRepository:
                     tt.tag_id = ta.tag_id
                     and tt.language_id = at.language_id
                 )
-            where at.language_id = :language_id
-                  and a.article_id = :article_id
+            where at.language_id = any(cast(:languages as varchar[]))
+                  and {article_filter}
             group by
                 a.article_id,
                 mu.user_id,
                 at.language_id,
                 at.article_id,
                 bct.blog_category_id,
-                bct.language_id;
+                bct.language_id
+            order by array_position(
+                cast(:languages as varchar[]), at.language_id::varchar
+            )
+            limit 1;
             """
         )
 
-        try:
-            async with self.__session as session:
-                result = await session.execute(
-                    stmt,
-                    {
-                        "language_id": language,
-                        "article_id": article_id,
-                    },
-                )
-                article = result.mappings().fetchone()
-                logger.debug("Article with id %s: %s", article_id, article)
-                if article:
-                    tags = []
-                    if article["tags"]:
-                        logger.debug(
-                            "Tags of article %s: %s",
-                            article_id,
-                            article["tags"],
-                        )
-                        tags = [
-                            Tag(tag_id=tag["tag_id"], name=tag["tag_name"])
-                            for tag in article["tags"]
-                            if article["tags"] and tag["tag_id"]
-                        ]
-
-                    author = Author(
-                        author_id=article["author_id"],
-                        first_name=article["author_first_name"],
-                        last_name=article["author_last_name"],
-                        middle_name=article["author_middle_name"],
-                        avatar=article["author_avatar"],
+        async with self.__session as session:
+            result = await session.execute(
+                stmt,
+                {
+                    **params,
+                    "languages": [
+                        str(language) for language in dict.fromkeys(languages)
+                    ],
+                },
+            )
+            article = result.mappings().fetchone()
+            logger.debug("Article with params %s: %s", params, article)
+            if article:
+                tags = []
+                if article["tags"]:
+                    logger.debug(
+                        "Tags of article %s: %s",
+                        article["article_id"],
+                        article["tags"],
                     )
+                    tags = [
+                        Tag(tag_id=tag["tag_id"], name=tag["tag_name"])
+                        for tag in article["tags"]
+                        if article["tags"] and tag["tag_id"]
+                    ]
+
+                author = Author(
+                    author_id=article["author_id"],
+                    first_name=article["author_first_name"],
+                    last_name=article["author_last_name"],
+                    middle_name=article["author_middle_name"],
+                    avatar=article["author_avatar"],
+                )
 
-                    article = Article(
-                        article_id=article["article_id"],
-                        title=article["title"],
-                        language=article["language_id"],
-                        category=ArticleCategory(
-                            category_id=article["category_id"],
-                            name=article["category_name"],
-                        )
-                        if article["category_id"]
-                        else None,
-                        image_src=article["article_image"],
-                        content=article["content"],
-                        views_count=article["views_count"],
-                        slug=article["slug"],
-                        author=author,
-                        tags=tags,
-                        status=article["status_id"],
-                        published_at=article["published_at"],
+                article = Article(
+                    article_id=article["article_id"],
+                    title=article["title"],
+                    language=article["language_id"],
+                    category=ArticleCategory(
+                        category_id=article["category_id"],
+                        name=article["category_name"],
                     )
-                    return article
-                return None
+                    if article["category_id"]
+                    else None,
+                    image_src=article["article_image"],
+                    content=article["content"],
+                    views_count=article["views_count"],
+                    slug=article["slug"],
+                    author=author,
+                    tags=tags,
+                    status=article["status_id"],
+                    published_at=article["published_at"],
+                )
+                return article
+            return None
+
+    async def get_article(
+        self,
+        article_id: UUID,
+        language: LanguageEnum,
+        fallback_languages: tuple[LanguageEnum, ...] = (),
+    ) -> Article | None:
+        """Get the article in the first available language of the chain.
+
+        Args:
+            article_id: The id of the article.
+            language: The most preferred language of the article.
+            fallback_languages: The languages to try (in order), when
+                the article hasn't the translation in the `language`.
+
+        Returns:
+            The article in the served language (see `Article.language`)
+            or None, if the article hasn't translation in any language.
+        """
+        try:
+            return await self.__fetch_article(
+                article_filter="a.article_id = :article_id",
+                params={"article_id": article_id},
+                languages=(language, *fallback_languages),
+            )
 
         except DBAPIError as error:
             logger.error(
@@ -221,6 +271,66 @@ class ArticleRepository:
             )
             raise ArticleDatabaseError from error
 
+    async def get_article_by_slug(
+        self,
+        slug: str,
+        language: LanguageEnum,
+        fallback_languages: tuple[LanguageEnum, ...] = (),
+    ) -> Article | None:
+        """Get the article by slug in the first available language.
+
+        Args:
+            slug: The unique slug of the article.
+            language: The most preferred language of the article.
+            fallback_languages: The languages to try (in order), when
+                the article hasn't the translation in the `language`.
+
+        Returns:
+            The article in the served language (see `Article.language`)
+            or None, if the article hasn't translation in any language.
+        """
+        try:
+            return await self.__fetch_article(
+                article_filter="a.slug = :slug",
+                params={"slug": slug},
+                languages=(language, *fallback_languages),
+            )
+
+        except DBAPIError as error:
+            logger.error(
+                "DB error when get article by slug: %s", slug, exc_info=error
+            )
+            raise ArticleDatabaseError from error
+
+    async def get_slugs(self) -> list[ArticleSlugDTO]:
+        """Get the slugs of all articles with the languages of translates.
+
+        Returns:
+            The list of the slugs, that are used to build the slug index.
+        """
+        stmt = (
+            select(
+                A.c.article_id,
+                A.c.slug,
+                func.array_agg(AT.c.language_id).label("languages"),
+            )
+            .select_from(A.join(AT, A.c.article_id == AT.c.article_id))
+            .group_by(A.c.article_id)
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+
+            return [
+                ArticleSlugDTO.model_validate(row)
+                for row in result.mappings().all()
+            ]
+
+        except DBAPIError as error:
+            logger.error("DB error when get slugs of articles", exc_info=error)
+            raise ArticleDatabaseError from error
+
     async def article_insert(self, article: Article):
         article_model = ArticleModel(
             article_id=article.article_id,
@@ -383,6 +493,79 @@ class ArticleRepository:
 
             raise ArticleIntegrityError from error
 
+    async def get_search_candidates(
+        self,
+        language: LanguageEnum,
+        ts_query_of_searched_words: str,
+        category_id: tuple[ArticleCategoriesID, ...] | None = None,
+        statuses: tuple[ArticleStatus, ...] | None = None,
+        tags: tuple[int, ...] | None = None,
+        limit: int = DEFAULT_LIMIT,
+    ) -> list[UUID]:
+        """Get the capped set of the articles matching the searched words.
+
+        The candidates are taken from the GIN index of the article
+        translates and ordered by the publication date, so the cost of
+        the query doesn't depend on the frequency of the searched words:
+        ts_rank isn't computed here.
+
+        Args:
+            language: The language of the articles.
+            ts_query_of_searched_words: The prepared to tsquery text.
+            category_id: A tuple of category IDs to filter by.
+            statuses: A tuple of article statuses to filter by.
+            tags: A tuple of tag IDs to filter by.
+            limit: The max count of the candidates.
+
+        Returns:
+            The ids of the candidates, the newest first.
+        """
+        ts_query = to_tsquery(
+            L.c.cfgname.cast(REGCONFIG), ts_query_of_searched_words
+        )
+        stmt = (
+            select(A.c.article_id)
+            .select_from(
+                A.join(AT, A.c.article_id == AT.c.article_id).join(
+                    L, AT.c.language_id == L.c.language_id
+                )
+            )
+            .where(
+                L.c.language_id == language,
+                AT.c.tsv_content.op("@@")(ts_query),
+            )
+            .order_by(A.c.published_at.desc().nullsfirst())
+            .limit(limit)
+        )
+
+        if category_id:
+            stmt = stmt.where(A.c.blog_category_id.in_(category_id))
+        if statuses:
+            stmt = stmt.where(A.c.status_id.in_(statuses))
+        if tags:
+            stmt = stmt.where(
+                exists().where(
+                    TA.c.article_id == A.c.article_id, TA.c.tag_id.in_(tags)
+                )
+            )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+
+            return list(result.scalars().all())
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPI error of get search candidates with"
+                + " (language, ts_query, limit) = (%s, %s, %s)",
+                language,
+                ts_query_of_searched_words,
+                limit,
+                exc_info=error,
+            )
+            raise ArticleDatabaseError from error
+
     async def get_articles(
         self,
         # filters params
@@ -391,6 +574,7 @@ class ArticleRepository:
         statuses: tuple[ArticleStatus, ...] | None = None,
         tags: tuple[int, ...] | None = None,
         ts_query_of_searched_words: str | None = None,
+        article_ids: tuple[UUID, ...] | None = None,
         # pagination params
         limit: int = DEFAULT_LIMIT,
         offset: int = 0,
@@ -460,6 +644,8 @@ class ArticleRepository:
             stmt = stmt.where(A.c.status_id.in_(statuses))
         if tags:
             stmt = stmt.where(TT.c.tag_id.in_(tags))
+        if article_ids:
+            stmt = stmt.where(A.c.article_id.in_(article_ids))
         if ts_query_of_searched_words:
             ts_query = to_tsquery(
                 L.c.cfgname.cast(REGCONFIG), ts_query_of_searched_words
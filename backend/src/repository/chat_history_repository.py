@@ -0,0 +1,95 @@
+from pathlib import Path
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import chat_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.redis_helper import redis_helper
+
+logger = get_configure_logger(Path(__file__).stem)
+
+CHAT_HISTORY_KEY_PREFIX = "deal_chat_history"
+
+
+class ChatHistoryRepository:
+    def __init__(self, redis: Redis, max_length: int, ttl: int):
+        """Initialize the ChatHistoryRepository with a Redis client.
+
+        The recent messages of every deal chat are stored in the capped
+        Redis stream (the ring buffer of about `max_length` messages). The
+        stream of the deal without new messages expires after `ttl`
+        seconds, so only the streams of the active deals are kept.
+
+        Args:
+            redis (Redis): An asynchronous Redis client instance.
+            max_length (int): The approximate max count of the messages.
+            ttl (int): The time-to-live of the stream in seconds.
+        """
+        self.__redis = redis
+        self.__max_length = max_length
+        self.__ttl = ttl
+
+    def __get_key(self, deal_id: UUID) -> str:
+        return f"{CHAT_HISTORY_KEY_PREFIX}:{deal_id}"
+
+    async def append(self, deal_id: UUID, message: str) -> None:
+        """Append the message to the stream of the deal.
+
+        Args:
+            deal_id (UUID): The ID of the deal.
+            message (str): The serialized message.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            async with self.__redis.pipeline(transaction=True) as pipe:
+                pipe.xadd(
+                    self.__get_key(deal_id),
+                    {"message": message},
+                    maxlen=self.__max_length,
+                    approximate=True,
+                )
+                pipe.expire(self.__get_key(deal_id), self.__ttl)
+                await pipe.execute()
+        except RedisError as error:
+            logger.error(
+                "Error with redis when append message to the chat %s",
+                deal_id,
+                exc_info=error,
+            )
+            raise error
+
+    async def get_recent(self, deal_id: UUID) -> list[str]:
+        """Get the recent messages of the deal in the order of appending.
+
+        Args:
+            deal_id (UUID): The ID of the deal.
+
+        Returns:
+            list[str]: The serialized messages.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            entries = await self.__redis.xrange(self.__get_key(deal_id))
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get messages of the chat %s",
+                deal_id,
+                exc_info=error,
+            )
+            raise error
+
+        return [fields["message"] for _, fields in entries]
+
+
+# create the instance
+chat_history_repository = ChatHistoryRepository(
+    redis=redis_helper.redis,
+    max_length=chat_settings.history_length,
+    ttl=chat_settings.history_ttl,
+)
@@ -0,0 +1,322 @@
+from datetime import date
+from pathlib import Path
+
+from fastapi import Depends
+from sqlalchemy import select, text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.general_constants import (
+    COMPLETED_SALE_STAGE_ID,
+    DEAL_HISTORY_ROLLUP_WATERMARK,
+)
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from db.models import DealStageEntry, DealStageRollup, SaleStage
+from domain.exceptions import DealAnalyticsDBError
+from dto.deal_analytics_dto import (
+    DealHistoryRowDTO,
+    DealStageEntryDTO,
+    DealStageRollupDTO,
+    SaleStageDTO,
+)
+from services.classes.revenue_forecast import OpenDealColumns
+from services.classes.stage_rollup import fold_deal_history
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealAnalyticsRepository:
+    def __init__(self, session: AsyncSession):
+        self.__session = session
+
+    async def fold_deal_history(
+        self, batch_size: int, settle_delay: float
+    ) -> int:
+        """Fold the batch of the new deal history to the stage rollups.
+
+        The rows after the watermark are folded in the order of their IDs
+        and the watermark is moved by the same transaction. The watermark
+        row is locked, so the concurrent jobs of the workers fold the
+        different batches. The rows younger than `settle_delay` seconds
+        (and the rows after them) are left to the next runs, because the
+        rows of the running transactions can be committed later.
+
+        Args:
+            batch_size: The max count of the folded rows.
+            settle_delay: The min age of the folded rows in seconds.
+
+        Returns:
+            The count of the folded rows. If it's less than `batch_size`,
+            there are no more settled rows.
+
+        Raises:
+            DealAnalyticsDBError: For general database API errors.
+        """
+        watermark_stmt = text(
+            """
+            insert into analytics_watermark (name, position, updated_at)
+            values (:name, 0, current_timestamp)
+            on conflict (name) do update set name = excluded.name
+            returning position
+            """
+        )
+        history_stmt = text(
+            """
+            select
+                dh.deal_history_id,
+                dh.deal_id,
+                dh.sale_stage_id,
+                dh.manager_id,
+                dh.changed_at,
+                coalesce(
+                    next_version.sale_stage_id, d.sale_stage_id
+                ) as next_sale_stage_id,
+                d.created_at as deal_created_at
+            from deal_history dh
+            left join deal d using (deal_id)
+            left join lateral (
+                select nv.sale_stage_id
+                from deal_history nv
+                where nv.deal_id = dh.deal_id
+                    -- prunes the partitions before the version at run time
+                    and nv.changed_at >= dh.changed_at
+                    and (nv.changed_at, nv.deal_history_id)
+                        > (dh.changed_at, dh.deal_history_id)
+                order by nv.changed_at, nv.deal_history_id
+                limit 1
+            ) next_version on true
+            where dh.deal_history_id > :position
+                and dh.deal_history_id < coalesce(
+                    (
+                        select min(deal_history_id)
+                        from deal_history
+                        where deal_history_id > :position
+                            and changed_at > current_timestamp
+                                - make_interval(secs => :settle_delay)
+                    ),
+                    9223372036854775807
+                )
+            order by dh.deal_history_id
+            limit :batch_size
+            """
+        )
+        rollup_stmt = text(
+            """
+            insert into deal_stage_rollup (
+                day, from_sale_stage_id, to_sale_stage_id, manager_id,
+                transitions, duration_total, duration_histogram
+            )
+            values (
+                :day, :from_sale_stage_id, :to_sale_stage_id, :manager_id,
+                :transitions, :duration_total,
+                cast(:duration_histogram as integer[])
+            )
+            on conflict on constraint deal_stage_rollup_key do update set
+                transitions = deal_stage_rollup.transitions
+                    + excluded.transitions,
+                duration_total = deal_stage_rollup.duration_total
+                    + excluded.duration_total,
+                duration_histogram = array(
+                    select coalesce(stored, 0) + coalesce(folded, 0)
+                    from unnest(
+                        deal_stage_rollup.duration_histogram,
+                        excluded.duration_histogram
+                    ) with ordinality as bucket(stored, folded, position)
+                    order by bucket.position
+                )
+            """
+        )
+        entry_stmt = text(
+            """
+            insert into deal_stage_entry (deal_id, sale_stage_id, entered_at)
+            values (:deal_id, :sale_stage_id, :entered_at)
+            on conflict (deal_id) do update set
+                sale_stage_id = excluded.sale_stage_id,
+                entered_at = excluded.entered_at
+            """
+        )
+        move_watermark_stmt = text(
+            """
+            update analytics_watermark
+            set position = :position, updated_at = current_timestamp
+            where name = :name
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                # the upsert locks the watermark until the commit
+                position = (
+                    await session.execute(
+                        watermark_stmt,
+                        params={"name": DEAL_HISTORY_ROLLUP_WATERMARK},
+                    )
+                ).scalar_one()
+
+                history_rows = (
+                    await session.execute(
+                        history_stmt,
+                        params={
+                            "position": position,
+                            "settle_delay": settle_delay,
+                            "batch_size": batch_size,
+                        },
+                    )
+                ).mappings()
+                rows = [DealHistoryRowDTO(**row) for row in history_rows]
+                if not rows:
+                    await session.commit()
+                    return 0
+
+                entry_rows = await session.execute(
+                    select(
+                        DealStageEntry.deal_id,
+                        DealStageEntry.sale_stage_id,
+                        DealStageEntry.entered_at,
+                    ).where(
+                        DealStageEntry.deal_id.in_(
+                            {row.deal_id for row in rows}
+                        )
+                    )
+                )
+                entries = {
+                    row.deal_id: DealStageEntryDTO(**row)
+                    for row in entry_rows.mappings()
+                }
+
+                fold = fold_deal_history(rows, entries)
+                if fold.rollups:
+                    await session.execute(
+                        rollup_stmt,
+                        [rollup.model_dump() for rollup in fold.rollups],
+                    )
+                if fold.entries:
+                    await session.execute(
+                        entry_stmt,
+                        [entry.model_dump() for entry in fold.entries],
+                    )
+                await session.execute(
+                    move_watermark_stmt,
+                    params={
+                        "name": DEAL_HISTORY_ROLLUP_WATERMARK,
+                        "position": rows[-1].deal_history_id,
+                    },
+                )
+                await session.commit()
+
+            return len(rows)
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when fold the deal history", exc_info=error
+            )
+            raise DealAnalyticsDBError from error
+
+    async def get_stage_rollups(
+        self, date_from: date, date_to: date
+    ) -> list[DealStageRollupDTO]:
+        """Get the daily stage rollups of the period (inclusive).
+
+        Raises:
+            DealAnalyticsDBError: For general database API errors.
+        """
+        stmt = select(
+            DealStageRollup.day,
+            DealStageRollup.from_sale_stage_id,
+            DealStageRollup.to_sale_stage_id,
+            DealStageRollup.manager_id,
+            DealStageRollup.transitions,
+            DealStageRollup.duration_total,
+            DealStageRollup.duration_histogram,
+        ).where(DealStageRollup.day.between(date_from, date_to))
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+
+            return [
+                DealStageRollupDTO(**row) for row in result.mappings().all()
+            ]
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when get the stage rollups from %s to %s",
+                date_from,
+                date_to,
+                exc_info=error,
+            )
+            raise DealAnalyticsDBError from error
+
+    async def get_sale_stages(self) -> list[SaleStageDTO]:
+        """Get the sale stages.
+
+        Raises:
+            DealAnalyticsDBError: For general database API errors.
+        """
+        stmt = select(
+            SaleStage.sale_stage_id,
+            SaleStage.name,
+            SaleStage.next_sale_stage_id,
+        ).order_by(SaleStage.sale_stage_id)
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+
+            return [SaleStageDTO(**row) for row in result.mappings().all()]
+
+        except DBAPIError as error:
+            logger.error("DBAPIError when get the sale stages", exc_info=error)
+            raise DealAnalyticsDBError from error
+
+    async def get_open_deal_columns(self) -> OpenDealColumns:
+        """Get the open deals of the revenue forecast column-wise.
+
+        The deal is open, if it isn't closed and isn't completed, as on the
+        stage board. The deals are bucketed by the month (UTC) of their
+        `expected_close_at`.
+
+        Raises:
+            DealAnalyticsDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            select
+                manager_id,
+                sale_stage_id,
+                date_trunc(
+                    'month', expected_close_at at time zone 'UTC'
+                )::date as expected_close_month,
+                cost::double precision as cost,
+                probability::double precision as probability
+            from deal
+            where close_at is null
+                and sale_stage_id <> :completed_sale_stage_id
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt,
+                    params={
+                        "completed_sale_stage_id": COMPLETED_SALE_STAGE_ID
+                    },
+                )
+                rows = result.tuples().all()
+
+            return OpenDealColumns.from_rows(rows)
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when get the open deals of the forecast",
+                exc_info=error,
+            )
+            raise DealAnalyticsDBError from error
+
+
+def deal_analytics_repository_dependency(
+    session: AsyncSession = Depends(postgres_helper.session_dependency),
+) -> DealAnalyticsRepository:
+    return DealAnalyticsRepository(session=session)
@@ -0,0 +1,168 @@
+from pathlib import Path
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import crm_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.redis_helper import redis_helper
+
+logger = get_configure_logger(Path(__file__).stem)
+
+DEAL_EVENTS_KEY = "deal_events"
+# the ID before any ID of the stream
+DEAL_EVENTS_START_ID = "0-0"
+
+
+class DealEventRepository:
+    def __init__(self, redis: Redis, max_length: int):
+        """Initialize the DealEventRepository with a Redis client.
+
+        The recent deal events are stored in the capped Redis stream (the
+        ring buffer of about `max_length` events). The IDs of the stream
+        entries are ordered, so the client resumes the stream after the ID
+        of its last event.
+
+        Args:
+            redis (Redis): An asynchronous Redis client instance.
+            max_length (int): The approximate max count of the events.
+        """
+        self.__redis = redis
+        self.__max_length = max_length
+
+    async def append(self, event: str) -> str:
+        """Append the event to the stream.
+
+        Args:
+            event (str): The serialized event.
+
+        Returns:
+            str: The ID of the event in the stream.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            return await self.__redis.xadd(
+                DEAL_EVENTS_KEY,
+                {"event": event},
+                maxlen=self.__max_length,
+                approximate=True,
+            )
+        except RedisError as error:
+            logger.error(
+                "Error with redis when append the deal event", exc_info=error
+            )
+            raise error
+
+    async def get_after(
+        self, event_id: str, count: int
+    ) -> list[tuple[str, str]]:
+        """Get the events after the ID in the order of appending.
+
+        Args:
+            event_id (str): The ID of the last known event (exclusive).
+            count (int): The max count of the events.
+
+        Returns:
+            list[tuple[str, str]]: The IDs and the serialized events.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            entries = await self.__redis.xrange(
+                DEAL_EVENTS_KEY, min=f"({event_id}", count=count
+            )
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get the deal events after %s",
+                event_id,
+                exc_info=error,
+            )
+            raise error
+
+        return [(entry_id, fields["event"]) for entry_id, fields in entries]
+
+    async def get_first_id(self) -> str | None:
+        """Get the ID of the oldest kept event.
+
+        Returns:
+            str | None: The ID or None, if the stream is empty.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            entries = await self.__redis.xrange(DEAL_EVENTS_KEY, count=1)
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get the first deal event",
+                exc_info=error,
+            )
+            raise error
+
+        return entries[0][0] if entries else None
+
+    async def get_last_id(self) -> str:
+        """Get the ID of the newest event.
+
+        Returns:
+            str: The ID or the start ID, if the stream is empty.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            entries = await self.__redis.xrevrange(DEAL_EVENTS_KEY, count=1)
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get the last deal event",
+                exc_info=error,
+            )
+            raise error
+
+        return entries[0][0] if entries else DEAL_EVENTS_START_ID
+
+    async def wait_after(
+        self, event_id: str, count: int, timeout: float
+    ) -> list[tuple[str, str]]:
+        """Wait for the events after the ID.
+
+        Args:
+            event_id (str): The ID of the last read event (exclusive).
+            count (int): The max count of the events.
+            timeout (float): The max time of the wait in seconds.
+
+        Returns:
+            list[tuple[str, str]]: The IDs and the serialized events, the
+                list is empty on the timeout.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            streams = await self.__redis.xread(
+                {DEAL_EVENTS_KEY: event_id},
+                count=count,
+                block=int(timeout * 1000),
+            )
+        except RedisError as error:
+            logger.error(
+                "Error with redis when wait for the deal events after %s",
+                event_id,
+                exc_info=error,
+            )
+            raise error
+
+        return [
+            (entry_id, fields["event"])
+            for _, entries in streams
+            for entry_id, fields in entries
+        ]
+
+
+# create the instance
+deal_event_repository = DealEventRepository(
+    redis=redis_helper.redis, max_length=crm_settings.deal_events_stream_length
+)
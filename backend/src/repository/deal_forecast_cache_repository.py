@@ -0,0 +1,70 @@
+from pathlib import Path
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.logger.logger import get_configure_logger
+from db.dependencies.redis_helper import redis_helper
+
+logger = get_configure_logger(Path(__file__).stem)
+
+DEAL_FORECAST_GENERATION_KEY = "deal_forecast:generation"
+
+
+class DealForecastCacheRepository:
+    def __init__(self, redis: Redis):
+        """Initialize the DealForecastCacheRepository with a Redis client.
+
+        The generation of the open deals is the counter, that is incremented
+        on every deal write. The workers compare it with the generation of
+        their cached snapshots, so the write on one worker invalidates the
+        snapshots of all workers.
+
+        Args:
+            redis (Redis): An asynchronous Redis client instance.
+        """
+        self.__redis = redis
+
+    async def get_generation(self) -> int:
+        """Get the generation of the open deals.
+
+        Returns:
+            int: The generation (0 if the deals weren't written yet).
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            generation = await self.__redis.get(DEAL_FORECAST_GENERATION_KEY)
+            return int(generation or 0)
+        except RedisError as error:
+            logger.error(
+                "Error with redis when get the deal forecast generation",
+                exc_info=error,
+            )
+            raise error
+
+    async def increment_generation(self) -> int:
+        """Increment the generation of the open deals.
+
+        Returns:
+            int: The new generation.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        try:
+            return await self.__redis.incr(DEAL_FORECAST_GENERATION_KEY)
+        except RedisError as error:
+            logger.error(
+                "Error with redis when increment the deal forecast"
+                + " generation",
+                exc_info=error,
+            )
+            raise error
+
+
+# create the instance
+deal_forecast_cache_repository = DealForecastCacheRepository(
+    redis=redis_helper.redis
+)
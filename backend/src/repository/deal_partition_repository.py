@@ -0,0 +1,309 @@
+from collections.abc import AsyncIterator
+from datetime import date
+from pathlib import Path
+
+from sqlalchemy import text
+from sqlalchemy.exc import DBAPIError
+from sqlalchemy.ext.asyncio import AsyncSession
+
+from core.general_constants import DEAL_HISTORY_ROLLUP_WATERMARK
+from core.logger.logger import get_configure_logger
+from domain.exceptions import DealDBError
+from dto.deal_dto import DealPartitionDTO
+
+logger = get_configure_logger(Path(__file__).stem)
+
+# the max wait of the lock of the partitioned table by the detach, so the
+# detach doesn't queue the writes of the table behind the long queries
+DETACH_LOCK_TIMEOUT = "5s"
+# the name of the advisory lock of the archivation
+ARCHIVATION_LOCK_NAME = "deal_partition_archivation"
+
+
+class DealPartitionRepository:
+    """The monthly partitions of the deal messages and the deal history.
+
+    The names of the tables and the partitions are the identifiers of the
+    statements, so they're got from the code constants and the catalog
+    only.
+    """
+
+    def __init__(self, session: AsyncSession):
+        self.__session = session
+
+    async def try_lock_archivation(self) -> bool:
+        """Lock the archivation until the end of the transaction of the
+        session.
+
+        The workers would export the same partition to one file and drop
+        it, so only one of them archives. The session isn't closed here,
+        it's held by the caller for the whole archivation.
+
+        Returns:
+            False, if the archivation is locked by another transaction.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            select pg_try_advisory_xact_lock(hashtextextended(:name, 0))
+            """
+        )
+
+        try:
+            return bool(
+                await self.__session.scalar(
+                    stmt, params={"name": ARCHIVATION_LOCK_NAME}
+                )
+            )
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when lock the archivation", exc_info=error
+            )
+            raise DealDBError from error
+
+    async def create_month_partition(
+        self, table_name: str, key_column: str, month: date
+    ) -> bool:
+        """Create the partition of the month, if it doesn't exist.
+
+        The rows of the month are moved from the default partition by the
+        create_month_partition function.
+
+        Returns:
+            True, if the partition is created.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            select create_month_partition(:table_name, :key_column, :month)
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                created = (
+                    await session.execute(
+                        stmt,
+                        params={
+                            "table_name": table_name,
+                            "key_column": key_column,
+                            "month": month,
+                        },
+                    )
+                ).scalar_one()
+                await session.commit()
+
+            return created
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when create the partition of %s of %s",
+                table_name,
+                month,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def get_expired_partitions(
+        self, table_name: str, before: date
+    ) -> list[DealPartitionDTO]:
+        """Get the month partitions of the table before the month.
+
+        The partitions detached by the interrupted archivation are returned
+        too, so their export is retried.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            select
+                c.relname as partition_name,
+                exists (
+                    select from pg_inherits i where i.inhrelid = c.oid
+                ) as attached
+            from pg_class c
+            where c.relkind = 'r'
+                and c.relnamespace = cast(current_schema() as regnamespace)
+                and c.relname ~ :name_pattern
+                and right(c.relname, 6) < :before
+            order by c.relname
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt,
+                    params={
+                        "name_pattern": f"^{table_name}_[0-9]{{6}}$",
+                        "before": f"{before:%Y%m}",
+                    },
+                )
+
+            return [
+                DealPartitionDTO.model_validate(row)
+                for row in result.mappings().all()
+            ]
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when get the expired partitions of %s",
+                table_name,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def has_unfolded_history(self, partition_name: str) -> bool:
+        """Check, that the history partition has the rows after the
+        watermark of the stage rollups.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            f"""
+            select exists (
+                select from "{partition_name}"
+                where deal_history_id > (
+                    select coalesce(max(position), 0)
+                    from analytics_watermark
+                    where name = :watermark_name
+                )
+            )
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                return (
+                    await session.execute(
+                        stmt,
+                        params={
+                            "watermark_name": DEAL_HISTORY_ROLLUP_WATERMARK
+                        },
+                    )
+                ).scalar_one()
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when check the history of %s",
+                partition_name,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def detach_partition(
+        self, table_name: str, partition_name: str
+    ) -> None:
+        """Detach the partition, so its rows aren't visible to the queries.
+
+        Raises:
+            DealDBError: For general database API errors and if the lock of
+                the table isn't got in time.
+        """
+        try:
+            async with self.__session as session:
+                await session.execute(
+                    text(f"set local lock_timeout = '{DETACH_LOCK_TIMEOUT}'")
+                )
+                await session.execute(
+                    text(
+                        f'alter table "{table_name}"'
+                        f' detach partition "{partition_name}"'
+                    )
+                )
+                await session.commit()
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when detach the partition %s",
+                partition_name,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def export_partition(
+        self, partition_name: str, batch_size: int
+    ) -> AsyncIterator[list[str]]:
+        """Read the rows of the detached partition by the server cursor.
+
+        Yields:
+            The batches of the rows as JSON objects.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        # the tsvector of the message is derived from the message, so it
+        # isn't archived
+        stmt = text(
+            f"""
+            select cast(to_jsonb(p) - 'tsv_message' as text)
+            from "{partition_name}" p
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.stream(
+                    stmt, execution_options={"yield_per": batch_size}
+                )
+                async for rows in result.scalars().partitions():
+                    yield list(rows)
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when export the partition %s",
+                partition_name,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def drop_partition(self, partition_name: str) -> None:
+        """Drop the detached partition after the export.
+
+        Raises:
+            DealDBError: If the partition is attached and for general
+                database API errors.
+        """
+        attached_stmt = text(
+            """
+            select exists (
+                select from pg_inherits
+                where inhrelid = to_regclass(:partition_name)
+            )
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                attached = (
+                    await session.execute(
+                        attached_stmt,
+                        params={"partition_name": partition_name},
+                    )
+                ).scalar_one()
+                if attached:
+                    logger.error(
+                        "The partition %s isn't dropped, it's attached",
+                        partition_name,
+                    )
+                    raise DealDBError(
+                        f"The partition {partition_name} is attached"
+                    )
+
+                await session.execute(text(f'drop table "{partition_name}"'))
+                await session.commit()
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when drop the partition %s",
+                partition_name,
+                exc_info=error,
+            )
+            raise DealDBError from error
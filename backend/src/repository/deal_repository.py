@@ -1,24 +1,44 @@
-import json
+import heapq
 from datetime import UTC, datetime
 from pathlib import Path
 from uuid import UUID
 
 from fastapi import Depends
-from sqlalchemy import func, select, text, update
+from sqlalchemy import Select, func, or_, select, text, true, tuple_, update
 from sqlalchemy.dialects.postgresql import insert
 from sqlalchemy.exc import DBAPIError, IntegrityError
 from sqlalchemy.ext.asyncio import AsyncSession
 
-from core.config import crm_settings
-from core.general_constants import DEFAULT_LIMIT
+from core.general_constants import (
+    COMPLETED_SALE_STAGE_ID,
+    DEAL_HISTORY_ROLLUP_WATERMARK,
+    DEAL_MESSAGE_PREVIEW_LENGTH,
+    DEFAULT_LIMIT,
+)
 from core.logger.logger import get_configure_logger
 from db.dependencies.postgres_helper import postgres_helper
 from db.models import Deal as DealModel
-from db.models import DealMessage, LostReason, User
+from db.models import (
+    DealIntake,
+    DealMessage,
+    DealOutbox,
+    DealStageBoard,
+    LostReason,
+    ManagerLoad,
+    SaleStage,
+    User,
+)
 from db.models import MdUser as MdUserModel
 from domain.entities.deal import Deal
 from domain.entities.message import Message
-from domain.enums import Roles
+from domain.enums import (
+    DealIntakeStatus,
+    DealOutboxEvent,
+    DealOutboxStatus,
+    DealState,
+    LanguageEnum,
+    Roles,
+)
 from domain.exceptions import (
     DealAlreadyExistsError,
     DealDBError,
@@ -28,23 +48,57 @@ from domain.exceptions import (
     DealManagerNotFoundError,
     DealNotFoundError,
     DealSaleStageNotFoundError,
+    ManagersDoesNotExistsError,
     MessageAlreadyExistsError,
     UserNotFoundError,
 )
 from dto.deal_dto import (
     DealBaseDTO,
+    DealBoardStageDTO,
     DealCreateDTO,
     DealDTO,
+    DealFiltersDTO,
+    DealHistoryPruneDTO,
+    DealIntakeDTO,
+    DealIntakeRequestDTO,
+    DealIntakeStatsDTO,
+    DealOutboxEventDTO,
+    DealOutboxStatsDTO,
     DealShortDTO,
     DealUpdateDTO,
     LostReasonDTO,
     ManagerOpenDealsDTO,
 )
-from dto.message_dto import MessageCreateDTO
+from dto.message_dto import (
+    MessageCreateDTO,
+    MessageCursorDTO,
+    MessageSearchDTO,
+)
 from repository.abc.deal_repository_abc import AbstractDealRepository
 
 logger = get_configure_logger(Path(__file__).stem)
 
+# the columns of the deal returned by the writes
+DEAL_COLUMNS = (
+    DealModel.deal_id,
+    DealModel.sale_stage_id,
+    DealModel.lead_id,
+    DealModel.cost,
+    DealModel.probability,
+    DealModel.fields,
+    DealModel.priority,
+    DealModel.manager_id,
+    DealModel.created_at,
+    DealModel.updated_at,
+)
+
+# the snippets of the found messages, the message is escaped before the
+# highlighting, so the snippet is the safe HTML
+MESSAGE_HEADLINE_OPTIONS = (
+    "StartSel=<mark>, StopSel=</mark>, MaxWords=20, MinWords=5,"
+    ' MaxFragments=2, FragmentDelimiter=" ... "'
+)
+
 
 class DealRepository(AbstractDealRepository):
     def __init__(self, session: AsyncSession):
@@ -75,99 +129,211 @@ class DealRepository(AbstractDealRepository):
         )
         raise DealError from error
 
-    @staticmethod
-    def delete_old_deal_versions(function):
-        async def inner(self, deal_id: UUID, *args, **kwargs):
-            try:
-                async with self.__session as session:
-                    await session.execute(
-                        text(
-                            """
-                            with deleted_deal as (
-                                select deal_history_id
-                                from deal_history
-                                where deal_id = :deal_id
-                                order by changed_at desc
-                                offset :max_deal_saves
-                            )
-                            delete from deal_history
-                            where deal_history_id in
-                                (select deal_history_id from deleted_deal);
-                            """
-                        ),
-                        params={
-                            "deal_id": deal_id,
-                            "max_deal_saves": crm_settings.max_deal_saves - 1,
-                        },
-                    )
-                    await session.commit()
-            except Exception as e:
-                logger.error(e)
+    async def __pick_least_loaded_manager(self, session: AsyncSession) -> UUID:
+        """Pick the manager with the least count of the open deals.
 
-            return await function(self, deal_id, *args, **kwargs)
+        The row of the manager load is locked until the end of the
+        transaction (the deal insert increments the count by trigger), and
+        the concurrent transactions skip the locked rows, so the concurrent
+        deals are assigned to the different managers.
 
-        return inner
+        Raises:
+            ManagersDoesNotExistsError: If there are no managers.
+        """
+        stmt = (
+            select(ManagerLoad.manager_id)
+            .order_by(ManagerLoad.open_deals_count, ManagerLoad.manager_id)
+            .limit(1)
+        )
 
-    async def create(self, deal_create: DealCreateDTO) -> DealDTO:
-        # prepared data for right asyncpg working with the dict objects
-        fields = json.dumps(deal_create.fields)
+        manager_id = await session.scalar(
+            stmt.with_for_update(skip_locked=True)
+        )
+        if manager_id is None:
+            # all managers are locked by the concurrent deal creations
+            manager_id = await session.scalar(stmt.with_for_update())
 
-        stmt = (
-            insert(DealModel)
-            .values(
-                deal_id=deal_create.deal_id,
-                sale_stage_id=deal_create.sale_stage_id,
-                lead_id=deal_create.lead_id,
-                cost=deal_create.cost,
-                probability=deal_create.probability,
-                fields=deal_create.fields,
-                priority=deal_create.priority,
-                manager_id=deal_create.manager_id,
-            )
-            .on_conflict_do_update(
-                index_elements=["lead_id"],
-                set_={"fields": DealModel.fields.op("||")(deal_create.fields)},
-            )
-            .returning(
-                DealModel.deal_id,
-                DealModel.sale_stage_id,
-                DealModel.lead_id,
-                DealModel.cost,
-                DealModel.probability,
-                DealModel.fields,
-                DealModel.priority,
-                DealModel.manager_id,
-                DealModel.created_at,
-                DealModel.updated_at,
+        if manager_id is None:
+            logger.error("There are no managers in the system")
+            raise ManagersDoesNotExistsError("There are no managers")
+
+        return manager_id
+
+    async def __pick_least_loaded_managers(
+        self, session: AsyncSession, count: int
+    ) -> list[UUID]:
+        """Pick the managers of the batch of the new deals.
+
+        Every deal is assigned to the manager with the least count of the
+        open deals, counting the deals of the batch. The rows of the
+        managers are locked like by the pick of the single deal.
+
+        Raises:
+            ManagersDoesNotExistsError: If there are no managers.
+        """
+        stmt = select(ManagerLoad.open_deals_count, ManagerLoad.manager_id)
+
+        loads = (
+            await session.execute(stmt.with_for_update(skip_locked=True))
+        ).all()
+        if not loads:
+            # all managers are locked by the concurrent deal creations
+            loads = (await session.execute(stmt.with_for_update())).all()
+
+        if not loads:
+            logger.error("There are no managers in the system")
+            raise ManagersDoesNotExistsError("There are no managers")
+
+        heap = [tuple(load) for load in loads]
+        heapq.heapify(heap)
+        manager_ids = []
+        for _ in range(count):
+            open_deals_count, manager_id = heap[0]
+            manager_ids.append(manager_id)
+            heapq.heapreplace(heap, (open_deals_count + 1, manager_id))
+
+        return manager_ids
+
+    async def __try_lock_reconciliation(
+        self, session: AsyncSession, name: str
+    ) -> bool:
+        """Lock the reconciliation of the counters until the end of the
+        transaction.
+
+        The reconciliations correct the counters by the drift, so the
+        concurrent reconciliations of the workers would correct it twice.
+
+        Returns:
+            False, if the reconciliation is locked by another transaction.
+        """
+        return bool(
+            await session.scalar(
+                text(
+                    """
+                    select pg_try_advisory_xact_lock(
+                        hashtextextended(:name, 0)
+                    )
+                    """
+                ),
+                params={"name": f"reconciliation:{name}"},
             )
         )
 
-        try:
-            async with self.__session as session:
-                result = await session.execute(
-                    stmt,
-                    params={
-                        **deal_create.model_dump(exclude={"fields"}),
-                        "fields": fields,
-                    },
+    async def __assign_managers(
+        self, session: AsyncSession, deals: list[DealCreateDTO]
+    ) -> None:
+        """Pick the managers of the new deals without the managers.
+
+        Raises:
+            ManagersDoesNotExistsError: If there are no managers.
+        """
+        existing_lead_ids = set(
+            await session.scalars(
+                select(DealModel.lead_id).where(
+                    DealModel.lead_id.in_([deal.lead_id for deal in deals])
                 )
-                await session.commit()
+            )
+        )
+        unassigned = [
+            deal
+            for deal in deals
+            if deal.manager_id is None
+            and deal.lead_id not in existing_lead_ids
+        ]
+        if len(unassigned) == 1:
+            unassigned[0].manager_id = await self.__pick_least_loaded_manager(
+                session
+            )
+        elif unassigned:
+            manager_ids = await self.__pick_least_loaded_managers(
+                session, len(unassigned)
+            )
+            for deal, manager_id in zip(unassigned, manager_ids, strict=True):
+                deal.manager_id = manager_id
+
+    async def __upsert_deals(
+        self, session: AsyncSession, deals: list[DealCreateDTO]
+    ) -> list[DealDTO]:
+        """Create the deals or merge them to the deals of the same leads.
+
+        The lead has one deal, so the fields of the deal are merged to the
+        deal of its lead. The deals of the different leads aren't merged,
+        even if their contacts are the same, so the lead doesn't get the
+        deal (and the chat) of another lead, the managers find such deals
+        by the contact search. The deals of the list with the same lead are
+        merged to each other in the order of the list. The managers of the
+        new deals are picked by the least load.
 
-            deal_row = result.mappings().one_or_none()
+        Returns:
+            The created or merged deal of every deal of the list.
 
-            if not deal_row:
-                logger.error(
-                    "The UPSERT operation of deal doesn't return"
-                    " the data of the deal %s",
-                    deal_create,
+        Raises:
+            ManagersDoesNotExistsError: If the manager isn't specified and
+                there are no managers.
+        """
+        # the fields of the later deals of the lead override the earlier
+        lead_deals: dict[UUID, DealCreateDTO] = {}
+        for deal in deals:
+            lead_deal = lead_deals.get(deal.lead_id)
+            lead_deals[deal.lead_id] = (
+                lead_deal.model_copy(
+                    update={"fields": lead_deal.fields | deal.fields}
                 )
-                raise DealDBError(
-                    "The UPSERT operation of deal doesn't return"
-                    f" the data of the deal {deal_create}",
+                if lead_deal
+                else deal
+            )
+
+        await self.__assign_managers(session, list(lead_deals.values()))
+        insert_stmt = insert(DealModel)
+        upsert_stmt = insert_stmt.on_conflict_do_update(
+            index_elements=["lead_id"],
+            set_={
+                "fields": DealModel.fields.op("||")(
+                    insert_stmt.excluded.fields
+                )
+            },
+        ).returning(*DEAL_COLUMNS)
+        result = await session.execute(
+            upsert_stmt.values(
+                [deal.model_dump() for deal in lead_deals.values()]
+            )
+        )
+        upserted_deals = {
+            row["lead_id"]: DealDTO.model_validate(row)
+            for row in result.mappings().all()
+        }
+
+        return [upserted_deals[deal.lead_id] for deal in deals]
+
+    async def create(self, deal_create: DealCreateDTO) -> DealDTO:
+        """Create the deal or merge it to the deal of the same lead.
+
+        The deals of the different leads aren't merged by the contacts. If
+        the manager isn't specified, the least loaded manager is picked in the
+        transaction of the deal insert.
+
+        The deal_created event is saved to the outbox in the transaction of
+        the deal upsert, so the notification is sent by the outbox
+        dispatcher if and only if the deal is saved.
+
+        Raises:
+            ManagersDoesNotExistsError: If the manager isn't specified and
+                there are no managers.
+        """
+        try:
+            async with self.__session as session:
+                [deal] = await self.__upsert_deals(session, [deal_create])
+                await session.execute(
+                    insert(DealOutbox).values(
+                        deal_id=deal.deal_id,
+                        event_type=DealOutboxEvent.DEAL_CREATED,
+                        payload=deal.model_dump(mode="json"),
+                    )
                 )
+                await session.commit()
 
-            logger.info("Deal when UPSERT deal_info: %s", deal_row)
-            return DealDTO.model_validate(deal_row)
+            logger.info("Deal when UPSERT deal_info: %s", deal)
+            return deal
 
         except IntegrityError as error:
             self._validate_integrity_errors(error)
@@ -179,7 +345,6 @@ class DealRepository(AbstractDealRepository):
             )
             raise DealDBError from error
 
-    @delete_old_deal_versions
     async def update(
         self, deal_id: UUID, deal_update: DealUpdateDTO
     ) -> Deal | None:
@@ -194,6 +359,7 @@ class DealRepository(AbstractDealRepository):
                 probability=deal_update.probability,
                 priority=deal_update.priority,
                 close_at=deal_update.close_at,
+                expected_close_at=deal_update.expected_close_at,
             )
         )
 
@@ -244,7 +410,6 @@ class DealRepository(AbstractDealRepository):
             )
             raise DealDBError from error
 
-    @delete_old_deal_versions
     async def close_deal(
         self, deal_id: UUID, lost: LostReasonDTO | None = None
     ) -> int:
@@ -292,6 +457,7 @@ class DealRepository(AbstractDealRepository):
                 DealModel.cost,
                 DealModel.created_at,
                 DealModel.close_at,
+                DealModel.expected_close_at,
                 DealModel.manager_id,
                 LostReason.name.label("lost_reason"),
             )
@@ -321,7 +487,6 @@ class DealRepository(AbstractDealRepository):
             )
             raise DealDBError from error
 
-    @delete_old_deal_versions
     async def change_sale_stage(
         self, deal_id: UUID, sale_stage_id: int
     ) -> int:
@@ -349,7 +514,6 @@ class DealRepository(AbstractDealRepository):
             )
             raise DealDBError from error
 
-    @delete_old_deal_versions
     async def change_fields(
         self,
         deal_id: UUID,
@@ -408,164 +572,1540 @@ class DealRepository(AbstractDealRepository):
             )
             raise DealDBError from error
 
-    async def get_deals(
-        self, limit: int = DEFAULT_LIMIT, offset: int = 0
-    ) -> list[DealShortDTO]:
-        stmt = (
-            select(
-                DealModel.deal_id,
-                DealModel.sale_stage_id,
-                DealModel.lead_id,
-                MdUserModel.first_name.label("lead_name"),
-                MdUserModel.last_name.label("lead_last_name"),
-                MdUserModel.profile_picture_link,
+    async def prune_deal_history(
+        self, max_deal_saves: int, batch_size: int
+    ) -> DealHistoryPruneDTO:
+        """Delete the versions of the deals over the max count of versions.
+
+        The versions are deleted for the batch of the deals by one
+        statement, the newest `max_deal_saves` versions of the deals are
+        kept. The versions, that aren't folded to the stage rollups yet,
+        are kept until the fold.
+
+        Args:
+            max_deal_saves: The count of the kept versions of the deal.
+            batch_size: The max count of the pruned deals.
+
+        Returns:
+            The count of the deleted versions and the pruned deals. If less
+            than `batch_size` deals are pruned, there are no deals to prune.
+
+        Raises:
+            DealDBError: For general database API errors during the delete.
+        """
+        stmt = text(
+            """
+            with pruned_deal as (
+                select deal_id
+                from deal_history
+                group by deal_id
+                having count(*) > :max_deal_saves
+                limit :batch_size
+            ),
+            old_version as (
+                select deal_history_id
+                from (
+                    select
+                        dh.deal_history_id,
+                        row_number() over (
+                            partition by dh.deal_id
+                            order by
+                                dh.changed_at desc,
+                                dh.deal_history_id desc
+                        ) as version
+                    from deal_history dh
+                    join pruned_deal using (deal_id)
+                ) deal_version
+                where version > :max_deal_saves
+                    -- the history isn't folded to the stage rollups yet
+                    and deal_history_id <= (
+                        select coalesce(max(position), 0)
+                        from analytics_watermark
+                        where name = :watermark_name
+                    )
+            ),
+            deleted_version as (
+                delete from deal_history
+                where deal_history_id in
+                    (select deal_history_id from old_version)
+                returning deal_id
             )
-            .outerjoin(MdUserModel, MdUserModel.user_id == DealModel.lead_id)
-            .order_by(DealModel.updated_at)
-            .limit(limit)
-            .offset(offset)
+            select
+                count(*) as pruned_rows,
+                count(distinct deal_id) as pruned_deals
+            from deleted_version
+            """
         )
 
         try:
             async with self.__session as session:
-                result = await session.execute(stmt)
-                deals_rows = result.mappings().all()
-
-            return [DealShortDTO.model_validate(row) for row in deals_rows]
+                result = await session.execute(
+                    stmt,
+                    params={
+                        "max_deal_saves": max_deal_saves,
+                        "batch_size": batch_size,
+                        "watermark_name": DEAL_HISTORY_ROLLUP_WATERMARK,
+                    },
+                )
+                await session.commit()
 
-        except IntegrityError as error:
-            self._validate_integrity_errors(error)
+            return DealHistoryPruneDTO.model_validate(result.mappings().one())
 
         except DBAPIError as error:
             logger.error(
-                "DBAPIError when getting deals",
+                "DBAPIError when prune the deal history with"
+                + " (max_deal_saves, batch_size) = (%s, %s)",
+                max_deal_saves,
+                batch_size,
                 exc_info=error,
             )
             raise DealDBError from error
 
-    async def get_managers_with_quantity_of_open_deals(
-        self,
-    ) -> list[ManagerOpenDealsDTO]:
-        stmt = (
-            select(
-                User.user_id.label("manager_id"),
-                func.count(DealModel.deal_id).label("open_deals_count"),
-            )
-            .outerjoin(
-                DealModel,
-                (DealModel.manager_id == User.user_id)
-                & (DealModel.sale_stage_id not in (7,))
-                & (DealModel.close_at.is_(None)),
+    async def claim_outbox_events(
+        self, batch_size: int, lease: float
+    ) -> list[DealOutboxEventDTO]:
+        """Claim the batch of the available outbox events for the delivery.
+
+        The available_at of the claimed events is moved forward by `lease`
+        seconds, so the events aren't claimed by other dispatchers until
+        they are delivered or the lease is expired (e.g. the dispatcher is
+        killed). The rows locked by the concurrent claims are skipped.
+
+        Args:
+            batch_size: The max count of the claimed events.
+            lease: The time of the delivery of the batch in seconds.
+
+        Returns:
+            The claimed events in the order of creation.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            with available_event as (
+                select outbox_id
+                from deal_outbox
+                where status = 'pending' and available_at <= now()
+                order by available_at, outbox_id
+                limit :batch_size
+                for update skip locked
             )
-            .where(
-                User.role_id.in_(
-                    [
-                        Roles.ADMIN,
-                    ]
+            update deal_outbox o
+            set available_at = now() + make_interval(secs => :lease)
+            from available_event
+            where o.outbox_id = available_event.outbox_id
+            returning
+                o.outbox_id,
+                o.deal_id,
+                o.event_type,
+                o.payload,
+                o.attempts,
+                o.created_at
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt, params={"batch_size": batch_size, "lease": lease}
                 )
+                await session.commit()
+
+            return sorted(
+                (
+                    DealOutboxEventDTO.model_validate(row)
+                    for row in result.mappings().all()
+                ),
+                key=lambda event: event.outbox_id,
             )
-            .group_by(User.user_id)
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when claim the deal outbox events",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def delete_outbox_events(self, outbox_ids: list[int]) -> int:
+        """Delete the delivered outbox events.
+
+        Returns:
+            The count of the deleted events.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            delete from deal_outbox
+            where outbox_id = any(cast(:outbox_ids as bigint[]))
+            """
         )
 
         try:
             async with self.__session as session:
-                result = await session.execute(stmt)
-            return [
-                ManagerOpenDealsDTO.model_validate(row)
-                for row in result.mappings().all()
-            ]
+                result = await session.execute(
+                    stmt, params={"outbox_ids": outbox_ids}
+                )
+                await session.commit()
+
+            return result.rowcount  # type: ignore
 
         except DBAPIError as error:
             logger.error(
-                "DBAPIError when getting managers with quantity of open deals",
+                "DBAPIError when delete the deal outbox events %s",
+                outbox_ids,
                 exc_info=error,
             )
             raise DealDBError from error
 
-    async def get_messages(
+    async def postpone_outbox_event(
         self,
-        deal_id: UUID,
-        limit: int = DEFAULT_LIMIT,
-        offset: int = 0,
-    ) -> list[Message]:
-        stmt = (
-            select(
-                DealMessage.deal_message_id.label("message_id"),
-                DealMessage.message,
-                DealMessage.sent_at,
-                DealMessage.user_id,
-                DealMessage.deal_id,
+        outbox_id: int,
+        delay: float,
+        error_text: str,
+        failed: bool = False,
+    ) -> None:
+        """Postpone the next delivery attempt of the failed outbox event.
+
+        Args:
+            outbox_id: The ID of the failed event.
+            delay: The delay of the next attempt in seconds.
+            error_text: The error of the failed attempt.
+            failed: The event isn't retried anymore.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            update deal_outbox
+            set
+                status = :status,
+                attempts = attempts + 1,
+                last_error = :error_text,
+                available_at = now() + make_interval(secs => :delay)
+            where outbox_id = :outbox_id
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                await session.execute(
+                    stmt,
+                    params={
+                        "outbox_id": outbox_id,
+                        "status": DealOutboxStatus.FAILED
+                        if failed
+                        else DealOutboxStatus.PENDING,
+                        "delay": delay,
+                        "error_text": error_text,
+                    },
+                )
+                await session.commit()
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when postpone the deal outbox event %s",
+                outbox_id,
+                exc_info=error,
             )
-            .where(DealMessage.deal_id == deal_id)
-            .limit(limit)
-            .offset(offset)
+            raise DealDBError from error
+
+    async def get_outbox_stats(self) -> DealOutboxStatsDTO:
+        """Get the count and the age of the oldest pending event.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            select
+                count(*) as depth,
+                coalesce(
+                    extract(epoch from now() - min(created_at)), 0
+                ) as lag
+            from deal_outbox
+            where status = 'pending'
+            """
         )
 
         try:
             async with self.__session as session:
                 result = await session.execute(stmt)
 
-            messages = [Message(**row) for row in result.mappings().all()]
-            return messages
+            return DealOutboxStatsDTO.model_validate(result.mappings().one())
 
-        except IntegrityError as error:
-            self._validate_integrity_errors(error)
         except DBAPIError as error:
             logger.error(
-                "DBAPIError when getting message of deal with id %s",
-                deal_id,
+                "DBAPIError when getting the deal outbox stats",
                 exc_info=error,
             )
             raise DealDBError from error
 
-    async def write_message(
-        self,
-        message_data: MessageCreateDTO,
-    ):
-        insert_stmt_message = (
-            insert(DealMessage)
-            .values(
-                message=message_data.message,
-                deal_id=message_data.deal_id,
-                user_id=message_data.user_id,
-                sent_at=message_data.sent_at,
-            )
-            .returning(DealMessage.deal_message_id)
-        )
-        update_deal_stmt = (
-            update(DealModel)
-            .where(DealModel.deal_id == message_data.deal_id)
-            .values(updated_at=datetime.now(tz=UTC))
+    async def enqueue_deal_intake(
+        self, intake_id: UUID, deal_create: DealCreateDTO
+    ) -> None:
+        """Queue the deal creation request for the intake worker.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = insert(DealIntake).values(
+            intake_id=intake_id,
+            payload=deal_create.model_dump(mode="json"),
+            status=DealIntakeStatus.PENDING,
         )
 
         try:
             async with self.__session as session:
-                result = await session.execute(insert_stmt_message)
-                await session.execute(update_deal_stmt)
+                await session.execute(stmt)
                 await session.commit()
 
-            message_id = result.scalar_one_or_none()
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when enqueue the deal intake %s",
+                intake_id,
+                exc_info=error,
+            )
+            raise DealDBError from error
 
-            if not message_id:
-                logger.error(
-                    "The create message request doesn't return message_id"
-                )
-                raise DealDBError(
-                    f"Can't create message in the deal {message_data.deal_id}"
-                )
+    async def get_deal_intake(self, intake_id: UUID) -> DealIntakeDTO | None:
+        """Get the state of the deal creation request.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = select(
+            DealIntake.intake_id,
+            DealIntake.status,
+            DealIntake.deal_id,
+            DealIntake.attempts,
+            DealIntake.last_error,
+            DealIntake.created_at,
+            DealIntake.processed_at,
+        ).where(DealIntake.intake_id == intake_id)
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+                row = result.mappings().one_or_none()
+
+            return DealIntakeDTO.model_validate(row) if row else None
 
-        except IntegrityError as error:
-            self._validate_integrity_errors(error)
         except DBAPIError as error:
             logger.error(
-                "DBAPIError when writing message of deal with id %s",
-                message_data.deal_id,
+                "DBAPIError when get the deal intake %s",
+                intake_id,
                 exc_info=error,
             )
             raise DealDBError from error
 
+    async def claim_deal_intakes(
+        self, batch_size: int, lease: float
+    ) -> list[DealIntakeRequestDTO]:
+        """Claim the batch of the pending deal creation requests.
 
-def deal_repository_dependency(
-    async_session: AsyncSession = Depends(postgres_helper.session_dependency),
+        The requests are claimed like the outbox events: the available_at
+        of the claimed requests is moved forward by `lease` seconds and the
+        rows locked by the concurrent claims are skipped.
+
+        Args:
+            batch_size: The max count of the claimed requests.
+            lease: The time of the processing of the batch in seconds.
+
+        Returns:
+            The claimed requests in the order of creation.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            with available_intake as (
+                select intake_id
+                from deal_intake
+                where status = :status and available_at <= now()
+                order by available_at, created_at
+                limit :batch_size
+                for update skip locked
+            )
+            update deal_intake i
+            set available_at = now() + make_interval(secs => :lease)
+            from available_intake
+            where i.intake_id = available_intake.intake_id
+            returning
+                i.intake_id,
+                i.payload,
+                i.attempts,
+                i.created_at
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt,
+                    params={
+                        "status": DealIntakeStatus.PENDING,
+                        "batch_size": batch_size,
+                        "lease": lease,
+                    },
+                )
+                await session.commit()
+                rows = result.mappings().all()
+
+            return [
+                DealIntakeRequestDTO(
+                    intake_id=row["intake_id"],
+                    deal=DealCreateDTO.model_validate(row["payload"]),
+                    attempts=row["attempts"],
+                )
+                for row in sorted(rows, key=lambda row: row["created_at"])
+            ]
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when claim the deal intakes", exc_info=error
+            )
+            raise DealDBError from error
+
+    async def create_intake_deals(
+        self, requests: list[DealIntakeRequestDTO]
+    ) -> list[DealDTO]:
+        """Create the deals of the requests by one upsert.
+
+        The requests of one lead are merged in the order of the batch, like
+        by the sequential upserts. The managers of the new deals
+        are picked by the least load, the deal_created events are saved to
+        the outbox and the requests are processed in one transaction.
+
+        Returns:
+            The created (or merged) deals.
+
+        Raises:
+            ManagersDoesNotExistsError: If there are no managers.
+            DealDBError: For general database API errors.
+        """
+        processed_stmt = text(
+            """
+            update deal_intake i
+            set
+                status = :status,
+                deal_id = processed.deal_id,
+                processed_at = now(),
+                last_error = null
+            from unnest(
+                cast(:intake_ids as uuid[]), cast(:deal_ids as uuid[])
+            ) as processed(intake_id, deal_id)
+            where i.intake_id = processed.intake_id
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                deals = await self.__upsert_deals(
+                    session, [request.deal for request in requests]
+                )
+                created_deals = list(
+                    {deal.deal_id: deal for deal in deals}.values()
+                )
+
+                await session.execute(
+                    insert(DealOutbox).values(
+                        [
+                            {
+                                "deal_id": deal.deal_id,
+                                "event_type": DealOutboxEvent.DEAL_CREATED,
+                                "payload": deal.model_dump(mode="json"),
+                            }
+                            for deal in created_deals
+                        ]
+                    )
+                )
+
+                await session.execute(
+                    processed_stmt,
+                    params={
+                        "status": DealIntakeStatus.PROCESSED,
+                        "intake_ids": [
+                            request.intake_id for request in requests
+                        ],
+                        "deal_ids": [deal.deal_id for deal in deals],
+                    },
+                )
+                await session.commit()
+
+            logger.info("Created %s deals of the intake", len(created_deals))
+            return created_deals
+
+        except IntegrityError as error:
+            self._validate_integrity_errors(error)
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when create the deals of the intake",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def postpone_deal_intake(
+        self,
+        intake_id: UUID,
+        delay: float,
+        error_text: str,
+        failed: bool = False,
+    ) -> None:
+        """Postpone the next attempt of the failed deal creation request.
+
+        Args:
+            intake_id: The ID of the failed request.
+            delay: The delay of the next attempt in seconds.
+            error_text: The error of the failed attempt.
+            failed: The request isn't retried anymore.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            update deal_intake
+            set
+                status = :status,
+                attempts = attempts + 1,
+                last_error = :error_text,
+                available_at = now() + make_interval(secs => :delay),
+                processed_at = case when :failed then now() end
+            where intake_id = :intake_id
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                await session.execute(
+                    stmt,
+                    params={
+                        "intake_id": intake_id,
+                        "status": DealIntakeStatus.FAILED
+                        if failed
+                        else DealIntakeStatus.PENDING,
+                        "delay": delay,
+                        "error_text": error_text,
+                        "failed": failed,
+                    },
+                )
+                await session.commit()
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when postpone the deal intake %s",
+                intake_id,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def delete_deal_intakes(self, retention: float) -> int:
+        """Delete the processed and failed requests after the retention.
+
+        Args:
+            retention: The time of the tracking of the requests in seconds.
+
+        Returns:
+            The count of the deleted requests.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            delete from deal_intake
+            where processed_at < now() - make_interval(secs => :retention)
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt, params={"retention": retention}
+                )
+                await session.commit()
+
+            return result.rowcount  # type: ignore
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when delete the deal intakes", exc_info=error
+            )
+            raise DealDBError from error
+
+    async def get_deal_intake_stats(self) -> DealIntakeStatsDTO:
+        """Get the count and the age of the oldest pending request.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            select
+                count(*) as depth,
+                coalesce(
+                    extract(epoch from now() - min(created_at)), 0
+                ) as lag
+            from deal_intake
+            where status = :status
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt, params={"status": DealIntakeStatus.PENDING}
+                )
+
+            return DealIntakeStatsDTO.model_validate(result.mappings().one())
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when getting the deal intake stats",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    def __get_cards_stmt(self, user_id: UUID) -> Select:
+        """Select the deal cards with the last messages.
+
+        The last message of every deal is joined laterally by the
+        deal_message_deal_id_sent_at_idx index, the unread messages of the
+        user are counted by the partial deal_message_unread_idx index.
+        """
+        last_message = (
+            select(
+                DealMessage.deal_message_id,
+                func.left(
+                    DealMessage.message, DEAL_MESSAGE_PREVIEW_LENGTH
+                ).label("message"),
+                DealMessage.user_id,
+                DealMessage.sent_at,
+            )
+            .where(DealMessage.deal_id == DealModel.deal_id)
+            .order_by(
+                DealMessage.sent_at.desc(), DealMessage.deal_message_id.desc()
+            )
+            .limit(1)
+            .lateral("last_message")
+        )
+        unread_count = (
+            select(func.count())
+            .where(
+                DealMessage.deal_id == DealModel.deal_id,
+                DealMessage.viewed_at.is_(None),
+                DealMessage.user_id.is_distinct_from(user_id),
+            )
+            .scalar_subquery()
+        )
+
+        return (
+            select(
+                DealModel.deal_id,
+                DealModel.sale_stage_id,
+                DealModel.lead_id,
+                DealModel.manager_id,
+                DealModel.updated_at,
+                MdUserModel.first_name.label("lead_name"),
+                MdUserModel.last_name.label("lead_last_name"),
+                MdUserModel.profile_picture_link,
+                last_message.c.deal_message_id.label("last_message_id"),
+                last_message.c.message.label("last_message"),
+                last_message.c.user_id.label("last_message_user_id"),
+                last_message.c.sent_at.label("last_message_sent_at"),
+                unread_count.label("unread_count"),
+            )
+            .outerjoin(MdUserModel, MdUserModel.user_id == DealModel.lead_id)
+            .outerjoin(last_message, true())
+            .order_by(DealModel.updated_at.desc(), DealModel.deal_id.desc())
+        )
+
+    def __get_filter_conditions(self, filters: DealFiltersDTO) -> list:
+        """Get the conditions of the filters and the keyset cursor of the
+        deal cards.
+        """
+        conditions = []
+        if filters.manager_id:
+            conditions.append(DealModel.manager_id == filters.manager_id)
+        if filters.lead_id:
+            conditions.append(DealModel.lead_id == filters.lead_id)
+        if filters.sale_stage_id:
+            conditions.append(DealModel.sale_stage_id == filters.sale_stage_id)
+        if filters.state == DealState.OPEN:
+            conditions.extend(
+                [
+                    DealModel.close_at.is_(None),
+                    DealModel.sale_stage_id != COMPLETED_SALE_STAGE_ID,
+                ]
+            )
+        elif filters.state == DealState.CLOSED:
+            conditions.append(
+                or_(
+                    DealModel.close_at.is_not(None),
+                    DealModel.sale_stage_id == COMPLETED_SALE_STAGE_ID,
+                )
+            )
+        if filters.lost is not None:
+            conditions.append(
+                DealModel.lost_reason_id.is_not(None)
+                if filters.lost
+                else DealModel.lost_reason_id.is_(None)
+            )
+        if filters.after:
+            conditions.append(
+                tuple_(DealModel.updated_at, DealModel.deal_id)
+                < tuple_(filters.after.updated_at, filters.after.deal_id)
+            )
+        return conditions
+
+    async def get_deals(
+        self,
+        user_id: UUID,
+        limit: int = DEFAULT_LIMIT,
+        offset: int = 0,
+        filters: DealFiltersDTO | None = None,
+    ) -> list[DealShortDTO]:
+        """Get the page of the deal cards ordered by the last update.
+
+        The deals are ordered by (updated_at, deal_id) descending, so the
+        filtered keyset pages are served by the (manager_id | sale_stage_id,
+        updated_at, deal_id) indexes.
+
+        Args:
+            user_id: The ID of the user, whose unread messages are counted.
+            limit: The max count of the deals.
+            offset: The count of the skipped deals.
+            filters: The filters and the keyset cursor of the page.
+
+        Returns:
+            The deals with the last messages, the latest updated first.
+        """
+        stmt = self.__get_cards_stmt(user_id).limit(limit).offset(offset)
+
+        if filters:
+            stmt = stmt.where(*self.__get_filter_conditions(filters))
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+                deals_rows = result.mappings().all()
+
+            return [DealShortDTO.model_validate(row) for row in deals_rows]
+
+        except IntegrityError as error:
+            self._validate_integrity_errors(error)
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when getting deals",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def search_deals(
+        self, user_id: UUID, query: str, limit: int
+    ) -> list[DealShortDTO]:
+        """Search the deal cards by the contacts and the lead names.
+
+        The email and the phone of the query are normalized like the
+        contacts of the deals and are looked up by the btree indexes. The
+        names of the contacts and of the leads are matched by `ilike`, that
+        is served by the trigram indexes, and ranked by the similarity.
+
+        Args:
+            user_id: The ID of the user, whose unread messages are counted.
+            query: The email, the phone or the part of the name.
+            limit: The max count of the deals.
+
+        Returns:
+            The deals, the exact contact matches first, then the most
+            similar names, then the latest updated.
+        """
+        # the exact matches outrank any similarity (it's at most 1)
+        stmt = text(
+            """
+            select candidate.deal_id, max(candidate.rank) as rank
+            from (
+                select deal_id, 2.0 as rank
+                from deal
+                where contact_email = normalize_contact_email(:query)
+                union all
+                select deal_id, 2.0 as rank
+                from deal
+                where contact_phone = normalize_contact_phone(:query)
+                union all
+                select deal_id, similarity(contact_name, :query) as rank
+                from deal
+                where contact_name ilike :pattern
+                union all
+                select
+                    d.deal_id,
+                    similarity(
+                        coalesce(u.first_name, '')
+                            || ' ' || coalesce(u.last_name, ''),
+                        :query
+                    ) as rank
+                from md_user u
+                join deal d on d.lead_id = u.user_id
+                where coalesce(u.first_name, '')
+                    || ' ' || coalesce(u.last_name, '') ilike :pattern
+            ) candidate
+            group by candidate.deal_id
+            order by rank desc
+            limit :limit
+            """
+        )
+        escaped_query = (
+            query.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt,
+                    params={
+                        "query": query,
+                        "pattern": f"%{escaped_query}%",
+                        "limit": limit,
+                    },
+                )
+                ranks = {row.deal_id: row.rank for row in result}
+                if not ranks:
+                    return []
+
+                result = await session.execute(
+                    self.__get_cards_stmt(user_id).where(
+                        DealModel.deal_id.in_(list(ranks))
+                    )
+                )
+                deals_rows = result.mappings().all()
+
+            # the cards are ordered by the last update, the stable sort
+            # keeps it inside the same ranks
+            deals = [DealShortDTO.model_validate(row) for row in deals_rows]
+            deals.sort(key=lambda deal: ranks[deal.deal_id], reverse=True)
+            return deals
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when searching deals",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def get_board(
+        self,
+        user_id: UUID,
+        limit: int = DEFAULT_LIMIT,
+        manager_id: UUID | None = None,
+    ) -> list[DealBoardStageDTO]:
+        """Get the kanban board of the open deals.
+
+        The counts and the total costs of the stages are read from the
+        deal_stage_board table, maintained by the deal trigger. The first
+        cards of every stage are joined laterally, so every stage is served
+        by the short scan of the (sale_stage_id, updated_at, deal_id)
+        index.
+
+        Args:
+            user_id: The ID of the user, whose unread messages are counted.
+            limit: The max count of the cards of every stage.
+            manager_id: If set, only the deals of the manager are on the
+                board.
+
+        Returns:
+            The sale stages (except the completed one) with the cards, the
+            latest updated first.
+        """
+        board_stmt = (
+            select(
+                SaleStage.sale_stage_id,
+                SaleStage.name,
+                func.coalesce(func.sum(DealStageBoard.deals_count), 0).label(
+                    "deals_count"
+                ),
+                func.coalesce(func.sum(DealStageBoard.cost_total), 0).label(
+                    "cost_total"
+                ),
+            )
+            .outerjoin(
+                DealStageBoard,
+                (DealStageBoard.sale_stage_id == SaleStage.sale_stage_id)
+                & (
+                    DealStageBoard.manager_id == manager_id
+                    if manager_id
+                    else true()
+                ),
+            )
+            .where(SaleStage.sale_stage_id != COMPLETED_SALE_STAGE_ID)
+            .group_by(SaleStage.sale_stage_id)
+            .order_by(SaleStage.sale_stage_id)
+        )
+
+        stage = (
+            select(SaleStage.sale_stage_id)
+            .where(SaleStage.sale_stage_id != COMPLETED_SALE_STAGE_ID)
+            .subquery("stage")
+        )
+        cards = (
+            self.__get_cards_stmt(user_id)
+            .where(
+                DealModel.sale_stage_id == stage.c.sale_stage_id,
+                DealModel.close_at.is_(None),
+            )
+            .limit(limit)
+        )
+        if manager_id:
+            cards = cards.where(DealModel.manager_id == manager_id)
+        cards = cards.lateral("card")
+        cards_stmt = (
+            select(cards)
+            .select_from(stage)
+            .join(cards, true())
+            .order_by(
+                cards.c.sale_stage_id,
+                cards.c.updated_at.desc(),
+                cards.c.deal_id.desc(),
+            )
+        )
+
+        try:
+            async with self.__session as session:
+                board_rows = (await session.execute(board_stmt)).mappings()
+                stages = [
+                    DealBoardStageDTO.model_validate(row) for row in board_rows
+                ]
+                cards_rows = (await session.execute(cards_stmt)).mappings()
+                deals = [
+                    DealShortDTO.model_validate(row) for row in cards_rows
+                ]
+
+            stages_by_id = {stage.sale_stage_id: stage for stage in stages}
+            for deal in deals:
+                stages_by_id[deal.sale_stage_id].deals.append(deal)
+
+            return stages
+
+        except DBAPIError as error:
+            logger.error("DBAPIError when getting deal board", exc_info=error)
+            raise DealDBError from error
+
+    async def reconcile_deal_stage_board(self) -> int:
+        """Correct the counts and the total costs of the open deals of the
+        sale stages.
+
+        The board is maintained by the update_deal_stage_board trigger. The
+        real board and the counters are read by one snapshot, so the drift
+        includes only the committed deal writes. The drift is added to the
+        counters (like the increments of the trigger), so the deal writes
+        aren't blocked and the concurrent increments aren't overwritten.
+
+        Returns:
+            The count of the corrected and added board rows.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            with real_board as (
+                select
+                    sale_stage_id,
+                    manager_id,
+                    count(*) as deals_count,
+                    sum(cost) as cost_total
+                from deal
+                where close_at is null
+                    and sale_stage_id <> :completed_sale_stage_id
+                group by sale_stage_id, manager_id
+            ),
+            drift as (
+                select
+                    b.deal_stage_board_id,
+                    coalesce(r.deals_count, 0) - b.deals_count
+                        as deals_count,
+                    coalesce(r.cost_total, 0) - b.cost_total as cost_total,
+                    r.sale_stage_id is null as is_empty
+                from deal_stage_board b
+                left join real_board r
+                    on r.sale_stage_id = b.sale_stage_id
+                    and r.manager_id is not distinct from b.manager_id
+            ),
+            corrected_board as (
+                -- the latest counters of the concurrently updated rows are
+                -- corrected
+                update deal_stage_board b
+                set deals_count = greatest(b.deals_count + d.deals_count, 0),
+                    cost_total = b.cost_total + d.cost_total
+                from drift d
+                where b.deal_stage_board_id = d.deal_stage_board_id
+                    and (d.deals_count <> 0 or d.cost_total <> 0)
+                returning b.deal_stage_board_id
+            ),
+            added_board as (
+                insert into deal_stage_board (
+                    sale_stage_id, manager_id, deals_count, cost_total
+                )
+                select sale_stage_id, manager_id, deals_count, cost_total
+                from real_board r
+                where not exists (
+                    select from deal_stage_board b
+                    where b.sale_stage_id = r.sale_stage_id
+                        and b.manager_id is not distinct from r.manager_id
+                )
+                -- the row is inserted by the concurrent deal write
+                on conflict on constraint deal_stage_board_key do update
+                set deals_count = deal_stage_board.deals_count
+                        + excluded.deals_count,
+                    cost_total = deal_stage_board.cost_total
+                        + excluded.cost_total
+                returning deal_stage_board_id
+            ),
+            deleted_board as (
+                -- the emptied rows are deleted, unless they are updated by
+                -- the concurrent deal writes
+                delete from deal_stage_board b
+                using drift d
+                where b.deal_stage_board_id = d.deal_stage_board_id
+                    and d.is_empty
+                    and d.deals_count = 0
+                    and d.cost_total = 0
+                    and b.deals_count = 0
+                    and b.cost_total = 0
+            )
+            select
+                (select count(*) from corrected_board)
+                + (select count(*) from added_board)
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                if not await self.__try_lock_reconciliation(
+                    session, "deal_stage_board"
+                ):
+                    return 0
+
+                corrected_rows = await session.scalar(
+                    stmt,
+                    params={
+                        "completed_sale_stage_id": COMPLETED_SALE_STAGE_ID
+                    },
+                )
+                await session.commit()
+
+            return corrected_rows or 0
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when reconcile the deal stage board",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def get_managers_with_quantity_of_open_deals(
+        self,
+    ) -> list[ManagerOpenDealsDTO]:
+        stmt = (
+            select(
+                User.user_id.label("manager_id"),
+                func.count(DealModel.deal_id).label("open_deals_count"),
+            )
+            .outerjoin(
+                DealModel,
+                (DealModel.manager_id == User.user_id)
+                & (DealModel.sale_stage_id not in (7,))
+                & (DealModel.close_at.is_(None)),
+            )
+            .where(
+                User.role_id.in_(
+                    [
+                        Roles.ADMIN,
+                    ]
+                )
+            )
+            .group_by(User.user_id)
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+            return [
+                ManagerOpenDealsDTO.model_validate(row)
+                for row in result.mappings().all()
+            ]
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when getting managers with quantity of open deals",
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def reconcile_manager_load(self) -> int:
+        """Correct the counts of the open deals of the managers.
+
+        The counts are maintained by the update_manager_load trigger. The
+        real counts and the counters are read by one snapshot, so the drift
+        includes only the committed deal writes. The drift is added to the
+        counters (like the increments of the trigger), so the deal writes
+        aren't blocked and the concurrent increments aren't overwritten.
+
+        Returns:
+            The count of the corrected, added and deleted manager loads.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            with real_load as (
+                select
+                    u.user_id as manager_id,
+                    count(d.deal_id) as open_deals_count
+                from "user" u
+                left join deal d
+                    on d.manager_id = u.user_id
+                    and d.close_at is null
+                    and d.sale_stage_id <> 7
+                where u.role_id = :manager_role_id
+                group by u.user_id
+            ),
+            drift as (
+                select
+                    l.manager_id,
+                    r.open_deals_count - l.open_deals_count
+                        as open_deals_count
+                from manager_load l
+                join real_load r on r.manager_id = l.manager_id
+            ),
+            corrected_load as (
+                -- the latest counts of the concurrently updated rows are
+                -- corrected
+                update manager_load l
+                set open_deals_count = greatest(
+                    l.open_deals_count + d.open_deals_count, 0
+                )
+                from drift d
+                where l.manager_id = d.manager_id
+                    and d.open_deals_count <> 0
+                returning l.manager_id
+            ),
+            added_load as (
+                insert into manager_load (manager_id, open_deals_count)
+                select r.manager_id, r.open_deals_count
+                from real_load r
+                where not exists (
+                    select from manager_load l
+                    where l.manager_id = r.manager_id
+                )
+                on conflict (manager_id) do update
+                set open_deals_count = manager_load.open_deals_count
+                    + excluded.open_deals_count
+                returning manager_id
+            ),
+            deleted_load as (
+                delete from manager_load
+                where manager_id not in (select manager_id from real_load)
+                returning manager_id
+            )
+            select
+                (select count(*) from corrected_load)
+                + (select count(*) from added_load)
+                + (select count(*) from deleted_load)
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                if not await self.__try_lock_reconciliation(
+                    session, "manager_load"
+                ):
+                    return 0
+
+                corrected_rows = await session.scalar(
+                    stmt, params={"manager_role_id": Roles.ADMIN}
+                )
+                await session.commit()
+
+            return corrected_rows or 0
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when reconcile the manager load", exc_info=error
+            )
+            raise DealDBError from error
+
+    async def get_messages(
+        self,
+        deal_id: UUID,
+        limit: int = DEFAULT_LIMIT,
+        offset: int = 0,
+        before: MessageCursorDTO | None = None,
+        after: MessageCursorDTO | None = None,
+        latest: bool = False,
+    ) -> list[Message]:
+        """Get the page of the messages of the deal ordered by sending.
+
+        The messages are ordered by (sent_at, deal_message_id), so the
+        pages are stable and the cursors are served by the
+        deal_message_deal_id_sent_at_idx index.
+
+        Args:
+            deal_id: The ID of the deal.
+            limit: The max count of the messages.
+            offset: The count of the skipped messages.
+            before: If set, the latest messages before the cursor are
+                returned.
+            after: If set, the first messages after the cursor are
+                returned.
+            latest: If set without the cursors, the latest messages are
+                returned instead of the first ones.
+
+        Returns:
+            The messages in the chronological order.
+        """
+        position = tuple_(DealMessage.sent_at, DealMessage.deal_message_id)
+        stmt = select(
+            DealMessage.deal_message_id.label("message_id"),
+            DealMessage.message,
+            DealMessage.sent_at,
+            DealMessage.user_id,
+            DealMessage.deal_id,
+        ).where(DealMessage.deal_id == deal_id)
+
+        # the sent_at bounds of the cursors prune the monthly partitions,
+        # the row comparisons alone don't
+        if after:
+            stmt = stmt.where(
+                DealMessage.sent_at >= after.sent_at,
+                position > tuple_(after.sent_at, after.message_id),
+            )
+        if before:
+            stmt = stmt.where(
+                DealMessage.sent_at <= before.sent_at,
+                position < tuple_(before.sent_at, before.message_id),
+            )
+
+        # the page right before the cursor (or the latest page) is selected
+        # from the end
+        is_backward = (before is not None or latest) and after is None
+        stmt = (
+            stmt.order_by(
+                DealMessage.sent_at.desc(), DealMessage.deal_message_id.desc()
+            )
+            if is_backward
+            else stmt.order_by(
+                DealMessage.sent_at, DealMessage.deal_message_id
+            )
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt.limit(limit).offset(offset)
+                )
+
+            messages = [Message(**row) for row in result.mappings().all()]
+            return messages[::-1] if is_backward else messages
+
+        except IntegrityError as error:
+            self._validate_integrity_errors(error)
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when getting message of deal with id %s",
+                deal_id,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def mark_messages_viewed(
+        self, deal_id: UUID, user_id: UUID, until: MessageCursorDTO
+    ) -> int:
+        """Mark the messages of other members up to the cursor as viewed.
+
+        Args:
+            deal_id: The ID of the deal.
+            user_id: The ID of the viewer.
+            until: The cursor of the last viewed message (inclusive).
+
+        Returns:
+            The count of the newly viewed messages.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = (
+            update(DealMessage)
+            .where(
+                DealMessage.deal_id == deal_id,
+                DealMessage.viewed_at.is_(None),
+                DealMessage.user_id.is_distinct_from(user_id),
+                # the partitions after the cursor are pruned
+                DealMessage.sent_at <= until.sent_at,
+                tuple_(DealMessage.sent_at, DealMessage.deal_message_id)
+                <= tuple_(until.sent_at, until.message_id),
+            )
+            .values(viewed_at=func.current_timestamp())
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(stmt)
+                await session.commit()
+
+            return result.rowcount  # type: ignore
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when mark messages of deal %s as viewed",
+                deal_id,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def search_messages(
+        self, user_id: UUID, language: LanguageEnum, query: str, limit: int
+    ) -> list[MessageSearchDTO]:
+        """Search the messages of the deals of the manager.
+
+        The query is parsed by the config of the language (the messages are
+        parsed by the configs of all languages) and matched by the GIN index
+        of the tsvectors. Only the best matched message of every deal is
+        returned, the snippets are built for the returned messages only.
+
+        Args:
+            user_id: The ID of the manager.
+            language: The language of the query.
+            query: The searched words.
+            limit: The max count of the deals.
+
+        Returns:
+            The best matched messages of the deals, the best ranked first,
+            the latest first inside the same ranks.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        stmt = text(
+            """
+            with search as (
+                select config, plainto_tsquery(config, :query) as query
+                from (
+                    select coalesce(
+                        (
+                            select cast(cfgname as regconfig)
+                            from language
+                            where language_id = :language
+                        ),
+                        cast('simple' as regconfig)
+                    ) as config
+                ) language_config
+            ),
+            matched as (
+                select distinct on (m.deal_id)
+                    m.deal_id,
+                    m.deal_message_id,
+                    m.sent_at,
+                    m.message,
+                    ts_rank(m.tsv_message, s.query) as match_rank,
+                    count(*) over (partition by m.deal_id)
+                        as matched_messages
+                from deal_message m
+                join deal d on d.deal_id = m.deal_id
+                cross join search s
+                where d.manager_id = :user_id
+                    and m.tsv_message @@ s.query
+                order by m.deal_id, match_rank desc, m.sent_at desc
+            ),
+            best as (
+                select *
+                from matched
+                order by match_rank desc, sent_at desc
+                limit :limit
+            )
+            select
+                b.deal_id,
+                b.deal_message_id as message_id,
+                b.sent_at,
+                b.matched_messages,
+                ts_headline(
+                    s.config,
+                    replace(
+                        replace(replace(b.message, '&', '&amp;'), '<', '&lt;'),
+                        '>',
+                        '&gt;'
+                    ),
+                    s.query,
+                    :headline_options
+                ) as snippet
+            from best b
+            cross join search s
+            order by b.match_rank desc, b.sent_at desc
+            """
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(
+                    stmt,
+                    params={
+                        "user_id": user_id,
+                        "language": language,
+                        "query": query,
+                        "limit": limit,
+                        "headline_options": MESSAGE_HEADLINE_OPTIONS,
+                    },
+                )
+
+            return [
+                MessageSearchDTO.model_validate(row)
+                for row in result.mappings().all()
+            ]
+
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when searching messages of manager %s",
+                user_id,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def write_message(
+        self,
+        message_data: MessageCreateDTO,
+    ):
+        insert_stmt_message = (
+            insert(DealMessage)
+            .values(
+                message=message_data.message,
+                deal_id=message_data.deal_id,
+                user_id=message_data.user_id,
+                sent_at=message_data.sent_at,
+            )
+            .returning(DealMessage.deal_message_id)
+        )
+        update_deal_stmt = (
+            update(DealModel)
+            .where(DealModel.deal_id == message_data.deal_id)
+            .values(updated_at=datetime.now(tz=UTC))
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(insert_stmt_message)
+                await session.execute(update_deal_stmt)
+                await session.commit()
+
+            message_id = result.scalar_one_or_none()
+
+            if not message_id:
+                logger.error(
+                    "The create message request doesn't return message_id"
+                )
+                raise DealDBError(
+                    f"Can't create message in the deal {message_data.deal_id}"
+                )
+
+        except IntegrityError as error:
+            self._validate_integrity_errors(error)
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when writing message of deal with id %s",
+                message_data.deal_id,
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+    async def write_messages(
+        self, messages_data: list[MessageCreateDTO]
+    ) -> list[int]:
+        """Write the batch of the messages by one transaction.
+
+        The messages are inserted by one multi-row INSERT and the
+        updated_at of every touched deal is updated once.
+
+        Returns:
+            The IDs of the messages in the order of the messages.
+
+        Raises:
+            DealNotFoundError: If any deal doesn't exist.
+            UserNotFoundError: If any user doesn't exist.
+            DealDBError: For general database API errors.
+        """
+        insert_stmt_messages = (
+            insert(DealMessage)
+            .values(
+                [
+                    {
+                        "message": message_data.message,
+                        "deal_id": message_data.deal_id,
+                        "user_id": message_data.user_id,
+                        "sent_at": message_data.sent_at,
+                    }
+                    for message_data in messages_data
+                ]
+            )
+            .returning(DealMessage.deal_message_id)
+        )
+        update_deals_stmt = (
+            update(DealModel)
+            .where(
+                DealModel.deal_id.in_(
+                    {message_data.deal_id for message_data in messages_data}
+                )
+            )
+            .values(updated_at=datetime.now(tz=UTC))
+        )
+
+        try:
+            async with self.__session as session:
+                result = await session.execute(insert_stmt_messages)
+                # the rows are returned in the order of the values
+                message_ids = list(result.scalars().all())
+                await session.execute(update_deals_stmt)
+                await session.commit()
+
+            if len(message_ids) != len(messages_data):
+                logger.error(
+                    "The create messages request returns %s ids of %s"
+                    + " messages",
+                    len(message_ids),
+                    len(messages_data),
+                )
+                raise DealDBError("Can't create the batch of the messages")
+
+            return message_ids
+
+        except IntegrityError as error:
+            self._validate_integrity_errors(error)
+        except DBAPIError as error:
+            logger.error(
+                "DBAPIError when writing the batch of %s messages",
+                len(messages_data),
+                exc_info=error,
+            )
+            raise DealDBError from error
+
+
+def deal_repository_dependency(
+    async_session: AsyncSession = Depends(postgres_helper.session_dependency),
 ) -> AbstractDealRepository:
     return DealRepository(session=async_session)
+
+
+def deal_chat_repository_dependency() -> AbstractDealRepository:
+    """Repository of the websocket chat.
+
+    The request session of the chat would be kept until the disconnection,
+    so the repository gets the own session, that is connected only inside
+    the repository methods (the connection is returned to the pool after
+    every method).
+    """
+    return DealRepository(session=postgres_helper.session_factory())
@@ -323,6 +323,13 @@ class ArticleShortSchema(BaseModel):
 
 class ArticleListSchema(LanguageSchema):
     articles: list[ArticleShortSchema]
+    truncated: bool = Field(
+        default=False,
+        description=(
+            "The search matched more articles than the candidates limit,"
+            + " so only the newest of them were ranked."
+        ),
+    )
 
 
 class ArticleResponseSchema(ArticleSchema, LanguageSchema):
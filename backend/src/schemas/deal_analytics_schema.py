@@ -0,0 +1,112 @@
+from datetime import UTC, date, datetime, timedelta
+from typing import Annotated, Self
+from uuid import UUID
+
+from pydantic import BaseModel, Field, model_validator
+
+# the default period of the analytics in days
+DEFAULT_ANALYTICS_PERIOD = 30
+MAX_ANALYTICS_PERIOD = 366
+DEFAULT_PERCENTILES = [50.0, 90.0, 95.0]
+
+Percentile = Annotated[float, Field(ge=0, le=100)]
+
+
+def get_today() -> date:
+    return datetime.now(tz=UTC).date()
+
+
+class AnalyticsPeriodSchema(BaseModel):
+    date_from: date = Field(
+        default_factory=lambda: (
+            get_today() - timedelta(days=DEFAULT_ANALYTICS_PERIOD - 1)
+        ),
+        description="The first day of the period (UTC).",
+    )
+    date_to: date = Field(
+        default_factory=get_today,
+        description="The last day of the period (UTC).",
+    )
+
+    @model_validator(mode="after")
+    def validate_period(self) -> Self:
+        if self.date_from > self.date_to:
+            raise ValueError("date_from can't be after date_to.")
+        if (self.date_to - self.date_from).days >= MAX_ANALYTICS_PERIOD:
+            raise ValueError(
+                f"The period can't be longer than {MAX_ANALYTICS_PERIOD}"
+                + " days."
+            )
+        return self
+
+
+class FunnelStageSchema(BaseModel):
+    sale_stage_id: int
+    name: str
+    entered: int = Field(description="Count of the moves to the stage.")
+    exited: int = Field(description="Count of the moves from the stage.")
+    advanced: int = Field(
+        description="Count of the moves from the stage to the next one."
+    )
+    conversion: float | None = Field(
+        description="Share of the moves from the stage to the next one."
+    )
+
+
+class StagePercentileSchema(BaseModel):
+    percentile: float
+    seconds: float
+
+
+class StageDurationSchema(BaseModel):
+    sale_stage_id: int
+    name: str
+    count: int = Field(
+        description="Count of the deals, that left the stage in the period."
+    )
+    mean_seconds: float | None
+    percentiles: list[StagePercentileSchema]
+
+
+class ManagerThroughputSchema(BaseModel):
+    manager_id: UUID
+    transitions: int = Field(
+        description="Count of the moves of the deals between the stages."
+    )
+    advanced: int = Field(
+        description="Count of the moves of the deals to the next stages."
+    )
+    won: int = Field(description="Count of the completed deals.")
+    transitions_per_day: float
+
+
+class ForecastBucketSchema(BaseModel):
+    manager_id: UUID | None = Field(
+        default=None, description="Null, if the managers aren't grouped."
+    )
+    sale_stage_id: int | None = Field(
+        default=None, description="Null, if the stages aren't grouped."
+    )
+    month: date | None = Field(
+        default=None,
+        description=(
+            "First day of the month of the expected close. Null for the"
+            + " deals without the expected close or if the months aren't"
+            + " grouped."
+        ),
+    )
+    deals: int
+    pipeline: float = Field(description="Sum of the costs of the deals.")
+    expected_revenue: float = Field(
+        description="Sum of the costs weighted by the probabilities."
+    )
+    variance: float = Field(description="Variance of the revenue.")
+    stddev: float = Field(description="Standard deviation of the revenue.")
+
+
+class RevenueForecastSchema(BaseModel):
+    total: ForecastBucketSchema
+    buckets: list[ForecastBucketSchema]
+    loaded_at: datetime = Field(
+        description="Time of the snapshot of the open deals."
+    )
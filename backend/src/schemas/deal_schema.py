@@ -8,7 +8,15 @@ from core.general_constants import (
     BASE_MIN_STR_LENGTH,
     MAX_DB_INT,
 )
-from domain.enums import Priority
+from domain.enums import DealIntakeStatus, DealState, Priority
+
+# the updated_at part (microseconds) fits the datetime
+DEAL_CURSOR_PATTERN = r"^\d{1,17}_[0-9a-f]{32}$"
+# the ID of the deal event is the ID of the Redis stream entry
+DEAL_EVENT_ID_PATTERN = r"^\d{1,20}-\d{1,20}$"
+# the trigram indexes don't serve the queries shorter than the trigram
+DEAL_SEARCH_QUERY_MIN_LENGTH = 3
+DEAL_SEARCH_QUERY_MAX_LENGTH = 100
 
 
 class LostCreateSchema(BaseModel):
@@ -36,6 +44,28 @@ class DealCreateSchema(BaseModel):
     )
 
 
+class DealIntakeResponseSchema(BaseModel):
+    intake_id: UUID
+    status: DealIntakeStatus
+    deal_id: UUID | None = Field(
+        default=None,
+        description=(
+            "The created deal of the processed request (the existing deal"
+            + " of the lead, if its fields are merged)."
+        ),
+    )
+    last_error: str | None = None
+    created_at: datetime
+    processed_at: datetime | None = None
+
+
+class DealIntakeStatsSchema(BaseModel):
+    depth: int = Field(description="Count of the pending requests.")
+    lag: float = Field(
+        description="Age of the oldest pending request in seconds."
+    )
+
+
 class DealResponseSchema(BaseModel):
     deal_id: UUID
     fields: dict
@@ -50,6 +80,7 @@ class DealResponseSchema(BaseModel):
     lost: LostResponseSchema | None = None
     created_at: datetime
     close_at: datetime | None
+    expected_close_at: datetime | None = None
 
 
 class DealUpdateSchema(BaseModel):
@@ -64,6 +95,14 @@ class DealUpdateSchema(BaseModel):
     )
     lost: LostCreateSchema | None = None
     close_at: datetime | None = None
+    expected_close_at: datetime | None = None
+
+
+class MessagePreviewSchema(BaseModel):
+    message_id: int
+    message: str = Field(description="Beginning of the last message.")
+    user_id: UUID | None
+    sent_at: datetime
 
 
 class DealShortResponseSchema(BaseModel):
@@ -85,3 +124,51 @@ class DealShortResponseSchema(BaseModel):
         min_length=BASE_MIN_STR_LENGTH,
         max_length=BASE_MAX_STR_LENGTH,
     )
+    manager_id: UUID | None = None
+    updated_at: datetime
+    last_message: MessagePreviewSchema | None = None
+    unread_count: int = Field(
+        default=0,
+        ge=0,
+        description="Count of the not viewed messages of other members.",
+    )
+    cursor: str = Field(
+        pattern=DEAL_CURSOR_PATTERN,
+        description="Cursor of the deal for the keyset pagination.",
+    )
+
+
+class DealBoardStageSchema(BaseModel):
+    sale_stage_id: int
+    name: str
+    deals_count: int = Field(description="Count of the open deals.")
+    cost_total: float = Field(description="Total cost of the open deals.")
+    deals: list[DealShortResponseSchema] = Field(
+        description=(
+            "First cards of the stage, the next ones are fetched from the"
+            + " deal list by the stage and the cursor of the last card."
+        )
+    )
+
+
+class DealFiltersSchema(BaseModel):
+    manager_id: UUID | None = None
+    sale_stage_id: int | None = Field(default=None, ge=1, le=MAX_DB_INT)
+    state: DealState | None = Field(
+        default=None,
+        description=(
+            "The open deals aren't completed and aren't closed yet, the"
+            + " closed deals are the others."
+        ),
+    )
+    lost: bool | None = Field(
+        default=None, description="Filter of the deals with the lost reason."
+    )
+    after: str | None = Field(
+        default=None,
+        pattern=DEAL_CURSOR_PATTERN,
+        description=(
+            "Cursor of the last deal of the previous page, the deals"
+            + " updated before it are returned."
+        ),
+    )
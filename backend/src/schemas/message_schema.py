@@ -1,10 +1,15 @@
-from datetime import UTC, datetime, timedelta
+from datetime import datetime
 from uuid import UUID
 
 from pydantic import BaseModel, Field
 
 from core.general_constants import BASE_MIN_STR_LENGTH, MAX_MESSAGE_LENGTH
 
+# the sent_at part (microseconds) fits the datetime, the message_id part
+# fits the bigint
+MESSAGE_CURSOR_PATTERN = r"^\d{1,17}_\d{1,18}$"
+MESSAGE_SEARCH_QUERY_MAX_LENGTH = 200
+
 
 class MessageResponseSchema(BaseModel):
     deal_id: UUID
@@ -13,7 +18,7 @@ class MessageResponseSchema(BaseModel):
         max_length=MAX_MESSAGE_LENGTH,
     )
     user_id: UUID
-    sent_at: datetime = Field(le=datetime.now(tz=UTC) + timedelta(seconds=5))
+    sent_at: datetime
 
 
 class MessageCreateSchema(BaseModel):
@@ -22,3 +27,63 @@ class MessageCreateSchema(BaseModel):
         min_length=BASE_MIN_STR_LENGTH,
         max_length=MAX_MESSAGE_LENGTH,
     )
+
+
+class DealMessageResponseSchema(MessageResponseSchema):
+    message_id: int
+    cursor: str = Field(
+        pattern=MESSAGE_CURSOR_PATTERN,
+        description="Cursor of the message for the before/after pagination.",
+    )
+
+
+class MessageCursorsSchema(BaseModel):
+    before: str | None = Field(
+        default=None,
+        pattern=MESSAGE_CURSOR_PATTERN,
+        description="Cursor of the message, the older messages are returned.",
+    )
+    after: str | None = Field(
+        default=None,
+        pattern=MESSAGE_CURSOR_PATTERN,
+        description=(
+            "Cursor of the message, the newer messages are returned"
+            + " (e.g. the messages missed by the reconnected client)."
+        ),
+    )
+
+
+class MessageAckSchema(BaseModel):
+    """Acknowledgement of the message, sent to the sender after the commit."""
+
+    deal_id: UUID
+    message_id: int
+    sent_at: datetime
+    cursor: str = Field(
+        pattern=MESSAGE_CURSOR_PATTERN,
+        description="Cursor of the message for the before/after pagination.",
+    )
+
+
+class MessageSearchResponseSchema(BaseModel):
+    """The best matched message of the deal."""
+
+    deal_id: UUID
+    message_id: int
+    sent_at: datetime
+    snippet: str = Field(
+        description=(
+            "The HTML-escaped fragments of the message, the matched words"
+            + " are in the <mark> tags."
+        ),
+    )
+    matched_messages: int = Field(
+        ge=1, description="Count of the matched messages of the deal."
+    )
+    cursor: str = Field(
+        pattern=MESSAGE_CURSOR_PATTERN,
+        description=(
+            "Cursor of the message, the chat around it is fetched by the"
+            + " before/after cursors."
+        ),
+    )
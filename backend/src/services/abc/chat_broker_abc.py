@@ -0,0 +1,31 @@
+from abc import ABC, abstractmethod
+from collections.abc import Awaitable, Callable
+from uuid import UUID
+
+# (room_id, payload) -> None
+ChatMessageHandler = Callable[[UUID, str], Awaitable[None]]
+
+
+class AbstractChatBroker(ABC):
+    """Transport of the chat messages between the workers of the app.
+
+    The message published by any worker is delivered to the handler of
+    every worker, that is subscribed to the room of the message.
+    """
+
+    @abstractmethod
+    async def publish(self, room_id: UUID, payload: str) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def subscribe(self, room_id: UUID) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def unsubscribe(self, room_id: UUID) -> None:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def listen(self, handler: ChatMessageHandler) -> None:
+        """Deliver the messages of the subscribed rooms until cancelled."""
+        raise NotImplementedError
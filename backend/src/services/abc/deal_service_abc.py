@@ -5,13 +5,21 @@ from fastapi import WebSocket
 
 from domain.entities.deal import Deal
 from domain.entities.message import Message
-from dto.deal_dto import DealShortDTO
+from domain.enums import LanguageEnum
+from dto.deal_dto import (
+    DealBoardStageDTO,
+    DealIntakeDTO,
+    DealIntakeStatsDTO,
+    DealShortDTO,
+)
+from dto.message_dto import MessageSearchDTO
 from schemas.deal_schema import (
     DealCreateSchema,
+    DealFiltersSchema,
     DealUpdateSchema,
     LostCreateSchema,
 )
-from schemas.message_schema import MessageCreateSchema
+from schemas.message_schema import MessageCreateSchema, MessageCursorsSchema
 
 
 class AbstractDealService(ABC):
@@ -19,6 +27,23 @@ class AbstractDealService(ABC):
     async def create(self, deal_create_schema: DealCreateSchema) -> UUID:
         raise NotImplementedError
 
+    @abstractmethod
+    async def enqueue(self, deal_create_schema: DealCreateSchema) -> UUID:
+        """Queue the deal creation for the intake worker.
+
+        Returns:
+            The ID of the intake request for the tracking.
+        """
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_intake(self, intake_id: UUID) -> DealIntakeDTO:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_intake_stats(self) -> DealIntakeStatsDTO:
+        raise NotImplementedError
+
     @abstractmethod
     async def update(
         self, deal_id: UUID, deal_update_schema: DealUpdateSchema
@@ -66,26 +91,74 @@ class AbstractDealService(ABC):
     @abstractmethod
     async def get_deals(
         self,
+        user_id: UUID,
+        role_id: int,
         limit: int,
         offset: int,
+        filters: DealFiltersSchema | None = None,
+    ) -> list[DealShortDTO]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def get_board(
+        self,
+        user_id: UUID,
+        role_id: int,
+        limit: int,
+        manager_id: UUID | None = None,
+    ) -> list[DealBoardStageDTO]:
+        raise NotImplementedError
+
+    @abstractmethod
+    async def search_deals(
+        self, user_id: UUID, role_id: int, query: str, limit: int
     ) -> list[DealShortDTO]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def search_messages(
+        self,
+        user_id: UUID,
+        role_id: int,
+        language: LanguageEnum,
+        query: str,
+        limit: int,
+    ) -> list[MessageSearchDTO]:
+        raise NotImplementedError
+
     @abstractmethod
     async def get_messages(
         self,
         deal_id: UUID,
         limit: int,
         offset: int,
+        cursors: MessageCursorsSchema | None = None,
     ) -> list[Message]:
         raise NotImplementedError
 
+    @abstractmethod
+    async def mark_messages_viewed(
+        self, deal_id: UUID, user_id: UUID, until: str
+    ) -> int:
+        """Mark the messages of other members up to the cursor as viewed.
+
+        Raises:
+            DealNotFoundError: If the deal doesn't exist.
+            DealAccessDeniedError: If the user isn't a member of the deal.
+        """
+        raise NotImplementedError
+
     @abstractmethod
     async def write_message(
         self,
         user_id: UUID,
         message: MessageCreateSchema,
-    ):
+    ) -> Message:
+        """Broadcast the message to the chat and write it.
+
+        Returns:
+            The written message, after the commit of the message.
+        """
         raise NotImplementedError
 
     @abstractmethod
@@ -94,9 +167,10 @@ class AbstractDealService(ABC):
         websocket: WebSocket,
         deal_id: UUID,
         user_id: UUID,
+        last_seen: str | None = None,
     ):
         raise NotImplementedError
 
     @abstractmethod
-    def disconnect(self, deal_id: UUID, user_id: UUID):
+    async def disconnect(self, deal_id: UUID, user_id: UUID):
         raise NotImplementedError
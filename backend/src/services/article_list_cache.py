@@ -0,0 +1,162 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Iterable
+from contextlib import suppress
+from hashlib import sha256
+from pathlib import Path
+
+from redis.exceptions import RedisError
+
+from core.config import cache_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.redis_helper import redis_helper
+from domain.enums import LanguageEnum
+from dto.article_dto import ArticleListFiltersDTO
+from repository.article_cache_repository import ArticleCacheRepository
+from schemas.article_schema import ArticleListSchema
+
+logger = get_configure_logger(Path(__file__).stem)
+
+# the tag of the lists, that aren't filtered by the dimension
+ANY_TAG_VALUE = "*"
+
+
+class ArticleListCache:
+    """Cache of the article lists with the tag-based invalidation.
+
+    The lists are keyed by the hash of the normalized filters and tagged by
+    the language, the categories and the tags of the filters. The lists
+    without a category (tag) filter are tagged by "*", because any article
+    can be in them.
+
+    The concurrent misses of the same list in the process share one load.
+    Redis failures don't fail the requests: the cache is bypassed, and the
+    not invalidated lists expire by the ttl.
+    """
+
+    def __init__(self, cache_repository: ArticleCacheRepository, ttl: int):
+        self.__cache_repository = cache_repository
+        self.__ttl = ttl
+        self.__loads: dict[str, asyncio.Task[ArticleListSchema]] = {}
+
+    def _get_key(self, filters: ArticleListFiltersDTO) -> str:
+        return sha256(filters.model_dump_json().encode("utf-8")).hexdigest()
+
+    def _get_tags(self, filters: ArticleListFiltersDTO) -> list[str]:
+        categories = filters.category_id or (ANY_TAG_VALUE,)
+        tags = filters.tags or (ANY_TAG_VALUE,)
+
+        return [
+            f"language:{filters.language}",
+            *(f"category:{category}" for category in categories),
+            *(f"tag:{tag}" for tag in tags),
+        ]
+
+    async def get_or_load(
+        self,
+        filters: ArticleListFiltersDTO,
+        load: Callable[[], Awaitable[ArticleListSchema]],
+    ) -> ArticleListSchema:
+        """Get the article list from the cache or load and cache it.
+
+        Args:
+            filters: The filters of the article list.
+            load: The function, that loads the article list on miss.
+
+        Returns:
+            The article list.
+        """
+        key = self._get_key(filters)
+
+        with suppress(RedisError):
+            cached_list = await self.__cache_repository.get_list(key)
+            if cached_list:
+                return ArticleListSchema.model_validate_json(cached_list)
+
+        # single-flight: the concurrent misses wait for the first load
+        task = self.__loads.get(key)
+        if task is None:
+            task = asyncio.create_task(self.__load(key, filters, load))
+            self.__loads[key] = task
+            task.add_done_callback(lambda _: self.__loads.pop(key, None))
+
+        # the load isn't cancelled with the first waiter
+        return await asyncio.shield(task)
+
+    async def __load(
+        self,
+        key: str,
+        filters: ArticleListFiltersDTO,
+        load: Callable[[], Awaitable[ArticleListSchema]],
+    ) -> ArticleListSchema:
+        article_list = await load()
+
+        with suppress(RedisError):
+            await self.__cache_repository.set_list(
+                key=key,
+                value=article_list.model_dump_json(),
+                tags=self._get_tags(filters),
+                ttl=self.__ttl,
+            )
+
+        return article_list
+
+    async def invalidate(
+        self,
+        languages: Iterable[LanguageEnum] | None = None,
+        categories: Iterable[int] | None = None,
+        tags: Iterable[int] | None = None,
+    ) -> None:
+        """Delete the cached lists, that can contain the changed articles.
+
+        The list is deleted if it matches every dimension: its language is
+        in the languages, and its category (tag) filter intersects the
+        categories (tags) or is absent. None means any value of the
+        dimension.
+
+        Args:
+            languages: The languages of the changed articles.
+            categories: The categories of the changed articles.
+            tags: The tag ids of the changed articles.
+        """
+        languages = set(LanguageEnum if languages is None else languages)
+        tag_groups = [[f"language:{language}" for language in languages]]
+        if categories is not None:
+            tag_groups.append(
+                [f"category:{category}" for category in set(categories)]
+                + [f"category:{ANY_TAG_VALUE}"]
+            )
+        if tags is not None:
+            tag_groups.append(
+                [f"tag:{tag}" for tag in set(tags)] + [f"tag:{ANY_TAG_VALUE}"]
+            )
+        all_tags = [tag for tag_group in tag_groups for tag in tag_group]
+
+        try:
+            tagged_lists = await self.__cache_repository.get_tagged_lists(
+                all_tags
+            )
+            keys = set.intersection(
+                *(
+                    set().union(*(tagged_lists[tag] for tag in tag_group))
+                    for tag_group in tag_groups
+                )
+            )
+            await self.__cache_repository.delete_lists(keys, all_tags)
+
+            logger.debug("Invalidated %s article lists", len(keys))
+        except RedisError:
+            logger.warning(
+                "Article lists aren't invalidated, they expire in %s seconds",
+                self.__ttl,
+            )
+
+
+# create the instance
+article_list_cache = ArticleListCache(
+    cache_repository=ArticleCacheRepository(redis=redis_helper.redis),
+    ttl=cache_settings.article_list_ttl,
+)
+
+
+def article_list_cache_dependency() -> ArticleListCache:
+    return article_list_cache
@@ -1,5 +1,6 @@
 import base64
 import zlib
+from collections.abc import Iterable
 from pathlib import Path
 from re import search
 from string import ascii_letters, digits
@@ -37,6 +38,7 @@ from domain.exceptions import (
     TagIntegrityError,
     TitleAlreadyExistsError,
 )
+from dto.article_dto import ArticleListFiltersDTO
 from repository.article_repository import (
     ArticleRepository,
     article_repository_dependency,
@@ -58,13 +60,29 @@ from schemas.article_schema import (
     TagTranslateCreateSchema,
     TagTranslateUpdateSchema,
 )
+from services.article_list_cache import (
+    ArticleListCache,
+    article_list_cache_dependency,
+)
+from services.article_slug_index import (
+    ArticleSlugIndex,
+    article_slug_index,
+    article_slug_index_dependency,
+)
 
 logger = get_configure_logger(Path(__file__).stem)
 
 
 class ArticleService:
-    def __init__(self, article_repository: ArticleRepository):
+    def __init__(
+        self,
+        article_repository: ArticleRepository,
+        slug_index: ArticleSlugIndex = article_slug_index,
+        list_cache: ArticleListCache | None = None,
+    ):
         self.__article_repository = article_repository
+        self.__slug_index = slug_index
+        self.__list_cache = list_cache
 
     async def add_article(self, article_create: ArticleCreateSchema) -> None:
         try:
@@ -93,6 +111,16 @@ class ArticleService:
 
             # save in the database
             await self.__article_repository.article_insert(article)
+            self.__slug_index.set(
+                article.article_id, article.slug, {article.language}
+            )
+            await self.__invalidate_list_cache(
+                languages=[article.language],
+                categories=[article.category.category_id]
+                if article.category
+                else [],
+                tags=[tag.tag_id for tag in article.tags or []],
+            )
 
         except ArticleIntegrityError as error:
             raise error
@@ -121,6 +149,8 @@ class ArticleService:
                 language=language,
                 article_translate=article_translate,
             )
+            self.__slug_index.add_language(article_id, language)
+            await self.__invalidate_list_cache(languages=[language])
         except AuthorDoesNotExistsError as error:
             raise error
         except LanguageDoesNotExistsError as error:
@@ -146,6 +176,12 @@ class ArticleService:
                 language=language,
                 article_translate=article_translate,
             )
+            self.__slug_index.change_language(
+                article_id, language, article_translate.language
+            )
+            await self.__invalidate_list_cache(
+                languages=[language, article_translate.language]
+            )
         except AuthorDoesNotExistsError as error:
             raise error
         except LanguageDoesNotExistsError as error:
@@ -203,7 +239,10 @@ class ArticleService:
         )
 
     async def get_article(
-        self, article_id: UUID, language: LanguageEnum
+        self,
+        article_id: UUID,
+        language: LanguageEnum,
+        fallback_languages: tuple[LanguageEnum, ...] = (),
     ) -> ArticleResponseSchema | None:
         """Retrieve, process, and format a single article for a client.
 
@@ -214,10 +253,13 @@ class ArticleService:
         Args:
             article_id: The unique identifier for the article.
             language: The language in which to retrieve the article.
+            fallback_languages: The languages to serve (in order), if the
+                article hasn't the translation in the `language`.
 
         Returns:
             An ArticleResponseSchema object if the article is found and
-            valid, otherwise None.
+            valid, otherwise None. The `language` of the response is the
+            served language.
 
         Raises:
             ArticleDatabaseError: If a database-level error occurs.
@@ -228,47 +270,90 @@ class ArticleService:
         """
         try:
             article = await self.__article_repository.get_article(
-                article_id, language
+                article_id, language, fallback_languages
             )
 
             if article:
-                # A slug is crucial for SEO-friendly URLs. Its absence
-                # indicates a data integrity issue.
-                if not article.slug:
-                    raise SlugIsMissingError("Slug is missing")
-
-                # Compress the article content.
-                compressed_content = (
-                    self._compress_string(article.content)
-                    if article.content
-                    else ""
+                return self._get_article_response(article)
+            else:
+                raise ArticleDoesNotExistsError(
+                    f"Article with id {article_id} and languages"
+                    + f" {(language, *fallback_languages)} does not exists"
                 )
 
-                # Validate that the article has a valid author and get
-                # their data.
-                author = self._get_author_validate_data(article=article)
-
-                return ArticleResponseSchema(
-                    title=article.title,
-                    slug=article.slug,
-                    image_src=article.image_src,
-                    content=compressed_content,
-                    category=ArticleCategorySchema(
-                        **article.category.model_dump()
+        except ArticleIntegrityError as error:
+            raise error
+        except AuthorDoesNotExistsError as error:
+            raise error
+        except ArticleDatabaseError as error:
+            raise error
+
+    async def get_article_by_slug(
+        self,
+        slug: str,
+        languages: tuple[LanguageEnum, ...],
+    ) -> ArticleResponseSchema | None:
+        """Retrieve, process, and format a single article by its slug.
+
+        The slug is resolved to the article id by the in-memory slug index,
+        and the languages chain is narrowed to the languages of the article
+        translates, so the lookup costs only the article fetch. When the
+        index doesn't know the slug or is stale (e.g. the article was
+        written by another worker), the article is fetched by slug.
+
+        Args:
+            slug: The unique slug of the article.
+            languages: The languages chain (by preference) of the article.
+
+        Returns:
+            An ArticleResponseSchema object if the article is found and
+            valid, otherwise None.
+
+        Raises:
+            ArticleDoesNotExistsError: If the article with the slug doesn't
+                exists in any language of the chain.
+            ArticleDatabaseError: If a database-level error occurs.
+            ArticleIntegrityError: If the article is missing critical
+                data (e.g. slug).
+            AuthorDoesNotExistsError: If the article does not have an
+                author.
+        """
+        try:
+            article = None
+
+            indexed_article = self.__slug_index.get(slug)
+            if indexed_article:
+                available_languages = tuple(
+                    language
+                    for language in languages
+                    if language in indexed_article.languages
+                )
+                if available_languages:
+                    article = await self.__article_repository.get_article(
+                        indexed_article.article_id,
+                        available_languages[0],
+                        available_languages[1:],
                     )
-                    if article.category
-                    else None,
-                    views_count=article.views_count,
-                    tags=[
-                        TagSchema(**tag.model_dump()) for tag in article.tags
-                    ],
-                    status=article.status,
-                    author=author,
-                    language=article.language,
+                    if not article or article.slug != slug:
+                        logger.info("Slug index is stale for %s", slug)
+                        self.__slug_index.remove(indexed_article.article_id)
+                        article = None
+
+            if not article:
+                article = await self.__article_repository.get_article_by_slug(
+                    slug, languages[0], languages[1:]
                 )
+                if article:
+                    self.__slug_index.set(article.article_id, article.slug)
+                    self.__slug_index.add_language(
+                        article.article_id, article.language
+                    )
+
+            if article:
+                return self._get_article_response(article)
             else:
                 raise ArticleDoesNotExistsError(
-                    f"Article with id {article_id} and language {language}"
+                    f"Article with slug {slug} and languages {languages}"
                     + " does not exists"
                 )
 
@@ -279,6 +364,36 @@ class ArticleService:
         except ArticleDatabaseError as error:
             raise error
 
+    def _get_article_response(self, article: Article) -> ArticleResponseSchema:
+        # A slug is crucial for SEO-friendly URLs. Its absence
+        # indicates a data integrity issue.
+        if not article.slug:
+            raise SlugIsMissingError("Slug is missing")
+
+        # Compress the article content.
+        compressed_content = (
+            self._compress_string(article.content) if article.content else ""
+        )
+
+        # Validate that the article has a valid author and get
+        # their data.
+        author = self._get_author_validate_data(article=article)
+
+        return ArticleResponseSchema(
+            title=article.title,
+            slug=article.slug,
+            image_src=article.image_src,
+            content=compressed_content,
+            category=ArticleCategorySchema(**article.category.model_dump())
+            if article.category
+            else None,
+            views_count=article.views_count,
+            tags=[TagSchema(**tag.model_dump()) for tag in article.tags],
+            status=article.status,
+            author=author,
+            language=article.language,
+        )
+
     def _get_searched_words(self, input_text: str) -> set[str]:
         """Prepare text to ts_query method with AND rule.
 
@@ -320,7 +435,8 @@ class ArticleService:
         if excluded:
             searched_words = {"!" + word for word in searched_words}
 
-        return f" {rule} ".join(searched_words)
+        # sorted to get the same query (and the cache key) for the same words
+        return f" {rule} ".join(sorted(searched_words))
 
     def _compress_string(self, input_string: str) -> str:
         compressed = zlib.compress(input_string.encode("utf-8"), wbits=-15)
@@ -335,6 +451,7 @@ class ArticleService:
         statuses: tuple[ArticleStatus, ...] | None = None,
         tags: tuple[int, ...] | None = None,
         searched_text: str | None = None,
+        candidates_limit: int | None = None,
         # pagination params
         limit: int = DEFAULT_LIMIT,
         offset: int = 0,
@@ -351,6 +468,10 @@ class ArticleService:
             category_id: A tuple of category IDs to filter by.
             statuses: A tuple of article statuses to filter by.
             tags: A tuple of tag IDs to filter by.
+            searched_text: The text to search the articles by.
+            candidates_limit: The max count of the newest articles matching
+                the searched text, that are ranked. If it isn't specified,
+                all matching articles are ranked.
             limit: The maximum number of articles to return.
             offset: The number of articles to skip for pagination.
             order_by: The field by which to sort the articles.
@@ -364,31 +485,26 @@ class ArticleService:
             A list of articles matching the criteria.
         """
         try:
-            if searched_text:
-                searched_text = self._text_preparation_to_tsquery(
-                    searched_text
-                )
-
-            articles = await self.__article_repository.get_articles(
+            filters = ArticleListFiltersDTO(
                 language=language,
                 category_id=category_id,
                 statuses=statuses,
                 tags=tags,
-                ts_query_of_searched_words=searched_text
+                searched_text=self._text_preparation_to_tsquery(searched_text)
                 if searched_text
                 else None,
+                candidates_limit=candidates_limit,
                 limit=limit,
                 offset=offset,
                 order_by=order_by,
                 order_direction=order_direction,
             )
 
-            return ArticleListSchema(
-                language=language,
-                articles=[
-                    ArticleShortSchema(**article.model_dump(exclude_none=True))
-                    for article in articles
-                ],
+            if self.__list_cache is None:
+                return await self.__load_articles(filters)
+
+            return await self.__list_cache.get_or_load(
+                filters, lambda: self.__load_articles(filters)
             )
 
         except ArticleIntegrityError as error:
@@ -396,7 +512,93 @@ class ArticleService:
         except DBAPIError as error:
             raise error
 
-    async def update_article(
+    async def __load_articles(
+        self, filters: ArticleListFiltersDTO
+    ) -> ArticleListSchema:
+        searched_text = filters.searched_text or None
+
+        article_ids, truncated = None, False
+        if searched_text and filters.candidates_limit:
+            # bounded-cost search: rank only the capped set of the
+            # newest matching articles instead of all of them
+            article_ids = (
+                await self.__article_repository.get_search_candidates(
+                    language=filters.language,
+                    ts_query_of_searched_words=searched_text,
+                    category_id=filters.category_id,
+                    statuses=filters.statuses,
+                    tags=filters.tags,
+                    limit=filters.candidates_limit + 1,
+                )
+            )
+            truncated = len(article_ids) > filters.candidates_limit
+            article_ids = tuple(article_ids[: filters.candidates_limit])
+
+            if not article_ids:
+                return ArticleListSchema(
+                    language=filters.language, articles=[]
+                )
+
+        articles = await self.__article_repository.get_articles(
+            language=filters.language,
+            category_id=filters.category_id,
+            statuses=filters.statuses,
+            tags=filters.tags,
+            ts_query_of_searched_words=searched_text,
+            article_ids=article_ids,
+            limit=filters.limit,
+            offset=filters.offset,
+            order_by=filters.order_by,
+            order_direction=filters.order_direction,
+        )
+
+        return ArticleListSchema(
+            language=filters.language,
+            articles=[
+                ArticleShortSchema(**article.model_dump(exclude_none=True))
+                for article in articles
+            ],
+            truncated=truncated,
+        )
+
+    async def __invalidate_list_cache(
+        self,
+        languages: Iterable[LanguageEnum] | None = None,
+        categories: Iterable[int] | None = None,
+        tags: Iterable[int] | None = None,
+    ) -> None:
+        if self.__list_cache is not None:
+            await self.__list_cache.invalidate(
+                languages=languages, categories=categories, tags=tags
+            )
+
+    async def __get_article_cache_tags(
+        self, article_id: UUID
+    ) -> tuple[list[int] | None, list[int] | None]:
+        """Get the categories and the tags of the article before the write.
+
+        Returns:
+            The categories and the tag ids of the article, or (None, None)
+            (any value) if the article isn't found or the cache is disabled.
+        """
+        if self.__list_cache is None:
+            return None, None
+
+        language, *fallback_languages = LanguageEnum
+        article = await self.__article_repository.get_article(
+            article_id=article_id,
+            language=language,
+            fallback_languages=tuple(fallback_languages),
+        )
+        if article is None:
+            return None, None
+
+        return (
+            [article.category.category_id] if article.category else [],
+            [tag.tag_id for tag in article.tags or []],
+        )
+
+    async def update_article(  # noqa: C901
         self,
         article_id: UUID,
         language: LanguageEnum,
@@ -426,11 +628,28 @@ class ArticleService:
                 else [],
             )
 
-            return await self.__article_repository.update_article(
+            categories, tags = await self.__get_article_cache_tags(article_id)
+            updated_rows = await self.__article_repository.update_article(
                 article_id=article_id,
                 update_article=article,
                 language=language,
             )
+            if updated_rows:
+                self.__slug_index.set(article_id, article.slug)
+                self.__slug_index.change_language(
+                    article_id, language, article.language
+                )
+                # the lists with the old and the new values are changed
+                if categories is not None and article.category:
+                    categories.append(article.category.category_id)
+                if tags is not None:
+                    tags.extend(tag.tag_id for tag in article.tags)
+                # the status and the category are shared by all languages
+                await self.__invalidate_list_cache(
+                    categories=categories, tags=tags
+                )
+
+            return updated_rows
         except AuthorIntegrityError as error:
             raise error
         except AuthorDoesNotExistsError as error:
@@ -453,9 +672,17 @@ class ArticleService:
         article_id: UUID,
     ) -> int:
         try:
-            return await self.__article_repository.delete_article(
+            categories, tags = await self.__get_article_cache_tags(article_id)
+            deleted_rows = await self.__article_repository.delete_article(
                 article_id=article_id,
             )
+            self.__slug_index.remove(article_id)
+            if deleted_rows:
+                await self.__invalidate_list_cache(
+                    categories=categories, tags=tags
+                )
+
+            return deleted_rows
         except ArticleDatabaseError as error:
             raise error
 
@@ -463,9 +690,16 @@ class ArticleService:
         self, article_id: UUID, language: LanguageEnum
     ):
         try:
-            return await self.__article_repository.delete_translate_article(
-                article_id=article_id, language=language
+            deleted_rows = (
+                await self.__article_repository.delete_translate_article(
+                    article_id=article_id, language=language
+                )
             )
+            self.__slug_index.remove_language(article_id, language)
+            if deleted_rows:
+                await self.__invalidate_list_cache(languages=[language])
+
+            return deleted_rows
         except ArticleDatabaseError as error:
             raise error
 
@@ -501,6 +735,9 @@ class ArticleService:
                 language=language,
                 tag_translate=tag_translate,
             )
+            await self.__invalidate_list_cache(
+                languages=[language], tags=[tag_id]
+            )
         except LanguageDoesNotExistsError as error:
             raise error
         except TagDoesNotExistsError as error:
@@ -524,6 +761,9 @@ class ArticleService:
                 language=language,
                 tag_translate=tag_translate,
             )
+            await self.__invalidate_list_cache(
+                languages=[language, tag_translate.language], tags=[tag_id]
+            )
         except LanguageDoesNotExistsError as error:
             raise error
         except TagDoesNotExistsError as error:
@@ -541,6 +781,7 @@ class ArticleService:
     ) -> None:
         try:
             await self.__article_repository.delete_tag(tag_id)
+            await self.__invalidate_list_cache(tags=[tag_id])
         except TagDoesNotExistsError as error:
             raise error
         except LanguageDoesNotExistsError as error:
@@ -553,10 +794,19 @@ class ArticleService:
     async def set_tags_to_article(self, article_id: UUID, tags: list[int]):
         try:
             domain_tags_list = [Tag(tag_id=tag_id) for tag_id in tags]
+            categories, article_tags = await self.__get_article_cache_tags(
+                article_id
+            )
             await self.__article_repository.set_tags_to_article(
                 article_id=article_id,
                 tags=domain_tags_list,
             )
+            # the lists of the existing tags contain the changed tag set of
+            # the article too
+            await self.__invalidate_list_cache(
+                categories=categories,
+                tags=None if article_tags is None else {*article_tags, *tags},
+            )
         except ArticleDoesNotExistsError as error:
             raise error
         except TagAlreadyExistsError as error:
@@ -571,5 +821,7 @@ def article_service_dependency(
     article_repository: ArticleRepository = Depends(
         article_repository_dependency
     ),
+    slug_index: ArticleSlugIndex = Depends(article_slug_index_dependency),
+    list_cache: ArticleListCache = Depends(article_list_cache_dependency),
 ):
-    return ArticleService(article_repository)
+    return ArticleService(article_repository, slug_index, list_cache)
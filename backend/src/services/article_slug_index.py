@@ -0,0 +1,100 @@
+from pathlib import Path
+from uuid import UUID
+
+from core.logger.logger import get_configure_logger
+from domain.enums import LanguageEnum
+from dto.article_dto import ArticleSlugDTO
+from repository.article_repository import ArticleRepository
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class ArticleSlugIndex:
+    """In-memory index slug -> (article_id, languages of the translates).
+
+    The index is loaded at the application startup and updated by the
+    ArticleService on the article writes. The index is process-local, so
+    the writes of the other workers aren't visible in it: the ArticleService
+    treats the index only as a hint and fetches the article by slug on miss.
+    """
+
+    def __init__(self):
+        self.__articles_by_slug: dict[str, ArticleSlugDTO] = {}
+        self.__slugs_by_article_id: dict[UUID, str] = {}
+
+    def __len__(self) -> int:
+        return len(self.__articles_by_slug)
+
+    async def load(self, article_repository: ArticleRepository) -> None:
+        """Replace the content of the index by the slugs from the database."""
+        slugs = await article_repository.get_slugs()
+
+        self.__articles_by_slug = {article.slug: article for article in slugs}
+        self.__slugs_by_article_id = {
+            article.article_id: article.slug for article in slugs
+        }
+        logger.info("Slug index loaded with %s articles", len(slugs))
+
+    def get(self, slug: str) -> ArticleSlugDTO | None:
+        return self.__articles_by_slug.get(slug)
+
+    def set(
+        self,
+        article_id: UUID,
+        slug: str,
+        languages: set[LanguageEnum] | None = None,
+    ) -> None:
+        """Add the article to the index or change the slug of the article.
+
+        Args:
+            article_id: The id of the article.
+            slug: The current slug of the article.
+            languages: The languages of the translates. If they aren't
+                specified, the languages from the index are kept.
+        """
+        old_slug = self.__slugs_by_article_id.get(article_id)
+        old_article = (
+            self.__articles_by_slug.pop(old_slug, None) if old_slug else None
+        )
+
+        if languages is None:
+            languages = old_article.languages if old_article else set()
+
+        self.__articles_by_slug[slug] = ArticleSlugDTO(
+            article_id=article_id, slug=slug, languages=languages
+        )
+        self.__slugs_by_article_id[article_id] = slug
+
+    def add_language(self, article_id: UUID, language: LanguageEnum) -> None:
+        slug = self.__slugs_by_article_id.get(article_id)
+        if slug:
+            self.__articles_by_slug[slug].languages.add(language)
+
+    def remove_language(
+        self, article_id: UUID, language: LanguageEnum
+    ) -> None:
+        slug = self.__slugs_by_article_id.get(article_id)
+        if slug:
+            self.__articles_by_slug[slug].languages.discard(language)
+
+    def change_language(
+        self,
+        article_id: UUID,
+        old_language: LanguageEnum,
+        new_language: LanguageEnum,
+    ) -> None:
+        self.remove_language(article_id, old_language)
+        self.add_language(article_id, new_language)
+
+    def remove(self, article_id: UUID) -> None:
+        slug = self.__slugs_by_article_id.pop(article_id, None)
+        if slug:
+            self.__articles_by_slug.pop(slug, None)
+
+
+# create the instance
+article_slug_index = ArticleSlugIndex()
+
+
+def article_slug_index_dependency() -> ArticleSlugIndex:
+    return article_slug_index
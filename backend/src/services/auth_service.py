@@ -27,6 +27,46 @@ logger = get_configure_logger(Path(__file__).stem)
 CRYPTO_CONTEXT = CryptContext(schemes=["bcrypt"], deprecated="auto")
 
 
+def validate_access_token(
+    token: Token,
+    secret_key: str = auth_settings.access_secret_key,
+    algorithm: str = auth_settings.algorithm,
+) -> TokenPayload:
+    """Validate an access token (signature and expiry).
+
+    The validation doesn't need the database, so it's used by the
+    long-lived connections (e.g. the websocket chats) without the session.
+
+    Args:
+        token: Token object containing the JWT.
+        secret_key: The secret key of the access tokens.
+        algorithm: The algorithm of the JWT.
+
+    Returns:
+        Decoded TokenPayload if valid.
+
+    Raises:
+        InvalidTokenDataError: If decoding fails.
+        TokenSessionExpiredError: If token is expired.
+    """
+    try:
+        token_payload = token.decode_access_token(
+            secret_key=secret_key, algorithm=algorithm
+        )
+    except InvalidTokenDataError as error:
+        logger.warning(
+            "Failed to decode access token: %s", error, exc_info=error
+        )
+        raise
+
+    # check is jwt expired
+    if token_payload.exp < time():
+        logger.debug("Access token expired for user %s", token_payload.user_id)
+        raise TokenSessionExpiredError
+
+    return token_payload
+
+
 class AuthService(AuthServicABC):
     """
     Manages JWT creation, cookie handling, password hashing/verification
@@ -209,24 +249,11 @@ class AuthService(AuthServicABC):
             InvalidTokenDataError: If decoding fails.
             TokenSessionExpiredError: If token is expired.
         """
-        try:
-            token_payload = token.decode_access_token(
-                secret_key=self._access_secret_key, algorithm=self._algorithm
-            )
-        except InvalidTokenDataError as error:
-            logger.warning(
-                "Failed to decode access token: %s", error, exc_info=error
-            )
-            raise
-
-        # check is jwt expired
-        if token_payload.exp < time():
-            logger.debug(
-                "Access token expired for user %s", token_payload.user_id
-            )
-            raise TokenSessionExpiredError
-
-        return token_payload
+        return validate_access_token(
+            token=token,
+            secret_key=self._access_secret_key,
+            algorithm=self._algorithm,
+        )
 
     async def _validate_refresh_token(
         self,
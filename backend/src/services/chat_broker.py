@@ -0,0 +1,105 @@
+import asyncio
+from pathlib import Path
+from uuid import UUID
+
+from redis.asyncio import Redis
+from redis.exceptions import RedisError
+
+from core.config import ChatBrokerEnum, chat_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.redis_helper import redis_helper
+from services.abc.chat_broker_abc import AbstractChatBroker, ChatMessageHandler
+
+logger = get_configure_logger(Path(__file__).stem)
+
+# the channel of the room is "<prefix><room_id>"
+CHAT_CHANNEL_PREFIX = "deal_chat:"
+
+
+class LocalChatBroker(AbstractChatBroker):
+    """Broker of the single worker, the messages don't leave the process."""
+
+    def __init__(self):
+        self.__rooms: set[UUID] = set()
+        self.__messages: asyncio.Queue[tuple[UUID, str]] = asyncio.Queue()
+
+    async def publish(self, room_id: UUID, payload: str) -> None:
+        await self.__messages.put((room_id, payload))
+
+    async def subscribe(self, room_id: UUID) -> None:
+        self.__rooms.add(room_id)
+
+    async def unsubscribe(self, room_id: UUID) -> None:
+        self.__rooms.discard(room_id)
+
+    async def listen(self, handler: ChatMessageHandler) -> None:
+        while True:
+            room_id, payload = await self.__messages.get()
+            if room_id in self.__rooms:
+                await handler(room_id, payload)
+
+
+class RedisChatBroker(AbstractChatBroker):
+    """Broker of the several workers based on the Redis pub/sub.
+
+    Every room is the channel, the worker is subscribed only to the rooms
+    with the local members, so the worker receives only the messages,
+    that it delivers.
+    """
+
+    def __init__(self, redis: Redis):
+        self.__redis = redis
+        self.__pubsub = redis.pubsub(ignore_subscribe_messages=True)
+        self.__has_rooms = asyncio.Event()
+
+    async def publish(self, room_id: UUID, payload: str) -> None:
+        """Publish the message to the room.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        await self.__redis.publish(f"{CHAT_CHANNEL_PREFIX}{room_id}", payload)
+
+    async def subscribe(self, room_id: UUID) -> None:
+        """Subscribe the worker to the room.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        await self.__pubsub.subscribe(f"{CHAT_CHANNEL_PREFIX}{room_id}")
+        self.__has_rooms.set()
+
+    async def unsubscribe(self, room_id: UUID) -> None:
+        """Unsubscribe the worker from the room.
+
+        Raises:
+            RedisError: On Redis failure.
+        """
+        await self.__pubsub.unsubscribe(f"{CHAT_CHANNEL_PREFIX}{room_id}")
+
+    async def listen(self, handler: ChatMessageHandler) -> None:
+        while True:
+            # the pub/sub connection is opened by the first subscription
+            await self.__has_rooms.wait()
+            try:
+                message = await self.__pubsub.get_message(timeout=1.0)
+            except RedisError:
+                logger.error("Chat messages receiving failed", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+
+            if message and message["type"] == "message":
+                room_id = UUID(
+                    message["channel"].removeprefix(CHAT_CHANNEL_PREFIX)
+                )
+                await handler(room_id, message["data"])
+
+
+def get_chat_broker(broker: ChatBrokerEnum) -> AbstractChatBroker:
+    if broker == ChatBrokerEnum.REDIS:
+        return RedisChatBroker(redis=redis_helper.redis)
+    return LocalChatBroker()
+
+
+# create the instance
+chat_broker = get_chat_broker(chat_settings.chat_broker)
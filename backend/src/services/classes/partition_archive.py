@@ -0,0 +1,52 @@
+import gzip
+import os
+from datetime import date
+from pathlib import Path
+from uuid import uuid4
+
+
+def get_month(day: date) -> date:
+    return day.replace(day=1)
+
+
+def shift_month(month: date, months: int) -> date:
+    """Get the first day of the month `months` after (or before) it."""
+    index = month.year * 12 + month.month - 1 + months
+    return date(index // 12, index % 12 + 1, 1)
+
+
+def get_partition_name(table_name: str, month: date) -> str:
+    """Get the name of the partition, like create_month_partition does."""
+    return f"{table_name}_{month:%Y%m}"
+
+
+class PartitionArchiveWriter:
+    """The gzip NDJSON file of the exported partition.
+
+    The rows are written to the temporary file of the writer, that is
+    synced and renamed by the commit, so the file of the archive is
+    complete, if it exists. The writes are blocking, they're called in the
+    threads.
+    """
+
+    def __init__(self, path: Path):
+        self.path = path
+        self.temp_path = path.with_name(f"{path.name}.{uuid4().hex}.tmp")
+        path.parent.mkdir(parents=True, exist_ok=True)
+        self.__file = open(self.temp_path, "wb")  # noqa: SIM115
+        self.__archive = gzip.GzipFile(fileobj=self.__file, mode="wb")
+
+    def write(self, lines: list[str]) -> None:
+        self.__archive.write("".join(f"{line}\n" for line in lines).encode())
+
+    def commit(self) -> None:
+        self.__archive.close()
+        self.__file.flush()
+        os.fsync(self.__file.fileno())
+        self.__file.close()
+        os.replace(self.temp_path, self.path)
+
+    def abort(self) -> None:
+        self.__archive.close()
+        self.__file.close()
+        self.temp_path.unlink(missing_ok=True)
@@ -0,0 +1,70 @@
+import asyncio
+from collections.abc import Awaitable, Callable
+from datetime import UTC, datetime
+from pathlib import Path
+from time import perf_counter
+
+from pydantic import BaseModel
+
+from core.logger.logger import get_configure_logger
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class PeriodicJobMetrics(BaseModel):
+    runs: int = 0
+    failed_runs: int = 0
+    last_run_duration: float = 0
+    last_run_at: datetime | None = None
+
+
+class PeriodicJob:
+    """The loop of the background job.
+
+    The step of the job is run until cancelled, the next step is run after
+    the wait (the sleep of `interval` seconds by default). The failed step
+    is counted and logged, the work is retried by the next step. The
+    metrics of the runs are written to the metrics of the job owner, whose
+    metrics extend PeriodicJobMetrics.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        step: Callable[[], Awaitable[object]],
+        metrics: PeriodicJobMetrics,
+        interval: float = 0,
+        wait: Callable[[], Awaitable[object]] | None = None,
+    ):
+        self.__name = name
+        self.__step = step
+        self.__metrics = metrics
+        self.__interval = interval
+        self.__wait = wait or self.__sleep
+
+    async def __sleep(self) -> None:
+        await asyncio.sleep(self.__interval)
+
+    async def run_step(self) -> None:
+        """Run the step once and count it.
+
+        Raises:
+            Exception: Any error of the step.
+        """
+        started_at = perf_counter()
+        await self.__step()
+
+        self.__metrics.runs += 1
+        self.__metrics.last_run_duration = perf_counter() - started_at
+        self.__metrics.last_run_at = datetime.now(tz=UTC)
+
+    async def run(self) -> None:
+        """Run the steps until cancelled."""
+        while True:
+            try:
+                await self.run_step()
+            except Exception:
+                self.__metrics.failed_runs += 1
+                logger.error("%s failed", self.__name, exc_info=True)
+
+            await self.__wait()
@@ -0,0 +1,153 @@
+from array import array
+from collections.abc import Iterable, Sequence
+from datetime import UTC, date, datetime
+from math import fsum, sqrt
+from uuid import UUID
+
+from domain.enums import ForecastDimension
+from dto.deal_analytics_dto import ForecastBucketDTO, RevenueForecastDTO
+
+
+class OpenDealColumns:
+    """Open deals of the forecast, stored column-wise.
+
+    The deal is won with its probability, so the revenue of the deal is the
+    Bernoulli variable: its expected value is `cost * p` and its variance is
+    `cost^2 * p * (1 - p)`. Both are calculated once on the load and kept in
+    the flat float arrays, so the forecasts of the snapshot are the sums of
+    the arrays. The revenues of the deals are independent, so the variances
+    of the buckets are the sums too.
+    """
+
+    def __init__(
+        self,
+        manager_ids: Sequence[UUID | None],
+        sale_stage_ids: Sequence[int],
+        months: Sequence[date | None],
+        costs: Sequence[float],
+        probabilities: Sequence[float],
+    ):
+        self.manager_ids = list(manager_ids)
+        self.sale_stage_ids = array("l", sale_stage_ids)
+        self.months = list(months)
+        self.costs = array("d", costs)
+        self.expected_revenues = array(
+            "d",
+            (
+                cost * probability
+                for cost, probability in zip(costs, probabilities, strict=True)
+            ),
+        )
+        self.variances = array(
+            "d",
+            (
+                cost * cost * probability * (1 - probability)
+                for cost, probability in zip(costs, probabilities, strict=True)
+            ),
+        )
+        self.loaded_at = datetime.now(tz=UTC)
+
+    @classmethod
+    def from_rows(
+        cls,
+        rows: Iterable[tuple[UUID | None, int, date | None, float, float]],
+    ) -> "OpenDealColumns":
+        """Transpose the rows of (manager_id, sale_stage_id, month, cost,
+        probability) to the columns.
+        """
+        columns = tuple(zip(*rows, strict=True)) or ((),) * 5
+        return cls(*columns)
+
+    def __len__(self) -> int:
+        return len(self.costs)
+
+
+def get_bucket(
+    deals: int,
+    pipeline: float,
+    expected_revenue: float,
+    variance: float,
+    **dimensions,
+) -> ForecastBucketDTO:
+    # the float errors of the sums can't make the variance negative
+    variance = max(variance, 0.0)
+    return ForecastBucketDTO(
+        **dimensions,
+        deals=deals,
+        pipeline=pipeline,
+        expected_revenue=expected_revenue,
+        variance=variance,
+        stddev=sqrt(variance),
+    )
+
+
+def get_revenue_forecast(
+    columns: OpenDealColumns, group_by: Sequence[ForecastDimension]
+) -> RevenueForecastDTO:
+    """Sum the expected revenues and the variances of the open deals by the
+    dimensions.
+
+    Args:
+        columns: The snapshot of the open deals.
+        group_by: The dimensions of the buckets, the buckets are ordered by
+            the expected revenue.
+
+    Returns:
+        The forecast of all deals and of the buckets.
+    """
+    total = get_bucket(
+        deals=len(columns),
+        pipeline=fsum(columns.costs),
+        expected_revenue=fsum(columns.expected_revenues),
+        variance=fsum(columns.variances),
+    )
+    if not group_by:
+        return RevenueForecastDTO(total=total, loaded_at=columns.loaded_at)
+
+    dimension_columns = {
+        ForecastDimension.MANAGER: ("manager_id", columns.manager_ids),
+        ForecastDimension.SALE_STAGE: (
+            "sale_stage_id",
+            columns.sale_stage_ids,
+        ),
+        ForecastDimension.MONTH: ("month", columns.months),
+    }
+    names = [dimension_columns[dimension][0] for dimension in group_by]
+    keys = zip(
+        *(dimension_columns[dimension][1] for dimension in group_by),
+        strict=True,
+    )
+
+    # key -> [deals, pipeline, expected revenue, variance]
+    sums: dict[tuple, list[float]] = {}
+    for key, cost, expected_revenue, variance in zip(
+        keys,
+        columns.costs,
+        columns.expected_revenues,
+        columns.variances,
+        strict=True,
+    ):
+        bucket_sums = sums.get(key)
+        if bucket_sums is None:
+            sums[key] = [1, cost, expected_revenue, variance]
+            continue
+        bucket_sums[0] += 1
+        bucket_sums[1] += cost
+        bucket_sums[2] += expected_revenue
+        bucket_sums[3] += variance
+
+    buckets = [
+        get_bucket(
+            deals=int(deals),
+            pipeline=pipeline,
+            expected_revenue=expected_revenue,
+            variance=variance,
+            **dict(zip(names, key, strict=True)),
+        )
+        for key, (deals, pipeline, expected_revenue, variance) in sums.items()
+    ]
+    buckets.sort(key=lambda bucket: bucket.expected_revenue, reverse=True)
+
+    return RevenueForecastDTO(
+        total=total, buckets=buckets, loaded_at=columns.loaded_at
+    )
@@ -0,0 +1,131 @@
+from bisect import bisect_left
+from collections.abc import Iterable
+from datetime import UTC
+from uuid import UUID
+
+from dto.deal_analytics_dto import (
+    DealHistoryFoldDTO,
+    DealHistoryRowDTO,
+    DealStageEntryDTO,
+    DealStageRollupDTO,
+)
+
+# the upper bounds of the buckets of the time in the sale stage in seconds
+# (1 minute, 2 minutes, 4 minutes, ... about 1 year), the last bucket is
+# unbounded
+DURATION_BUCKET_BOUNDS: tuple[float, ...] = tuple(
+    60.0 * 2**power for power in range(20)
+)
+DURATION_BUCKETS_COUNT = len(DURATION_BUCKET_BOUNDS) + 1
+
+
+def get_duration_bucket(duration: float) -> int:
+    return bisect_left(DURATION_BUCKET_BOUNDS, duration)
+
+
+def merge_histograms(histograms: Iterable[list[int]]) -> list[int]:
+    merged = [0] * DURATION_BUCKETS_COUNT
+    for histogram in histograms:
+        for bucket, count in enumerate(histogram):
+            merged[bucket] += count
+    return merged
+
+
+def get_percentile(histogram: list[int], percentile: float) -> float | None:
+    """Estimate the percentile of the durations by their histogram.
+
+    The durations are interpolated linearly inside the bucket, the
+    durations of the unbounded bucket are estimated by its lower bound.
+
+    Returns:
+        The duration in seconds or None, if the histogram is empty.
+    """
+    total = sum(histogram)
+    if not total:
+        return None
+
+    rank = total * percentile / 100
+    accumulated = 0
+    for bucket, count in enumerate(histogram):
+        if count and accumulated + count >= rank:
+            lower = DURATION_BUCKET_BOUNDS[bucket - 1] if bucket else 0.0
+            if bucket == len(DURATION_BUCKET_BOUNDS):
+                return lower
+            upper = DURATION_BUCKET_BOUNDS[bucket]
+            return lower + (upper - lower) * (rank - accumulated) / count
+        accumulated += count
+
+    return DURATION_BUCKET_BOUNDS[-1]
+
+
+def fold_deal_history(
+    rows: list[DealHistoryRowDTO],
+    entries: dict[UUID, DealStageEntryDTO],
+) -> DealHistoryFoldDTO:
+    """Fold the new versions of the deals to the daily stage rollups.
+
+    The version is saved by the change of the deal, so the deal moved from
+    the stage of the version to the stage of the next version at the time
+    of the change. The time in the stage is counted from the entry of the
+    deal to the stage (or from the creation of the deal).
+
+    Args:
+        rows: The new versions of the deals in the order of the changes.
+        entries: The known entries of the deals to their sale stages.
+
+    Returns:
+        The rollups of the versions and the new entries of the deals.
+    """
+    entries = dict(entries)
+    changed_deal_ids: set[UUID] = set()
+    rollups: dict[tuple, DealStageRollupDTO] = {}
+
+    for row in rows:
+        if (
+            row.next_sale_stage_id is None
+            or row.next_sale_stage_id == row.sale_stage_id
+        ):
+            # the deal is deleted or the stage isn't changed
+            continue
+
+        entry = entries.get(row.deal_id)
+        entered_at = (
+            entry.entered_at
+            if entry and entry.sale_stage_id == row.sale_stage_id
+            else row.deal_created_at
+        )
+
+        day = row.changed_at.astimezone(UTC).date()
+        key = (day, row.sale_stage_id, row.next_sale_stage_id, row.manager_id)
+        rollup = rollups.setdefault(
+            key,
+            DealStageRollupDTO(
+                day=day,
+                from_sale_stage_id=row.sale_stage_id,
+                to_sale_stage_id=row.next_sale_stage_id,
+                manager_id=row.manager_id,
+                transitions=0,
+                duration_total=0,
+                duration_histogram=[0] * DURATION_BUCKETS_COUNT,
+            ),
+        )
+        rollup.transitions += 1
+        # the time in the stage of the deleted deal can be unknown
+        if entered_at is not None:
+            duration = max((row.changed_at - entered_at).total_seconds(), 0)
+            rollup.duration_total += duration
+            rollup.duration_histogram[get_duration_bucket(duration)] += 1
+
+        entries[row.deal_id] = DealStageEntryDTO(
+            deal_id=row.deal_id,
+            sale_stage_id=row.next_sale_stage_id,
+            entered_at=row.changed_at,
+        )
+        # the entries of the deleted deals aren't saved
+        if row.deal_created_at is not None:
+            changed_deal_ids.add(row.deal_id)
+
+    return DealHistoryFoldDTO(
+        rollups=list(rollups.values()),
+        entries=[entries[deal_id] for deal_id in changed_deal_ids],
+    )
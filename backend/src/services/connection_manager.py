@@ -1,20 +1,141 @@
-from datetime import UTC, datetime
+import asyncio
+from collections.abc import Callable
+from contextlib import suppress
 from pathlib import Path
+from time import monotonic
 from uuid import UUID
 
 from fastapi import WebSocket
+from pydantic import BaseModel
+from starlette.status import WS_1008_POLICY_VIOLATION
 
+from core.config import chat_settings
 from core.logger.logger import get_configure_logger
 from domain.exceptions import ChatNotActiveError
-from schemas.message_schema import MessageResponseSchema
+from services.abc.chat_broker_abc import AbstractChatBroker
+from services.chat_broker import chat_broker
 
 logger = get_configure_logger(Path(__file__).stem)
 
 
+class RoomDeliveryMetrics(BaseModel):
+    delivered_total: int = 0
+    dropped_connections_total: int = 0
+    # time from the receiving of the message by the worker to the sending
+    # of it to the member in seconds
+    last_latency: float = 0
+    max_latency: float = 0
+
+
+class ChatConnection:
+    """Connection of the chat member with the own bounded send queue.
+
+    The messages are sent by the writer task of the connection, so the slow
+    member doesn't delay the delivery to other members of the room.
+    """
+
+    def __init__(
+        self,
+        websocket: WebSocket,
+        send_queue_size: int,
+        send_timeout: float,
+        on_sent: Callable[[float], None],
+        on_failed: Callable[[], None],
+    ):
+        self.websocket = websocket
+        # the connection is dropped, but isn't closed yet
+        self.dropped = False
+        self.__queue: asyncio.Queue[tuple[str, float]] = asyncio.Queue(
+            maxsize=send_queue_size
+        )
+        self.__send_timeout = send_timeout
+        self.__on_sent = on_sent
+        self.__on_failed = on_failed
+        self.__writer = asyncio.create_task(self.__write())
+
+    def send(self, payload: str) -> bool:
+        """Queue the message.
+
+        Returns:
+            False if the send queue is full (the member is too slow).
+        """
+        try:
+            self.__queue.put_nowait((payload, monotonic()))
+        except asyncio.QueueFull:
+            return False
+        return True
+
+    async def __write(self) -> None:
+        while True:
+            payload, queued_at = await self.__queue.get()
+            try:
+                await asyncio.wait_for(
+                    self.websocket.send_text(payload), self.__send_timeout
+                )
+            except Exception:
+                logger.warning("Message sending failed", exc_info=True)
+                self.__on_failed()
+                return
+            self.__on_sent(monotonic() - queued_at)
+
+    async def close(self, code: int | None = None, reason: str = "") -> None:
+        """Stop the writer task and close the websocket, if code is set."""
+        self.__writer.cancel()
+        if code is not None:
+            with suppress(Exception):
+                await self.websocket.close(code=code, reason=reason)
+
+
 class WebSocketManager:
-    def __init__(self):
-        # Хранение активных соединений в виде {room_id: {user_id: WebSocket}}
-        self.active_connections: dict[UUID, dict[UUID, WebSocket]] = {}
+    def __init__(
+        self,
+        broker: AbstractChatBroker,
+        send_queue_size: int,
+        send_timeout: float,
+    ):
+        # Хранение активных соединений: room_id -> user_id -> ChatConnection
+        self.active_connections: dict[UUID, dict[UUID, ChatConnection]] = {}
+        # the messages of the rooms are delivered by the broker, so the
+        # members of the room can be connected to the different workers
+        self.__broker = broker
+        self.__send_queue_size = send_queue_size
+        self.__send_timeout = send_timeout
+        self.__room_metrics: dict[UUID, RoomDeliveryMetrics] = {}
+        # the closing connections of the slow members
+        self.__closing_tasks: set[asyncio.Task] = set()
+
+    def get_room_metrics(self, room_id: UUID) -> RoomDeliveryMetrics | None:
+        metrics = self.__room_metrics.get(room_id)
+        return metrics.model_copy() if metrics else None
+
+    def __record_delivery(self, room_id: UUID, latency: float) -> None:
+        if metrics := self.__room_metrics.get(room_id):
+            metrics.delivered_total += 1
+            metrics.last_latency = latency
+            metrics.max_latency = max(metrics.max_latency, latency)
+
+    def __drop(self, room_id: UUID, user_id: UUID) -> None:
+        """Disconnect the slow (or broken) connection of the member."""
+        connection = self.active_connections.get(room_id, {}).get(user_id)
+        if connection is None or connection.dropped:
+            return
+        connection.dropped = True
+
+        logger.warning(
+            "Slow user %s is disconnected from the %s room", user_id, room_id
+        )
+        if metrics := self.__room_metrics.get(room_id):
+            metrics.dropped_connections_total += 1
+
+        async def close() -> None:
+            await self.disconnect(room_id=room_id, user_id=user_id)
+            await connection.close(
+                code=WS_1008_POLICY_VIOLATION, reason="Too slow consumer"
+            )
+
+        task = asyncio.create_task(close())
+        self.__closing_tasks.add(task)
+        task.add_done_callback(self.__closing_tasks.discard)
 
     async def connect(
         self,
@@ -33,9 +154,17 @@ class WebSocketManager:
                 room_id,
             )
             self.active_connections[room_id] = {}
-        self.active_connections[room_id][user_id] = websocket
+            self.__room_metrics[room_id] = RoomDeliveryMetrics()
+            await self.__broker.subscribe(room_id)
+        self.active_connections[room_id][user_id] = ChatConnection(
+            websocket=websocket,
+            send_queue_size=self.__send_queue_size,
+            send_timeout=self.__send_timeout,
+            on_sent=lambda latency: self.__record_delivery(room_id, latency),
+            on_failed=lambda: self.__drop(room_id, user_id),
+        )
 
-    def disconnect(
+    async def disconnect(
         self,
         room_id: UUID,
         user_id: UUID,
@@ -48,45 +177,63 @@ class WebSocketManager:
             room_id in self.active_connections
             and user_id in self.active_connections[room_id]
         ):
-            del self.active_connections[room_id][user_id]
+            connection = self.active_connections[room_id].pop(user_id)
+            await connection.close()
             if not self.active_connections[room_id]:
                 del self.active_connections[room_id]
+                del self.__room_metrics[room_id]
+                await self.__broker.unsubscribe(room_id)
 
-    async def broadcast(
-        self,
-        message: str,
-        room_id: UUID,
-        sender_id: UUID,
-    ):
+    async def broadcast(self, room_id: UUID, payload: str):
         """
         Рассылает сообщение всем пользователям в комнате.
+        The serialized message is published to the broker and delivered to
+        the members of the room on every worker by `deliver`.
+
+        Raises:
+            ChatNotActiveError: If the room hasn't the local members.
         """
-        room_id = room_id
-        sender_id = sender_id
-        if room_id in self.active_connections:
-            for user_id, connection in self.active_connections[
-                room_id
-            ].items():
-                logger.debug(
-                    "Message received from user %s in the %s room",
-                    user_id,
-                    room_id,
-                )
-                message_schema = MessageResponseSchema(
-                    deal_id=room_id,
-                    message=message,
-                    user_id=sender_id,
-                    sent_at=datetime.now(tz=UTC),
-                )
-                await connection.send_json(message_schema)
-        else:
+        if room_id not in self.active_connections:
             raise ChatNotActiveError(
                 f"Chat with id {room_id} does not active."
             )
 
+        await self.__broker.publish(room_id, payload)
+
+    async def deliver(self, room_id: UUID, payload: str):
+        """Queue the message of the room to the local members of the room.
+
+        The payload is serialized once by the sender. The member, whose
+        send queue is full, is disconnected (it can fetch the missed
+        messages by the message cursor after the reconnection).
+        """
+        for user_id, connection in list(
+            self.active_connections.get(room_id, {}).items()
+        ):
+            if not connection.send(payload):
+                self.__drop(room_id, user_id)
+
+    async def send_to(self, room_id: UUID, user_id: UUID, payload: str):
+        """Queue the message to the local member of the room.
+
+        The message is sent after the messages queued before it. The member,
+        whose send queue is full, is disconnected.
+        """
+        connection = self.active_connections.get(room_id, {}).get(user_id)
+        if connection is not None and not connection.send(payload):
+            self.__drop(room_id, user_id)
+
+    async def run(self):
+        """Deliver the messages of the broker until cancelled."""
+        await self.__broker.listen(self.deliver)
+
 
 # create the instance
-websocket_manager = WebSocketManager()
+websocket_manager = WebSocketManager(
+    broker=chat_broker,
+    send_queue_size=chat_settings.send_queue_size,
+    send_timeout=chat_settings.send_timeout,
+)
 
 
 def websocket_maganer_dependency() -> WebSocketManager:
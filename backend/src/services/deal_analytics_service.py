@@ -0,0 +1,227 @@
+from collections import defaultdict
+from datetime import date
+from uuid import UUID
+
+from fastapi import Depends
+
+from core.general_constants import COMPLETED_SALE_STAGE_ID
+from domain.enums import ForecastDimension
+from dto.deal_analytics_dto import (
+    DealStageRollupDTO,
+    FunnelStageDTO,
+    ManagerThroughputDTO,
+    RevenueForecastDTO,
+    SaleStageDTO,
+    StageDurationDTO,
+    StagePercentileDTO,
+)
+from repository.deal_analytics_repository import (
+    DealAnalyticsRepository,
+    deal_analytics_repository_dependency,
+)
+from services.classes.stage_rollup import get_percentile, merge_histograms
+from services.deal_forecast_cache import (
+    DealForecastCache,
+    deal_forecast_cache,
+)
+
+
+class DealAnalyticsService:
+    """Sales funnel analytics served from the daily stage rollups.
+
+    The rollups of the period are merged in memory, the percentiles of the
+    time in the stages are estimated by the merged histograms. The revenue
+    forecast is calculated by the cached snapshot of the open deals.
+    """
+
+    def __init__(
+        self,
+        analytics_repository: DealAnalyticsRepository,
+        forecast_cache: DealForecastCache,
+    ):
+        self.__analytics_repository = analytics_repository
+        self.__forecast_cache = forecast_cache
+
+    async def __get_funnel_stages(self) -> list[SaleStageDTO]:
+        """Get the sale stages in the order of the funnel."""
+        stages = await self.__analytics_repository.get_sale_stages()
+        stages_by_id = {stage.sale_stage_id: stage for stage in stages}
+        next_stage_ids = {stage.next_sale_stage_id for stage in stages}
+
+        ordered: list[SaleStageDTO] = []
+        for stage in stages:
+            if stage.sale_stage_id in next_stage_ids:
+                continue
+            # the first stage of the chain
+            current: SaleStageDTO | None = stage
+            while current is not None and current not in ordered:
+                ordered.append(current)
+                current = (
+                    stages_by_id.get(current.next_sale_stage_id)
+                    if current.next_sale_stage_id is not None
+                    else None
+                )
+
+        # the stages of the cycles
+        ordered.extend(stage for stage in stages if stage not in ordered)
+        return ordered
+
+    async def get_funnel(
+        self, date_from: date, date_to: date
+    ) -> list[FunnelStageDTO]:
+        """Get the conversion of every sale stage to the next one."""
+        stages = await self.__get_funnel_stages()
+        rollups = await self.__analytics_repository.get_stage_rollups(
+            date_from, date_to
+        )
+
+        entered: dict[int, int] = defaultdict(int)
+        exited: dict[int, int] = defaultdict(int)
+        advanced: dict[int, int] = defaultdict(int)
+        next_stage_ids = {
+            stage.sale_stage_id: stage.next_sale_stage_id for stage in stages
+        }
+        for rollup in rollups:
+            entered[rollup.to_sale_stage_id] += rollup.transitions
+            exited[rollup.from_sale_stage_id] += rollup.transitions
+            if (
+                next_stage_ids.get(rollup.from_sale_stage_id)
+                == rollup.to_sale_stage_id
+            ):
+                advanced[rollup.from_sale_stage_id] += rollup.transitions
+
+        return [
+            FunnelStageDTO(
+                sale_stage_id=stage.sale_stage_id,
+                name=stage.name,
+                entered=entered[stage.sale_stage_id],
+                exited=exited[stage.sale_stage_id],
+                advanced=advanced[stage.sale_stage_id],
+                conversion=advanced[stage.sale_stage_id]
+                / exited[stage.sale_stage_id]
+                if exited[stage.sale_stage_id]
+                else None,
+            )
+            for stage in stages
+        ]
+
+    async def get_time_in_stage(
+        self, date_from: date, date_to: date, percentiles: list[float]
+    ) -> list[StageDurationDTO]:
+        """Get the distribution of the time in every sale stage.
+
+        The time is counted for the deals, that left the stage in the
+        period.
+        """
+        stages = await self.__get_funnel_stages()
+        rollups = await self.__analytics_repository.get_stage_rollups(
+            date_from, date_to
+        )
+
+        stage_rollups: dict[int, list[DealStageRollupDTO]] = defaultdict(list)
+        for rollup in rollups:
+            stage_rollups[rollup.from_sale_stage_id].append(rollup)
+
+        durations: list[StageDurationDTO] = []
+        for stage in stages:
+            histogram = merge_histograms(
+                rollup.duration_histogram
+                for rollup in stage_rollups[stage.sale_stage_id]
+            )
+            count = sum(histogram)
+            duration_total = sum(
+                rollup.duration_total
+                for rollup in stage_rollups[stage.sale_stage_id]
+            )
+            durations.append(
+                StageDurationDTO(
+                    sale_stage_id=stage.sale_stage_id,
+                    name=stage.name,
+                    count=count,
+                    mean_seconds=duration_total / count if count else None,
+                    percentiles=[
+                        StagePercentileDTO(
+                            percentile=percentile,
+                            seconds=get_percentile(histogram, percentile),
+                        )
+                        for percentile in percentiles
+                    ]
+                    if count
+                    else [],
+                )
+            )
+
+        return durations
+
+    async def get_manager_throughput(
+        self, date_from: date, date_to: date
+    ) -> list[ManagerThroughputDTO]:
+        """Get the moves of the deals between the stages by the managers.
+
+        The throughput is ordered by the count of the won deals.
+        """
+        stages = await self.__analytics_repository.get_sale_stages()
+        rollups = await self.__analytics_repository.get_stage_rollups(
+            date_from, date_to
+        )
+        next_stage_ids = {
+            stage.sale_stage_id: stage.next_sale_stage_id for stage in stages
+        }
+        days = (date_to - date_from).days + 1
+
+        throughput: dict[UUID, ManagerThroughputDTO] = {}
+        for rollup in rollups:
+            if rollup.manager_id is None:
+                continue
+
+            manager = throughput.setdefault(
+                rollup.manager_id,
+                ManagerThroughputDTO(
+                    manager_id=rollup.manager_id,
+                    transitions=0,
+                    advanced=0,
+                    won=0,
+                    transitions_per_day=0,
+                ),
+            )
+            manager.transitions += rollup.transitions
+            if (
+                next_stage_ids.get(rollup.from_sale_stage_id)
+                == rollup.to_sale_stage_id
+            ):
+                manager.advanced += rollup.transitions
+            if rollup.to_sale_stage_id == COMPLETED_SALE_STAGE_ID:
+                manager.won += rollup.transitions
+
+        for manager in throughput.values():
+            manager.transitions_per_day = manager.transitions / days
+
+        return sorted(
+            throughput.values(),
+            key=lambda manager: (manager.won, manager.transitions),
+            reverse=True,
+        )
+
+    async def get_revenue_forecast(
+        self, group_by: list[ForecastDimension]
+    ) -> RevenueForecastDTO:
+        """Get the probability-weighted revenue of the open deals.
+
+        Args:
+            group_by: The dimensions of the forecast buckets.
+        """
+        return await self.__forecast_cache.get_or_load(
+            group_by=group_by,
+            load=self.__analytics_repository.get_open_deal_columns,
+        )
+
+
+def deal_analytics_service_dependency(
+    analytics_repository: DealAnalyticsRepository = Depends(
+        deal_analytics_repository_dependency
+    ),
+) -> DealAnalyticsService:
+    return DealAnalyticsService(
+        analytics_repository=analytics_repository,
+        forecast_cache=deal_forecast_cache,
+    )
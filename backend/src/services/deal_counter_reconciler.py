@@ -0,0 +1,87 @@
+from collections.abc import Awaitable, Callable
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import crm_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from repository.deal_repository import DealRepository
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealCounterReconcilerMetrics(PeriodicJobMetrics):
+    corrected_rows_total: int = 0
+
+
+class DealCounterReconciler:
+    """Periodic correction of the counters of the open deals.
+
+    The counters (e.g. the open deals counts of the managers, the kanban
+    board of the sale stages) are maintained incrementally by the deal
+    triggers. The reconciliation of the repository corrects the drift
+    (e.g. after the manual data changes) and returns the count of the
+    corrected rows.
+    """
+
+    def __init__(
+        self,
+        name: str,
+        session_factory: async_sessionmaker[AsyncSession],
+        reconcile: Callable[[DealRepository], Awaitable[int]],
+        interval: int,
+    ):
+        self.__name = name
+        self.__session_factory = session_factory
+        self.__reconcile = reconcile
+        self.__metrics = DealCounterReconcilerMetrics()
+        self.__job = PeriodicJob(
+            name=f"{name} reconciliation",
+            step=self.reconcile,
+            metrics=self.__metrics,
+            interval=interval,
+        )
+
+    @property
+    def metrics(self) -> DealCounterReconcilerMetrics:
+        return self.__metrics.model_copy()
+
+    async def reconcile(self) -> int:
+        """Correct the counters.
+
+        Returns:
+            The count of the corrected rows.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        async with self.__session_factory() as session:
+            corrected_rows = await self.__reconcile(DealRepository(session))
+
+        self.__metrics.corrected_rows_total += corrected_rows
+        if corrected_rows:
+            logger.warning(
+                "%s drift corrected: %s", self.__name, corrected_rows
+            )
+        return corrected_rows
+
+    async def run(self) -> None:
+        """Reconcile every `interval` seconds until cancelled."""
+        await self.__job.run()
+
+
+# create the instances
+manager_load_reconciler = DealCounterReconciler(
+    name="Manager load",
+    session_factory=postgres_helper.session_factory,
+    reconcile=DealRepository.reconcile_manager_load,
+    interval=crm_settings.manager_load_reconcile_interval,
+)
+deal_stage_board_reconciler = DealCounterReconciler(
+    name="Deal stage board",
+    session_factory=postgres_helper.session_factory,
+    reconcile=DealRepository.reconcile_deal_stage_board,
+    interval=crm_settings.deal_stage_board_reconcile_interval,
+)
@@ -0,0 +1,273 @@
+import asyncio
+from collections.abc import AsyncIterator
+from pathlib import Path
+from uuid import UUID
+
+from pydantic import BaseModel, ValidationError
+from redis.exceptions import RedisError
+
+from core.config import crm_settings
+from core.logger.logger import get_configure_logger
+from domain.enums import DealEventType
+from dto.deal_dto import DealEventDTO, DealStreamEventDTO
+from repository.deal_event_repository import (
+    DealEventRepository,
+    deal_event_repository,
+)
+
+logger = get_configure_logger(Path(__file__).stem)
+
+# the max count of the events of one read
+DEAL_EVENTS_READ_COUNT = 100
+# the max time of the blocking read in seconds
+DEAL_EVENTS_READ_TIMEOUT = 5.0
+
+
+def get_stream_position(event_id: str) -> tuple[int, int]:
+    """Get the comparable position of the stream ID "<ms>-<seq>"."""
+    milliseconds, sequence = event_id.split("-")
+    return int(milliseconds), int(sequence)
+
+
+def is_event_member(user_id: UUID, event: DealEventDTO) -> bool:
+    return user_id in (event.lead_id, event.manager_id)
+
+
+class DealEventSubscription:
+    """The queue of the events of one client stream."""
+
+    def __init__(self, user_id: UUID, queue_size: int):
+        self.user_id = user_id
+        self.queue: asyncio.Queue[DealStreamEventDTO] = asyncio.Queue(
+            maxsize=queue_size
+        )
+        # the queue was full, so the client missed the events
+        self.overflowed = False
+
+    def put(self, event: DealStreamEventDTO) -> None:
+        if self.overflowed:
+            return
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            self.overflowed = True
+
+
+class DealEventStreamMetrics(BaseModel):
+    failed_reads: int = 0
+    # count of the skipped events with the invalid payloads
+    invalid_events_total: int = 0
+
+
+class DealEventStream:
+    """Stream of the deal changes for the dashboards.
+
+    The events of the deal writes are appended to the capped Redis stream,
+    so every worker gets the events of all workers. The worker reads the
+    stream by one blocking read (`run`) and fans the events out to the
+    queues of its client streams, so the idle clients don't hold the
+    Redis connections.
+
+    The client resumes the stream after the ID of its last event: the kept
+    events after it are replayed from Redis before the live events. If the
+    events after it aren't kept anymore (or the queue of the slow client is
+    full), the client gets the reset event and reloads the deals.
+    """
+
+    def __init__(
+        self,
+        event_repository: DealEventRepository,
+        replay_limit: int,
+        queue_size: int,
+        heartbeat_interval: float,
+    ):
+        self.__event_repository = event_repository
+        self.__replay_limit = replay_limit
+        self.__queue_size = queue_size
+        self.__heartbeat_interval = heartbeat_interval
+        self.__subscriptions: set[DealEventSubscription] = set()
+        self.__has_subscriptions = asyncio.Event()
+        self.__metrics = DealEventStreamMetrics()
+
+    @property
+    def metrics(self) -> DealEventStreamMetrics:
+        return self.__metrics.model_copy()
+
+    async def publish(self, event: DealEventDTO) -> None:
+        """Publish the event of the deal write.
+
+        The event is best effort: Redis failures don't fail the write, the
+        clients see the change after the reload.
+        """
+        try:
+            await self.__event_repository.append(event.model_dump_json())
+        except RedisError:
+            logger.warning(
+                "Event %s of the deal %s isn't published",
+                event.event_type,
+                event.deal_id,
+            )
+
+    def __parse(self, event_id: str, payload: str) -> DealEventDTO | None:
+        """Get the event of the stream entry or None, if it's invalid."""
+        try:
+            return DealEventDTO.model_validate_json(payload)
+        except ValidationError:
+            self.__metrics.invalid_events_total += 1
+            logger.error(
+                "Deal event %s is invalid and skipped", event_id, exc_info=True
+            )
+            return None
+
+    def dispatch(self, event_id: str, event: DealEventDTO) -> None:
+        """Put the event to the queues of the members of the deal."""
+        stream_event = DealStreamEventDTO(
+            event_id=event_id, event_type=event.event_type, event=event
+        )
+        for subscription in self.__subscriptions:
+            if is_event_member(subscription.user_id, event):
+                subscription.put(stream_event)
+
+    async def __replay(
+        self, user_id: UUID, last_event_id: str
+    ) -> list[DealStreamEventDTO] | None:
+        """Get the kept events of the user after the last event.
+
+        Returns:
+            The events or None, if the events after the last event aren't
+            kept anymore.
+        """
+        first_id = await self.__event_repository.get_first_id()
+        if first_id is not None and get_stream_position(
+            first_id
+        ) > get_stream_position(last_event_id):
+            return None
+
+        entries = await self.__event_repository.get_after(
+            last_event_id, self.__replay_limit
+        )
+        if len(entries) == self.__replay_limit:
+            return None
+
+        events = []
+        for event_id, payload in entries:
+            event = self.__parse(event_id, payload)
+            if event is not None and is_event_member(user_id, event):
+                events.append(
+                    DealStreamEventDTO(
+                        event_id=event_id,
+                        event_type=event.event_type,
+                        event=event,
+                    )
+                )
+        return events
+
+    async def subscribe(
+        self, user_id: UUID, last_event_id: str | None = None
+    ) -> AsyncIterator[DealStreamEventDTO | None]:
+        """Stream the events of the deals of the user.
+
+        Args:
+            user_id: The ID of the lead or the manager of the deals.
+            last_event_id: The ID of the last event of the resumed stream.
+
+        Yields:
+            The events or None, when the stream is idle for the heartbeat
+            interval.
+        """
+        subscription = DealEventSubscription(user_id, self.__queue_size)
+        # the subscription is added before the replay, so the events of the
+        # replay time are queued and the duplicates are skipped below
+        self.__subscriptions.add(subscription)
+        self.__has_subscriptions.set()
+        try:
+            position = None
+            if last_event_id is not None:
+                try:
+                    events = await self.__replay(user_id, last_event_id)
+                except RedisError:
+                    events = None
+
+                if events is None:
+                    yield DealStreamEventDTO(event_type=DealEventType.RESET)
+                else:
+                    position = get_stream_position(last_event_id)
+                    for event in events:
+                        yield event
+                        position = get_stream_position(event.event_id)  # type: ignore
+
+            while True:
+                if subscription.overflowed:
+                    subscription.queue = asyncio.Queue(
+                        maxsize=self.__queue_size
+                    )
+                    subscription.overflowed = False
+                    position = None
+                    yield DealStreamEventDTO(event_type=DealEventType.RESET)
+
+                try:
+                    event = await asyncio.wait_for(
+                        subscription.queue.get(),
+                        timeout=self.__heartbeat_interval,
+                    )
+                except TimeoutError:
+                    yield None
+                    continue
+
+                if (
+                    position is not None
+                    and get_stream_position(event.event_id) <= position  # type: ignore
+                ):
+                    continue
+                yield event
+        finally:
+            self.__subscriptions.discard(subscription)
+            if not self.__subscriptions:
+                self.__has_subscriptions.clear()
+
+    async def run(self) -> None:
+        """Read the new events of the stream and dispatch them.
+
+        The failed read is retried after the pause, the invalid events are
+        skipped.
+        """
+        last_event_id = None
+        while True:
+            if not self.__subscriptions:
+                # the worker without the clients doesn't read the stream,
+                # the next client gets the events after its subscription
+                last_event_id = None
+                await self.__has_subscriptions.wait()
+
+            try:
+                if last_event_id is None:
+                    last_event_id = await self.__event_repository.get_last_id()
+                entries = await self.__event_repository.wait_after(
+                    last_event_id,
+                    count=DEAL_EVENTS_READ_COUNT,
+                    timeout=DEAL_EVENTS_READ_TIMEOUT,
+                )
+            except Exception:
+                self.__metrics.failed_reads += 1
+                logger.error("Deal events reading failed", exc_info=True)
+                await asyncio.sleep(1)
+                continue
+
+            for event_id, payload in entries:
+                last_event_id = event_id
+                event = self.__parse(event_id, payload)
+                if event is not None:
+                    self.dispatch(event_id, event)
+
+
+# create the instance
+deal_event_stream = DealEventStream(
+    event_repository=deal_event_repository,
+    replay_limit=crm_settings.deal_events_replay_limit,
+    queue_size=crm_settings.deal_events_queue_size,
+    heartbeat_interval=crm_settings.deal_events_heartbeat_interval,
+)
+
+
+def deal_event_stream_dependency() -> DealEventStream:
+    return deal_event_stream
@@ -0,0 +1,119 @@
+import asyncio
+from collections.abc import Awaitable, Callable, Sequence
+from pathlib import Path
+from time import monotonic
+
+from redis.exceptions import RedisError
+
+from core.config import cache_settings
+from core.logger.logger import get_configure_logger
+from domain.enums import ForecastDimension
+from dto.deal_analytics_dto import RevenueForecastDTO
+from repository.deal_forecast_cache_repository import (
+    DealForecastCacheRepository,
+    deal_forecast_cache_repository,
+)
+from services.classes.revenue_forecast import (
+    OpenDealColumns,
+    get_revenue_forecast,
+)
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealForecastCache:
+    """Cache of the open deals snapshot and of the forecasts by it.
+
+    The snapshot is kept in the memory of the worker and is reloaded, when
+    the generation of the open deals in Redis is changed by the deal write
+    (of any worker) or the snapshot is expired. The forecasts are
+    calculated once per snapshot and grouping.
+
+    The concurrent misses of the worker share one load. Redis failures
+    don't fail the requests: the snapshot is invalidated by the `ttl` only.
+    """
+
+    def __init__(
+        self, cache_repository: DealForecastCacheRepository, ttl: int
+    ):
+        self.__cache_repository = cache_repository
+        self.__ttl = ttl
+        self.__lock = asyncio.Lock()
+        self.__snapshot: OpenDealColumns | None = None
+        self.__generation: int | None = None
+        self.__expires_at = 0.0
+        self.__forecasts: dict[
+            tuple[ForecastDimension, ...], RevenueForecastDTO
+        ] = {}
+
+    async def __get_generation(self) -> int | None:
+        try:
+            return await self.__cache_repository.get_generation()
+        except RedisError:
+            return None
+
+    def __is_fresh(self, generation: int | None) -> bool:
+        return (
+            self.__snapshot is not None
+            and monotonic() < self.__expires_at
+            and (generation is None or generation == self.__generation)
+        )
+
+    async def get_or_load(
+        self,
+        group_by: Sequence[ForecastDimension],
+        load: Callable[[], Awaitable[OpenDealColumns]],
+    ) -> RevenueForecastDTO:
+        """Get the forecast by the cached snapshot or load the snapshot.
+
+        Args:
+            group_by: The dimensions of the forecast buckets.
+            load: The function, that loads the open deals on miss.
+
+        Returns:
+            The revenue forecast.
+        """
+        # the generation is got before the load, so the write during the
+        # load makes the loaded snapshot stale
+        generation = await self.__get_generation()
+        snapshot, forecasts = self.__snapshot, self.__forecasts
+        if snapshot is None or not self.__is_fresh(generation):
+            async with self.__lock:
+                if not self.__is_fresh(generation):
+                    self.__snapshot = await load()
+                    self.__generation = generation
+                    self.__expires_at = monotonic() + self.__ttl
+                    self.__forecasts = {}
+                    logger.debug("Loaded %s open deals", len(self.__snapshot))
+                snapshot, forecasts = self.__snapshot, self.__forecasts
+
+        # the dimensions are grouped in the order of the request
+        key = tuple(dict.fromkeys(group_by))
+        forecast = forecasts.get(key)
+        if forecast is None:
+            forecast = get_revenue_forecast(snapshot, key)  # type: ignore
+            forecasts[key] = forecast
+
+        return forecast
+
+    async def invalidate(self) -> None:
+        """Drop the snapshot of the worker and make the snapshots of other
+        workers stale.
+        """
+        self.__snapshot = None
+        self.__forecasts = {}
+
+        try:
+            await self.__cache_repository.increment_generation()
+        except RedisError:
+            logger.warning(
+                "Deal forecast isn't invalidated, it expires in %s seconds",
+                self.__ttl,
+            )
+
+
+# create the instance
+deal_forecast_cache = DealForecastCache(
+    cache_repository=deal_forecast_cache_repository,
+    ttl=cache_settings.deal_forecast_ttl,
+)
@@ -0,0 +1,100 @@
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import crm_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from dto.deal_dto import DealHistoryPruneDTO
+from repository.deal_repository import DealRepository
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealHistoryCompactorMetrics(PeriodicJobMetrics):
+    pruned_rows_total: int = 0
+    pruned_deals_total: int = 0
+    last_pruned_rows: int = 0
+
+
+class DealHistoryCompactor:
+    """Periodic pruning of the deal history.
+
+    The deal versions are saved by the save_deal_state trigger on every
+    change of the deal. The compactor keeps the newest `max_deal_saves`
+    versions of every deal, so the deal mutations don't prune the history
+    on the request path.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        max_deal_saves: int,
+        batch_size: int,
+        interval: int,
+    ):
+        self.__session_factory = session_factory
+        self.__max_deal_saves = max_deal_saves
+        self.__batch_size = batch_size
+        self.__metrics = DealHistoryCompactorMetrics()
+        self.__job = PeriodicJob(
+            name="Deal history prune",
+            step=self.compact,
+            metrics=self.__metrics,
+            interval=interval,
+        )
+
+    @property
+    def metrics(self) -> DealHistoryCompactorMetrics:
+        return self.__metrics.model_copy()
+
+    async def compact(self) -> DealHistoryPruneDTO:
+        """Prune the history of all deals over the max count of versions.
+
+        Returns:
+            The count of the deleted versions and the pruned deals.
+
+        Raises:
+            DealDBError: For general database API errors during the prune.
+        """
+        started_at = perf_counter()
+        total = DealHistoryPruneDTO()
+
+        while True:
+            async with self.__session_factory() as session:
+                batch = await DealRepository(session).prune_deal_history(
+                    max_deal_saves=self.__max_deal_saves,
+                    batch_size=self.__batch_size,
+                )
+            total.pruned_rows += batch.pruned_rows
+            total.pruned_deals += batch.pruned_deals
+
+            if batch.pruned_deals < self.__batch_size:
+                break
+
+        self.__metrics.pruned_rows_total += total.pruned_rows
+        self.__metrics.pruned_deals_total += total.pruned_deals
+        self.__metrics.last_pruned_rows = total.pruned_rows
+
+        logger.info(
+            "Deal history pruned: %s rows of %s deals in %.3f s",
+            total.pruned_rows,
+            total.pruned_deals,
+            perf_counter() - started_at,
+        )
+        return total
+
+    async def run(self) -> None:
+        """Prune the deal history every `interval` seconds until cancelled."""
+        await self.__job.run()
+
+
+# create the instance
+deal_history_compactor = DealHistoryCompactor(
+    session_factory=postgres_helper.session_factory,
+    max_deal_saves=crm_settings.max_deal_saves,
+    batch_size=crm_settings.deal_history_prune_batch_size,
+    interval=crm_settings.deal_history_prune_interval,
+)
@@ -0,0 +1,99 @@
+from pathlib import Path
+from time import perf_counter
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import crm_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from repository.deal_analytics_repository import DealAnalyticsRepository
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealHistoryRollupMetrics(PeriodicJobMetrics):
+    folded_rows_total: int = 0
+    last_folded_rows: int = 0
+
+
+class DealHistoryRollup:
+    """Periodic fold of the new deal history to the daily stage rollups.
+
+    Only the history rows after the watermark are read, so the cost of the
+    run depends on the count of the new changes of the deals, not on the
+    size of the history. The analytics endpoints read the rollups only.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        batch_size: int,
+        interval: int,
+        settle_delay: float,
+    ):
+        self.__session_factory = session_factory
+        self.__batch_size = batch_size
+        self.__settle_delay = settle_delay
+        self.__metrics = DealHistoryRollupMetrics()
+        self.__job = PeriodicJob(
+            name="Deal history fold",
+            step=self.fold,
+            metrics=self.__metrics,
+            interval=interval,
+        )
+
+    @property
+    def metrics(self) -> DealHistoryRollupMetrics:
+        return self.__metrics.model_copy()
+
+    async def fold(self) -> int:
+        """Fold all settled rows of the deal history after the watermark.
+
+        Returns:
+            The count of the folded rows.
+
+        Raises:
+            DealAnalyticsDBError: For general database API errors.
+        """
+        started_at = perf_counter()
+        folded_rows = 0
+
+        while True:
+            async with self.__session_factory() as session:
+                batch = await DealAnalyticsRepository(
+                    session
+                ).fold_deal_history(
+                    batch_size=self.__batch_size,
+                    settle_delay=self.__settle_delay,
+                )
+            folded_rows += batch
+
+            if batch < self.__batch_size:
+                break
+
+        self.__metrics.folded_rows_total += folded_rows
+        self.__metrics.last_folded_rows = folded_rows
+
+        logger.info(
+            "Deal history folded: %s rows in %.3f s",
+            folded_rows,
+            perf_counter() - started_at,
+        )
+        return folded_rows
+
+    async def run(self) -> None:
+        """Fold the deal history every `interval` seconds until cancelled.
+
+        The failed fold is retried by the next run after the watermark.
+        """
+        await self.__job.run()
+
+
+# create the instance
+deal_history_rollup = DealHistoryRollup(
+    session_factory=postgres_helper.session_factory,
+    batch_size=crm_settings.deal_history_rollup_batch_size,
+    interval=crm_settings.deal_history_rollup_interval,
+    settle_delay=crm_settings.deal_history_rollup_settle_delay,
+)
@@ -0,0 +1,249 @@
+import asyncio
+from contextlib import suppress
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import intake_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from domain.enums import DealEventType
+from domain.exceptions import (
+    DealAlreadyExistsError,
+    DealDBError,
+    DealError,
+    DealLeadNotFoundError,
+    DealManagerNotFoundError,
+    DealSaleStageNotFoundError,
+    ManagersDoesNotExistsError,
+)
+from dto.deal_dto import DealEventDTO, DealIntakeRequestDTO
+from repository.deal_repository import DealRepository
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+from services.deal_event_stream import DealEventStream, deal_event_stream
+from services.deal_forecast_cache import (
+    DealForecastCache,
+    deal_forecast_cache,
+)
+from services.deal_outbox_dispatcher import (
+    DealOutboxDispatcher,
+    deal_outbox_dispatcher,
+)
+
+logger = get_configure_logger(Path(__file__).stem)
+
+# the errors of the invalid requests, that aren't retried
+DEAL_INTAKE_REJECTIONS = (
+    DealAlreadyExistsError,
+    DealError,
+    DealLeadNotFoundError,
+    DealManagerNotFoundError,
+    DealSaleStageNotFoundError,
+)
+
+
+class DealIntakeWorkerMetrics(PeriodicJobMetrics):
+    processed_total: int = 0
+    rejected_total: int = 0
+    failed_attempts_total: int = 0
+    # count of the pending requests
+    queue_depth: int = 0
+    # age of the oldest pending request in seconds
+    lag: float = 0
+
+
+class DealIntakeWorker:
+    """Creation of the deals of the asynchronous intake.
+
+    The deal creation requests are queued by the endpoint, so the spikes of
+    the lead forms are absorbed by the queue table instead of the deal
+    upserts. The worker claims them by batches (the concurrent workers skip
+    the claimed requests) and creates the deals of the batch by one upsert.
+
+    If the batch is rejected by the database, the requests are processed
+    one by one, so only the invalid requests are failed. The requests
+    failed by the database errors are retried with the exponential backoff
+    up to `max_attempts` times.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        outbox_dispatcher: DealOutboxDispatcher,
+        forecast_cache: DealForecastCache,
+        event_stream: DealEventStream,
+        batch_size: int,
+        interval: float,
+        lease: float,
+        max_attempts: int,
+        base_backoff: float,
+        max_backoff: float,
+        retention: float,
+    ):
+        self.__session_factory = session_factory
+        self.__outbox_dispatcher = outbox_dispatcher
+        self.__forecast_cache = forecast_cache
+        self.__event_stream = event_stream
+        self.__batch_size = batch_size
+        self.__interval = interval
+        self.__lease = lease
+        self.__max_attempts = max_attempts
+        self.__base_backoff = base_backoff
+        self.__max_backoff = max_backoff
+        self.__retention = retention
+        self.__wakeup = asyncio.Event()
+        self.__metrics = DealIntakeWorkerMetrics()
+        self.__job = PeriodicJob(
+            name="Deal intake processing",
+            step=self.__process_queue,
+            metrics=self.__metrics,
+            wait=self.__wait_for_requests,
+        )
+
+    @property
+    def metrics(self) -> DealIntakeWorkerMetrics:
+        return self.__metrics.model_copy()
+
+    def wake(self) -> None:
+        """Start the processing without waiting for the next poll."""
+        self.__wakeup.set()
+
+    def _get_backoff(self, attempts: int) -> float:
+        return min(self.__base_backoff * 2**attempts, self.__max_backoff)
+
+    async def __create_deals(
+        self, requests: list[DealIntakeRequestDTO]
+    ) -> None:
+        async with self.__session_factory() as session:
+            deals = await DealRepository(session).create_intake_deals(requests)
+
+        # the side effects of the synchronous creation
+        self.__outbox_dispatcher.wake()
+        await self.__forecast_cache.invalidate()
+        for deal in deals:
+            await self.__event_stream.publish(
+                DealEventDTO(
+                    event_type=DealEventType.DEAL_CREATED,
+                    deal_id=deal.deal_id,
+                    lead_id=deal.lead_id,
+                    manager_id=deal.manager_id,
+                    sale_stage_id=deal.sale_stage_id,
+                )
+            )
+
+    async def __postpone(
+        self, request: DealIntakeRequestDTO, error: Exception
+    ) -> None:
+        rejected = isinstance(error, DEAL_INTAKE_REJECTIONS)
+        failed = rejected or request.attempts + 1 >= self.__max_attempts
+        if rejected:
+            self.__metrics.rejected_total += 1
+        else:
+            self.__metrics.failed_attempts_total += 1
+
+        delay = self._get_backoff(request.attempts)
+        logger.warning(
+            "Deal intake %s failed (attempt %s), %s",
+            request.intake_id,
+            request.attempts + 1,
+            "no retry" if failed else f"retry in {delay} s",
+            exc_info=error,
+        )
+        async with self.__session_factory() as session:
+            await DealRepository(session).postpone_deal_intake(
+                intake_id=request.intake_id,
+                delay=delay,
+                error_text=str(error),
+                failed=failed,
+            )
+
+    async def process(self) -> int:
+        """Create the deals of one batch of the pending requests.
+
+        Returns:
+            The count of the claimed requests. If it's less than the batch
+            size, there are no more pending requests.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        async with self.__session_factory() as session:
+            requests = await DealRepository(session).claim_deal_intakes(
+                batch_size=self.__batch_size, lease=self.__lease
+            )
+        if not requests:
+            return 0
+
+        try:
+            await self.__create_deals(requests)
+        except DEAL_INTAKE_REJECTIONS:
+            # the invalid requests are found one by one
+            for request in requests:
+                try:
+                    await self.__create_deals([request])
+                except (
+                    *DEAL_INTAKE_REJECTIONS,
+                    ManagersDoesNotExistsError,
+                    DealDBError,
+                ) as error:
+                    await self.__postpone(request, error)
+                else:
+                    self.__metrics.processed_total += 1
+        except (ManagersDoesNotExistsError, DealDBError) as error:
+            for request in requests:
+                await self.__postpone(request, error)
+        else:
+            self.__metrics.processed_total += len(requests)
+
+        return len(requests)
+
+    async def refresh_stats(self) -> None:
+        """Update the queue depth and the lag metrics.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        async with self.__session_factory() as session:
+            stats = await DealRepository(session).get_deal_intake_stats()
+
+        self.__metrics.queue_depth = stats.depth
+        self.__metrics.lag = stats.lag
+
+    async def __wait_for_requests(self) -> None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(
+                self.__wakeup.wait(), timeout=self.__interval
+            )
+        self.__wakeup.clear()
+
+    async def __process_queue(self) -> None:
+        while await self.process() == self.__batch_size:
+            pass
+        async with self.__session_factory() as session:
+            await DealRepository(session).delete_deal_intakes(
+                retention=self.__retention
+            )
+        await self.refresh_stats()
+
+    async def run(self) -> None:
+        """Process the requests until cancelled.
+
+        The queue is polled every `interval` seconds or after the wake up.
+        """
+        await self.__job.run()
+
+
+# create the instance
+deal_intake_worker = DealIntakeWorker(
+    session_factory=postgres_helper.session_factory,
+    outbox_dispatcher=deal_outbox_dispatcher,
+    forecast_cache=deal_forecast_cache,
+    event_stream=deal_event_stream,
+    batch_size=intake_settings.deal_intake_batch_size,
+    interval=intake_settings.deal_intake_interval,
+    lease=intake_settings.deal_intake_lease,
+    max_attempts=intake_settings.deal_intake_max_attempts,
+    base_backoff=intake_settings.deal_intake_base_backoff,
+    max_backoff=intake_settings.deal_intake_max_backoff,
+    retention=intake_settings.deal_intake_retention,
+)
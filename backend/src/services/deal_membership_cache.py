@@ -0,0 +1,50 @@
+from time import monotonic
+from uuid import UUID
+
+from core.config import chat_settings
+from dto.deal_dto import DealMembersDTO
+
+
+class DealMembershipCache:
+    """Cache of the deal members (the lead and the manager).
+
+    The members are checked on every chat message, so the check costs the
+    dict lookup instead of the deal query. The members are cached on the
+    connection to the chat and invalidated by the deal changes of the
+    worker, the `ttl` limits the staleness after the changes on other
+    workers. The oldest deals are evicted over `max_size`.
+    """
+
+    def __init__(self, ttl: float, max_size: int):
+        self.__ttl = ttl
+        self.__max_size = max_size
+        # deal_id -> (members, expiration time)
+        self.__members: dict[UUID, tuple[DealMembersDTO, float]] = {}
+
+    def get(self, deal_id: UUID) -> DealMembersDTO | None:
+        cached = self.__members.get(deal_id)
+        if cached is None:
+            return None
+
+        members, expires_at = cached
+        if expires_at < monotonic():
+            del self.__members[deal_id]
+            return None
+        return members
+
+    def set(self, deal_id: UUID, members: DealMembersDTO) -> None:
+        # the updated deal becomes the newest one
+        self.__members.pop(deal_id, None)
+        if len(self.__members) >= self.__max_size:
+            del self.__members[next(iter(self.__members))]
+        self.__members[deal_id] = (members, monotonic() + self.__ttl)
+
+    def invalidate(self, deal_id: UUID) -> None:
+        self.__members.pop(deal_id, None)
+
+
+# create the instance
+deal_membership_cache = DealMembershipCache(
+    ttl=chat_settings.membership_ttl,
+    max_size=chat_settings.membership_cache_size,
+)
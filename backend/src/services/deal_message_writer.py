@@ -0,0 +1,158 @@
+import asyncio
+from pathlib import Path
+from time import monotonic
+
+from pydantic import BaseModel
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import crm_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from dto.message_dto import MessageCreateDTO
+from repository.deal_repository import DealRepository
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealMessageWriterMetrics(BaseModel):
+    flushes: int = 0
+    written_messages_total: int = 0
+    failed_messages_total: int = 0
+    last_batch_size: int = 0
+    last_flush_duration: float = 0
+
+
+class DealMessageWriter:
+    """Group commit of the chat messages.
+
+    The messages of all chats are queued and written by one transaction
+    (the multi-row INSERT and one update of every touched deal) every
+    `flush_interval` seconds or when `max_batch_size` messages are queued.
+    The writer of the message waits until the transaction is committed, so
+    the returned message ID is the durability acknowledgement. The queue is
+    bounded, the writers wait for the free place in the full queue.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        flush_interval: float,
+        max_batch_size: int,
+        max_queue_size: int,
+    ):
+        self.__session_factory = session_factory
+        self.__flush_interval = flush_interval
+        self.__max_batch_size = max_batch_size
+        self.__queue: asyncio.Queue[
+            tuple[MessageCreateDTO, asyncio.Future[int]]
+        ] = asyncio.Queue(maxsize=max_queue_size)
+        # the messages taken from the queue, but not flushed yet
+        self.__batch: list[tuple[MessageCreateDTO, asyncio.Future[int]]] = []
+        self.__metrics = DealMessageWriterMetrics()
+
+    @property
+    def metrics(self) -> DealMessageWriterMetrics:
+        return self.__metrics.model_copy()
+
+    async def write(self, message_data: MessageCreateDTO) -> int:
+        """Queue the message and wait for its commit.
+
+        Returns:
+            The ID of the written message.
+
+        Raises:
+            DealNotFoundError: If the deal doesn't exist.
+            UserNotFoundError: If the user doesn't exist.
+            DealDBError: For general database API errors.
+        """
+        written = asyncio.get_running_loop().create_future()
+        await self.__queue.put((message_data, written))
+        return await written
+
+    async def __write_batch(self, messages_data: list[MessageCreateDTO]):
+        async with self.__session_factory() as session:
+            return await DealRepository(session).write_messages(messages_data)
+
+    async def flush(
+        self, batch: list[tuple[MessageCreateDTO, asyncio.Future[int]]]
+    ) -> None:
+        """Write the batch and resolve the futures of the writers.
+
+        If the batch fails (e.g. one of the deals is deleted), the messages
+        are written one by one, so only the invalid messages fail.
+        """
+        started_at = monotonic()
+        messages_data = [message_data for message_data, _ in batch]
+        try:
+            message_ids = await self.__write_batch(messages_data)
+            results: list[int | Exception] = list(message_ids)
+        except Exception:
+            logger.warning(
+                "The batch of %s messages failed, write them one by one",
+                len(batch),
+                exc_info=True,
+            )
+            results = []
+            for message_data in messages_data:
+                try:
+                    results.extend(await self.__write_batch([message_data]))
+                except Exception as error:
+                    results.append(error)
+
+        for (_, written), result in zip(batch, results, strict=True):
+            if written.done():
+                # the writer is cancelled (e.g. the chat is disconnected)
+                continue
+            if isinstance(result, Exception):
+                self.__metrics.failed_messages_total += 1
+                written.set_exception(result)
+            else:
+                self.__metrics.written_messages_total += 1
+                written.set_result(result)
+
+        self.__metrics.flushes += 1
+        self.__metrics.last_batch_size = len(batch)
+        self.__metrics.last_flush_duration = monotonic() - started_at
+
+    async def __collect_batch(self) -> None:
+        self.__batch.append(await self.__queue.get())
+        deadline = monotonic() + self.__flush_interval
+
+        while len(self.__batch) < self.__max_batch_size:
+            timeout = deadline - monotonic()
+            if timeout <= 0:
+                break
+            try:
+                self.__batch.append(
+                    await asyncio.wait_for(self.__queue.get(), timeout)
+                )
+            except TimeoutError:
+                break
+
+    async def __flush_collected(self) -> None:
+        batch, self.__batch = self.__batch, []
+        if batch:
+            await self.flush(batch)
+
+    async def run(self) -> None:
+        """Flush the queued messages until cancelled.
+
+        The queued messages are flushed before the cancellation.
+        """
+        try:
+            while True:
+                await self.__collect_batch()
+                await self.__flush_collected()
+        finally:
+            while not self.__queue.empty():
+                self.__batch.append(self.__queue.get_nowait())
+            await self.__flush_collected()
+
+
+# create the instance
+deal_message_writer = DealMessageWriter(
+    session_factory=postgres_helper.session_factory,
+    flush_interval=crm_settings.message_flush_interval,
+    max_batch_size=crm_settings.message_batch_size,
+    max_queue_size=crm_settings.message_queue_size,
+)
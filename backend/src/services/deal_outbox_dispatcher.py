@@ -0,0 +1,262 @@
+import asyncio
+from contextlib import suppress
+from datetime import UTC, datetime
+from pathlib import Path
+
+from aiogram.exceptions import TelegramRetryAfter
+from pydantic import ValidationError
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import outbox_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from domain.enums import DealOutboxEvent
+from dto.deal_dto import DealDTO, DealOutboxEventDTO
+from repository.deal_repository import DealRepository
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+from telegram.notification_manager import (
+    TelegramNotificationManager,
+    telegram_notification_manager,
+)
+
+logger = get_configure_logger(Path(__file__).stem)
+
+
+class DealOutboxDispatcherMetrics(PeriodicJobMetrics):
+    delivered_total: int = 0
+    failed_attempts_total: int = 0
+    # count of the events, that aren't retried anymore
+    failed_total: int = 0
+    # count of the undelivered events
+    queue_depth: int = 0
+    # age of the oldest undelivered event in seconds
+    lag: float = 0
+    # max time from the deal write to the delivery of the last batch
+    last_delivery_lag: float = 0
+
+
+class DealOutboxDispatcher:
+    """Delivery of the deal outbox events to the Telegram chat.
+
+    The events are saved by the deal repository in the transactions of the
+    deal writes. The dispatcher claims them by batches (the concurrent
+    dispatchers skip the claimed events), delivers them and deletes the
+    delivered ones. The failed events are retried with the exponential
+    backoff, so the outage of Telegram doesn't fail the deal requests. The
+    events are failed after `max_attempts` attempts, the events with the
+    invalid payloads are failed without the retries.
+
+    The new deals are accumulated for `digest_window` seconds (or until the
+    batch is full) and the batch of at least `digest_min_size` deals is
+    sent by one digest message. So only one batch of the events is kept in
+    memory, the rest of them wait in the outbox table.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        notification_manager: TelegramNotificationManager,
+        batch_size: int,
+        interval: float,
+        lease: float,
+        max_attempts: int,
+        base_backoff: float,
+        max_backoff: float,
+        digest_window: float,
+        digest_min_size: int,
+    ):
+        self.__session_factory = session_factory
+        self.__notification_manager = notification_manager
+        self.__batch_size = batch_size
+        self.__interval = interval
+        self.__lease = lease
+        self.__max_attempts = max_attempts
+        self.__base_backoff = base_backoff
+        self.__max_backoff = max_backoff
+        self.__digest_window = digest_window
+        self.__digest_min_size = digest_min_size
+        self.__wakeup = asyncio.Event()
+        self.__batch_full = asyncio.Event()
+        self.__pending_events = 0
+        self.__metrics = DealOutboxDispatcherMetrics()
+        self.__job = PeriodicJob(
+            name="Deal outbox dispatch",
+            step=self.__dispatch_outbox,
+            metrics=self.__metrics,
+            wait=self.__wait_for_events,
+        )
+
+    @property
+    def metrics(self) -> DealOutboxDispatcherMetrics:
+        return self.__metrics.model_copy()
+
+    def wake(self) -> None:
+        """Start the dispatch without waiting for the next poll.
+
+        The dispatch starts after the digest window, or immediately if the
+        batch of the new events is full.
+        """
+        self.__pending_events += 1
+        self.__wakeup.set()
+        if self.__pending_events >= self.__batch_size:
+            self.__batch_full.set()
+
+    def _get_backoff(self, attempts: int) -> float:
+        return min(self.__base_backoff * 2**attempts, self.__max_backoff)
+
+    @staticmethod
+    def __get_deal(event: DealOutboxEventDTO) -> DealDTO | None:
+        """Get the deal of the notification of the event.
+
+        Raises:
+            ValidationError: If the payload of the event is invalid.
+        """
+        if event.event_type == DealOutboxEvent.DEAL_CREATED:
+            return DealDTO.model_validate(event.payload)
+        return None
+
+    async def __deliver(self, deals: list[DealDTO]) -> None:
+        if len(deals) == 1:
+            await self.__notification_manager.send_deal_data(deals[0])
+        elif deals:
+            await self.__notification_manager.send_deals_digest(deals)
+
+    async def __postpone(
+        self, events: list[DealOutboxEventDTO], error: Exception
+    ) -> None:
+        rejected = isinstance(error, ValidationError)
+        for event in events:
+            failed = rejected or event.attempts + 1 >= self.__max_attempts
+            self.__metrics.failed_attempts_total += 1
+            if failed:
+                self.__metrics.failed_total += 1
+
+            delay = self._get_backoff(event.attempts)
+            if isinstance(error, TelegramRetryAfter):
+                delay = max(delay, error.retry_after)
+
+            logger.warning(
+                "Delivery of the outbox event %s failed (attempt %s), %s",
+                event.outbox_id,
+                event.attempts + 1,
+                "no retry" if failed else f"retry in {delay} s",
+                exc_info=error,
+            )
+            async with self.__session_factory() as session:
+                await DealRepository(session).postpone_outbox_event(
+                    outbox_id=event.outbox_id,
+                    delay=delay,
+                    error_text=str(error),
+                    failed=failed,
+                )
+
+    async def dispatch(self) -> int:
+        """Deliver one batch of the available outbox events.
+
+        Returns:
+            The count of the claimed events. If it's less than the batch
+            size, there are no more available events.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        async with self.__session_factory() as session:
+            events = await DealRepository(session).claim_outbox_events(
+                batch_size=self.__batch_size, lease=self.__lease
+            )
+
+        # the events with the invalid payloads are failed before the
+        # delivery, so they don't fail the digest
+        deliverable: list[tuple[DealOutboxEventDTO, DealDTO | None]] = []
+        for event in events:
+            try:
+                deliverable.append((event, self.__get_deal(event)))
+            except ValidationError as error:
+                await self.__postpone([event], error)
+
+        # the digest is delivered or failed as a whole
+        parts = (
+            [deliverable]
+            if len(deliverable) >= self.__digest_min_size
+            else [[item] for item in deliverable]
+        )
+        delivered: list[DealOutboxEventDTO] = []
+        for part in parts:
+            part_events = [event for event, _ in part]
+            try:
+                await self.__deliver([deal for _, deal in part if deal])
+            except Exception as error:
+                await self.__postpone(part_events, error)
+            else:
+                delivered.extend(part_events)
+
+        if delivered:
+            async with self.__session_factory() as session:
+                await DealRepository(session).delete_outbox_events(
+                    [event.outbox_id for event in delivered]
+                )
+
+            now = datetime.now(tz=UTC)
+            self.__metrics.delivered_total += len(delivered)
+            self.__metrics.last_delivery_lag = max(
+                (now - event.created_at).total_seconds() for event in delivered
+            )
+
+        return len(events)
+
+    async def refresh_stats(self) -> None:
+        """Update the queue depth and the lag metrics.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        async with self.__session_factory() as session:
+            stats = await DealRepository(session).get_outbox_stats()
+
+        self.__metrics.queue_depth = stats.depth
+        self.__metrics.lag = stats.lag
+
+    async def __wait_for_events(self) -> None:
+        with suppress(TimeoutError):
+            await asyncio.wait_for(
+                self.__wakeup.wait(), timeout=self.__interval
+            )
+
+        if self.__wakeup.is_set() and self.__digest_window:
+            # accumulate the new events to the digest
+            with suppress(TimeoutError):
+                await asyncio.wait_for(
+                    self.__batch_full.wait(), timeout=self.__digest_window
+                )
+
+        self.__wakeup.clear()
+        self.__batch_full.clear()
+        self.__pending_events = 0
+
+    async def __dispatch_outbox(self) -> None:
+        while await self.dispatch() == self.__batch_size:
+            pass
+        await self.refresh_stats()
+
+    async def run(self) -> None:
+        """Dispatch the events until cancelled.
+
+        The outbox is polled every `interval` seconds or after the digest
+        window since the wake up.
+        """
+        await self.__job.run()
+
+
+# create the instance
+deal_outbox_dispatcher = DealOutboxDispatcher(
+    session_factory=postgres_helper.session_factory,
+    notification_manager=telegram_notification_manager,
+    batch_size=outbox_settings.deal_outbox_batch_size,
+    interval=outbox_settings.deal_outbox_interval,
+    lease=outbox_settings.deal_outbox_lease,
+    max_attempts=outbox_settings.deal_outbox_max_attempts,
+    base_backoff=outbox_settings.deal_outbox_base_backoff,
+    max_backoff=outbox_settings.deal_outbox_max_backoff,
+    digest_window=outbox_settings.deal_outbox_digest_window,
+    digest_min_size=outbox_settings.deal_outbox_digest_min_size,
+)
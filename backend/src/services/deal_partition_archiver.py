@@ -0,0 +1,227 @@
+import asyncio
+from datetime import UTC, date, datetime
+from pathlib import Path
+
+from sqlalchemy.ext.asyncio import AsyncSession, async_sessionmaker
+
+from core.config import archive_settings
+from core.logger.logger import get_configure_logger
+from db.dependencies.postgres_helper import postgres_helper
+from dto.deal_dto import DealPartitionDTO
+from repository.deal_partition_repository import DealPartitionRepository
+from services.classes.partition_archive import (
+    PartitionArchiveWriter,
+    get_month,
+    shift_month,
+)
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+
+logger = get_configure_logger(Path(__file__).stem)
+
+# the partitioned tables and their partition keys
+DEAL_PARTITIONED_TABLES = {
+    "deal_message": "sent_at",
+    "deal_history": "changed_at",
+}
+
+
+class DealPartitionArchiverMetrics(PeriodicJobMetrics):
+    created_partitions_total: int = 0
+    archived_partitions_total: int = 0
+    archived_rows_total: int = 0
+
+
+class DealPartitionArchiver:
+    """Maintenance of the monthly partitions of the deal messages and the
+    deal history.
+
+    The partitions of the current and the next `premake_months` months are
+    created in advance, so the rows aren't written to the default
+    partition. The partitions older than the retention of the table are
+    detached (the queries don't see them since), exported to the gzip
+    NDJSON file `<directory>/<partition>.ndjson.gz` and dropped. The
+    partition is dropped only after the file is complete, the detached,
+    but not dropped partitions are exported again by the next run.
+
+    The history partitions with the rows, that aren't folded to the stage
+    rollups yet, are kept until the fold. The run of the worker is skipped,
+    while another worker archives.
+    """
+
+    def __init__(
+        self,
+        session_factory: async_sessionmaker[AsyncSession],
+        directory: Path,
+        batch_size: int,
+        premake_months: int,
+        retention_months: dict[str, int],
+        interval: int,
+    ):
+        self.__session_factory = session_factory
+        self.__directory = directory
+        self.__batch_size = batch_size
+        self.__premake_months = premake_months
+        self.__retention_months = retention_months
+        self.__metrics = DealPartitionArchiverMetrics()
+        self.__job = PeriodicJob(
+            name="Deal partitions archivation",
+            step=self.archive,
+            metrics=self.__metrics,
+            interval=interval,
+        )
+
+    @property
+    def metrics(self) -> DealPartitionArchiverMetrics:
+        return self.__metrics.model_copy()
+
+    async def create_partitions(self, today: date) -> int:
+        """Create the partitions of the current and the next months.
+
+        Returns:
+            The count of the created partitions.
+
+        Raises:
+            DealDBError: For general database API errors.
+        """
+        created = 0
+        for table_name, key_column in DEAL_PARTITIONED_TABLES.items():
+            for months in range(self.__premake_months + 1):
+                async with self.__session_factory() as session:
+                    created += await DealPartitionRepository(
+                        session
+                    ).create_month_partition(
+                        table_name=table_name,
+                        key_column=key_column,
+                        month=shift_month(get_month(today), months),
+                    )
+        return created
+
+    async def __export(self, partition_name: str) -> int:
+        writer = await asyncio.to_thread(
+            PartitionArchiveWriter,
+            self.__directory / f"{partition_name}.ndjson.gz",
+        )
+        rows = 0
+        try:
+            async with self.__session_factory() as session:
+                async for lines in DealPartitionRepository(
+                    session
+                ).export_partition(partition_name, self.__batch_size):
+                    await asyncio.to_thread(writer.write, lines)
+                    rows += len(lines)
+            await asyncio.to_thread(writer.commit)
+        except BaseException:
+            await asyncio.to_thread(writer.abort)
+            raise
+
+        return rows
+
+    async def archive_partition(
+        self, table_name: str, partition: DealPartitionDTO
+    ) -> int | None:
+        """Detach, export and drop the partition.
+
+        Returns:
+            The count of the exported rows or None, if the history of the
+            partition isn't folded yet.
+
+        Raises:
+            DealDBError: For general database API errors.
+            OSError: If the file of the archive isn't written.
+        """
+        partition_name = partition.partition_name
+        if partition.attached:
+            async with self.__session_factory() as session:
+                repository = DealPartitionRepository(session)
+                if (
+                    table_name == "deal_history"
+                    and await repository.has_unfolded_history(partition_name)
+                ):
+                    logger.warning(
+                        "The partition %s isn't archived, its history isn't"
+                        + " folded to the stage rollups yet",
+                        partition_name,
+                    )
+                    return None
+
+            async with self.__session_factory() as session:
+                await DealPartitionRepository(session).detach_partition(
+                    table_name, partition_name
+                )
+
+        rows = await self.__export(partition_name)
+        async with self.__session_factory() as session:
+            await DealPartitionRepository(session).drop_partition(
+                partition_name
+            )
+
+        logger.info("Archived %s rows of %s", rows, partition_name)
+        return rows
+
+    async def archive(self, today: date | None = None) -> int:
+        """Create the next partitions and archive the expired partitions.
+
+        Returns:
+            The count of the archived partitions, 0 if the archivation is
+            locked by another worker.
+
+        Raises:
+            DealDBError: For general database API errors.
+            OSError: If the file of the archive isn't written.
+        """
+        today = today or datetime.now(tz=UTC).date()
+
+        # the lock is held by the transaction of the session until the end
+        # of the run
+        async with self.__session_factory() as lock_session:
+            if not await DealPartitionRepository(
+                lock_session
+            ).try_lock_archivation():
+                logger.info(
+                    "The archivation is skipped, it's run by another worker"
+                )
+                return 0
+
+            self.__metrics.created_partitions_total += (
+                await self.create_partitions(today)
+            )
+
+            archived = 0
+            for table_name in DEAL_PARTITIONED_TABLES:
+                before = shift_month(
+                    get_month(today), -self.__retention_months[table_name]
+                )
+                async with self.__session_factory() as session:
+                    partitions = await DealPartitionRepository(
+                        session
+                    ).get_expired_partitions(table_name, before)
+
+                for partition in partitions:
+                    rows = await self.archive_partition(table_name, partition)
+                    if rows is None:
+                        continue
+                    archived += 1
+                    self.__metrics.archived_partitions_total += 1
+                    self.__metrics.archived_rows_total += rows
+
+        return archived
+
+    async def run(self) -> None:
+        """Maintain the partitions every `interval` seconds until
+        cancelled.
+        """
+        await self.__job.run()
+
+
+# create the instance
+deal_partition_archiver = DealPartitionArchiver(
+    session_factory=postgres_helper.session_factory,
+    directory=Path(archive_settings.deal_archive_directory),
+    batch_size=archive_settings.deal_archive_batch_size,
+    premake_months=archive_settings.deal_partition_premake_months,
+    retention_months={
+        "deal_message": archive_settings.deal_message_retention_months,
+        "deal_history": archive_settings.deal_history_retention_months,
+    },
+    interval=archive_settings.deal_archive_interval,
+)
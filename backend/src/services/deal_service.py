@@ -1,39 +1,89 @@
-from datetime import UTC, datetime
+from contextlib import suppress
+from datetime import datetime
 from pathlib import Path
 from uuid import UUID
 
 from fastapi import Depends, WebSocket
+from redis.exceptions import RedisError
 from uuid_extensions import uuid7
 
+from core.config import chat_settings
 from core.general_constants import DEFAULT_LIMIT
 from core.logger.logger import get_configure_logger
 from domain.entities.deal import Deal
 from domain.entities.message import Message
-from domain.exceptions import ManagersDoesNotExistsError
+from domain.enums import DealEventType, LanguageEnum, Roles
+from domain.exceptions import (
+    DealAccessDeniedError,
+    DealIntakeNotFoundError,
+    DealNotFoundError,
+)
 from dto.deal_dto import (
+    DealBoardStageDTO,
     DealCreateDTO,
-    DealDTO,
+    DealCursorDTO,
+    DealEventDTO,
+    DealFiltersDTO,
+    DealIntakeDTO,
+    DealIntakeStatsDTO,
+    DealMembersDTO,
     DealShortDTO,
     DealUpdateDTO,
     LostReasonDTO,
 )
-from dto.message_dto import MessageCreateDTO
+from dto.message_dto import (
+    MessageCreateDTO,
+    MessageCursorDTO,
+    MessageSearchDTO,
+)
 from repository.abc.deal_repository_abc import AbstractDealRepository
-from repository.deal_repository import deal_repository_dependency
+from repository.chat_history_repository import (
+    ChatHistoryRepository,
+    chat_history_repository,
+)
+from repository.deal_repository import (
+    deal_chat_repository_dependency,
+    deal_repository_dependency,
+)
 from schemas.deal_schema import (
     DealCreateSchema,
+    DealFiltersSchema,
     DealUpdateSchema,
     LostCreateSchema,
 )
-from schemas.message_schema import MessageCreateSchema
+from schemas.message_schema import (
+    DealMessageResponseSchema,
+    MessageCreateSchema,
+    MessageCursorsSchema,
+)
 from services.abc.deal_service_abc import AbstractDealService
 from services.connection_manager import (
     WebSocketManager,
     websocket_maganer_dependency,
 )
-from telegram.notification_manager import (
-    TelegramNotificationManager,
-    telegram_notification_manager,
+from services.deal_event_stream import (
+    DealEventStream,
+    deal_event_stream,
+)
+from services.deal_forecast_cache import (
+    DealForecastCache,
+    deal_forecast_cache,
+)
+from services.deal_intake_worker import (
+    DealIntakeWorker,
+    deal_intake_worker,
+)
+from services.deal_membership_cache import (
+    DealMembershipCache,
+    deal_membership_cache,
+)
+from services.deal_message_writer import (
+    DealMessageWriter,
+    deal_message_writer,
+)
+from services.deal_outbox_dispatcher import (
+    DealOutboxDispatcher,
+    deal_outbox_dispatcher,
 )
 
 logger = get_configure_logger(Path(__file__).stem)
@@ -44,60 +94,115 @@ class DealService(AbstractDealService):
         self,
         deal_repository: AbstractDealRepository,
         websocket_manager: WebSocketManager,
-        telegram_notification_manager: TelegramNotificationManager,
+        outbox_dispatcher: DealOutboxDispatcher,
+        message_writer: DealMessageWriter,
+        chat_history: ChatHistoryRepository,
+        history_replay_limit: int,
+        membership_cache: DealMembershipCache,
+        forecast_cache: DealForecastCache,
+        event_stream: DealEventStream,
+        intake_worker: DealIntakeWorker,
     ):
         self.__deal_repository = deal_repository
         self.__websocket_manager = websocket_manager
-        self.__telegram_notification_manager = telegram_notification_manager
-
-    async def select_manager_to_deal(self) -> UUID:
-        managers = await self.__deal_repository.get_managers_with_quantity_of_open_deals()
-        if not managers:
-            logger.error("There are no managers in the system")
-            raise ManagersDoesNotExistsError("There are no managers")
-
-        return min(
-            managers, key=lambda manager: manager.open_deals_count
-        ).manager_id
+        self.__outbox_dispatcher = outbox_dispatcher
+        self.__message_writer = message_writer
+        self.__chat_history = chat_history
+        self.__history_replay_limit = history_replay_limit
+        self.__membership_cache = membership_cache
+        self.__forecast_cache = forecast_cache
+        self.__event_stream = event_stream
+        self.__intake_worker = intake_worker
 
     async def create(self, deal_create_schema: DealCreateSchema) -> UUID:
         # Data preparation
         deal_id = uuid7()
-        manager_id = (
-            await self.select_manager_to_deal()
-            if not deal_create_schema.manager_id
-            else deal_create_schema.manager_id
-        )
 
-        deal: DealDTO = await self.__deal_repository.create(
+        # the least loaded manager is picked by the repository, if the
+        # manager isn't specified
+        deal = await self.__deal_repository.create(
             deal_create=DealCreateDTO(
-                **deal_create_schema.model_dump(exclude={"manager_id"}),
-                manager_id=manager_id,
+                **deal_create_schema.model_dump(),
                 deal_id=deal_id,
             )
         )
 
-        await self.__telegram_notification_manager.send_deal_data(deal)
+        # the notification is saved to the outbox with the deal
+        self.__outbox_dispatcher.wake()
+        await self.__forecast_cache.invalidate()
+        await self.__event_stream.publish(
+            DealEventDTO(
+                event_type=DealEventType.DEAL_CREATED,
+                deal_id=deal.deal_id,
+                lead_id=deal.lead_id,
+                manager_id=deal.manager_id,
+                sale_stage_id=deal.sale_stage_id,
+            )
+        )
 
-        return deal_id
+        # the submission of the lead with the deal is merged into it,
+        # so the ID of the stored deal is returned
+        return deal.deal_id
+
+    async def enqueue(self, deal_create_schema: DealCreateSchema) -> UUID:
+        # the deal ID is generated by the request, so the retries of the
+        # intake worker create the same deal
+        intake_id = uuid7()
+        await self.__deal_repository.enqueue_deal_intake(
+            intake_id=intake_id,
+            deal_create=DealCreateDTO(**deal_create_schema.model_dump()),
+        )
+        self.__intake_worker.wake()
+
+        return intake_id
+
+    async def get_intake(self, intake_id: UUID) -> DealIntakeDTO:
+        intake = await self.__deal_repository.get_deal_intake(intake_id)
+        if intake is None:
+            raise DealIntakeNotFoundError
+
+        return intake
+
+    async def get_intake_stats(self) -> DealIntakeStatsDTO:
+        return await self.__deal_repository.get_deal_intake_stats()
 
     async def close_deal(
         self, deal_id: UUID, lost: LostCreateSchema | None = None
     ) -> int:
-        return await self.__deal_repository.close_deal(
+        closed_rows = await self.__deal_repository.close_deal(
             deal_id=deal_id,
             lost=LostReasonDTO(**lost.model_dump(exclude_unset=True))
             if lost
             else None,
         )
+        await self.__forecast_cache.invalidate()
+        if closed_rows:
+            await self.__publish(DealEventType.DEAL_CLOSED, deal_id)
+
+        return closed_rows
 
     async def update(
         self, deal_id: UUID, deal_update_schema: DealUpdateSchema
     ) -> Deal | None:
-        return await self.__deal_repository.update(
+        deal = await self.__deal_repository.update(
             deal_id=deal_id,
             deal_update=DealUpdateDTO(**deal_update_schema.model_dump()),
         )
+        # the manager can be reassigned
+        self.__membership_cache.invalidate(deal_id)
+        await self.__forecast_cache.invalidate()
+        if deal is not None:
+            await self.__event_stream.publish(
+                DealEventDTO(
+                    event_type=DealEventType.DEAL_UPDATED,
+                    deal_id=deal.deal_id,
+                    lead_id=deal.lead_id,
+                    manager_id=deal.manager_id,
+                    sale_stage_id=deal.sale_stage_id,
+                )
+            )
+
+        return deal
 
     async def get(self, deal_id: UUID) -> Deal | None:
         return await self.__deal_repository.get(
@@ -109,27 +214,118 @@ class DealService(AbstractDealService):
         deal_id: UUID,
         sale_stage_id: int,
     ) -> int:
-        return await self.__deal_repository.change_sale_stage(
+        changed_rows = await self.__deal_repository.change_sale_stage(
             deal_id=deal_id, sale_stage_id=sale_stage_id
         )
+        self.__membership_cache.invalidate(deal_id)
+        await self.__forecast_cache.invalidate()
+        if changed_rows:
+            await self.__publish(
+                DealEventType.STAGE_CHANGED,
+                deal_id,
+                sale_stage_id=sale_stage_id,
+            )
+
+        return changed_rows
 
     async def change_fields(
         self,
         deal_id: UUID,
         fields: dict,
     ) -> int:
-        return await self.__deal_repository.change_fields(
+        changed_rows = await self.__deal_repository.change_fields(
             deal_id=deal_id, fields=fields
         )
+        if changed_rows:
+            await self.__publish(DealEventType.FIELDS_CHANGED, deal_id)
+
+        return changed_rows
 
     async def get_deals(
         self,
+        user_id: UUID,
+        role_id: int,
         limit: int = DEFAULT_LIMIT,
         offset: int = 0,
+        filters: DealFiltersSchema | None = None,
     ) -> list[DealShortDTO]:
+        """Get the deal cards, the leads get only their own deals."""
+        filters_dto = (
+            DealFiltersDTO(
+                **filters.model_dump(exclude={"after"}),
+                after=DealCursorDTO.decode(filters.after)
+                if filters.after
+                else None,
+            )
+            if filters
+            else None
+        )
+        if role_id != Roles.ADMIN:
+            filters_dto = (filters_dto or DealFiltersDTO()).model_copy(
+                update={"lead_id": user_id}
+            )
+
         return await self.__deal_repository.get_deals(
+            user_id=user_id,
             limit=limit,
             offset=offset,
+            filters=filters_dto,
+        )
+
+    async def get_board(
+        self,
+        user_id: UUID,
+        role_id: int,
+        limit: int = DEFAULT_LIMIT,
+        manager_id: UUID | None = None,
+    ) -> list[DealBoardStageDTO]:
+        """Get the kanban board of the open deals.
+
+        Raises:
+            DealAccessDeniedError: If the user isn't the manager.
+        """
+        if role_id != Roles.ADMIN:
+            raise DealAccessDeniedError("Only the managers get the board")
+
+        return await self.__deal_repository.get_board(
+            user_id=user_id, limit=limit, manager_id=manager_id
+        )
+
+    async def search_deals(
+        self, user_id: UUID, role_id: int, query: str, limit: int
+    ) -> list[DealShortDTO]:
+        """Search the deals by the contacts and the lead names.
+
+        Raises:
+            DealAccessDeniedError: If the user isn't the manager.
+        """
+        if role_id != Roles.ADMIN:
+            raise DealAccessDeniedError("Only the managers search the deals")
+
+        return await self.__deal_repository.search_deals(
+            user_id=user_id, query=query, limit=limit
+        )
+
+    async def search_messages(
+        self,
+        user_id: UUID,
+        role_id: int,
+        language: LanguageEnum,
+        query: str,
+        limit: int,
+    ) -> list[MessageSearchDTO]:
+        """Search the messages of the deals of the manager.
+
+        Raises:
+            DealAccessDeniedError: If the user isn't the manager.
+        """
+        if role_id != Roles.ADMIN:
+            raise DealAccessDeniedError(
+                "Only the managers search the messages"
+            )
+
+        return await self.__deal_repository.search_messages(
+            user_id=user_id, language=language, query=query, limit=limit
         )
 
     async def get_messages(
@@ -137,46 +333,246 @@ class DealService(AbstractDealService):
         deal_id: UUID,
         limit: int,
         offset: int,
+        cursors: MessageCursorsSchema | None = None,
     ) -> list[Message]:
         return await self.__deal_repository.get_messages(
             deal_id,
             limit,
             offset,
+            before=MessageCursorDTO.decode(cursors.before)
+            if cursors and cursors.before
+            else None,
+            after=MessageCursorDTO.decode(cursors.after)
+            if cursors and cursors.after
+            else None,
         )
 
+    async def __get_members(self, deal_id: UUID) -> DealMembersDTO | None:
+        members = self.__membership_cache.get(deal_id)
+        if members is not None:
+            return members
+
+        deal = await self.__deal_repository.get(deal_id)
+        if deal is None:
+            return None
+
+        members = DealMembersDTO(
+            lead_id=deal.lead_id, manager_id=deal.manager_id
+        )
+        self.__membership_cache.set(deal_id, members)
+        return members
+
+    async def __check_member(self, deal_id: UUID, user_id: UUID) -> None:
+        """Check, that the user is the lead or the manager of the deal.
+
+        Raises:
+            DealNotFoundError: If the deal isn't found.
+            DealAccessDeniedError: If the user isn't the member of the deal.
+        """
+        members = await self.__get_members(deal_id)
+        if members is None:
+            raise DealNotFoundError
+        if user_id not in (members.lead_id, members.manager_id):
+            raise DealAccessDeniedError
+
+    @staticmethod
+    def __get_message_payload(message: Message) -> str:
+        return DealMessageResponseSchema(
+            **message.model_dump(),
+            cursor=MessageCursorDTO(
+                sent_at=message.sent_at, message_id=message.message_id
+            ).encode(),
+        ).model_dump_json()
+
+    async def __publish(
+        self,
+        event_type: DealEventType,
+        deal_id: UUID,
+        sale_stage_id: int | None = None,
+    ) -> None:
+        """Publish the event of the deal write to the dashboards.
+
+        The event carries the members of the deal, so the streams are
+        filtered without the database.
+        """
+        members = await self.__get_members(deal_id)
+        if members is None:
+            return
+
+        await self.__event_stream.publish(
+            DealEventDTO(
+                event_type=event_type,
+                deal_id=deal_id,
+                lead_id=members.lead_id,
+                manager_id=members.manager_id,
+                sale_stage_id=sale_stage_id,
+            )
+        )
+
+    async def __get_recent_messages(self, deal_id: UUID) -> list[Message]:
+        try:
+            recent_messages = await self.__chat_history.get_recent(deal_id)
+        except RedisError:
+            # the history is fetched from the database
+            return []
+
+        return [
+            Message.model_validate_json(message) for message in recent_messages
+        ]
+
+    async def get_replay(
+        self, deal_id: UUID, last_seen: str | None = None
+    ) -> list[Message]:
+        """Get the messages of the deal missed by the client.
+
+        The messages are read from the recent chat history in Redis. The
+        database is queried only if the history doesn't cover the replay
+        (e.g. the history of the inactive deal is expired).
+
+        Args:
+            deal_id: The ID of the deal.
+            last_seen: The cursor of the last message seen by the client.
+
+        Returns:
+            Up to `history_replay_limit` first messages after the last seen
+            message, so the client continues by the `after` cursor without
+            the gaps, or the latest messages, if the last seen message isn't
+            set. The messages are in the chronological order.
+        """
+        after = MessageCursorDTO.decode(last_seen) if last_seen else None
+
+        def get_cursor(message: Message) -> MessageCursorDTO:
+            return MessageCursorDTO(
+                sent_at=message.sent_at, message_id=message.message_id
+            )
+
+        def get_position(message: Message) -> tuple[datetime, int]:
+            return message.sent_at, message.message_id
+
+        # the messages are appended in the order of the commits
+        recent_messages = sorted(
+            await self.__get_recent_messages(deal_id), key=get_position
+        )
+
+        if after is None:
+            replay = recent_messages[-self.__history_replay_limit :]
+            if len(replay) < self.__history_replay_limit:
+                # the latest messages before the recent history
+                older_messages = await self.__deal_repository.get_messages(
+                    deal_id,
+                    self.__history_replay_limit - len(replay),
+                    0,
+                    before=get_cursor(replay[0]) if replay else None,
+                    after=None,
+                    latest=True,
+                )
+                replay = older_messages + replay
+            return replay
+
+        newer_messages = [
+            message
+            for message in recent_messages
+            if get_position(message) > (after.sent_at, after.message_id)
+        ]
+        if len(newer_messages) < len(recent_messages):
+            # the history reaches the last seen message
+            return newer_messages[: self.__history_replay_limit]
+
+        # the first missed messages are older than the recent history
+        missed_messages = await self.__deal_repository.get_messages(
+            deal_id,
+            self.__history_replay_limit,
+            0,
+            before=get_cursor(newer_messages[0]) if newer_messages else None,
+            after=after,
+        )
+        return (missed_messages + newer_messages)[
+            : self.__history_replay_limit
+        ]
+
     async def connect_to_chat(
-        self, websocket: WebSocket, deal_id: UUID, user_id: UUID
+        self,
+        websocket: WebSocket,
+        deal_id: UUID,
+        user_id: UUID,
+        last_seen: str | None = None,
     ):
+        # the history and the messages of the deal are sent to its members
+        # only
+        await self.__check_member(deal_id, user_id)
         await self.__websocket_manager.connect(
             websocket=websocket, room_id=deal_id, user_id=user_id
         )
 
-    def disconnect(self, deal_id: UUID, user_id: UUID):
-        self.__websocket_manager.disconnect(
+        # the member is connected before the replay, so the messages sent
+        # in between aren't lost (but can be delivered twice, the client
+        # dedupes them by the message_id)
+        for message in await self.get_replay(deal_id, last_seen):
+            await self.__websocket_manager.send_to(
+                room_id=deal_id,
+                user_id=user_id,
+                payload=self.__get_message_payload(message),
+            )
+
+    async def disconnect(self, deal_id: UUID, user_id: UUID):
+        await self.__websocket_manager.disconnect(
             room_id=deal_id,
             user_id=user_id,
         )
 
+    async def mark_messages_viewed(
+        self, deal_id: UUID, user_id: UUID, until: str
+    ) -> int:
+        await self.__check_member(deal_id, user_id)
+
+        return await self.__deal_repository.mark_messages_viewed(
+            deal_id=deal_id,
+            user_id=user_id,
+            until=MessageCursorDTO.decode(until),
+        )
+
     async def write_message(
         self,
         user_id: UUID,
         message: MessageCreateSchema,
-    ):
-        # TODO: check is user has access to the deal.
-        # (the user_role must be higher or equal than manager
-        # or user_id=lead_id)
-        await self.__websocket_manager.broadcast(
-            message=message.message,
-            room_id=message.deal_id,
-            sender_id=user_id,
-        )
-        await self.__deal_repository.write_message(
-            message_data=MessageCreateDTO(
-                **message.model_dump(),
-                user_id=user_id,
-            )
+    ) -> Message:
+        await self.__check_member(message.deal_id, user_id)
+
+        message_data = MessageCreateDTO(
+            **message.model_dump(),
+            user_id=user_id,
+        )
+        # the messages are written by the group commit
+        message_id = await self.__message_writer.write(message_data)
+        written_message = Message(
+            **message_data.model_dump(), message_id=message_id
         )
 
+        # the message is broadcast after the commit, so the members don't
+        # see the messages, that aren't saved. The delivery is best effort:
+        # the members fetch the missed messages by the cursor.
+        try:
+            await self.__websocket_manager.broadcast(
+                room_id=written_message.deal_id,
+                payload=self.__get_message_payload(written_message),
+            )
+        except RedisError:
+            logger.warning(
+                "The message %s of the deal %s isn't broadcast",
+                message_id,
+                written_message.deal_id,
+                exc_info=True,
+            )
+
+        # the message is replayed from the database, if it isn't appended
+        with suppress(RedisError):
+            await self.__chat_history.append(
+                deal_id=written_message.deal_id,
+                message=written_message.model_dump_json(),
+            )
+
+        return written_message
+
 
 def deal_service_dependency(
     deal_repository: AbstractDealRepository = Depends(
@@ -189,5 +585,31 @@ def deal_service_dependency(
     return DealService(
         deal_repository=deal_repository,
         websocket_manager=websocket_manager,
-        telegram_notification_manager=telegram_notification_manager,
+        outbox_dispatcher=deal_outbox_dispatcher,
+        message_writer=deal_message_writer,
+        chat_history=chat_history_repository,
+        history_replay_limit=chat_settings.history_replay_limit,
+        membership_cache=deal_membership_cache,
+        forecast_cache=deal_forecast_cache,
+        event_stream=deal_event_stream,
+        intake_worker=deal_intake_worker,
+    )
+
+
+def deal_chat_service_dependency(
+    deal_repository: AbstractDealRepository = Depends(
+        deal_chat_repository_dependency
+    ),
+    websocket_manager: WebSocketManager = Depends(
+        websocket_maganer_dependency
+    ),
+) -> AbstractDealService:
+    """Service of the websocket chat without the request database session.
+
+    The messages are written by the group commit, the history is read by
+    the short-lived sessions of the repository.
+    """
+    return deal_service_dependency(
+        deal_repository=deal_repository,
+        websocket_manager=websocket_manager,
     )
@@ -1,8 +1,11 @@
+import asyncio
+from collections import defaultdict
 from pathlib import Path
+from time import monotonic
 
 from aiogram import Bot
 from aiogram.enums import ParseMode
-from aiogram.utils.markdown import bold, pre
+from aiogram.utils.markdown import bold, code, pre
 
 from core.config import telegram_settings
 from core.logger.logger import get_configure_logger
@@ -12,10 +15,51 @@ from telegram.telegram_helper import telegram_helper
 logger = get_configure_logger(Path(__file__).stem)
 
 
+# the max length of the text of the telegram message
+MAX_MESSAGE_LENGTH = 4096
+
+
+class ChatRateLimiter:
+    """Limit of the rate of the messages to every chat.
+
+    The messages to one chat are spaced at least 60 / `messages_per_minute`
+    seconds apart, the messages to different chats aren't delayed.
+    """
+
+    def __init__(self, messages_per_minute: int):
+        self._interval = 60 / messages_per_minute
+        self._next_send_at: defaultdict[int, float] = defaultdict(float)
+        self._locks: defaultdict[int, asyncio.Lock] = defaultdict(asyncio.Lock)
+
+    async def acquire(self, chat_id: int) -> None:
+        """Wait for the next free slot of the chat."""
+        async with self._locks[chat_id]:
+            delay = self._next_send_at[chat_id] - monotonic()
+            if delay > 0:
+                await asyncio.sleep(delay)
+            self._next_send_at[chat_id] = monotonic() + self._interval
+
+
 class TelegramNotificationManager:
-    def __init__(self, bot: Bot, chat_id: int):
+    def __init__(
+        self,
+        bot: Bot,
+        chat_id: int,
+        rate_limiter: ChatRateLimiter | None = None,
+    ):
         self._bot = bot
         self._chat_id = chat_id
+        self._rate_limiter = rate_limiter
+
+    async def _send_message(self, text: str) -> None:
+        if self._rate_limiter:
+            await self._rate_limiter.acquire(self._chat_id)
+
+        await self._bot.send_message(
+            chat_id=self._chat_id,
+            text=text,
+            parse_mode=ParseMode.MARKDOWN_V2,
+        )
 
     @telegram_helper.dispatcher.message()
     async def send_deal_data(
@@ -41,14 +85,37 @@ class TelegramNotificationManager:
         if "question" in deal.fields:
             text += f"{bold('Вопрос')}: {pre(deal.fields['question'])}\n"
 
-        await self._bot.send_message(
-            chat_id=self._chat_id,
-            text=text,
-            parse_mode=ParseMode.MARKDOWN_V2,
-        )
+        await self._send_message(text)
+
+    async def send_deals_digest(self, deals: list[DealDTO]) -> None:
+        """Send the deals by one message (or by several long messages).
+
+        Every deal is one line of the digest, the lines are split to the
+        messages by the max length of the telegram message.
+        """
+        lines = []
+        for deal in deals:
+            line = f"{code(deal.deal_id)} {bold(deal.cost)}"
+            if "email" in deal.fields:
+                line += f" {code(deal.fields['email'])}"
+            if "phone" in deal.fields:
+                line += f" {code(deal.fields['phone'])}"
+            lines.append(line)
+
+        text = f"{bold(f'Новые заявки ({len(deals)})')}:\n\n"
+        for line in lines:
+            if len(text) + len(line) + 1 > MAX_MESSAGE_LENGTH:
+                await self._send_message(text)
+                text = ""
+            text += f"{line}\n"
+
+        await self._send_message(text)
 
 
 telegram_notification_manager = TelegramNotificationManager(
     bot=telegram_helper.bot,
     chat_id=telegram_settings.deals_chat_id,
+    rate_limiter=ChatRateLimiter(
+        messages_per_minute=telegram_settings.chat_messages_per_minute
+    ),
 )
@@ -1,6 +1,8 @@
 from pathlib import Path
 
 from aiogram import Bot, Dispatcher
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
 
 from core.config import telegram_settings
 from core.logger.logger import get_configure_logger
@@ -10,7 +12,16 @@ logger = get_configure_logger(Path(__file__).stem)
 
 class TelegramHelper:
     def __init__(self):
-        self._bot = Bot(telegram_settings.telegram_bot_token)
+        session = (
+            AiohttpSession(
+                api=TelegramAPIServer.from_base(
+                    telegram_settings.telegram_api_server
+                )
+            )
+            if telegram_settings.telegram_api_server
+            else None
+        )
+        self._bot = Bot(telegram_settings.telegram_bot_token, session=session)
         self._dispatcher = Dispatcher()
 
     @property
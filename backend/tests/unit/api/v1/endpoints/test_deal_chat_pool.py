@@ -0,0 +1,204 @@
+import asyncio
+from contextlib import asynccontextmanager
+from time import perf_counter
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+import uvicorn
+from fastapi import FastAPI
+from httpx import AsyncClient
+from jwt import encode as jwt_encode
+from pytest import MonkeyPatch, mark
+from starlette.status import HTTP_200_OK
+from websockets.asyncio.client import connect
+
+from api.v1.endpoints.deal import router as deal_router
+from core.config import auth_settings
+from db.dependencies.postgres_helper import postgres_helper
+from dto.deal_dto import DealMembersDTO
+from services import deal_service as deal_service_module
+from services.chat_broker import LocalChatBroker
+from services.classes.token import TokenPayload
+from services.connection_manager import (
+    WebSocketManager,
+    websocket_maganer_dependency,
+)
+from services.deal_membership_cache import DealMembershipCache
+
+# the pool of the database connections is much smaller than the count of
+# the open chats
+POOL_SIZE = 5
+CHATS_COUNT = 200
+REQUESTS_COUNT = 500
+REQUESTS_CONCURRENCY = 20
+# the request (or the chat) waiting for the pinned connection fails by the
+# timeout
+REQUEST_TIMEOUT = 5
+MAX_P95_LATENCY = 2
+USER_ID = UUID(int=1)
+
+
+class FakePool:
+    """Pool of the database connections with the usage statistics."""
+
+    def __init__(self, size: int):
+        self.__slots = asyncio.Semaphore(size)
+        self.checked_out = 0
+        self.max_checked_out = 0
+
+    async def acquire(self) -> None:
+        await self.__slots.acquire()
+        self.checked_out += 1
+        self.max_checked_out = max(self.max_checked_out, self.checked_out)
+
+    def release(self) -> None:
+        self.checked_out -= 1
+        self.__slots.release()
+
+
+class FakeSession:
+    """Session, that holds the connection from the first enter to the last
+    exit (like the session with the open transaction).
+    """
+
+    def __init__(self, pool: FakePool):
+        self.__pool = pool
+        self.__depth = 0
+
+    async def __aenter__(self) -> "FakeSession":
+        if not self.__depth:
+            await self.__pool.acquire()
+        self.__depth += 1
+        return self
+
+    async def __aexit__(self, *args) -> None:
+        self.__depth -= 1
+        if not self.__depth:
+            self.__pool.release()
+
+    async def execute(self, *args, **kwargs) -> MagicMock:
+        result = MagicMock()
+        result.mappings.return_value.all.return_value = []
+        result.mappings.return_value.fetchone.return_value = None
+        return result
+
+
+def get_access_cookie() -> dict[str, str]:
+    token = jwt_encode(
+        payload=TokenPayload(
+            token_id="chat-benchmark",
+            user_id=str(USER_ID),
+            role_id=2,
+            fingerprint=1,
+        ).model_dump(),
+        key=auth_settings.access_secret_key,
+        algorithm=auth_settings.algorithm,
+    )
+    return {"Cookie": f"{auth_settings.access_cookie_name}={token}"}
+
+
+@asynccontextmanager
+async def serve(app: FastAPI):
+    server = uvicorn.Server(
+        uvicorn.Config(
+            app, host="127.0.0.1", port=0, lifespan="off", log_level="error"
+        )
+    )
+    server_task = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.01)
+
+    host, port = server.servers[0].sockets[0].getsockname()[:2]
+    try:
+        yield f"{host}:{port}"
+    finally:
+        server.should_exit = True
+        await server_task
+
+
+@mark.api
+@mark.benchmark
+class TestDealChatPool:
+    async def test_idle_chats_dont_hold_sessions(
+        self, monkeypatch: MonkeyPatch
+    ):
+        pool = FakePool(POOL_SIZE)
+        websocket_manager = WebSocketManager(
+            broker=LocalChatBroker(), send_queue_size=10, send_timeout=1
+        )
+
+        async def session_dependency():
+            async with FakeSession(pool) as session:
+                yield session
+
+        chat_history = AsyncMock()
+        chat_history.get_recent.return_value = []
+        monkeypatch.setattr(
+            deal_service_module, "chat_history_repository", chat_history
+        )
+        monkeypatch.setattr(
+            postgres_helper, "session_factory", lambda: FakeSession(pool)
+        )
+        # the user of the token is the manager of the deals of the chats
+        membership_cache = DealMembershipCache(ttl=60, max_size=CHATS_COUNT)
+        for index in range(CHATS_COUNT):
+            membership_cache.set(
+                UUID(int=index),
+                DealMembersDTO(
+                    lead_id=UUID(int=CHATS_COUNT), manager_id=USER_ID
+                ),
+            )
+        monkeypatch.setattr(
+            deal_service_module, "deal_membership_cache", membership_cache
+        )
+
+        app = FastAPI()
+        app.include_router(deal_router)
+        app.dependency_overrides[postgres_helper.session_dependency] = (
+            session_dependency
+        )
+        app.dependency_overrides[websocket_maganer_dependency] = lambda: (
+            websocket_manager
+        )
+
+        async with serve(app) as address:
+            chats = [
+                await connect(
+                    f"ws://{address}/deal/chat/{UUID(int=index)}",
+                    additional_headers=get_access_cookie(),
+                    open_timeout=REQUEST_TIMEOUT,
+                )
+                for index in range(CHATS_COUNT)
+            ]
+            while len(websocket_manager.active_connections) < CHATS_COUNT:
+                await asyncio.sleep(0.01)
+
+            # the idle chats don't hold the connections
+            assert pool.checked_out == 0
+
+            semaphore = asyncio.Semaphore(REQUESTS_CONCURRENCY)
+
+            async def request(client: AsyncClient) -> float:
+                async with semaphore:
+                    started_at = perf_counter()
+                    response = await client.get(
+                        f"/deal/{UUID(int=1)}/messages",
+                        params={"after": "0_0"},
+                    )
+                    assert response.status_code == HTTP_200_OK
+                    return perf_counter() - started_at
+
+            async with AsyncClient(
+                base_url=f"http://{address}", timeout=REQUEST_TIMEOUT
+            ) as client:
+                latencies = sorted(
+                    await asyncio.gather(
+                        *(request(client) for _ in range(REQUESTS_COUNT))
+                    )
+                )
+
+            for chat in chats:
+                await chat.close()
+
+        assert latencies[int(REQUESTS_COUNT * 0.95)] < MAX_P95_LATENCY
+        assert pool.max_checked_out <= POOL_SIZE
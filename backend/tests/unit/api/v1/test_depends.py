@@ -0,0 +1,53 @@
+from pytest import mark
+
+from api.v1.depends import parse_accept_language
+from domain.enums import LanguageEnum
+
+
+@mark.api
+class TestDepends:
+    @mark.parametrize(
+        "header, expectation",
+        [
+            ("", []),
+            ("ru-RU", [LanguageEnum.RUSSIAN]),
+            (
+                "kz-KZ,ru-RU;q=0.9,en-US;q=0.8",
+                [
+                    LanguageEnum.KAZAKHSTAN,
+                    LanguageEnum.RUSSIAN,
+                    LanguageEnum.ENGLISH,
+                ],
+            ),
+            # q-values are more important than the order of the header
+            (
+                "en-US;q=0.5, kz-KZ;q=0.7, ru-RU",
+                [
+                    LanguageEnum.RUSSIAN,
+                    LanguageEnum.KAZAKHSTAN,
+                    LanguageEnum.ENGLISH,
+                ],
+            ),
+            # primary subtag, unsupported and not acceptable languages
+            ("en,de-DE;q=0.9,ru-RU;q=0", [LanguageEnum.ENGLISH]),
+            ("*;q=0.5,fr-FR", []),
+            # invalid q-value means not acceptable, duplicates are removed
+            (
+                "ru-RU;q=abc,en-US,en;q=0.9",
+                [LanguageEnum.ENGLISH],
+            ),
+        ],
+        ids=[
+            "empty_header",
+            "single_language",
+            "ordered_by_header",
+            "ordered_by_q_values",
+            "skip_unsupported_languages",
+            "only_unsupported_languages",
+            "invalid_q_value_and_duplicates",
+        ],
+    )
+    def test_parse_accept_language(
+        self, header: str, expectation: list[LanguageEnum]
+    ):
+        assert parse_accept_language(header) == expectation
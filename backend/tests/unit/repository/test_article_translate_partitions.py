@@ -0,0 +1,134 @@
+"""Benchmark of the partition pruning of the article_translate table.
+
+The queries have the shapes of the ArticleRepository queries. Every query
+is explained with ANALYZE, so the execution time of the query is in the
+failure message (and in the log with -s).
+"""
+
+from pathlib import Path
+
+from pytest import mark
+from sqlalchemy import text
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from core.logger.logger import get_configure_logger
+from domain.enums import LanguageEnum
+
+logger = get_configure_logger(Path(__file__).stem)
+
+ARTICLE_TRANSLATE_PARTITIONS = {
+    "article_translate_ru",
+    "article_translate_kz",
+    "article_translate_en",
+    "article_translate_default",
+}
+
+# the shape of the ArticleRepository.get_articles query
+ARTICLE_LIST_QUERY = """
+    select a.article_id, at.title, l.language_id
+    from article a
+    join article_translate at on a.article_id = at.article_id
+    join language l on at.language_id = l.language_id
+    where l.language_id = :language
+    order by a.published_at desc nulls first
+    limit 10
+"""
+# the shape of the ArticleRepository.get_articles query with searched text
+ARTICLE_SEARCH_QUERY = """
+    select a.article_id, at.title, l.language_id
+    from article a
+    join article_translate at on a.article_id = at.article_id
+    join language l on at.language_id = l.language_id
+    where l.language_id = :language
+        and at.tsv_content @@ to_tsquery(l.cfgname::regconfig, :ts_query)
+    order by ts_rank(
+        at.tsv_content, to_tsquery(l.cfgname::regconfig, :ts_query)
+    ) desc
+    limit 10
+"""
+# the shape of the ArticleRepository.get_article query
+ARTICLE_QUERY = """
+    select at.article_id, at.title, at.language_id
+    from article_translate at
+    where at.language_id = any(cast(:languages as varchar[]))
+    order by array_position(
+        cast(:languages as varchar[]), at.language_id::varchar
+    )
+    limit 1
+"""
+
+
+def get_scanned_relations(plan: dict) -> set[str]:
+    relations = {plan["Relation Name"]} if "Relation Name" in plan else set()
+    for subplan in plan.get("Plans", []):
+        relations |= get_scanned_relations(subplan)
+    return relations
+
+
+async def explain(
+    async_session: AsyncSession, query: str, params: dict
+) -> tuple[set[str], float]:
+    result = await async_session.execute(
+        text(f"explain (analyze, format json) {query}"), params
+    )
+    explanation = result.scalar_one()[0]
+
+    return (
+        get_scanned_relations(explanation["Plan"]),
+        explanation["Execution Time"],
+    )
+
+
+@mark.article
+@mark.repository
+@mark.asyncio
+class TestArticleTranslatePartitions:
+    @mark.parametrize(
+        "query, params, expectation",
+        [
+            (
+                ARTICLE_LIST_QUERY,
+                {"language": LanguageEnum.RUSSIAN},
+                {"article_translate_ru"},
+            ),
+            (
+                ARTICLE_SEARCH_QUERY,
+                {"language": LanguageEnum.ENGLISH, "ts_query": "wine"},
+                {"article_translate_en"},
+            ),
+            (
+                ARTICLE_QUERY,
+                {"languages": [LanguageEnum.KAZAKHSTAN, LanguageEnum.RUSSIAN]},
+                {"article_translate_kz", "article_translate_ru"},
+            ),
+            (
+                ARTICLE_LIST_QUERY,
+                {"language": "ge"},
+                {"article_translate_default"},
+            ),
+        ],
+        ids=[
+            "article_list",
+            "article_search",
+            "article_with_fallback_languages",
+            "language_without_partition",
+        ],
+    )
+    async def test_partition_pruning(
+        self,
+        async_session: AsyncSession,
+        query: str,
+        params: dict,
+        expectation: set[str],
+    ):
+        relations, execution_time = await explain(async_session, query, params)
+        logger.info(
+            "Scanned %s in %.3f ms with %s", relations, execution_time, params
+        )
+
+        scanned_partitions = relations & ARTICLE_TRANSLATE_PARTITIONS
+        # the empty set means, that the table isn't partitioned
+        assert scanned_partitions == expectation, (
+            f"Partitions {scanned_partitions} are scanned in"
+            + f" {execution_time} ms, expected {expectation}"
+        )
@@ -0,0 +1,104 @@
+from uuid import UUID
+
+from pytest import fixture, mark
+from pytest_asyncio import fixture as async_fixture
+from sqlalchemy import insert, select
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from db.models import Deal, Role, SaleStage, User
+from domain.enums import Roles
+from dto.deal_dto import DealCreateDTO
+from repository.deal_repository import DealRepository
+
+MANAGER_ID = UUID(int=1)
+FIRST_LEAD_ID = UUID(int=101)
+SECOND_LEAD_ID = UUID(int=102)
+
+
+@async_fixture
+async def create_session(async_session: AsyncSession) -> AsyncSession:
+    await async_session.execute(
+        insert(Role), {"role_id": Roles.ADMIN, "name": "Manager"}
+    )
+    await async_session.execute(
+        insert(SaleStage), {"sale_stage_id": 1, "name": "Stage 1"}
+    )
+    await async_session.execute(
+        insert(User),
+        [
+            {
+                "user_id": user_id,
+                "login": f"user_{user_id.int}",
+                "email": f"user_{user_id.int}@example.com",
+                "password": "securepassword123",
+                "role_id": role_id,
+                "is_registered": True,
+            }
+            for user_id, role_id in [
+                (MANAGER_ID, Roles.ADMIN),
+                (FIRST_LEAD_ID, Roles.LEAD),
+                (SECOND_LEAD_ID, Roles.LEAD),
+            ]
+        ],
+    )
+    await async_session.commit()
+    return async_session
+
+
+@fixture
+def deal_repository(create_session: AsyncSession) -> DealRepository:
+    return DealRepository(session=create_session)
+
+
+def get_deal_create(lead_id: UUID, **fields) -> DealCreateDTO:
+    return DealCreateDTO(
+        sale_stage_id=1,
+        manager_id=MANAGER_ID,
+        lead_id=lead_id,
+        fields=fields,
+        cost=100,
+        probability=0.5,
+        priority=0,
+    )
+
+
+@mark.repository
+@mark.asyncio
+class TestDealCreate:
+    async def test_merge_deal_of_lead(self, deal_repository: DealRepository):
+        first_deal = await deal_repository.create(
+            get_deal_create(
+                FIRST_LEAD_ID, email="lead@example.com", question="Price?"
+            )
+        )
+        second_deal = await deal_repository.create(
+            get_deal_create(FIRST_LEAD_ID, question="Delivery?")
+        )
+
+        assert second_deal.deal_id == first_deal.deal_id
+        assert second_deal.fields == {
+            "email": "lead@example.com",
+            "question": "Delivery?",
+        }
+
+    async def test_keep_deals_of_leads_with_same_contact(
+        self, create_session: AsyncSession, deal_repository: DealRepository
+    ):
+        first_deal = await deal_repository.create(
+            get_deal_create(
+                FIRST_LEAD_ID, email="lead@example.com", question="Price?"
+            )
+        )
+        second_deal = await deal_repository.create(
+            get_deal_create(
+                SECOND_LEAD_ID, email="Lead@Example.com", question="Delivery?"
+            )
+        )
+
+        # the lead doesn't get the deal of another lead
+        assert second_deal.deal_id != first_deal.deal_id
+        assert second_deal.lead_id == SECOND_LEAD_ID
+        fields = await create_session.scalar(
+            select(Deal.fields).where(Deal.deal_id == first_deal.deal_id)
+        )
+        assert fields == {"email": "lead@example.com", "question": "Price?"}
@@ -0,0 +1,284 @@
+"""Tests of the kanban board of the open deals.
+
+The counters of the board are maintained by the update_deal_stage_board
+trigger, so the deals are written by the plain statements and the counters
+are compared with the counts of the open deals.
+"""
+
+from datetime import UTC, datetime
+from uuid import UUID
+
+from pytest import fixture, mark
+from pytest_asyncio import fixture as async_fixture
+from sqlalchemy import insert, select, text, update
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from db.models import Deal, DealStageBoard, SaleStage, User
+from repository.deal_repository import DealRepository
+
+FIRST_MANAGER_ID = UUID(int=1)
+SECOND_MANAGER_ID = UUID(int=2)
+# the leads of the deals are UUID(int=100 + index)
+LEADS_COUNT = 5
+COMPLETED_SALE_STAGE_ID = 7
+
+BoardRows = dict[tuple[int, UUID | None], tuple[int, float]]
+
+
+@async_fixture
+async def board_session(async_session: AsyncSession) -> AsyncSession:
+    await async_session.execute(
+        insert(SaleStage),
+        [
+            {"sale_stage_id": sale_stage_id, "name": f"Stage {sale_stage_id}"}
+            for sale_stage_id in range(1, COMPLETED_SALE_STAGE_ID + 1)
+        ],
+    )
+    await async_session.execute(
+        insert(User),
+        [
+            {
+                "user_id": user_id,
+                "login": f"user_{user_id.int}",
+                "email": f"user_{user_id.int}@example.com",
+                "password": "securepassword123",
+                "role_id": 1,
+                "is_registered": True,
+            }
+            for user_id in [
+                FIRST_MANAGER_ID,
+                SECOND_MANAGER_ID,
+                *(UUID(int=100 + index) for index in range(LEADS_COUNT)),
+            ]
+        ],
+    )
+    await async_session.commit()
+    return async_session
+
+
+@fixture
+def deal_repository(board_session: AsyncSession) -> DealRepository:
+    return DealRepository(session=board_session)
+
+
+async def create_deal(
+    session: AsyncSession,
+    index: int,
+    sale_stage_id: int = 1,
+    manager_id: UUID | None = FIRST_MANAGER_ID,
+    cost: float = 100,
+) -> UUID:
+    deal_id = UUID(int=1000 + index)
+    await session.execute(
+        insert(Deal).values(
+            deal_id=deal_id,
+            sale_stage_id=sale_stage_id,
+            lead_id=UUID(int=100 + index),
+            manager_id=manager_id,
+            cost=cost,
+        )
+    )
+    await session.commit()
+    return deal_id
+
+
+async def update_deal(session: AsyncSession, deal_id: UUID, **values):
+    await session.execute(
+        update(Deal).where(Deal.deal_id == deal_id).values(**values)
+    )
+    await session.commit()
+
+
+async def get_board_rows(session: AsyncSession) -> BoardRows:
+    """Get the not empty counters of the board."""
+    result = await session.execute(
+        select(
+            DealStageBoard.sale_stage_id,
+            DealStageBoard.manager_id,
+            DealStageBoard.deals_count,
+            DealStageBoard.cost_total,
+        ).where(
+            (DealStageBoard.deals_count != 0)
+            | (DealStageBoard.cost_total != 0)
+        )
+    )
+    return {
+        (row.sale_stage_id, row.manager_id): (
+            row.deals_count,
+            float(row.cost_total),
+        )
+        for row in result
+    }
+
+
+@mark.repository
+@mark.asyncio
+class TestDealStageBoardTrigger:
+    async def test_create_deals(self, board_session: AsyncSession):
+        await create_deal(board_session, 0, cost=100)
+        await create_deal(board_session, 1, cost=50)
+        await create_deal(board_session, 2, sale_stage_id=2, manager_id=None)
+
+        assert await get_board_rows(board_session) == {
+            (1, FIRST_MANAGER_ID): (2, 150),
+            (2, None): (1, 100),
+        }
+
+    async def test_change_sale_stage(self, board_session: AsyncSession):
+        deal_id = await create_deal(board_session, 0)
+        await create_deal(board_session, 1)
+
+        await update_deal(board_session, deal_id, sale_stage_id=2)
+
+        assert await get_board_rows(board_session) == {
+            (1, FIRST_MANAGER_ID): (1, 100),
+            (2, FIRST_MANAGER_ID): (1, 100),
+        }
+
+    async def test_close_deal(self, board_session: AsyncSession):
+        closed_deal_id = await create_deal(board_session, 0)
+        completed_deal_id = await create_deal(board_session, 1)
+        await create_deal(board_session, 2)
+
+        await update_deal(
+            board_session, closed_deal_id, close_at=datetime.now(tz=UTC)
+        )
+        await update_deal(
+            board_session,
+            completed_deal_id,
+            sale_stage_id=COMPLETED_SALE_STAGE_ID,
+        )
+
+        # the closed and the completed deals aren't open
+        assert await get_board_rows(board_session) == {
+            (1, FIRST_MANAGER_ID): (1, 100),
+        }
+
+    async def test_change_manager(self, board_session: AsyncSession):
+        deal_id = await create_deal(board_session, 0)
+        unassigned_deal_id = await create_deal(
+            board_session, 1, manager_id=None
+        )
+
+        await update_deal(board_session, deal_id, manager_id=SECOND_MANAGER_ID)
+        await update_deal(
+            board_session, unassigned_deal_id, manager_id=FIRST_MANAGER_ID
+        )
+
+        assert await get_board_rows(board_session) == {
+            (1, FIRST_MANAGER_ID): (1, 100),
+            (1, SECOND_MANAGER_ID): (1, 100),
+        }
+
+    async def test_change_cost(self, board_session: AsyncSession):
+        deal_id = await create_deal(board_session, 0, cost=100)
+        await create_deal(board_session, 1, cost=50)
+
+        await update_deal(board_session, deal_id, cost=30)
+
+        assert await get_board_rows(board_session) == {
+            (1, FIRST_MANAGER_ID): (2, 80),
+        }
+
+    async def test_delete_deal(self, board_session: AsyncSession):
+        deal_id = await create_deal(board_session, 0)
+
+        await board_session.execute(
+            text("delete from deal where deal_id = :deal_id"),
+            params={"deal_id": deal_id},
+        )
+        await board_session.commit()
+
+        assert await get_board_rows(board_session) == {}
+
+
+@mark.repository
+@mark.asyncio
+class TestDealStageBoardRepository:
+    async def test_get_board(
+        self, board_session: AsyncSession, deal_repository: DealRepository
+    ):
+        for index in range(3):
+            await create_deal(board_session, index, cost=10 * (index + 1))
+        await create_deal(
+            board_session, 3, sale_stage_id=3, manager_id=SECOND_MANAGER_ID
+        )
+        await create_deal(
+            board_session, 4, sale_stage_id=COMPLETED_SALE_STAGE_ID
+        )
+
+        stages = await deal_repository.get_board(
+            user_id=FIRST_MANAGER_ID, limit=2
+        )
+
+        # the completed stage isn't on the board, the empty stages are
+        assert [
+            (stage.sale_stage_id, stage.deals_count, stage.cost_total)
+            for stage in stages
+        ] == [
+            (1, 3, 60),
+            (2, 0, 0),
+            (3, 1, 100),
+            (4, 0, 0),
+            (5, 0, 0),
+            (6, 0, 0),
+        ]
+        # the first cards of the stage, the latest updated first
+        assert [deal.deal_id for deal in stages[0].deals] == [
+            UUID(int=1002),
+            UUID(int=1001),
+        ]
+        assert [deal.deal_id for deal in stages[2].deals] == [UUID(int=1003)]
+
+    async def test_get_board_of_manager(
+        self, board_session: AsyncSession, deal_repository: DealRepository
+    ):
+        await create_deal(board_session, 0)
+        await create_deal(board_session, 1, manager_id=SECOND_MANAGER_ID)
+
+        stages = await deal_repository.get_board(
+            user_id=SECOND_MANAGER_ID, manager_id=SECOND_MANAGER_ID
+        )
+
+        assert (stages[0].deals_count, stages[0].cost_total) == (1, 100)
+        assert [deal.deal_id for deal in stages[0].deals] == [UUID(int=1001)]
+
+    async def test_reconcile_board(
+        self, board_session: AsyncSession, deal_repository: DealRepository
+    ):
+        await create_deal(board_session, 0)
+        await create_deal(board_session, 1, sale_stage_id=2)
+        # the drift of the manual data changes
+        await board_session.execute(
+            text(
+                """
+                update deal_stage_board
+                set deals_count = deals_count + 2, cost_total = 0
+                where sale_stage_id = 1
+                """
+            )
+        )
+        await board_session.execute(
+            text("delete from deal_stage_board where sale_stage_id = 2")
+        )
+        await board_session.execute(
+            text(
+                """
+                insert into deal_stage_board (
+                    sale_stage_id, manager_id, deals_count, cost_total
+                )
+                values (3, null, 1, 10)
+                """
+            )
+        )
+        await board_session.commit()
+
+        corrected_rows = await deal_repository.reconcile_deal_stage_board()
+
+        assert corrected_rows == 3
+        assert await get_board_rows(board_session) == {
+            (1, FIRST_MANAGER_ID): (1, 100),
+            (2, FIRST_MANAGER_ID): (1, 100),
+        }
+        # the correct board isn't changed
+        assert await deal_repository.reconcile_deal_stage_board() == 0
@@ -0,0 +1,116 @@
+from datetime import UTC, datetime
+from uuid import UUID
+
+from pytest import fixture, mark
+from pytest_asyncio import fixture as async_fixture
+from sqlalchemy import insert, select, text
+from sqlalchemy.ext.asyncio.session import AsyncSession
+
+from db.models import Deal, ManagerLoad, Role, SaleStage, User
+from domain.enums import Roles
+from repository.deal_repository import DealRepository
+
+FIRST_MANAGER_ID = UUID(int=1)
+SECOND_MANAGER_ID = UUID(int=2)
+# the leads of the deals are UUID(int=100 + index)
+LEADS_COUNT = 4
+
+
+@async_fixture
+async def load_session(async_session: AsyncSession) -> AsyncSession:
+    await async_session.execute(
+        insert(Role), {"role_id": Roles.ADMIN, "name": "Manager"}
+    )
+    await async_session.execute(
+        insert(SaleStage), {"sale_stage_id": 1, "name": "Stage 1"}
+    )
+    await async_session.execute(
+        insert(User),
+        [
+            {
+                "user_id": user_id,
+                "login": f"user_{user_id.int}",
+                "email": f"user_{user_id.int}@example.com",
+                "password": "securepassword123",
+                "role_id": role_id,
+                "is_registered": True,
+            }
+            for user_id, role_id in [
+                (FIRST_MANAGER_ID, Roles.ADMIN),
+                (SECOND_MANAGER_ID, Roles.ADMIN),
+                *((UUID(int=100 + index), 1) for index in range(LEADS_COUNT)),
+            ]
+        ],
+    )
+    await async_session.commit()
+    return async_session
+
+
+@fixture
+def deal_repository(load_session: AsyncSession) -> DealRepository:
+    return DealRepository(session=load_session)
+
+
+async def create_deal(
+    session: AsyncSession, index: int, close_at: datetime | None = None
+) -> None:
+    await session.execute(
+        insert(Deal).values(
+            deal_id=UUID(int=1000 + index),
+            sale_stage_id=1,
+            lead_id=UUID(int=100 + index),
+            manager_id=FIRST_MANAGER_ID,
+            cost=100,
+            close_at=close_at,
+        )
+    )
+    await session.commit()
+
+
+async def get_loads(session: AsyncSession) -> dict[UUID, int]:
+    result = await session.execute(
+        select(ManagerLoad.manager_id, ManagerLoad.open_deals_count)
+    )
+    return {row.manager_id: row.open_deals_count for row in result}
+
+
+@mark.repository
+@mark.asyncio
+class TestManagerLoadRepository:
+    async def test_reconcile_manager_load(
+        self, load_session: AsyncSession, deal_repository: DealRepository
+    ):
+        await create_deal(load_session, 0)
+        await create_deal(load_session, 1)
+        await create_deal(load_session, 2, close_at=datetime.now(tz=UTC))
+
+        # the managers are registered by the reconciliation
+        assert await deal_repository.reconcile_manager_load() == 2
+        assert await get_loads(load_session) == {
+            FIRST_MANAGER_ID: 2,
+            SECOND_MANAGER_ID: 0,
+        }
+
+        # the drift of the manual data changes
+        await load_session.execute(
+            text("update manager_load set open_deals_count = 5")
+        )
+        await load_session.commit()
+
+        assert await deal_repository.reconcile_manager_load() == 2
+        assert await get_loads(load_session) == {
+            FIRST_MANAGER_ID: 2,
+            SECOND_MANAGER_ID: 0,
+        }
+
+    async def test_keep_trigger_increments(
+        self, load_session: AsyncSession, deal_repository: DealRepository
+    ):
+        await create_deal(load_session, 0)
+        await deal_repository.reconcile_manager_load()
+
+        # the count is incremented by the trigger after the reconciliation
+        await create_deal(load_session, 1)
+
+        assert await deal_repository.reconcile_manager_load() == 0
+        assert (await get_loads(load_session))[FIRST_MANAGER_ID] == 2
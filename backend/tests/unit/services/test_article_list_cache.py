@@ -0,0 +1,156 @@
+import asyncio
+from unittest.mock import AsyncMock
+
+from pytest import fixture, mark
+from redis.exceptions import ConnectionError as RedisConnectionError
+
+from domain.enums import ArticleCategoriesID, LanguageEnum
+from dto.article_dto import ArticleListFiltersDTO
+from schemas.article_schema import ArticleListSchema
+from services.article_list_cache import ArticleListCache
+
+RU_LIST_KEY = "ru_list"
+RED_WINE_LIST_KEY = "red_wine_list"
+TAG_LIST_KEY = "tag_list"
+EN_LIST_KEY = "en_list"
+
+
+@fixture
+def cache_repository():
+    cache_repository = AsyncMock()
+    cache_repository.get_list.return_value = None
+    # lists: ru without filters, ru red wine, ru with tag 1, en without filters
+    cache_repository.get_tagged_lists.side_effect = lambda tags: {
+        tag: {
+            "language:ru-RU": {RU_LIST_KEY, RED_WINE_LIST_KEY, TAG_LIST_KEY},
+            "language:en-US": {EN_LIST_KEY},
+            "category:*": {RU_LIST_KEY, TAG_LIST_KEY, EN_LIST_KEY},
+            "category:1": {RED_WINE_LIST_KEY},
+            "tag:*": {RU_LIST_KEY, RED_WINE_LIST_KEY, EN_LIST_KEY},
+            "tag:1": {TAG_LIST_KEY},
+        }.get(tag, set())
+        for tag in tags
+    }
+    return cache_repository
+
+
+@fixture
+def list_cache(cache_repository: AsyncMock):
+    return ArticleListCache(cache_repository=cache_repository, ttl=30)
+
+
+@mark.article
+@mark.service
+class TestArticleListCache:
+    def test_key_of_normalized_filters(self, list_cache: ArticleListCache):
+        first_filters = ArticleListFiltersDTO(
+            language=LanguageEnum.RUSSIAN, tags=(3, 1, 3)
+        )
+        second_filters = ArticleListFiltersDTO(
+            language=LanguageEnum.RUSSIAN, tags=(1, 3)
+        )
+
+        assert list_cache._get_key(first_filters) == list_cache._get_key(
+            second_filters
+        )
+        assert list_cache._get_tags(first_filters) == [
+            "language:ru-RU",
+            "category:*",
+            "tag:1",
+            "tag:3",
+        ]
+
+    async def test_single_flight(
+        self, list_cache: ArticleListCache, cache_repository: AsyncMock
+    ):
+        filters = ArticleListFiltersDTO(language=LanguageEnum.RUSSIAN)
+        load = AsyncMock()
+
+        async def slow_load():
+            await asyncio.sleep(0.01)
+            await load()
+            return ArticleListSchema(
+                language=LanguageEnum.RUSSIAN, articles=[]
+            )
+
+        results = await asyncio.gather(
+            *(list_cache.get_or_load(filters, slow_load) for _ in range(5))
+        )
+
+        assert load.await_count == 1
+        assert all(result.articles == [] for result in results)
+        cache_repository.set_list.assert_awaited_once()
+
+    async def test_redis_failure_bypass_cache(
+        self, list_cache: ArticleListCache, cache_repository: AsyncMock
+    ):
+        cache_repository.get_list.side_effect = RedisConnectionError
+        cache_repository.set_list.side_effect = RedisConnectionError
+        article_list = ArticleListSchema(
+            language=LanguageEnum.RUSSIAN, articles=[]
+        )
+
+        result = await list_cache.get_or_load(
+            ArticleListFiltersDTO(language=LanguageEnum.RUSSIAN),
+            AsyncMock(return_value=article_list),
+        )
+
+        assert result == article_list
+
+    @mark.parametrize(
+        "languages, categories, tags, expectation",
+        [
+            (
+                [LanguageEnum.RUSSIAN],
+                None,
+                None,
+                {RU_LIST_KEY, RED_WINE_LIST_KEY, TAG_LIST_KEY},
+            ),
+            (
+                [LanguageEnum.RUSSIAN],
+                [ArticleCategoriesID.WHITE_WINE],
+                [],
+                {RU_LIST_KEY},
+            ),
+            (
+                None,
+                [ArticleCategoriesID.RED_WINE],
+                None,
+                {RU_LIST_KEY, RED_WINE_LIST_KEY, TAG_LIST_KEY, EN_LIST_KEY},
+            ),
+            (
+                None,
+                None,
+                [1],
+                {TAG_LIST_KEY, RU_LIST_KEY, RED_WINE_LIST_KEY, EN_LIST_KEY},
+            ),
+            (
+                [LanguageEnum.RUSSIAN],
+                [ArticleCategoriesID.RED_WINE],
+                [2],
+                {RU_LIST_KEY, RED_WINE_LIST_KEY},
+            ),
+        ],
+        ids=[
+            "language",
+            "language_and_other_category",
+            "category_in_all_languages",
+            "tag_in_all_languages",
+            "all_dimensions",
+        ],
+    )
+    async def test_invalidate(
+        self,
+        list_cache: ArticleListCache,
+        cache_repository: AsyncMock,
+        languages,
+        categories,
+        tags,
+        expectation: set[str],
+    ):
+        await list_cache.invalidate(
+            languages=languages, categories=categories, tags=tags
+        )
+
+        deleted_keys = cache_repository.delete_lists.call_args.args[0]
+        assert deleted_keys == expectation
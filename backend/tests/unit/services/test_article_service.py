@@ -1,5 +1,11 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
 from pytest import fixture, mark
 
+from domain.entities.article import Article, ArticleCategory
+from domain.entities.tag import Tag
+from domain.enums import ArticleCategoriesID, LanguageEnum
 from services.article_service import ArticleService
 
 
@@ -63,3 +69,57 @@ class TestArticleService:
         words_set = sut(input_text)
 
         assert expectation_set == words_set
+
+    @mark.parametrize(
+        "candidates_count, candidates_limit, truncated",
+        [(0, 2, False), (2, 2, False), (3, 2, True)],
+        ids=["no_candidates", "candidates_in_limit", "truncated_candidates"],
+    )
+    async def test_get_articles_with_candidates_limit(
+        self, candidates_count: int, candidates_limit: int, truncated: bool
+    ):
+        article_repository = AsyncMock()
+        article_repository.get_search_candidates.return_value = [
+            uuid4() for _ in range(candidates_count)
+        ]
+        article_repository.get_articles.return_value = []
+        sut = ArticleService(article_repository=article_repository)
+
+        result = await sut.get_articles(
+            language=LanguageEnum.RUSSIAN,
+            searched_text="вино",
+            candidates_limit=candidates_limit,
+        )
+
+        assert result.truncated is truncated
+        candidates = article_repository.get_search_candidates.call_args
+        assert candidates.kwargs["limit"] == candidates_limit + 1
+        if candidates_count:
+            articles = article_repository.get_articles.call_args
+            assert len(articles.kwargs["article_ids"]) == min(
+                candidates_count, candidates_limit
+            )
+        else:
+            article_repository.get_articles.assert_not_called()
+
+    async def test_set_tags_to_article_invalidates_all_tags(self):
+        article_repository = AsyncMock()
+        article_repository.get_article.return_value = Article(
+            article_id=uuid4(),
+            title="Pinot Noir",
+            slug="pinot-noir",
+            category=ArticleCategory(
+                category_id=ArticleCategoriesID.WHITE_WINE
+            ),
+            tags=[Tag(tag_id=1), Tag(tag_id=3)],
+        )
+        list_cache = AsyncMock()
+        sut = ArticleService(
+            article_repository=article_repository, list_cache=list_cache
+        )
+
+        await sut.set_tags_to_article(article_id=uuid4(), tags=[3, 4])
+
+        list_cache.invalidate.assert_awaited_once_with(
+            languages=None, categories=[2], tags={1, 3, 4}
+        )
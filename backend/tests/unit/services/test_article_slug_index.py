@@ -0,0 +1,68 @@
+from unittest.mock import AsyncMock
+from uuid import uuid4
+
+from pytest import fixture, mark
+
+from domain.enums import LanguageEnum
+from dto.article_dto import ArticleSlugDTO
+from services.article_slug_index import ArticleSlugIndex
+
+ARTICLE_ID = uuid4()
+ARTICLE_SLUG = "pinot-noir"
+
+
+@fixture
+def slug_index():
+    index = ArticleSlugIndex()
+    index.set(ARTICLE_ID, ARTICLE_SLUG, {LanguageEnum.RUSSIAN})
+    return index
+
+
+@mark.article
+@mark.service
+class TestArticleSlugIndex:
+    async def test_load(self, slug_index: ArticleSlugIndex):
+        article_repository = AsyncMock()
+        article_repository.get_slugs.return_value = [
+            ArticleSlugDTO(
+                article_id=uuid4(),
+                slug="merlot",
+                languages={LanguageEnum.ENGLISH},
+            )
+        ]
+
+        await slug_index.load(article_repository)
+
+        assert len(slug_index) == 1
+        assert slug_index.get(ARTICLE_SLUG) is None
+        assert slug_index.get("merlot") is not None
+
+    def test_change_slug_keeps_languages(self, slug_index: ArticleSlugIndex):
+        slug_index.set(ARTICLE_ID, "pinot-noir-new")
+
+        article = slug_index.get("pinot-noir-new")
+
+        assert slug_index.get(ARTICLE_SLUG) is None
+        assert article is not None
+        assert article.article_id == ARTICLE_ID
+        assert article.languages == {LanguageEnum.RUSSIAN}
+
+    def test_languages(self, slug_index: ArticleSlugIndex):
+        slug_index.add_language(ARTICLE_ID, LanguageEnum.ENGLISH)
+        slug_index.change_language(
+            ARTICLE_ID, LanguageEnum.RUSSIAN, LanguageEnum.KAZAKHSTAN
+        )
+        slug_index.remove_language(ARTICLE_ID, LanguageEnum.ENGLISH)
+
+        article = slug_index.get(ARTICLE_SLUG)
+
+        assert article is not None
+        assert article.languages == {LanguageEnum.KAZAKHSTAN}
+
+    def test_remove(self, slug_index: ArticleSlugIndex):
+        slug_index.remove(ARTICLE_ID)
+        # unknown articles are ignored
+        slug_index.add_language(ARTICLE_ID, LanguageEnum.ENGLISH)
+
+        assert slug_index.get(ARTICLE_SLUG) is None
+        assert len(slug_index) == 0
@@ -0,0 +1,134 @@
+import asyncio
+import json
+from contextlib import suppress
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+from pytest import mark
+
+from services.abc.chat_broker_abc import AbstractChatBroker, ChatMessageHandler
+from services.chat_broker import LocalChatBroker
+from services.connection_manager import WebSocketManager
+
+ROOM_ID = UUID(int=1)
+MANAGER_ID = UUID(int=2)
+LEAD_ID = UUID(int=3)
+
+
+class HubChatBroker(AbstractChatBroker):
+    """Broker of one worker, connected to the pub/sub hub of the test."""
+
+    def __init__(self, hub: list["HubChatBroker"]):
+        self.hub = hub
+        self.rooms: set[UUID] = set()
+        self.messages: asyncio.Queue[tuple[UUID, str]] = asyncio.Queue()
+        hub.append(self)
+
+    async def publish(self, room_id: UUID, payload: str) -> None:
+        for broker in self.hub:
+            if room_id in broker.rooms:
+                await broker.messages.put((room_id, payload))
+
+    async def subscribe(self, room_id: UUID) -> None:
+        self.rooms.add(room_id)
+
+    async def unsubscribe(self, room_id: UUID) -> None:
+        self.rooms.discard(room_id)
+
+    async def listen(self, handler: ChatMessageHandler) -> None:
+        while True:
+            await handler(*await self.messages.get())
+
+
+def get_manager(
+    broker: AbstractChatBroker, send_queue_size: int = 10
+) -> WebSocketManager:
+    return WebSocketManager(
+        broker=broker, send_queue_size=send_queue_size, send_timeout=1
+    )
+
+
+def get_payload(message: str) -> str:
+    return json.dumps({"message": message, "user_id": str(MANAGER_ID)})
+
+
+async def run_until_delivered(*managers: WebSocketManager):
+    tasks = [asyncio.create_task(manager.run()) for manager in managers]
+    await asyncio.sleep(0.01)
+    for task in tasks:
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+
+
+@mark.service
+class TestWebSocketManager:
+    async def test_broadcast_to_local_room(self):
+        manager = get_manager(LocalChatBroker())
+        websocket = AsyncMock()
+        await manager.connect(websocket, room_id=ROOM_ID, user_id=MANAGER_ID)
+
+        await manager.broadcast(room_id=ROOM_ID, payload=get_payload("Hi"))
+        await run_until_delivered(manager)
+
+        websocket.send_text.assert_awaited_once()
+        payload = json.loads(websocket.send_text.await_args.args[0])
+        assert payload["message"] == "Hi"
+        assert payload["user_id"] == str(MANAGER_ID)
+
+    async def test_broadcast_across_workers(self):
+        hub = []
+        first_worker = get_manager(HubChatBroker(hub))
+        second_worker = get_manager(HubChatBroker(hub))
+        third_worker = get_manager(HubChatBroker(hub))
+        manager_websocket = AsyncMock()
+        lead_websocket = AsyncMock()
+        await first_worker.connect(
+            manager_websocket, room_id=ROOM_ID, user_id=MANAGER_ID
+        )
+        await second_worker.connect(
+            lead_websocket, room_id=ROOM_ID, user_id=LEAD_ID
+        )
+
+        await first_worker.broadcast(
+            room_id=ROOM_ID, payload=get_payload("Hi")
+        )
+        await run_until_delivered(first_worker, second_worker, third_worker)
+
+        manager_websocket.send_text.assert_awaited_once()
+        lead_websocket.send_text.assert_awaited_once()
+        # the worker without the members of the room isn't subscribed
+        assert all(ROOM_ID not in broker.rooms for broker in hub[2:])
+
+    async def test_unsubscribe_empty_room(self):
+        hub = []
+        manager = get_manager(HubChatBroker(hub))
+        await manager.connect(AsyncMock(), room_id=ROOM_ID, user_id=LEAD_ID)
+
+        await manager.disconnect(room_id=ROOM_ID, user_id=LEAD_ID)
+
+        assert ROOM_ID not in hub[0].rooms
+
+    async def test_drop_slow_consumer(self):
+        manager = get_manager(LocalChatBroker(), send_queue_size=2)
+        fast_websocket = AsyncMock()
+        slow_websocket = AsyncMock()
+        # the slow member doesn't receive the messages
+        slow_websocket.send_text.side_effect = asyncio.Event().wait
+        await manager.connect(fast_websocket, room_id=ROOM_ID, user_id=LEAD_ID)
+        await manager.connect(
+            slow_websocket, room_id=ROOM_ID, user_id=MANAGER_ID
+        )
+
+        for message in ("1", "2", "3", "4"):
+            await manager.deliver(ROOM_ID, message)
+            await asyncio.sleep(0)
+        await asyncio.sleep(0.01)
+
+        assert fast_websocket.send_text.await_count == 4
+        slow_websocket.close.assert_awaited_once()
+        assert MANAGER_ID not in manager.active_connections[ROOM_ID]
+        metrics = manager.get_room_metrics(ROOM_ID)
+        assert metrics
+        assert metrics.delivered_total == 4
+        assert metrics.dropped_connections_total == 1
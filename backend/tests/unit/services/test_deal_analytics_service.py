@@ -0,0 +1,250 @@
+from datetime import date
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+from pytest import approx, fixture, mark
+from redis.exceptions import RedisError
+
+from domain.enums import ForecastDimension
+from dto.deal_analytics_dto import DealStageRollupDTO, SaleStageDTO
+from services.classes.revenue_forecast import (
+    OpenDealColumns,
+    get_revenue_forecast,
+)
+from services.classes.stage_rollup import (
+    DURATION_BUCKETS_COUNT,
+    get_duration_bucket,
+)
+from services.deal_analytics_service import DealAnalyticsService
+from services.deal_forecast_cache import DealForecastCache
+
+MANAGER_ID = UUID(int=1)
+OTHER_MANAGER_ID = UUID(int=2)
+DAY = date(2026, 10, 19)
+MONTH = date(2026, 11, 1)
+
+
+def get_rollup(
+    from_sale_stage_id: int,
+    to_sale_stage_id: int,
+    transitions: int,
+    duration: float,
+) -> DealStageRollupDTO:
+    histogram = [0] * DURATION_BUCKETS_COUNT
+    histogram[get_duration_bucket(duration)] = transitions
+    return DealStageRollupDTO(
+        day=DAY,
+        from_sale_stage_id=from_sale_stage_id,
+        to_sale_stage_id=to_sale_stage_id,
+        manager_id=MANAGER_ID,
+        transitions=transitions,
+        duration_total=duration * transitions,
+        duration_histogram=histogram,
+    )
+
+
+@fixture
+def analytics_repository_mock():
+    repository = AsyncMock()
+    # the stages are returned out of the funnel order
+    repository.get_sale_stages.return_value = [
+        SaleStageDTO(sale_stage_id=3, name="Won", next_sale_stage_id=None),
+        SaleStageDTO(sale_stage_id=1, name="Contact", next_sale_stage_id=2),
+        SaleStageDTO(sale_stage_id=2, name="Offer", next_sale_stage_id=3),
+    ]
+    repository.get_stage_rollups.return_value = [
+        get_rollup(1, 2, 8, 3600),
+        get_rollup(2, 3, 3, 86400),
+        # the deal is moved back
+        get_rollup(2, 1, 1, 600),
+    ]
+    return repository
+
+
+@fixture
+def analytics_service(analytics_repository_mock):
+    return DealAnalyticsService(
+        analytics_repository=analytics_repository_mock,
+        forecast_cache=AsyncMock(),
+    )
+
+
+@fixture
+def open_deals() -> OpenDealColumns:
+    return OpenDealColumns.from_rows(
+        [
+            (MANAGER_ID, 1, MONTH, 1000.0, 0.5),
+            (MANAGER_ID, 2, MONTH, 2000.0, 0.25),
+            (OTHER_MANAGER_ID, 1, None, 400.0, 1.0),
+        ]
+    )
+
+
+@fixture
+def forecast_cache_repository_mock():
+    repository = AsyncMock()
+    repository.get_generation.return_value = 1
+    return repository
+
+
+@fixture
+def forecast_cache(forecast_cache_repository_mock) -> DealForecastCache:
+    return DealForecastCache(
+        cache_repository=forecast_cache_repository_mock, ttl=60
+    )
+
+
+@mark.service
+class TestDealAnalyticsService:
+    async def test_get_funnel(self, analytics_service: DealAnalyticsService):
+        funnel = await analytics_service.get_funnel(DAY, DAY)
+
+        assert [
+            (stage.sale_stage_id, stage.entered, stage.exited, stage.advanced)
+            for stage in funnel
+        ] == [(1, 1, 8, 8), (2, 8, 4, 3), (3, 3, 0, 0)]
+        assert funnel[1].conversion == 0.75
+        assert funnel[2].conversion is None
+
+    async def test_get_time_in_stage(
+        self, analytics_service: DealAnalyticsService
+    ):
+        durations = await analytics_service.get_time_in_stage(
+            DAY, DAY, percentiles=[50]
+        )
+
+        offer = durations[1]
+        assert offer.count == 4
+        assert offer.mean_seconds == (3 * 86400 + 600) / 4
+        # the median is in the bucket of the day
+        assert 61440 <= offer.percentiles[0].seconds <= 122880
+        assert durations[2].percentiles == []
+
+    async def test_get_manager_throughput(
+        self, analytics_service: DealAnalyticsService
+    ):
+        throughput = await analytics_service.get_manager_throughput(
+            date(2026, 10, 18), DAY
+        )
+
+        assert len(throughput) == 1
+        assert throughput[0].transitions == 12
+        assert throughput[0].advanced == 11
+        # the completed stage is 7
+        assert throughput[0].won == 0
+        assert throughput[0].transitions_per_day == 6
+
+
+@mark.service
+class TestRevenueForecast:
+    def test_total(self, open_deals: OpenDealColumns):
+        forecast = get_revenue_forecast(open_deals, group_by=[])
+
+        assert forecast.total.deals == 3
+        assert forecast.total.pipeline == 3400
+        assert forecast.total.expected_revenue == 1400
+        # the variances of the independent deals are summed
+        assert forecast.total.variance == approx(
+            1000**2 * 0.25 + 2000**2 * 0.1875
+        )
+        assert forecast.total.stddev == approx(forecast.total.variance**0.5)
+        assert forecast.buckets == []
+
+    def test_group_by(self, open_deals: OpenDealColumns):
+        forecast = get_revenue_forecast(
+            open_deals,
+            group_by=[ForecastDimension.MANAGER, ForecastDimension.MONTH],
+        )
+
+        assert [
+            (
+                bucket.manager_id,
+                bucket.sale_stage_id,
+                bucket.month,
+                bucket.deals,
+                bucket.expected_revenue,
+            )
+            for bucket in forecast.buckets
+        ] == [
+            (MANAGER_ID, None, MONTH, 2, 1000),
+            (OTHER_MANAGER_ID, None, None, 1, 400),
+        ]
+        # the won deal is certain
+        assert forecast.buckets[1].variance == 0
+
+    def test_empty(self):
+        forecast = get_revenue_forecast(
+            OpenDealColumns.from_rows([]),
+            group_by=[ForecastDimension.SALE_STAGE],
+        )
+
+        assert forecast.total.deals == 0
+        assert forecast.buckets == []
+
+
+@mark.service
+class TestDealForecastCache:
+    async def test_snapshot_is_reused(
+        self, forecast_cache: DealForecastCache, open_deals: OpenDealColumns
+    ):
+        load = AsyncMock(return_value=open_deals)
+
+        first = await forecast_cache.get_or_load(
+            [ForecastDimension.MANAGER], load
+        )
+        second = await forecast_cache.get_or_load(
+            [ForecastDimension.MANAGER, ForecastDimension.MANAGER], load
+        )
+        await forecast_cache.get_or_load([ForecastDimension.MONTH], load)
+
+        assert first is second
+        load.assert_awaited_once()
+
+    async def test_write_of_other_worker(
+        self,
+        forecast_cache: DealForecastCache,
+        forecast_cache_repository_mock: AsyncMock,
+        open_deals: OpenDealColumns,
+    ):
+        load = AsyncMock(return_value=open_deals)
+        await forecast_cache.get_or_load([], load)
+
+        forecast_cache_repository_mock.get_generation.return_value = 2
+        await forecast_cache.get_or_load([], load)
+
+        assert load.await_count == 2
+
+    async def test_invalidate(
+        self,
+        forecast_cache: DealForecastCache,
+        forecast_cache_repository_mock: AsyncMock,
+        open_deals: OpenDealColumns,
+    ):
+        load = AsyncMock(return_value=open_deals)
+        await forecast_cache.get_or_load([], load)
+
+        await forecast_cache.invalidate()
+        await forecast_cache.get_or_load([], load)
+
+        forecast_cache_repository_mock.increment_generation.assert_awaited()
+        assert load.await_count == 2
+
+    async def test_redis_failure(
+        self,
+        forecast_cache: DealForecastCache,
+        forecast_cache_repository_mock: AsyncMock,
+        open_deals: OpenDealColumns,
+    ):
+        forecast_cache_repository_mock.get_generation.side_effect = RedisError
+        forecast_cache_repository_mock.increment_generation.side_effect = (
+            RedisError
+        )
+        load = AsyncMock(return_value=open_deals)
+
+        await forecast_cache.get_or_load([], load)
+        await forecast_cache.get_or_load([], load)
+        await forecast_cache.invalidate()
+        forecast = await forecast_cache.get_or_load([], load)
+
+        assert forecast.total.deals == 3
+        assert load.await_count == 2
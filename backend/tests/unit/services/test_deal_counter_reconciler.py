@@ -0,0 +1,36 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+from pytest import MonkeyPatch, mark
+
+from services import deal_counter_reconciler as reconciler_module
+from services.deal_counter_reconciler import DealCounterReconciler
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+@mark.service
+class TestDealCounterReconciler:
+    async def test_reconcile(self, monkeypatch: MonkeyPatch):
+        deal_repository = AsyncMock()
+        monkeypatch.setattr(
+            reconciler_module,
+            "DealRepository",
+            MagicMock(return_value=deal_repository),
+        )
+        reconcile = AsyncMock(return_value=3)
+        reconciler = DealCounterReconciler(
+            name="Manager load",
+            session_factory=session_factory,  # type: ignore
+            reconcile=reconcile,
+            interval=1,
+        )
+
+        result = await reconciler.reconcile()
+
+        assert result == 3
+        reconcile.assert_awaited_once_with(deal_repository)
+        assert reconciler.metrics.corrected_rows_total == 3
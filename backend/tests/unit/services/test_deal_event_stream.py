@@ -0,0 +1,163 @@
+import asyncio
+from contextlib import suppress
+from unittest.mock import AsyncMock
+from uuid import UUID
+
+from pytest import fixture, mark
+
+from domain.enums import DealEventType
+from dto.deal_dto import DealEventDTO, DealStreamEventDTO
+from services.deal_event_stream import DealEventStream
+
+LEAD_ID = UUID(int=1)
+MANAGER_ID = UUID(int=2)
+STRANGER_ID = UUID(int=3)
+QUEUE_SIZE = 2
+
+
+def get_event(
+    deal_id: int = 1, event_type: DealEventType = DealEventType.DEAL_UPDATED
+) -> DealEventDTO:
+    return DealEventDTO(
+        event_type=event_type,
+        deal_id=UUID(int=deal_id),
+        lead_id=LEAD_ID,
+        manager_id=MANAGER_ID,
+    )
+
+
+@fixture
+def event_repository_mock():
+    return AsyncMock()
+
+
+@fixture
+def event_stream(event_repository_mock):
+    return DealEventStream(
+        event_repository=event_repository_mock,
+        replay_limit=10,
+        queue_size=QUEUE_SIZE,
+        heartbeat_interval=0.05,
+    )
+
+
+@mark.service
+class TestDealEventStream:
+    async def test_dispatch_to_members(self, event_stream: DealEventStream):
+        member_events = event_stream.subscribe(MANAGER_ID)
+        stranger_events = event_stream.subscribe(STRANGER_ID)
+        member_next = asyncio.ensure_future(anext(member_events))
+        stranger_next = asyncio.ensure_future(anext(stranger_events))
+        await asyncio.sleep(0)
+
+        event_stream.dispatch("1-0", get_event())
+
+        event = await member_next
+        assert event.event_id == "1-0"
+        assert event.event.deal_id == UUID(int=1)
+        # the stranger gets only the heartbeat
+        assert await stranger_next is None
+
+        await member_events.aclose()
+        await stranger_events.aclose()
+
+    async def test_resume_skips_replayed_events(
+        self,
+        event_stream: DealEventStream,
+        event_repository_mock: AsyncMock,
+    ):
+        event_repository_mock.get_first_id.return_value = "1-0"
+        event_repository_mock.get_after.return_value = [
+            ("2-0", get_event(2).model_dump_json()),
+            ("3-0", get_event(3).model_dump_json()),
+        ]
+        events = event_stream.subscribe(LEAD_ID, last_event_id="1-0")
+        first_event = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        # the replayed event is dispatched by the reader too
+        event_stream.dispatch("3-0", get_event(3))
+        event_stream.dispatch("4-0", get_event(4))
+
+        event_ids = [(await first_event).event_id] + [
+            (await anext(events)).event_id for _ in range(2)
+        ]
+
+        assert event_ids == ["2-0", "3-0", "4-0"]
+        event_repository_mock.get_after.assert_awaited_once_with("1-0", 10)
+        await events.aclose()
+
+    async def test_resume_after_trimmed_events(
+        self,
+        event_stream: DealEventStream,
+        event_repository_mock: AsyncMock,
+    ):
+        event_repository_mock.get_first_id.return_value = "5-0"
+        events = event_stream.subscribe(LEAD_ID, last_event_id="1-0")
+
+        event = await anext(events)
+
+        assert event.event_type == DealEventType.RESET
+        event_repository_mock.get_after.assert_not_awaited()
+        await events.aclose()
+
+    async def test_slow_client_is_reset(self, event_stream: DealEventStream):
+        events = event_stream.subscribe(LEAD_ID)
+        next_event = asyncio.ensure_future(anext(events))
+        await asyncio.sleep(0)
+        # the first event is got by the waiting client
+        event_stream.dispatch("1-0", get_event(1))
+        assert (await next_event).event_id == "1-0"
+
+        for index in range(2, QUEUE_SIZE + 3):
+            event_stream.dispatch(f"{index}-0", get_event(index))
+
+        assert (await anext(events)).event_type == DealEventType.RESET
+        # the queue is dropped, the client gets only the new events
+        event_stream.dispatch("9-0", get_event(9))
+        assert (await anext(events)).event_id == "9-0"
+        await events.aclose()
+
+    async def test_run_after_errors(
+        self,
+        event_stream: DealEventStream,
+        event_repository_mock: AsyncMock,
+    ):
+        reads = [
+            RuntimeError,
+            [("1-0", "invalid"), ("2-0", get_event().model_dump_json())],
+        ]
+
+        async def wait_after(*args, **kwargs) -> list[tuple[str, str]]:
+            if not reads:
+                # the stream is idle
+                await asyncio.Event().wait()
+            entries = reads.pop(0)
+            if entries is RuntimeError:
+                raise RuntimeError
+            return entries
+
+        event_repository_mock.get_last_id.return_value = "0-0"
+        event_repository_mock.wait_after.side_effect = wait_after
+        events = event_stream.subscribe(MANAGER_ID)
+
+        async def get_next_event() -> DealStreamEventDTO:
+            # the heartbeats are skipped
+            async for event in events:
+                if event is not None:
+                    return event
+            raise AssertionError
+
+        next_event = asyncio.ensure_future(get_next_event())
+        await asyncio.sleep(0)
+
+        task = asyncio.create_task(event_stream.run())
+        event = await asyncio.wait_for(next_event, timeout=2)
+        task.cancel()
+        with suppress(asyncio.CancelledError):
+            await task
+        await events.aclose()
+
+        # the stream isn't stopped by the read error and the invalid event
+        assert event.event_id == "2-0"
+        assert event_stream.metrics.failed_reads == 1
+        assert event_stream.metrics.invalid_events_total == 1
@@ -0,0 +1,45 @@
+from contextlib import asynccontextmanager
+from unittest.mock import AsyncMock, MagicMock
+
+from pytest import MonkeyPatch, mark
+
+from dto.deal_dto import DealHistoryPruneDTO
+from services import deal_history_compactor as compactor_module
+from services.deal_history_compactor import DealHistoryCompactor
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+@mark.service
+class TestDealHistoryCompactor:
+    async def test_compact_until_last_batch(self, monkeypatch: MonkeyPatch):
+        deal_repository = AsyncMock()
+        deal_repository.prune_deal_history.side_effect = [
+            DealHistoryPruneDTO(pruned_rows=10, pruned_deals=2),
+            DealHistoryPruneDTO(pruned_rows=4, pruned_deals=2),
+            DealHistoryPruneDTO(pruned_rows=1, pruned_deals=1),
+        ]
+        monkeypatch.setattr(
+            compactor_module,
+            "DealRepository",
+            MagicMock(return_value=deal_repository),
+        )
+        compactor = DealHistoryCompactor(
+            session_factory=session_factory,  # type: ignore
+            max_deal_saves=5,
+            batch_size=2,
+            interval=1,
+        )
+
+        result = await compactor.compact()
+
+        assert result == DealHistoryPruneDTO(pruned_rows=15, pruned_deals=5)
+        assert deal_repository.prune_deal_history.await_count == 3
+        deal_repository.prune_deal_history.assert_awaited_with(
+            max_deal_saves=5, batch_size=2
+        )
+        assert compactor.metrics.pruned_rows_total == 15
+        assert compactor.metrics.last_pruned_rows == 15
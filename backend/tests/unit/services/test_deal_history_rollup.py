@@ -0,0 +1,156 @@
+from contextlib import asynccontextmanager
+from datetime import UTC, date, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from pytest import MonkeyPatch, approx, mark
+
+from dto.deal_analytics_dto import DealHistoryRowDTO, DealStageEntryDTO
+from services import deal_history_rollup as rollup_module
+from services.classes.stage_rollup import (
+    DURATION_BUCKETS_COUNT,
+    fold_deal_history,
+    get_duration_bucket,
+    get_percentile,
+    merge_histograms,
+)
+from services.deal_history_rollup import DealHistoryRollup
+
+DEAL_ID = UUID(int=1)
+MANAGER_ID = UUID(int=2)
+CREATED_AT = datetime(2026, 10, 1, 12, tzinfo=UTC)
+
+
+def get_row(
+    deal_history_id: int,
+    sale_stage_id: int,
+    next_sale_stage_id: int | None,
+    changed_at: datetime,
+    deal_created_at: datetime | None = CREATED_AT,
+) -> DealHistoryRowDTO:
+    return DealHistoryRowDTO(
+        deal_history_id=deal_history_id,
+        deal_id=DEAL_ID,
+        sale_stage_id=sale_stage_id,
+        manager_id=MANAGER_ID,
+        changed_at=changed_at,
+        next_sale_stage_id=next_sale_stage_id,
+        deal_created_at=deal_created_at,
+    )
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+@mark.service
+class TestStageRollup:
+    def test_fold_stage_moves(self):
+        rows = [
+            # the stage is changed after 2 hours
+            get_row(1, 1, 2, CREATED_AT + timedelta(hours=2)),
+            # the probability is changed in the same stage
+            get_row(2, 2, 2, CREATED_AT + timedelta(hours=3)),
+            # the stage is changed after 1 day in the stage
+            get_row(3, 2, 3, CREATED_AT + timedelta(days=1, hours=2)),
+        ]
+
+        fold = fold_deal_history(rows, entries={})
+
+        assert [
+            (
+                rollup.day,
+                rollup.from_sale_stage_id,
+                rollup.to_sale_stage_id,
+                rollup.transitions,
+                rollup.duration_total,
+            )
+            for rollup in fold.rollups
+        ] == [
+            (date(2026, 10, 1), 1, 2, 1, 7200),
+            (date(2026, 10, 2), 2, 3, 1, 86400),
+        ]
+        assert (
+            fold.rollups[1].duration_histogram[get_duration_bucket(86400)] == 1
+        )
+        assert fold.entries == [
+            DealStageEntryDTO(
+                deal_id=DEAL_ID,
+                sale_stage_id=3,
+                entered_at=CREATED_AT + timedelta(days=1, hours=2),
+            )
+        ]
+
+    def test_fold_from_saved_entry(self):
+        entered_at = CREATED_AT + timedelta(days=3)
+
+        fold = fold_deal_history(
+            [get_row(10, 4, 5, entered_at + timedelta(minutes=30))],
+            entries={
+                DEAL_ID: DealStageEntryDTO(
+                    deal_id=DEAL_ID, sale_stage_id=4, entered_at=entered_at
+                )
+            },
+        )
+
+        assert fold.rollups[0].duration_total == 1800
+
+    def test_fold_deleted_deal(self):
+        fold = fold_deal_history(
+            [
+                get_row(
+                    1,
+                    1,
+                    2,
+                    CREATED_AT + timedelta(hours=1),
+                    deal_created_at=None,
+                ),
+                # the version of the deletion
+                get_row(2, 2, None, CREATED_AT + timedelta(hours=2)),
+            ],
+            entries={},
+        )
+
+        assert fold.rollups[0].transitions == 1
+        # the time in the stage is unknown
+        assert sum(fold.rollups[0].duration_histogram) == 0
+        assert fold.entries == []
+
+    def test_percentiles(self):
+        histogram = [0] * DURATION_BUCKETS_COUNT
+        # 90 moves in (60, 120] seconds and 10 moves in (120, 240] seconds
+        histogram[1] = 90
+        histogram[2] = 10
+
+        merged = merge_histograms([histogram, histogram])
+
+        assert get_percentile(merged, 50) == approx(60 + 60 * 100 / 180)
+        assert get_percentile(merged, 95) == approx(120 + 120 * 10 / 20)
+        assert get_percentile([0] * DURATION_BUCKETS_COUNT, 50) is None
+
+
+@mark.service
+class TestDealHistoryRollup:
+    async def test_fold_until_last_batch(self, monkeypatch: MonkeyPatch):
+        analytics_repository = AsyncMock()
+        analytics_repository.fold_deal_history.side_effect = [100, 100, 7]
+        monkeypatch.setattr(
+            rollup_module,
+            "DealAnalyticsRepository",
+            MagicMock(return_value=analytics_repository),
+        )
+        rollup = DealHistoryRollup(
+            session_factory=session_factory,  # type: ignore
+            batch_size=100,
+            interval=1,
+            settle_delay=5,
+        )
+
+        result = await rollup.fold()
+
+        assert result == 207
+        analytics_repository.fold_deal_history.assert_awaited_with(
+            batch_size=100, settle_delay=5
+        )
+        assert rollup.metrics.folded_rows_total == 207
@@ -0,0 +1,146 @@
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from pytest import MonkeyPatch, fixture, mark
+
+from domain.exceptions import DealDBError, DealLeadNotFoundError
+from dto.deal_dto import (
+    DealCreateDTO,
+    DealDTO,
+    DealIntakeRequestDTO,
+)
+from services import deal_intake_worker as worker_module
+from services.deal_intake_worker import DealIntakeWorker
+
+MAX_ATTEMPTS = 3
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+def get_request(index: int, attempts: int = 0) -> DealIntakeRequestDTO:
+    return DealIntakeRequestDTO(
+        intake_id=UUID(int=index),
+        deal=DealCreateDTO(
+            deal_id=UUID(int=100 + index),
+            sale_stage_id=1,
+            lead_id=UUID(int=200 + index),
+            fields={"email": "lead@example.com"},
+            cost=0,
+            probability=0,
+            priority=-1,
+        ),
+        attempts=attempts,
+    )
+
+
+def get_deals(requests: list[DealIntakeRequestDTO]) -> list[DealDTO]:
+    return [
+        DealDTO(
+            **request.deal.model_dump(exclude={"manager_id"}),
+            manager_id=UUID(int=300),
+            created_at=datetime.now(tz=UTC),
+            updated_at=datetime.now(tz=UTC),
+        )
+        for request in requests
+    ]
+
+
+@fixture
+def worker(monkeypatch: MonkeyPatch):
+    deal_repository = AsyncMock()
+    monkeypatch.setattr(
+        worker_module,
+        "DealRepository",
+        MagicMock(return_value=deal_repository),
+    )
+    event_stream = AsyncMock()
+
+    return (
+        DealIntakeWorker(
+            session_factory=session_factory,  # type: ignore
+            outbox_dispatcher=MagicMock(),
+            forecast_cache=AsyncMock(),
+            event_stream=event_stream,
+            batch_size=10,
+            interval=1,
+            lease=60,
+            max_attempts=MAX_ATTEMPTS,
+            base_backoff=1,
+            max_backoff=5,
+            retention=3600,
+        ),
+        deal_repository,
+        event_stream,
+    )
+
+
+@mark.service
+class TestDealIntakeWorker:
+    async def test_process_batch(self, worker):
+        worker, deal_repository, event_stream = worker
+        requests = [get_request(1), get_request(2)]
+        deal_repository.claim_deal_intakes.return_value = requests
+        deal_repository.create_intake_deals.return_value = get_deals(requests)
+
+        claimed = await worker.process()
+
+        assert claimed == 2
+        # the batch is created by one upsert
+        deal_repository.create_intake_deals.assert_awaited_once_with(requests)
+        deal_repository.postpone_deal_intake.assert_not_awaited()
+        assert event_stream.publish.await_count == 2
+        assert worker.metrics.processed_total == 2
+
+    async def test_reject_invalid_request(self, worker):
+        worker, deal_repository, _ = worker
+        requests = [get_request(1), get_request(2), get_request(3)]
+        deal_repository.claim_deal_intakes.return_value = requests
+
+        async def create_intake_deals(batch):
+            if any(request.intake_id == UUID(int=2) for request in batch):
+                raise DealLeadNotFoundError
+            return get_deals(batch)
+
+        deal_repository.create_intake_deals.side_effect = create_intake_deals
+
+        await worker.process()
+
+        # the batch and the requests one by one
+        assert deal_repository.create_intake_deals.await_count == 4
+        deal_repository.postpone_deal_intake.assert_awaited_once()
+        postpone_kwargs = deal_repository.postpone_deal_intake.await_args
+        assert postpone_kwargs.kwargs["intake_id"] == UUID(int=2)
+        assert postpone_kwargs.kwargs["failed"]
+        assert worker.metrics.processed_total == 2
+        assert worker.metrics.rejected_total == 1
+
+    @mark.parametrize(
+        "attempts, expected_delay, expected_failed",
+        [(0, 1, False), (1, 2, False), (MAX_ATTEMPTS - 1, 4, True)],
+        ids=["first_retry", "exponential_backoff", "last_attempt"],
+    )
+    async def test_retry_batch_on_database_error(
+        self,
+        worker,
+        attempts: int,
+        expected_delay: float,
+        expected_failed: bool,
+    ):
+        worker, deal_repository, _ = worker
+        deal_repository.claim_deal_intakes.return_value = [
+            get_request(1, attempts=attempts)
+        ]
+        deal_repository.create_intake_deals.side_effect = DealDBError
+
+        await worker.process()
+
+        # the database errors aren't isolated by the requests
+        deal_repository.create_intake_deals.assert_awaited_once()
+        postpone_kwargs = deal_repository.postpone_deal_intake.await_args
+        assert postpone_kwargs.kwargs["delay"] == expected_delay
+        assert postpone_kwargs.kwargs["failed"] == expected_failed
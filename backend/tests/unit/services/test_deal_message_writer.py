@@ -0,0 +1,107 @@
+import asyncio
+from contextlib import asynccontextmanager, suppress
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from pytest import MonkeyPatch, fixture, mark, raises
+
+from domain.exceptions import DealNotFoundError
+from dto.message_dto import MessageCreateDTO
+from services import deal_message_writer as writer_module
+from services.deal_message_writer import DealMessageWriter
+
+DELETED_DEAL_ID = UUID(int=2)
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+def get_message(deal_id: UUID = UUID(int=1)) -> MessageCreateDTO:
+    return MessageCreateDTO(deal_id=deal_id, message="Hi", user_id=UUID(int=3))
+
+
+async def write_messages(messages_data: list[MessageCreateDTO]) -> list[int]:
+    if any(message.deal_id == DELETED_DEAL_ID for message in messages_data):
+        raise DealNotFoundError
+    return [id(message) for message in messages_data]
+
+
+@fixture
+def deal_repository(monkeypatch: MonkeyPatch):
+    deal_repository = AsyncMock()
+    deal_repository.write_messages.side_effect = write_messages
+    monkeypatch.setattr(
+        writer_module,
+        "DealRepository",
+        MagicMock(return_value=deal_repository),
+    )
+    return deal_repository
+
+
+@fixture
+async def writer():
+    writer = DealMessageWriter(
+        session_factory=session_factory,  # type: ignore
+        flush_interval=0.05,
+        max_batch_size=10,
+        max_queue_size=10,
+    )
+    writer_task = asyncio.create_task(writer.run())
+    yield writer
+    writer_task.cancel()
+    with suppress(asyncio.CancelledError):
+        await writer_task
+
+
+@mark.service
+class TestDealMessageWriter:
+    async def test_group_commit(
+        self, writer: DealMessageWriter, deal_repository: AsyncMock
+    ):
+        messages = [get_message() for _ in range(3)]
+
+        message_ids = await asyncio.gather(
+            *(writer.write(message) for message in messages)
+        )
+
+        assert message_ids == [id(message) for message in messages]
+        deal_repository.write_messages.assert_awaited_once_with(messages)
+        assert writer.metrics.flushes == 1
+        assert writer.metrics.written_messages_total == 3
+
+    async def test_failed_message_of_batch(
+        self, writer: DealMessageWriter, deal_repository: AsyncMock
+    ):
+        message = get_message()
+        failed_message = get_message(deal_id=DELETED_DEAL_ID)
+
+        results = await asyncio.gather(
+            writer.write(message),
+            writer.write(failed_message),
+            return_exceptions=True,
+        )
+
+        assert results[0] == id(message)
+        assert isinstance(results[1], DealNotFoundError)
+        # the batch and every message of the batch
+        assert deal_repository.write_messages.await_count == 3
+        assert writer.metrics.failed_messages_total == 1
+
+    async def test_flush_on_cancel(self, deal_repository: AsyncMock):
+        writer = DealMessageWriter(
+            session_factory=session_factory,  # type: ignore
+            flush_interval=60,
+            max_batch_size=10,
+            max_queue_size=10,
+        )
+        writer_task = asyncio.create_task(writer.run())
+        write_task = asyncio.create_task(writer.write(get_message()))
+        await asyncio.sleep(0.01)
+
+        writer_task.cancel()
+        with raises(asyncio.CancelledError):
+            await writer_task
+
+        assert await write_task
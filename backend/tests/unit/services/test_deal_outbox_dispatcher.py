@@ -0,0 +1,251 @@
+from contextlib import asynccontextmanager
+from datetime import UTC, datetime
+from time import monotonic
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from aiogram import Bot
+from aiogram.client.session.aiohttp import AiohttpSession
+from aiogram.client.telegram import TelegramAPIServer
+from aiohttp import web
+from aiohttp.test_utils import TestServer
+from pytest import MonkeyPatch, mark
+from pytest_asyncio import fixture as async_fixture
+
+from domain.enums import DealOutboxEvent
+from dto.deal_dto import DealOutboxEventDTO
+from services import deal_outbox_dispatcher as dispatcher_module
+from services.deal_outbox_dispatcher import DealOutboxDispatcher
+from telegram.notification_manager import (
+    ChatRateLimiter,
+    TelegramNotificationManager,
+)
+
+BOT_TOKEN = "123456:TEST_TOKEN"
+CHAT_ID = 42
+MAX_ATTEMPTS = 5
+
+
+class FakeTelegram:
+    """Local Bot API server, that fails the first `failures` messages."""
+
+    def __init__(self):
+        self.failures = 0
+        self.sent_messages: list[dict] = []
+
+    async def send_message(self, request: web.Request) -> web.Response:
+        data = dict(await request.post())
+        if self.failures:
+            self.failures -= 1
+            return web.json_response(
+                {"ok": False, "error_code": 500, "description": "Down"},
+                status=500,
+            )
+
+        self.sent_messages.append(data)
+        return web.json_response(
+            {
+                "ok": True,
+                "result": {
+                    "message_id": len(self.sent_messages),
+                    "date": 0,
+                    "chat": {"id": CHAT_ID, "type": "group"},
+                },
+            }
+        )
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+def get_event(outbox_id: int, attempts: int = 0) -> DealOutboxEventDTO:
+    return DealOutboxEventDTO(
+        outbox_id=outbox_id,
+        deal_id=UUID(int=outbox_id),
+        event_type=DealOutboxEvent.DEAL_CREATED,
+        payload={
+            "deal_id": str(UUID(int=outbox_id)),
+            "sale_stage_id": 1,
+            "manager_id": str(UUID(int=100)),
+            "lead_id": str(UUID(int=200 + outbox_id)),
+            "fields": {"email": "lead@example.com"},
+            "cost": 0,
+            "probability": 0,
+            "priority": -1,
+            "created_at": "2026-10-19T10:00:00Z",
+            "updated_at": "2026-10-19T10:00:00Z",
+        },
+        attempts=attempts,
+        created_at=datetime.now(tz=UTC),
+    )
+
+
+@async_fixture
+async def fake_telegram():
+    fake_telegram = FakeTelegram()
+    app = web.Application()
+    app.router.add_post(
+        f"/bot{BOT_TOKEN}/sendMessage", fake_telegram.send_message
+    )
+
+    server = TestServer(app)
+    await server.start_server()
+    yield fake_telegram, str(server.make_url(""))
+    await server.close()
+
+
+@async_fixture
+async def dispatcher(fake_telegram, monkeypatch: MonkeyPatch):
+    _, base_url = fake_telegram
+    bot = Bot(
+        BOT_TOKEN,
+        session=AiohttpSession(
+            api=TelegramAPIServer.from_base(base_url.rstrip("/"))
+        ),
+    )
+    deal_repository = AsyncMock()
+    monkeypatch.setattr(
+        dispatcher_module,
+        "DealRepository",
+        MagicMock(return_value=deal_repository),
+    )
+
+    yield (
+        DealOutboxDispatcher(
+            session_factory=session_factory,  # type: ignore
+            notification_manager=TelegramNotificationManager(
+                bot=bot, chat_id=CHAT_ID
+            ),
+            batch_size=10,
+            interval=1,
+            lease=60,
+            max_attempts=MAX_ATTEMPTS,
+            base_backoff=1,
+            max_backoff=5,
+            digest_window=0,
+            digest_min_size=3,
+        ),
+        deal_repository,
+    )
+    await bot.session.close()
+
+
+@mark.service
+class TestDealOutboxDispatcher:
+    async def test_dispatch_batch(self, dispatcher, fake_telegram):
+        dispatcher, deal_repository = dispatcher
+        fake_telegram, _ = fake_telegram
+        deal_repository.claim_outbox_events.return_value = [
+            get_event(1),
+            get_event(2),
+        ]
+
+        claimed = await dispatcher.dispatch()
+
+        assert claimed == 2
+        assert len(fake_telegram.sent_messages) == 2
+        assert all(
+            message["chat_id"] == str(CHAT_ID)
+            for message in fake_telegram.sent_messages
+        )
+        deal_repository.delete_outbox_events.assert_awaited_once_with([1, 2])
+        deal_repository.postpone_outbox_event.assert_not_awaited()
+        assert dispatcher.metrics.delivered_total == 2
+
+    @mark.parametrize(
+        "attempts, expected_delay",
+        [(0, 1), (2, 4), (10, 5)],
+        ids=["first_retry", "exponential_backoff", "max_backoff"],
+    )
+    async def test_retry_failed_event(
+        self,
+        dispatcher,
+        fake_telegram,
+        attempts: int,
+        expected_delay: float,
+    ):
+        dispatcher, deal_repository = dispatcher
+        fake_telegram, _ = fake_telegram
+        fake_telegram.failures = 1
+        deal_repository.claim_outbox_events.return_value = [
+            get_event(1, attempts=attempts),
+            get_event(2),
+        ]
+
+        await dispatcher.dispatch()
+
+        deal_repository.postpone_outbox_event.assert_awaited_once()
+        postpone_kwargs = deal_repository.postpone_outbox_event.await_args
+        assert postpone_kwargs.kwargs["outbox_id"] == 1
+        assert postpone_kwargs.kwargs["delay"] == expected_delay
+        # the event of the last attempt isn't retried
+        assert postpone_kwargs.kwargs["failed"] is (attempts == 10)
+        deal_repository.delete_outbox_events.assert_awaited_once_with([2])
+        assert dispatcher.metrics.failed_attempts_total == 1
+
+    async def test_dispatch_digest(self, dispatcher, fake_telegram):
+        dispatcher, deal_repository = dispatcher
+        fake_telegram, _ = fake_telegram
+        deal_repository.claim_outbox_events.return_value = [
+            get_event(outbox_id) for outbox_id in range(1, 6)
+        ]
+
+        await dispatcher.dispatch()
+
+        assert len(fake_telegram.sent_messages) == 1
+        assert "Новые заявки \\(5\\)" in fake_telegram.sent_messages[0]["text"]
+        deal_repository.delete_outbox_events.assert_awaited_once_with(
+            [1, 2, 3, 4, 5]
+        )
+
+    async def test_retry_failed_digest(self, dispatcher, fake_telegram):
+        dispatcher, deal_repository = dispatcher
+        fake_telegram, _ = fake_telegram
+        fake_telegram.failures = 1
+        deal_repository.claim_outbox_events.return_value = [
+            get_event(outbox_id) for outbox_id in range(1, 4)
+        ]
+
+        await dispatcher.dispatch()
+
+        assert deal_repository.postpone_outbox_event.await_count == 3
+        deal_repository.delete_outbox_events.assert_not_awaited()
+
+    async def test_fail_invalid_event(self, dispatcher, fake_telegram):
+        dispatcher, deal_repository = dispatcher
+        fake_telegram, _ = fake_telegram
+        invalid_event = get_event(1)
+        invalid_event.payload["deal_id"] = "invalid"
+        deal_repository.claim_outbox_events.return_value = [
+            invalid_event,
+            *(get_event(outbox_id) for outbox_id in range(2, 5)),
+        ]
+
+        await dispatcher.dispatch()
+
+        # the invalid event doesn't fail the digest of the other events
+        deal_repository.postpone_outbox_event.assert_awaited_once()
+        postpone_kwargs = deal_repository.postpone_outbox_event.await_args
+        assert postpone_kwargs.kwargs["outbox_id"] == 1
+        assert postpone_kwargs.kwargs["failed"] is True
+        assert "Новые заявки \\(3\\)" in fake_telegram.sent_messages[0]["text"]
+        deal_repository.delete_outbox_events.assert_awaited_once_with(
+            [2, 3, 4]
+        )
+        assert dispatcher.metrics.failed_total == 1
+
+
+@mark.service
+class TestChatRateLimiter:
+    async def test_acquire(self):
+        rate_limiter = ChatRateLimiter(messages_per_minute=600)
+
+        started_at = monotonic()
+        for _ in range(3):
+            await rate_limiter.acquire(chat_id=CHAT_ID)
+        # the other chat isn't delayed
+        await rate_limiter.acquire(chat_id=CHAT_ID + 1)
+
+        assert 0.2 <= monotonic() - started_at < 0.3
@@ -0,0 +1,228 @@
+import gzip
+from contextlib import asynccontextmanager
+from datetime import date
+from pathlib import Path
+from unittest.mock import AsyncMock, MagicMock
+
+from pytest import MonkeyPatch, mark, raises
+
+from dto.deal_dto import DealPartitionDTO
+from services import deal_partition_archiver as archiver_module
+from services.classes.partition_archive import (
+    PartitionArchiveWriter,
+    get_month,
+    shift_month,
+)
+from services.deal_partition_archiver import DealPartitionArchiver
+
+
+@asynccontextmanager
+async def session_factory():
+    yield None
+
+
+def get_archiver(directory: Path) -> DealPartitionArchiver:
+    return DealPartitionArchiver(
+        session_factory=session_factory,  # type: ignore
+        directory=directory,
+        batch_size=2,
+        premake_months=1,
+        retention_months={"deal_message": 24, "deal_history": 12},
+        interval=1,
+    )
+
+
+def get_partition_repository(
+    partitions: dict[str, list[DealPartitionDTO]],
+    unfolded: bool = False,
+    locked: bool = False,
+) -> MagicMock:
+    async def export_partition(partition_name: str, batch_size: int):
+        yield ['{"deal_message_id": 1}', '{"deal_message_id": 2}']
+        yield ['{"deal_message_id": 3}']
+
+    repository = MagicMock()
+    repository.try_lock_archivation = AsyncMock(return_value=not locked)
+    repository.create_month_partition = AsyncMock(return_value=False)
+    repository.get_expired_partitions = AsyncMock(
+        side_effect=lambda table_name, before: partitions[table_name]
+    )
+    repository.has_unfolded_history = AsyncMock(return_value=unfolded)
+    repository.detach_partition = AsyncMock()
+    repository.export_partition = MagicMock(side_effect=export_partition)
+    repository.drop_partition = AsyncMock()
+    return repository
+
+
+@mark.service
+class TestPartitionArchive:
+    def test_shift_month(self):
+        assert get_month(date(2026, 10, 19)) == date(2026, 10, 1)
+        assert shift_month(date(2026, 10, 1), 3) == date(2027, 1, 1)
+        assert shift_month(date(2026, 1, 1), -1) == date(2025, 12, 1)
+        assert shift_month(date(2026, 10, 1), -24) == date(2024, 10, 1)
+
+    def test_commit_writer(self, tmp_path: Path):
+        path = tmp_path / "archive" / "deal_message_202410.ndjson.gz"
+        writer = PartitionArchiveWriter(path)
+        writer.write(["{}", '{"a": 1}'])
+
+        assert not path.exists()
+        writer.commit()
+
+        assert not writer.temp_path.exists()
+        with gzip.open(path, "rt") as file:
+            assert file.read() == '{}\n{"a": 1}\n'
+
+    def test_writers_of_one_archive(self, tmp_path: Path):
+        path = tmp_path / "deal_message_202410.ndjson.gz"
+        first_writer = PartitionArchiveWriter(path)
+        second_writer = PartitionArchiveWriter(path)
+
+        # the writers don't truncate the temporary file of each other
+        assert first_writer.temp_path != second_writer.temp_path
+        first_writer.abort()
+        second_writer.abort()
+
+    def test_abort_writer(self, tmp_path: Path):
+        path = tmp_path / "deal_message_202410.ndjson.gz"
+        writer = PartitionArchiveWriter(path)
+        writer.write(["{}"])
+
+        writer.abort()
+
+        assert not path.exists()
+        assert not writer.temp_path.exists()
+
+
+@mark.service
+class TestDealPartitionArchiver:
+    async def test_archive_expired_partitions(
+        self, monkeypatch: MonkeyPatch, tmp_path: Path
+    ):
+        repository = get_partition_repository(
+            {
+                "deal_message": [
+                    DealPartitionDTO(
+                        partition_name="deal_message_202409", attached=True
+                    ),
+                    # the leftover of the interrupted archivation
+                    DealPartitionDTO(
+                        partition_name="deal_message_202408", attached=False
+                    ),
+                ],
+                "deal_history": [],
+            }
+        )
+        monkeypatch.setattr(
+            archiver_module,
+            "DealPartitionRepository",
+            MagicMock(return_value=repository),
+        )
+        archiver = get_archiver(tmp_path)
+
+        result = await archiver.archive(today=date(2026, 10, 19))
+
+        assert result == 2
+        repository.get_expired_partitions.assert_any_await(
+            "deal_message", date(2024, 10, 1)
+        )
+        repository.get_expired_partitions.assert_any_await(
+            "deal_history", date(2025, 10, 1)
+        )
+        repository.detach_partition.assert_awaited_once_with(
+            "deal_message", "deal_message_202409"
+        )
+        assert repository.drop_partition.await_count == 2
+        with gzip.open(tmp_path / "deal_message_202409.ndjson.gz", "rt") as f:
+            assert len(f.read().splitlines()) == 3
+        assert (tmp_path / "deal_message_202408.ndjson.gz").exists()
+        # the current and the next month of the both tables
+        assert repository.create_month_partition.await_count == 4
+        assert archiver.metrics.archived_partitions_total == 2
+        assert archiver.metrics.archived_rows_total == 6
+
+    async def test_keep_unfolded_history(
+        self, monkeypatch: MonkeyPatch, tmp_path: Path
+    ):
+        repository = get_partition_repository(
+            {
+                "deal_message": [],
+                "deal_history": [
+                    DealPartitionDTO(
+                        partition_name="deal_history_202409", attached=True
+                    ),
+                ],
+            },
+            unfolded=True,
+        )
+        monkeypatch.setattr(
+            archiver_module,
+            "DealPartitionRepository",
+            MagicMock(return_value=repository),
+        )
+        archiver = get_archiver(tmp_path)
+
+        result = await archiver.archive(today=date(2026, 10, 19))
+
+        assert result == 0
+        repository.detach_partition.assert_not_awaited()
+        repository.drop_partition.assert_not_awaited()
+        assert archiver.metrics.archived_partitions_total == 0
+
+    async def test_skip_locked_archivation(
+        self, monkeypatch: MonkeyPatch, tmp_path: Path
+    ):
+        repository = get_partition_repository(
+            {
+                "deal_message": [
+                    DealPartitionDTO(
+                        partition_name="deal_message_202409", attached=True
+                    ),
+                ],
+                "deal_history": [],
+            },
+            locked=True,
+        )
+        monkeypatch.setattr(
+            archiver_module,
+            "DealPartitionRepository",
+            MagicMock(return_value=repository),
+        )
+        archiver = get_archiver(tmp_path)
+
+        result = await archiver.archive(today=date(2026, 10, 19))
+
+        # the partitions are archived by another worker
+        assert result == 0
+        repository.create_month_partition.assert_not_awaited()
+        repository.get_expired_partitions.assert_not_awaited()
+        repository.drop_partition.assert_not_awaited()
+
+    async def test_keep_partition_on_failed_export(
+        self, monkeypatch: MonkeyPatch, tmp_path: Path
+    ):
+        repository = get_partition_repository({})
+
+        async def export_partition(partition_name: str, batch_size: int):
+            yield ["{}"]
+            raise OSError
+
+        repository.export_partition = MagicMock(side_effect=export_partition)
+        monkeypatch.setattr(
+            archiver_module,
+            "DealPartitionRepository",
+            MagicMock(return_value=repository),
+        )
+        archiver = get_archiver(tmp_path)
+
+        with raises(OSError):
+            await archiver.archive_partition(
+                "deal_message",
+                DealPartitionDTO(
+                    partition_name="deal_message_202409", attached=False
+                ),
+            )
+
+        repository.drop_partition.assert_not_awaited()
+        assert list(tmp_path.iterdir()) == []
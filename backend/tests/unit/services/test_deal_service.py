@@ -0,0 +1,632 @@
+import json
+from datetime import UTC, datetime, timedelta
+from unittest.mock import AsyncMock, MagicMock
+from uuid import UUID
+
+from pydantic import ValidationError
+from pytest import fixture, mark, raises
+from redis.exceptions import RedisError
+
+from domain.entities.deal import Deal
+from domain.entities.message import Message
+from domain.enums import DealState, LanguageEnum, Roles
+from domain.exceptions import DealAccessDeniedError, DealNotFoundError
+from dto.deal_dto import DealCursorDTO, DealDTO, DealFiltersDTO
+from dto.message_dto import MessageCursorDTO
+from schemas.deal_schema import DealCreateSchema, DealFiltersSchema
+from schemas.message_schema import MessageCreateSchema, MessageCursorsSchema
+from services.deal_membership_cache import DealMembershipCache
+from services.deal_service import DealService
+
+DEAL_ID = UUID(int=1)
+USER_ID = UUID(int=2)
+MANAGER_ID = UUID(int=3)
+REPLAY_LIMIT = 4
+CURSOR = MessageCursorDTO(
+    sent_at=datetime(2026, 10, 19, 12, 30, 15, 123456, tzinfo=UTC),
+    message_id=42,
+)
+
+
+@fixture
+def deal_repository_mock():
+    return AsyncMock()
+
+
+@fixture
+def chat_history_mock():
+    return AsyncMock()
+
+
+@fixture
+def websocket_manager_mock():
+    return AsyncMock()
+
+
+@fixture
+def message_writer_mock():
+    message_writer = AsyncMock()
+    message_writer.write.return_value = CURSOR.message_id
+    return message_writer
+
+
+@fixture
+def deal_service(
+    deal_repository_mock,
+    chat_history_mock,
+    websocket_manager_mock,
+    message_writer_mock,
+):
+    return DealService(
+        deal_repository=deal_repository_mock,
+        websocket_manager=websocket_manager_mock,
+        outbox_dispatcher=MagicMock(),
+        message_writer=message_writer_mock,
+        chat_history=chat_history_mock,
+        history_replay_limit=REPLAY_LIMIT,
+        membership_cache=DealMembershipCache(ttl=60, max_size=10),
+        forecast_cache=AsyncMock(),
+        event_stream=AsyncMock(),
+        intake_worker=MagicMock(),
+    )
+
+
+@mark.service
+class TestDealService:
+    def test_message_cursor(self):
+        assert MessageCursorDTO.decode(CURSOR.encode()) == CURSOR
+
+    def test_max_message_cursor(self):
+        cursor = MessageCursorsSchema(before="9" * 17 + "_" + "9" * 18)
+
+        assert MessageCursorDTO.decode(cursor.before).message_id < 2**63
+
+    @mark.parametrize(
+        "cursor",
+        ["999999999999999999_1", "1_9999999999999999999"],
+        ids=["sent_at_overflow", "message_id_overflow"],
+    )
+    def test_overflowed_message_cursor(self, cursor: str):
+        with raises(ValidationError):
+            MessageCursorsSchema(before=cursor)
+
+    @mark.parametrize(
+        "cursors, expectation",
+        [
+            (None, {"before": None, "after": None}),
+            (
+                MessageCursorsSchema(before=CURSOR.encode()),
+                {"before": CURSOR, "after": None},
+            ),
+            (
+                MessageCursorsSchema(after=CURSOR.encode()),
+                {"before": None, "after": CURSOR},
+            ),
+        ],
+        ids=["without_cursors", "before", "after"],
+    )
+    async def test_get_messages(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        cursors: MessageCursorsSchema | None,
+        expectation: dict,
+    ):
+        await deal_service.get_messages(
+            deal_id=DEAL_ID, limit=10, offset=0, cursors=cursors
+        )
+
+        deal_repository_mock.get_messages.assert_awaited_once_with(
+            DEAL_ID, 10, 0, **expectation
+        )
+
+    async def test_create_merged_deal(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        # the submission is merged into the deal of the lead
+        deal_repository_mock.create.return_value = DealDTO(
+            deal_id=DEAL_ID,
+            sale_stage_id=1,
+            manager_id=MANAGER_ID,
+            lead_id=USER_ID,
+            fields={},
+            cost=0,
+            probability=0,
+            priority=0,
+            created_at=CURSOR.sent_at,
+            updated_at=CURSOR.sent_at,
+        )
+
+        deal_id = await deal_service.create(
+            DealCreateSchema(
+                sale_stage_id=1,
+                lead_id=USER_ID,
+                fields={},
+                cost=0,
+                probability=0,
+                priority=0,
+            )
+        )
+
+        assert deal_id == DEAL_ID
+        deal_create = deal_repository_mock.create.await_args.kwargs[
+            "deal_create"
+        ]
+        assert deal_create.deal_id != DEAL_ID
+
+    def test_deal_cursor(self):
+        cursor = DealCursorDTO(updated_at=CURSOR.sent_at, deal_id=DEAL_ID)
+
+        assert DealCursorDTO.decode(cursor.encode()) == cursor
+
+    async def test_get_deals(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        cursor = DealCursorDTO(updated_at=CURSOR.sent_at, deal_id=DEAL_ID)
+
+        await deal_service.get_deals(
+            user_id=MANAGER_ID,
+            role_id=Roles.ADMIN,
+            limit=10,
+            offset=0,
+            filters=DealFiltersSchema(
+                manager_id=MANAGER_ID,
+                state=DealState.OPEN,
+                lost=False,
+                after=cursor.encode(),
+            ),
+        )
+
+        deal_repository_mock.get_deals.assert_awaited_once_with(
+            user_id=MANAGER_ID,
+            limit=10,
+            offset=0,
+            filters=DealFiltersDTO(
+                manager_id=MANAGER_ID,
+                state=DealState.OPEN,
+                lost=False,
+                after=cursor,
+            ),
+        )
+
+    @mark.parametrize(
+        "filters, expectation",
+        [
+            (None, DealFiltersDTO(lead_id=USER_ID)),
+            (
+                DealFiltersSchema(state=DealState.OPEN),
+                DealFiltersDTO(state=DealState.OPEN, lead_id=USER_ID),
+            ),
+        ],
+        ids=["without_filters", "with_filters"],
+    )
+    async def test_get_deals_by_lead(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        filters: DealFiltersSchema | None,
+        expectation: DealFiltersDTO,
+    ):
+        await deal_service.get_deals(
+            user_id=USER_ID,
+            role_id=Roles.LEAD,
+            limit=10,
+            offset=0,
+            filters=filters,
+        )
+
+        # the lead sees only their own deal
+        deal_repository_mock.get_deals.assert_awaited_once_with(
+            user_id=USER_ID, limit=10, offset=0, filters=expectation
+        )
+
+    async def test_get_board_by_lead(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        with raises(DealAccessDeniedError):
+            await deal_service.get_board(
+                user_id=USER_ID, role_id=Roles.LEAD, limit=10
+            )
+        deal_repository_mock.get_board.assert_not_awaited()
+
+    async def test_search_deals(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        await deal_service.search_deals(
+            user_id=MANAGER_ID,
+            role_id=Roles.ADMIN,
+            query="+7 (916) 123-45-67",
+            limit=10,
+        )
+
+        deal_repository_mock.search_deals.assert_awaited_once_with(
+            user_id=MANAGER_ID, query="+7 (916) 123-45-67", limit=10
+        )
+
+    async def test_search_deals_by_lead(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        with raises(DealAccessDeniedError):
+            await deal_service.search_deals(
+                user_id=USER_ID,
+                role_id=Roles.LEAD,
+                query="lead@example.com",
+                limit=10,
+            )
+        deal_repository_mock.search_deals.assert_not_awaited()
+
+    async def test_search_messages(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        await deal_service.search_messages(
+            user_id=MANAGER_ID,
+            role_id=Roles.ADMIN,
+            language=LanguageEnum.ENGLISH,
+            query="pinot noir delivery",
+            limit=10,
+        )
+
+        deal_repository_mock.search_messages.assert_awaited_once_with(
+            user_id=MANAGER_ID,
+            language=LanguageEnum.ENGLISH,
+            query="pinot noir delivery",
+            limit=10,
+        )
+
+    async def test_search_messages_by_lead(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        with raises(DealAccessDeniedError):
+            await deal_service.search_messages(
+                user_id=USER_ID,
+                role_id=Roles.LEAD,
+                language=LanguageEnum.ENGLISH,
+                query="pinot noir delivery",
+                limit=10,
+            )
+        deal_repository_mock.search_messages.assert_not_awaited()
+
+
+def get_message(message_id: int) -> Message:
+    return Message(
+        message_id=message_id,
+        deal_id=DEAL_ID,
+        message=f"Message {message_id}",
+        user_id=USER_ID,
+        sent_at=CURSOR.sent_at + timedelta(seconds=message_id),
+    )
+
+
+def get_message_cursor(message: Message) -> str:
+    return MessageCursorDTO(
+        sent_at=message.sent_at, message_id=message.message_id
+    ).encode()
+
+
+@mark.service
+class TestDealServiceReplay:
+    async def test_replay_from_recent_history(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        messages = [get_message(message_id) for message_id in range(1, 6)]
+        # the messages are appended in the order of the commits
+        chat_history_mock.get_recent.return_value = [
+            message.model_dump_json() for message in messages[::-1]
+        ]
+
+        replay = await deal_service.get_replay(
+            DEAL_ID, last_seen=get_message_cursor(messages[1])
+        )
+
+        assert replay == messages[2:]
+        deal_repository_mock.get_messages.assert_not_awaited()
+
+    async def test_replay_limit(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        messages = [
+            get_message(message_id)
+            for message_id in range(1, REPLAY_LIMIT + 3)
+        ]
+        chat_history_mock.get_recent.return_value = [
+            message.model_dump_json() for message in messages
+        ]
+
+        replay = await deal_service.get_replay(DEAL_ID)
+
+        assert replay == messages[-REPLAY_LIMIT:]
+        deal_repository_mock.get_messages.assert_not_awaited()
+
+    async def test_replay_older_messages_from_database(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        messages = [get_message(message_id) for message_id in range(1, 6)]
+        # the history of the deal is expired before the 4th message
+        chat_history_mock.get_recent.return_value = [
+            message.model_dump_json() for message in messages[3:]
+        ]
+        deal_repository_mock.get_messages.return_value = messages[1:3]
+
+        replay = await deal_service.get_replay(
+            DEAL_ID, last_seen=get_message_cursor(messages[0])
+        )
+
+        assert replay == messages[1:]
+        # the messages between the last seen one and the history
+        deal_repository_mock.get_messages.assert_awaited_once_with(
+            DEAL_ID,
+            REPLAY_LIMIT,
+            0,
+            before=MessageCursorDTO.decode(get_message_cursor(messages[3])),
+            after=MessageCursorDTO.decode(get_message_cursor(messages[0])),
+        )
+
+    async def test_replay_first_missed_messages(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        messages = [
+            get_message(message_id)
+            for message_id in range(1, REPLAY_LIMIT + 3)
+        ]
+        chat_history_mock.get_recent.return_value = [
+            message.model_dump_json() for message in messages
+        ]
+
+        replay = await deal_service.get_replay(
+            DEAL_ID, last_seen=get_message_cursor(messages[0])
+        )
+
+        # the client continues after the last replayed message
+        assert replay == messages[1 : REPLAY_LIMIT + 1]
+        deal_repository_mock.get_messages.assert_not_awaited()
+
+    async def test_replay_without_redis(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        messages = [get_message(message_id) for message_id in range(1, 3)]
+        chat_history_mock.get_recent.side_effect = RedisError
+        deal_repository_mock.get_messages.return_value = messages
+
+        replay = await deal_service.get_replay(DEAL_ID)
+
+        assert replay == messages
+        # the latest page, not the first one
+        deal_repository_mock.get_messages.assert_awaited_once_with(
+            DEAL_ID, REPLAY_LIMIT, 0, before=None, after=None, latest=True
+        )
+
+    async def test_replay_after_last_seen_without_redis(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        messages = [get_message(message_id) for message_id in range(2, 4)]
+        chat_history_mock.get_recent.side_effect = RedisError
+        deal_repository_mock.get_messages.return_value = messages
+
+        replay = await deal_service.get_replay(
+            DEAL_ID, last_seen=get_message_cursor(get_message(1))
+        )
+
+        assert replay == messages
+        # the first messages after the last seen one
+        deal_repository_mock.get_messages.assert_awaited_once_with(
+            DEAL_ID,
+            REPLAY_LIMIT,
+            0,
+            before=None,
+            after=MessageCursorDTO.decode(get_message_cursor(get_message(1))),
+        )
+
+
+def get_deal(manager_id: UUID | None = MANAGER_ID) -> Deal:
+    return Deal(
+        deal_id=DEAL_ID,
+        lead_id=USER_ID,
+        sale_stage_id=1,
+        manager_id=manager_id,
+        fields=None,
+        probability=0.5,
+        cost=100,
+        priority=1,
+        created_at=CURSOR.sent_at,
+    )
+
+
+@mark.service
+class TestDealServiceMembership:
+    @mark.parametrize(
+        "user_id",
+        [USER_ID, MANAGER_ID],
+        ids=["lead", "manager"],
+    )
+    async def test_write_message_of_member(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        user_id: UUID,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+
+        for _ in range(3):
+            await deal_service.write_message(
+                user_id=user_id,
+                message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+            )
+
+        # the members are cached by the first message
+        deal_repository_mock.get.assert_awaited_once_with(DEAL_ID)
+
+    async def test_write_message_of_stranger(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+
+        with raises(DealAccessDeniedError):
+            await deal_service.write_message(
+                user_id=UUID(int=4),
+                message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+            )
+
+    async def test_write_message_after_reassignment(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        new_manager_id = UUID(int=4)
+        deal_repository_mock.get.side_effect = [
+            get_deal(),
+            get_deal(manager_id=new_manager_id),
+        ]
+        await deal_service.write_message(
+            user_id=MANAGER_ID,
+            message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+        )
+
+        await deal_service.change_sale_stage(deal_id=DEAL_ID, sale_stage_id=2)
+
+        with raises(DealAccessDeniedError):
+            await deal_service.write_message(
+                user_id=MANAGER_ID,
+                message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+            )
+        await deal_service.write_message(
+            user_id=new_manager_id,
+            message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+        )
+
+    async def test_connect_stranger_to_chat(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        websocket_manager_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+
+        with raises(DealAccessDeniedError):
+            await deal_service.connect_to_chat(
+                websocket=AsyncMock(), deal_id=DEAL_ID, user_id=UUID(int=4)
+            )
+        deal_repository_mock.get.return_value = None
+        with raises(DealNotFoundError):
+            await deal_service.connect_to_chat(
+                websocket=AsyncMock(), deal_id=UUID(int=5), user_id=USER_ID
+            )
+
+        # the stranger doesn't receive the messages and the history
+        websocket_manager_mock.connect.assert_not_awaited()
+        websocket_manager_mock.send_to.assert_not_awaited()
+        chat_history_mock.get_recent.assert_not_awaited()
+
+    async def test_mark_messages_viewed(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+
+        await deal_service.mark_messages_viewed(
+            deal_id=DEAL_ID, user_id=MANAGER_ID, until=CURSOR.encode()
+        )
+
+        deal_repository_mock.mark_messages_viewed.assert_awaited_once_with(
+            deal_id=DEAL_ID, user_id=MANAGER_ID, until=CURSOR
+        )
+
+    async def test_mark_messages_viewed_by_stranger(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+
+        with raises(DealAccessDeniedError):
+            await deal_service.mark_messages_viewed(
+                deal_id=DEAL_ID, user_id=UUID(int=4), until=CURSOR.encode()
+            )
+        deal_repository_mock.get.return_value = None
+        with raises(DealNotFoundError):
+            await deal_service.mark_messages_viewed(
+                deal_id=UUID(int=5), user_id=USER_ID, until=CURSOR.encode()
+            )
+        deal_repository_mock.mark_messages_viewed.assert_not_awaited()
+
+    async def test_broadcast_written_message(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        websocket_manager_mock: AsyncMock,
+        message_writer_mock: AsyncMock,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+        calls = MagicMock()
+        calls.attach_mock(message_writer_mock.write, "write")
+        calls.attach_mock(websocket_manager_mock.broadcast, "broadcast")
+
+        message = await deal_service.write_message(
+            user_id=USER_ID,
+            message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+        )
+
+        # the message is broadcast after its commit
+        assert [call[0] for call in calls.mock_calls] == [
+            "write",
+            "broadcast",
+        ]
+        payload = json.loads(
+            websocket_manager_mock.broadcast.await_args.kwargs["payload"]
+        )
+        assert payload["message_id"] == CURSOR.message_id
+        assert payload["cursor"] == get_message_cursor(message)
+
+    async def test_write_message_without_broker(
+        self,
+        deal_service: DealService,
+        deal_repository_mock: AsyncMock,
+        websocket_manager_mock: AsyncMock,
+        chat_history_mock: AsyncMock,
+    ):
+        deal_repository_mock.get.return_value = get_deal()
+        websocket_manager_mock.broadcast.side_effect = RedisError
+
+        message = await deal_service.write_message(
+            user_id=USER_ID,
+            message=MessageCreateSchema(deal_id=DEAL_ID, message="Hi"),
+        )
+
+        # the written message is saved to the history despite the broker
+        assert message.message_id == CURSOR.message_id
+        chat_history_mock.append.assert_awaited_once()
@@ -0,0 +1,84 @@
+import asyncio
+from contextlib import suppress
+from unittest.mock import AsyncMock
+
+from pytest import mark, raises
+
+from services.classes.periodic_job import PeriodicJob, PeriodicJobMetrics
+
+
+class CounterMetrics(PeriodicJobMetrics):
+    counted_total: int = 0
+
+
+async def run_for_a_while(job: PeriodicJob) -> None:
+    task = asyncio.create_task(job.run())
+    await asyncio.sleep(0.01)
+    task.cancel()
+    with suppress(asyncio.CancelledError):
+        await task
+
+
+@mark.service
+class TestPeriodicJob:
+    async def test_run_step(self):
+        metrics = CounterMetrics()
+
+        async def step() -> None:
+            metrics.counted_total += 1
+
+        job = PeriodicJob(name="Counter", step=step, metrics=metrics)
+
+        await job.run_step()
+
+        # the metrics of the owner are kept
+        assert metrics.counted_total == 1
+        assert metrics.runs == 1
+        assert metrics.last_run_at is not None
+
+    async def test_failed_step(self):
+        metrics = PeriodicJobMetrics()
+        job = PeriodicJob(
+            name="Counter",
+            step=AsyncMock(side_effect=RuntimeError),
+            metrics=metrics,
+        )
+
+        with raises(RuntimeError):
+            await job.run_step()
+        assert metrics.runs == 0
+
+    async def test_run_after_unexpected_error(self):
+        metrics = PeriodicJobMetrics()
+        waits = 0
+
+        async def step() -> None:
+            # the first step fails
+            if not metrics.failed_runs:
+                raise RuntimeError
+
+        async def wait() -> None:
+            nonlocal waits
+            waits += 1
+            await asyncio.sleep(0)
+
+        job = PeriodicJob(
+            name="Counter", step=step, metrics=metrics, wait=wait
+        )
+
+        await run_for_a_while(job)
+
+        # the job isn't stopped by the error
+        assert metrics.failed_runs == 1
+        assert metrics.runs > 0
+        assert waits >= metrics.runs
+
+    async def test_sleep_between_steps(self):
+        metrics = PeriodicJobMetrics()
+        job = PeriodicJob(
+            name="Counter", step=AsyncMock(), metrics=metrics, interval=60
+        )
+
+        await run_for_a_while(job)
+
+        assert metrics.runs == 1